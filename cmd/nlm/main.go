@@ -144,7 +144,8 @@ func init() {
 		fmt.Fprintf(os.Stderr, "  auth [profile]    Setup authentication\n")
 		fmt.Fprintf(os.Stderr, "  refresh           Refresh authentication credentials\n")
 		fmt.Fprintf(os.Stderr, "  feedback <msg>    Submit feedback\n")
-		fmt.Fprintf(os.Stderr, "  hb                Send heartbeat\n\n")
+		fmt.Fprintf(os.Stderr, "  hb                Send heartbeat\n")
+		fmt.Fprintf(os.Stderr, "  worker            Serve line-delimited JSON command requests on stdin\n\n")
 	}
 }
 
@@ -422,6 +423,7 @@ func isValidCommand(cmd string) bool {
 		"generate-guide", "generate-outline", "generate-section", "generate-magic", "generate-mindmap", "generate-chat", "chat", "chat-list",
 		"rephrase", "expand", "summarize", "critique", "brainstorm", "verify", "explain", "outline", "study-guide", "faq", "briefing-doc", "mindmap", "timeline", "toc",
 		"auth", "refresh", "hb", "share", "share-private", "share-details", "feedback",
+		"worker",
 	}
 
 	for _, valid := range validCommands {
@@ -547,6 +549,15 @@ func run() error {
 		}
 	}
 
+	// Worker mode serves many commands from one process and API client
+	if cmd == "worker" {
+		client := api.New(authToken, cookies, opts...)
+		if useDirectRPC {
+			client.SetUseDirectRPC(true)
+		}
+		return runWorker(client)
+	}
+
 	for i := 0; i < 3; i++ {
 		if i > 0 {
 			if i == 1 {
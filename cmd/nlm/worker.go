@@ -0,0 +1,169 @@
+package main
+
+import (
+	"bufio"
+	"bytes"
+	"encoding/json"
+	"fmt"
+	"io"
+	"os"
+	"sync"
+
+	"github.com/tmc/nlm/internal/api"
+)
+
+// workerProtocolVersion is reported in the worker's ready line so callers can
+// detect incompatible changes to the request/response format.
+const workerProtocolVersion = 1
+
+// workerMaxLine bounds a single request line (text sources are sent inline).
+const workerMaxLine = 64 << 20
+
+// workerReady is written once on startup, before any request is read.
+type workerReady struct {
+	Ready    bool `json:"ready"`
+	Protocol int  `json:"protocol"`
+}
+
+// workerRequest is one line of input to `nlm worker`.
+type workerRequest struct {
+	ID    int64    `json:"id"`
+	Args  []string `json:"args"`
+	Stdin *string  `json:"stdin,omitempty"`
+}
+
+// workerResponse is one line of output from `nlm worker`, mirroring what a
+// one-shot invocation of the same command would have produced.
+type workerResponse struct {
+	ID       int64  `json:"id"`
+	ExitCode int    `json:"exit_code"`
+	Stdout   string `json:"stdout"`
+	Stderr   string `json:"stderr"`
+}
+
+// workerUnsupported lists commands that cannot run inside a worker because
+// they are interactive or manage the process's own credentials.
+var workerUnsupported = map[string]bool{
+	"help": true, "-h": true, "--help": true,
+	"auth": true, "refresh": true, "chat": true, "worker": true,
+}
+
+// runWorker serves line-delimited JSON requests from stdin until EOF. Every
+// request runs against the same API client, so HTTP connections and
+// credentials are reused instead of being set up per invocation.
+func runWorker(client *api.Client) error {
+	out := json.NewEncoder(os.Stdout)
+	if err := out.Encode(workerReady{Ready: true, Protocol: workerProtocolVersion}); err != nil {
+		return err
+	}
+
+	in := bufio.NewScanner(os.Stdin)
+	in.Buffer(make([]byte, 64*1024), workerMaxLine)
+	for in.Scan() {
+		var req workerRequest
+		var resp workerResponse
+		if err := json.Unmarshal(in.Bytes(), &req); err != nil {
+			resp = workerResponse{ExitCode: 2, Stderr: fmt.Sprintf("nlm: invalid worker request: %v\n", err)}
+		} else {
+			resp = serveWorkerRequest(client, req)
+		}
+		if err := out.Encode(resp); err != nil {
+			return err
+		}
+	}
+	return in.Err()
+}
+
+// serveWorkerRequest runs a single command with stdin, stdout and stderr
+// redirected so its output can be returned in the response.
+func serveWorkerRequest(client *api.Client, req workerRequest) workerResponse {
+	resp := workerResponse{ID: req.ID}
+	if len(req.Args) == 0 {
+		resp.ExitCode = 2
+		resp.Stderr = "nlm: worker request has no command\n"
+		return resp
+	}
+
+	cmd, args := req.Args[0], req.Args[1:]
+	if !isValidCommand(cmd) || workerUnsupported[cmd] {
+		resp.ExitCode = 2
+		resp.Stderr = fmt.Sprintf("nlm: command %q is not supported in worker mode\n", cmd)
+		return resp
+	}
+
+	var err error
+	resp.Stdout, resp.Stderr, err = captureOutput(req.Stdin, func() error {
+		if err := validateArgs(cmd, args); err != nil {
+			return err
+		}
+		return runCmd(client, cmd, args...)
+	})
+	if err != nil {
+		resp.ExitCode = 1
+		resp.Stderr += fmt.Sprintf("nlm: %v\n", err)
+	}
+	return resp
+}
+
+// captureOutput runs fn with os.Stdin, os.Stdout and os.Stderr swapped for
+// pipes and returns everything fn wrote. Panics are reported as errors so a
+// single bad request does not take the worker down.
+func captureOutput(stdin *string, fn func() error) (stdout, stderr string, err error) {
+	origStdin, origStdout, origStderr := os.Stdin, os.Stdout, os.Stderr
+	defer func() {
+		os.Stdin, os.Stdout, os.Stderr = origStdin, origStdout, origStderr
+	}()
+
+	inR, inW, err := os.Pipe()
+	if err != nil {
+		return "", "", err
+	}
+	defer inR.Close()
+	outR, outW, err := os.Pipe()
+	if err != nil {
+		return "", "", err
+	}
+	errR, errW, err := os.Pipe()
+	if err != nil {
+		outR.Close()
+		outW.Close()
+		return "", "", err
+	}
+
+	go func() {
+		if stdin != nil {
+			io.WriteString(inW, *stdin)
+		}
+		inW.Close()
+	}()
+
+	var outBuf, errBuf bytes.Buffer
+	var wg sync.WaitGroup
+	wg.Add(2)
+	go func() {
+		defer wg.Done()
+		io.Copy(&outBuf, outR)
+	}()
+	go func() {
+		defer wg.Done()
+		io.Copy(&errBuf, errR)
+	}()
+
+	os.Stdin, os.Stdout, os.Stderr = inR, outW, errW
+	func() {
+		defer func() {
+			if r := recover(); r != nil {
+				err = fmt.Errorf("panic: %v", r)
+			}
+		}()
+		err = fn()
+	}()
+	os.Stdin, os.Stdout, os.Stderr = origStdin, origStdout, origStderr
+
+	outW.Close()
+	errW.Close()
+	wg.Wait()
+	outR.Close()
+	errR.Close()
+	return outBuf.String(), errBuf.String(), err
+}
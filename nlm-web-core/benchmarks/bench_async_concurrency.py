@@ -0,0 +1,62 @@
+"""Concurrency benchmark: blocking NLMClient vs AsyncNLMClient.
+
+Runs N concurrent ``list_notebooks`` calls from async handlers against the stub
+nlm CLI. The blocking client serializes them on the event loop, so wall time
+grows with the sum of latencies; AsyncNLMClient overlaps them, so wall time
+stays close to a single call's latency.
+
+Usage:
+    python -m benchmarks.bench_async_concurrency --delay 0.2 -n 1 5 10 20
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from nlm_web_core.nlm_client import AsyncNLMClient, NLMClient
+from benchmarks.stub import write_launcher
+
+
+async def run_blocking(nlm_path: str, n: int) -> float:
+    """Time n concurrent handlers using the blocking client."""
+    client = NLMClient("token", "cookies", nlm_path=nlm_path)
+
+    async def handler():
+        return client.list_notebooks()
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(handler() for _ in range(n)))
+    finally:
+        client.close()
+    return time.perf_counter() - start
+
+
+async def run_async(nlm_path: str, n: int) -> float:
+    """Time n concurrent handlers using the asyncio client."""
+    client = AsyncNLMClient("token", "cookies", nlm_path=nlm_path)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client.list_notebooks() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.2, help="stub latency (s)")
+    parser.add_argument("-n", type=int, nargs="+", default=[1, 5, 10, 20])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        nlm_path = write_launcher(Path(tmp), args.delay)
+        print(f"{'N':>4} {'sum':>8} {'blocking':>10} {'async':>8}")
+        for n in args.n:
+            blocking = asyncio.run(run_blocking(nlm_path, n))
+            concurrent = asyncio.run(run_async(nlm_path, n))
+            print(f"{n:>4} {n * args.delay:>7.2f}s {blocking:>9.2f}s {concurrent:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Micro-benchmark: parsing large synthetic ``nlm list --json`` outputs.
+
+Compares the previous reverse line scan with the single-pass extractor,
+using the stdlib decoder and, when installed, orjson.
+
+Usage:
+    python -m benchmarks.bench_json_parse --notebooks 100 1000 10000
+"""
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Optional
+
+from nlm_web_core import json_output
+
+
+def legacy_parse(output: str) -> Any:
+    """The reverse line scan _parse_json_output used before."""
+    lines = output.strip().split("\n")
+    for line in reversed(lines):
+        line = line.strip()
+        if line.startswith("{") or line.startswith("["):
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                continue
+    try:
+        return json.loads(output)
+    except json.JSONDecodeError:
+        return output
+
+
+def synthetic_notebooks(count: int) -> list[dict[str, Any]]:
+    """Build a notebook listing resembling the CLI's output."""
+    return [
+        {
+            "project_id": f"{i:08x}-0000-4000-8000-000000000000",
+            "title": f"Research notebook {i}",
+            "emoji": "📚",
+            "sources": [
+                {"source_id": {"source_id": f"src-{i}-{j}"}, "title": f"Source {j}"}
+                for j in range(3)
+            ],
+            "metadata": {"create_time": "2025-01-15T10:00:00Z"},
+        }
+        for i in range(count)
+    ]
+
+
+def outputs(notebooks: list[dict[str, Any]]) -> dict[str, str]:
+    """Output variants: compact, pretty-printed and with log lines first."""
+    return {
+        "compact": json.dumps(notebooks) + "\n",
+        "pretty": json.dumps(notebooks, indent=2) + "\n",
+        "logged": "Loading notebooks...\n" * 20 + json.dumps(notebooks, indent=2),
+    }
+
+
+def with_backend(orjson_module: Optional[Any]) -> Callable[[str], Any]:
+    """Return extract_json bound to a specific decoder backend."""
+
+    def parse(output: str) -> Any:
+        saved, json_output.orjson = json_output.orjson, orjson_module
+        try:
+            return json_output.extract_json(output)
+        finally:
+            json_output.orjson = saved
+
+    return parse
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notebooks", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    parsers = {"legacy": legacy_parse, "extract": with_backend(None)}
+    if json_output.orjson is not None:
+        parsers["extract+orjson"] = with_backend(json_output.orjson)
+
+    print(f"{'notebooks':>9} {'output':>8} " + "".join(f"{n:>16}" for n in parsers))
+    for count in args.notebooks:
+        notebooks = synthetic_notebooks(count)
+        number = max(1, 20000 // count)
+        for variant, output in outputs(notebooks).items():
+            row = f"{count:>9} {variant:>8} "
+            for parse in parsers.values():
+                best = min(
+                    timeit.repeat(
+                        lambda: parse(output), number=number, repeat=args.repeat
+                    )
+                )
+                wrong = "!" if parse(output) != notebooks else " "
+                row += f"{best / number * 1000:13.3f}ms{wrong}"
+            print(row)
+    print("! = did not return the notebook listing")
+
+
+if __name__ == "__main__":
+    main()
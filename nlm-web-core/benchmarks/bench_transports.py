@@ -0,0 +1,89 @@
+"""Latency benchmark: one-shot nlm processes vs persistent workers.
+
+Runs the same sequence of read commands through AsyncNLMClient twice: once
+spawning a process per call and once on an AsyncWorkerPool. Against the real
+CLI the gap includes Go runtime startup, auth loading and TLS handshakes;
+against the stub it is process spawn and interpreter startup.
+
+Usage:
+    python -m benchmarks.bench_transports --calls 50
+    python -m benchmarks.bench_transports --nlm "$(which nlm)"  # live account
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from nlm_web_core.nlm_client import AsyncNLMClient
+from nlm_web_core.worker import AsyncWorkerPool
+from benchmarks.stub import write_launcher
+
+
+async def measure(client: AsyncNLMClient, calls: int) -> list[float]:
+    """Return per-call latencies in seconds for sequential list calls."""
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await client.list_notebooks()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(name: str, latencies: list[float]) -> str:
+    """Format mean/p50/p95 latency in milliseconds."""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{name:<10} mean {statistics.mean(ordered) * 1000:8.2f}ms"
+        f"  p50 {statistics.median(ordered) * 1000:8.2f}ms"
+        f"  p95 {p95 * 1000:8.2f}ms"
+    )
+
+
+async def run(nlm_path: str, calls: int, auth_token: str, cookies: str) -> None:
+    """Benchmark both transports and print a summary."""
+    env = {"NLM_AUTH_TOKEN": auth_token, "NLM_COOKIES": cookies}
+    one_shot = AsyncNLMClient(auth_token, cookies, nlm_path=nlm_path)
+    pool = AsyncWorkerPool(nlm_path, env, size=1)
+    worker = AsyncNLMClient(auth_token, cookies, nlm_path=nlm_path, worker_pool=pool)
+    try:
+        # Warm up the worker so startup is not counted per call
+        await worker.list_notebooks()
+        if not pool.available:
+            print("nlm binary has no worker mode; worker numbers are one-shot")
+        print(summarize("one-shot", await measure(one_shot, calls)))
+        print(summarize("worker", await measure(worker, calls)))
+    finally:
+        await pool.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.0, help="stub latency (s)")
+    parser.add_argument("--nlm", help="real nlm binary (uses NLM_* credentials)")
+    args = parser.parse_args(argv)
+
+    if args.nlm:
+        asyncio.run(
+            run(
+                args.nlm,
+                args.calls,
+                os.environ["NLM_AUTH_TOKEN"],
+                os.environ["NLM_COOKIES"],
+            )
+        )
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        nlm_path = write_launcher(Path(tmp), args.delay)
+        asyncio.run(run(nlm_path, args.calls, "token", "cookies"))
+
+
+if __name__ == "__main__":
+    main()
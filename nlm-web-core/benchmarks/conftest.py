@@ -0,0 +1,46 @@
+"""pytest-benchmark configuration: tail latency and throughput summary.
+
+pytest-benchmark reports min/median/mean/max per benchmark; tests here also
+call record_latency() so p95/p99 and throughput are stored in each result's
+``extra_info`` (and so in ``--benchmark-json`` output) and printed at the end
+of the run.
+"""
+from typing import Any
+
+# (test name, extra_info) for every benchmark that recorded its latencies
+RESULTS: list[tuple[str, dict[str, Any]]] = []
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def record_latency(benchmark: Any) -> None:
+    """Store p50/p95/p99 latency and throughput of a finished benchmark."""
+    samples = sorted(benchmark.stats.stats.data)
+    benchmark.extra_info.update(
+        {
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "throughput_per_s": len(samples) / sum(samples),
+        }
+    )
+    RESULTS.append((benchmark.name, benchmark.extra_info))
+
+
+def pytest_terminal_summary(terminalreporter: Any) -> None:
+    """Print the tail latency table after pytest-benchmark's own."""
+    if not RESULTS:
+        return
+    terminalreporter.section("latency percentiles")
+    width = max(len(name) for name, _ in RESULTS)
+    terminalreporter.write_line(
+        f"{'benchmark':<{width}} {'p50':>10} {'p95':>10} {'p99':>10} {'ops/s':>9}"
+    )
+    for name, info in RESULTS:
+        terminalreporter.write_line(
+            f"{name:<{width}} {info['p50_ms']:8.2f}ms {info['p95_ms']:8.2f}ms"
+            f" {info['p99_ms']:8.2f}ms {info['throughput_per_s']:9.1f}"
+        )
@@ -0,0 +1,25 @@
+"""Helpers for running benchmarks against the stub nlm CLI."""
+import sys
+from pathlib import Path
+
+STUB_NLM = Path(__file__).resolve().parents[1] / "tests" / "stub_nlm.py"
+
+
+def write_launcher(directory: Path, delay: float = 0.0, **sizes: int) -> str:
+    """
+    Write a shell launcher running the stub CLI with a fixed delay.
+
+    Args:
+        directory: Directory to write the launcher into
+        delay: Seconds each command sleeps
+        **sizes: Payload sizes, e.g. notebooks=1000 sets NLM_STUB_NOTEBOOKS
+
+    Returns:
+        Path of the launcher
+    """
+    env = f"NLM_STUB_DELAY={delay}"
+    env += "".join(f" NLM_STUB_{name.upper()}={value}" for name, value in sizes.items())
+    launcher = directory / ("nlm-" + "-".join(f"{k}{v}" for k, v in sizes.items())).rstrip("-")
+    launcher.write_text(f'#!/bin/sh\n{env} exec "{sys.executable}" "{STUB_NLM}" "$@"\n')
+    launcher.chmod(0o755)
+    return str(launcher)
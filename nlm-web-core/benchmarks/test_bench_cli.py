@@ -0,0 +1,78 @@
+"""End-to-end benchmarks of NLMClient driving the stub nlm CLI.
+
+Unlike the unit tests, which stand in for the nlm process, every call here pays
+the full cost of ``_run_command``: process spawn (or a worker round trip),
+environment setup, pipe I/O and JSON parsing of outputs of realistic size.
+
+Usage:
+    pytest benchmarks --benchmark-only --no-cov
+    pytest benchmarks --benchmark-only --no-cov --benchmark-json=bench.json
+"""
+from pathlib import Path
+
+import pytest
+
+from nlm_web_core.nlm_client import NLMClient
+from nlm_web_core.worker import AsyncWorkerPool
+from benchmarks.conftest import record_latency
+from benchmarks.stub import write_launcher
+
+# Only the benchmark fixture needs the plugin; the imports above do not
+pytest.importorskip("pytest_benchmark")
+
+ROUNDS = 30
+
+ENV = {"NLM_AUTH_TOKEN": "token", "NLM_COOKIES": "cookies"}
+
+
+@pytest.fixture(params=["one-shot", "worker"])
+def make_client(request, tmp_path: Path):
+    """Factory for a client on either transport, closed after the test."""
+    clients = []
+
+    def make(**sizes: int) -> NLMClient:
+        nlm_path = write_launcher(tmp_path, **sizes)
+        pool = None
+        if request.param == "worker":
+            pool = AsyncWorkerPool(nlm_path, ENV, size=1)
+        client = NLMClient("token", "cookies", nlm_path=nlm_path, worker_pool=pool)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def run(benchmark, function) -> None:
+    """Time one call per round and record tail latencies."""
+    benchmark.pedantic(function, rounds=ROUNDS, iterations=1, warmup_rounds=2)
+    record_latency(benchmark)
+
+
+@pytest.mark.parametrize("notebooks", [10, 1000, 10000])
+def test_list_notebooks(benchmark, make_client, notebooks):
+    """nlm list --json with growing accounts."""
+    client = make_client(notebooks=notebooks)
+    run(benchmark, client.list_notebooks)
+    assert len(client.list_notebooks()) == notebooks
+
+
+@pytest.mark.parametrize("method", ["list_sources", "list_notes", "list_audio"])
+@pytest.mark.parametrize("items", [10, 1000])
+def test_notebook_listings(benchmark, make_client, method, items):
+    """nlm sources/notes/audio-list --json."""
+    client = make_client(items=items)
+    call = getattr(client, method)
+    run(benchmark, lambda: call("nb1"))
+    assert len(call("nb1")) == items
+
+
+@pytest.mark.parametrize("method", ["generate_guide", "generate_faq"])
+@pytest.mark.parametrize("lines", [10, 1000])
+def test_generate(benchmark, make_client, method, lines):
+    """nlm generate-guide/faq with growing documents."""
+    client = make_client(lines=lines)
+    call = getattr(client, method)
+    run(benchmark, lambda: call("nb1"))
+    assert call("nb1").count("\n") == lines + 1
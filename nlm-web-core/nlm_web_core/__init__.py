@@ -0,0 +1 @@
+"""nlm client, caches, limits and background jobs shared by the NLM web apps."""
@@ -0,0 +1,162 @@
+"""Circuit breaker that stops sending commands to a failing upstream.
+
+When most recent commands failed with upstream errors, further commands are
+rejected immediately for a cool-down period instead of each waiting for its
+own failure. After the cool-down a single probe command is let through: if
+it succeeds the circuit closes again, otherwise it reopens.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a command is rejected because the circuit is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        """
+        Args:
+            message: Error message
+            retry_after: Seconds until the circuit lets a probe through
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding window of outcomes.
+
+    Thread-safe and never blocks, so one breaker serves both client flavours.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            failure_rate: Fraction of failed commands in the window that opens
+                the circuit
+            window: Most recent outcomes considered
+            min_calls: Outcomes needed before the rate is acted on
+            reset_timeout: Seconds the circuit stays open before a probe
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open."""
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> None:
+        """
+        Admit a command, or reject it while the circuit is open.
+
+        In the half-open state one probe is admitted at a time; a probe that
+        never reports back is replaced after reset_timeout.
+
+        Raises:
+            CircuitOpenError: If the command must not be sent upstream
+        """
+        with self._lock:
+            state = self._current_state()
+            now = self._clock()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and (
+                self._probe_started is None
+                or now - self._probe_started >= self.reset_timeout
+            ):
+                self._probe_started = now
+                return
+            self.rejected += 1
+            retry_after = max(self._opened_at + self.reset_timeout - now, 1.0)
+        raise CircuitOpenError(
+            "NotebookLM is failing; requests are paused", retry_after=retry_after
+        )
+
+    def record_success(self) -> None:
+        """Record a command the upstream answered, closing a half-open circuit."""
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+                self._probe_started = None
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record an upstream failure, opening the circuit if the rate is too high."""
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            if state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def release(self) -> None:
+        """
+        Forget a command admitted by allow() that will report no outcome.
+
+        Frees the half-open probe slot, so a probe that was cancelled or shed
+        locally lets the next command probe instead of holding traffic back
+        until reset_timeout.
+        """
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                self._probe_started = None
+
+    def stats(self) -> dict[str, object]:
+        """State and counters for monitoring."""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "failures": self._outcomes.count(False),
+                "calls": len(self._outcomes),
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+    def _current_state(self) -> str:
+        """State, moving open to half-open once cooled down; the lock must be held."""
+        if (
+            self._state == OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = HALF_OPEN
+            self._probe_started = None
+        return self._state
+
+    def _open(self) -> None:
+        """Trip the circuit; the lock must be held."""
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_started = None
+        self._outcomes.clear()
+        self.opened += 1
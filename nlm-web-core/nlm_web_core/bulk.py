@@ -0,0 +1,105 @@
+"""Bounded-parallel batch execution of ``nlm add`` for many sources.
+
+Items run at most ``concurrency`` at a time. Failures are reported per item
+rather than failing the batch, except errors of the ``abort_on`` types (a
+missing notebook), which cancel the rest. Failures the ``transient``
+predicate accepts are retried with exponential backoff.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Optional, Union
+
+from nlm_web_core.records import Source
+
+
+@dataclass(frozen=True, slots=True)
+class SourceItem:
+    """One source to add: a URL, file path or text content."""
+
+    source_input: str
+    source_type: str = "url"
+    mime_type: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class SourceResult:
+    """Outcome of adding one item of a batch."""
+
+    index: int
+    item: SourceItem
+    source: Optional[Source] = None
+    error: Optional[str] = None
+    attempts: int = 1
+
+    @property
+    def ok(self) -> bool:
+        """Whether the source was added."""
+        return self.error is None
+
+
+def as_items(items: Iterable[Union[SourceItem, str]]) -> list[SourceItem]:
+    """Normalize a batch; plain strings are URLs."""
+    return [item if isinstance(item, SourceItem) else SourceItem(item) for item in items]
+
+
+async def add_all_async(
+    add: Callable[[SourceItem], Awaitable[Optional[Source]]],
+    items: list[SourceItem],
+    concurrency: int,
+    retries: int,
+    retry_delay: float,
+    transient: Callable[[Exception], bool],
+    abort_on: tuple[type[Exception], ...] = (),
+    progress: Optional[Callable[[SourceResult], None]] = None,
+) -> list[SourceResult]:
+    """
+    Add items as asyncio tasks.
+
+    Remaining items are cancelled when an abort_on error is raised or the
+    caller is cancelled.
+
+    Args:
+        add: Adds one item and returns the created source
+        items: Items to add
+        concurrency: Items in flight at once
+        retries: Extra attempts for transient failures
+        retry_delay: Seconds before the first retry, doubled after each
+        transient: Whether a failed attempt may safely be retried
+        abort_on: Error types that fail the whole batch
+        progress: Called as each item finishes
+
+    Returns:
+        One result per item, in input order
+
+    Raises:
+        Exception: The first error of an abort_on type
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def attempt(index: int, item: SourceItem) -> SourceResult:
+        async with semaphore:
+            for tries in range(1, retries + 2):
+                try:
+                    return SourceResult(index, item, source=await add(item), attempts=tries)
+                except Exception as e:
+                    if isinstance(e, abort_on):
+                        raise
+                    if tries > retries or not transient(e):
+                        return SourceResult(index, item, error=str(e), attempts=tries)
+                    await asyncio.sleep(retry_delay * 2 ** (tries - 1))
+            raise AssertionError("the last attempt always returns")
+
+    results: list[Optional[SourceResult]] = [None] * len(items)
+    tasks = [asyncio.ensure_future(attempt(i, item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            results[result.index] = result
+            if progress is not None:
+                progress(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    # Every item has a result once the loop above finished
+    return [result for result in results if result is not None]
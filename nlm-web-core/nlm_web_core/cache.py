@@ -0,0 +1,178 @@
+"""TTL + LRU response cache for read-only nlm commands."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Default seconds each read command's output stays valid, keyed by subcommand
+DEFAULT_TTLS: dict[str, float] = {
+    "list": 30.0,
+    "sources": 30.0,
+    "notes": 30.0,
+    "audio-list": 15.0,
+    "audio-get": 10.0,
+}
+
+MISSING = object()
+
+
+class ResponseCache:
+    """Bounded LRU cache of parsed nlm output with per-command TTLs.
+
+    Keys are command argument tuples such as ``("sources", "nb1", "--json")``;
+    the first element selects the TTL. Each entry is tagged with the notebook
+    it belongs to (``None`` for account-wide reads like ``list``) so mutating
+    calls can invalidate exactly what they touched.
+
+    Invalidations are also counted per tag, so a read that was already
+    running when a write invalidated its notebook can be refused: take a
+    ``generation()`` before running the command and pass it to ``set()``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttls: Optional[dict[str, float]] = None,
+        default_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttls: Per-subcommand TTL overrides in seconds
+            default_ttl: TTL for subcommands without an explicit entry
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[
+            tuple[Hashable, ...], tuple[float, Optional[str], Any]
+        ] = OrderedDict()
+        # Invalidations per tag (None for account-wide ones); clear() bumps
+        # the epoch, which outdates every generation taken before it
+        self._generations: dict[Optional[str], int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple[Hashable, ...]) -> Any:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Command argument tuple
+
+        Returns:
+            Cached value, or ``MISSING`` if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def generation(self, notebook_id: Optional[str] = None) -> tuple[int, int]:
+        """
+        Return a token for the invalidations seen so far by a tag.
+
+        Args:
+            notebook_id: Notebook the read belongs to, None if account-wide
+
+        Returns:
+            Opaque token to pass to set() with the read's response
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(notebook_id, 0)
+
+    def set(
+        self,
+        key: tuple[Hashable, ...],
+        value: Any,
+        notebook_id: Optional[str] = None,
+        generation: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """
+        Store a response, evicting the least recently used entry if full.
+
+        Args:
+            key: Command argument tuple
+            value: Parsed command output
+            notebook_id: Notebook the response belongs to, None if account-wide
+            generation: Token from generation() taken before the command ran;
+                if the tag was invalidated since, the response may predate the
+                write and is not stored
+        """
+        ttl = self.ttls.get(str(key[0]), self.default_ttl) if key else self.default_ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != (
+                self._epoch,
+                self._generations.get(notebook_id, 0),
+            ):
+                return
+            self._entries[key] = (self._clock() + ttl, notebook_id, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: tuple[Hashable, ...]) -> None:
+        """Drop a single cached response."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, notebook_id: Optional[str] = None) -> None:
+        """
+        Drop responses affected by a write to a notebook.
+
+        Account-wide entries (such as the notebook list) are always dropped,
+        since notebook writes change what they report.
+
+        Args:
+            notebook_id: Notebook that was modified, None for account-wide writes
+        """
+        with self._lock:
+            self._generations[None] = self._generations.get(None, 0) + 1
+            if notebook_id is not None:
+                self._generations[notebook_id] = (
+                    self._generations.get(notebook_id, 0) + 1
+                )
+            stale = [
+                key
+                for key, (_, tag, _) in self._entries.items()
+                if tag is None or tag == notebook_id
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def __len__(self) -> int:
+        """Number of cached responses, including expired ones not yet pruned."""
+        return len(self._entries)
@@ -0,0 +1,405 @@
+"""Process-wide nlm client shared by every request and page.
+
+The client owns the response cache, single-flight group, worker pool and
+admission limiter, so each application builds one ClientRegistry (see its
+``app.clients``) that is started by its startup hook and closed at shutdown
+rather than constructed per request.
+The background job queue that runs long generation commands on it and the
+cache of downloaded media live here too.
+
+Users who sign in with their own credentials get a child registry of their
+own, keyed by a hash of the credentials, so each account has its own cache,
+limiter, breaker and retry budget. Children are closed once idle. Their
+limiter is a fair share of the host: every command also needs a slot from
+the root registry's limiter, so NLM_MAX_CONCURRENT bounds the nlm processes
+of all users together.
+"""
+import asyncio
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Union
+
+from nlm_web_core.breaker import CircuitBreaker
+from nlm_web_core.cache import ResponseCache
+from nlm_web_core.fake_backend import DEMO_NOTEBOOKS, FakeNLMBackend, generate_notebooks
+from nlm_web_core.jobs import Job, JobQueue, JobStore
+from nlm_web_core.limiter import AsyncConcurrencyLimiter
+from nlm_web_core.media import MediaCache
+from nlm_web_core.metrics import Metrics
+from nlm_web_core.nlm_client import MEDIA_SUFFIXES, AsyncNLMClient
+from nlm_web_core.retry import RetryPolicy
+from nlm_web_core.sessions import Credentials, SessionStore
+from nlm_web_core.settings import NLMSettings
+from nlm_web_core.singleflight import AsyncSingleFlight
+from nlm_web_core.timeouts import TimeoutPolicy
+from nlm_web_core.tracing import NoopTracer, RecordingTracer, Tracer, otel_tracer
+from nlm_web_core.worker import AsyncWorkerPool
+
+# What ClientRegistry.client serves: the nlm client, or the in-memory demo
+# backend when no credentials are configured
+NLMBackend = Union[AsyncNLMClient, FakeNLMBackend]
+
+
+class ClientRegistry:
+    """Owns the shared nlm client for the lifetime of the application."""
+
+    def __init__(
+        self, config: NLMSettings, parent: Optional["ClientRegistry"] = None
+    ):
+        """
+        Initialize registry; the client is built by start().
+
+        Args:
+            config: Settings, usually the application's
+            parent: Registry a per-user registry belongs to; its metrics and
+                tracer are shared
+        """
+        self.config = config
+        self.parent = parent
+        if parent is None:
+            # Built here rather than lazily so middleware can be added at import
+            self.metrics: Optional[Metrics] = (
+                Metrics() if config.nlm_metrics_enabled else None
+            )
+            self.tracer = self._tracer()
+        else:
+            self.metrics, self.tracer = parent.metrics, parent.tracer
+        self.sessions = SessionStore(max_age=config.session_max_age)
+        self.last_used = time.monotonic()
+        self._client: Optional[NLMBackend] = None
+        self._limiter: Optional[AsyncConcurrencyLimiter] = None
+        self._jobs: Optional[JobQueue] = None
+        self._media: Optional[MediaCache] = None
+        self._users: OrderedDict[str, ClientRegistry] = OrderedDict()
+        self._users_lock = threading.Lock()
+        self._closing: set[asyncio.Task] = set()
+        if self.metrics is not None and parent is None:
+            self.metrics.add_callback(
+                "nlm_user_clients", "Per-user clients currently open.",
+                lambda: len(self._users), type="gauge",
+            )
+
+    @property
+    def demo_mode(self) -> bool:
+        """Whether credentials are missing and the fake backend is served."""
+        return not self.config.nlm_auth_token or not self.config.nlm_cookies
+
+    @property
+    def client(self) -> NLMBackend:
+        """The shared client, built on first use if startup did not run."""
+        return self.start()
+
+    def start(self) -> NLMBackend:
+        """
+        Build the shared client if it does not exist yet.
+
+        Returns:
+            The shared client
+        """
+        if self._client is None:
+            self._client = self._demo_client() if self.demo_mode else self._build()
+        return self._client
+
+    @property
+    def limiter(self) -> Optional[AsyncConcurrencyLimiter]:
+        """
+        Admission limiter built from settings on first use, None if unbounded.
+
+        The root registry's is shared: its client admits commands through it,
+        and per-user clients take a slot from it after their own.
+        """
+        if self._limiter is None and self.config.nlm_max_concurrent > 0:
+            config = self.config
+            self._limiter = AsyncConcurrencyLimiter(
+                max_concurrent=config.nlm_max_concurrent,
+                max_per_notebook=config.nlm_max_per_notebook,
+                max_queue=config.nlm_max_queue,
+                queue_timeout=config.nlm_queue_timeout,
+            )
+        return self._limiter
+
+    @property
+    def jobs(self) -> JobQueue:
+        """The background job queue, built on first use; see JobQueue.start."""
+        if self._jobs is None:
+            config = self.config
+            self._jobs = JobQueue(
+                self.client,
+                # Fake notebooks do not outlive the process, so neither do their jobs
+                JobStore(":memory:" if self.demo_mode else config.nlm_job_store),
+                workers=config.nlm_job_workers,
+                poll_interval=config.nlm_job_poll_interval,
+                poll_max_interval=config.nlm_job_poll_max_interval,
+                poll_timeout=config.nlm_job_poll_timeout,
+            )
+            self._jobs.subscribe(self._media_changed)
+        return self._jobs
+
+    @property
+    def media(self) -> MediaCache:
+        """Cache of downloaded audio and video overviews, built on first use."""
+        if self._media is None:
+            config = self.config
+            self._media = MediaCache(
+                config.nlm_media_dir,
+                max_bytes=config.nlm_media_cache_mb * 1024 * 1024,
+                max_age=config.nlm_media_max_age,
+            )
+            if self.metrics is not None and self.parent is None:
+                self._watch_cache(self.metrics, "nlm_media_cache", "downloaded media", self._media)
+        return self._media
+
+    def _media_changed(self, job: Job) -> None:
+        """Drop a cached download once a new overview has been generated."""
+        if (
+            self._media is not None
+            and job.kind in MEDIA_SUFFIXES
+            and job.status == "succeeded"
+        ):
+            self._media.discard(f"{job.kind}/{job.notebook_id}")
+
+    @property
+    def user_count(self) -> int:
+        """Per-user registries currently open."""
+        return len(self._users)
+
+    def for_credentials(self, credentials: Optional[Credentials]) -> "ClientRegistry":
+        """
+        Registry serving a signed-in user, built on their first request.
+
+        Users of the same account share one registry. Registries idle for
+        longer than NLM_USER_IDLE_TIMEOUT, or beyond NLM_MAX_USERS, are closed
+        here, least recently used first, unless they still have work running,
+        so NLM_MAX_USERS is not a hard bound: the root limiter is what caps
+        the commands all users run at once. Closing registries needs the
+        running event loop, so call this from it.
+
+        Args:
+            credentials: The user's credentials, or None for anonymous requests
+
+        Returns:
+            This registry for anonymous requests and for the configured
+            account, otherwise the account's own registry
+        """
+        config = self.config
+        if credentials is None or (
+            credentials.auth_token == config.nlm_auth_token
+            and credentials.cookies == config.nlm_cookies
+        ):
+            return self
+        key = credentials.key
+        with self._users_lock:
+            self._evict_idle()
+            user = self._users.get(key)
+            if user is None:
+                user = self._users[key] = ClientRegistry(
+                    config.model_copy(
+                        update={
+                            "nlm_auth_token": credentials.auth_token,
+                            "nlm_cookies": credentials.cookies,
+                            # Jobs cannot be resumed after a restart without the
+                            # credentials, which are never written to disk
+                            "nlm_job_store": ":memory:",
+                            "nlm_worker_pool_size": config.nlm_user_worker_pool_size,
+                            # One directory per registry: an evicted registry
+                            # removes its own while the user may be back
+                            "nlm_media_dir": os.path.join(
+                                config.nlm_media_dir,
+                                "users",
+                                f"{key[:16]}-{uuid.uuid4().hex[:8]}",
+                            ),
+                        }
+                    ),
+                    parent=self,
+                )
+            self._users.move_to_end(key)
+            user.last_used = time.monotonic()
+            return user
+
+    def _busy(self) -> bool:
+        """Whether commands or jobs are still running on this registry's client."""
+        if self._jobs is not None and self._jobs.store.unfinished():
+            return True
+        return (
+            isinstance(self._client, AsyncNLMClient)
+            and self._limiter is not None
+            and self._limiter.stats()["running"] > 0
+        )
+
+    def _evict_idle(self) -> None:
+        """
+        Close idle and surplus per-user registries, least recently used first.
+
+        The users lock must be held. Off the event loop nothing is evicted,
+        since the registries' workers and jobs could not be closed; they stay
+        open until a lookup on the loop evicts them.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        config = self.config
+        now = time.monotonic()
+        for key, user in list(self._users.items()):
+            idle = now - user.last_used > config.nlm_user_idle_timeout
+            if not idle and len(self._users) <= config.nlm_max_users:
+                break
+            if user._busy():
+                continue
+            del self._users[key]
+            task = loop.create_task(user.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def close(self) -> None:
+        """Stop background jobs and persistent nlm workers and drop the client.
+
+        Per-user registries are closed too, and a per-user registry removes
+        its downloaded media.
+        """
+        with self._users_lock:
+            users, self._users = list(self._users.values()), OrderedDict()
+        for user in users:
+            await user.close()
+        if self._closing:
+            await asyncio.gather(*self._closing)
+        if self.parent is not None and self._media is not None:
+            shutil.rmtree(self.config.nlm_media_dir, ignore_errors=True)
+            self._media = None
+        jobs, self._jobs = self._jobs, None
+        if jobs is not None:
+            await jobs.close()
+            jobs.store.close()
+        client, self._client = self._client, None
+        worker_pool = getattr(client, "worker_pool", None)
+        if isinstance(worker_pool, AsyncWorkerPool):
+            await worker_pool.close()
+
+    @staticmethod
+    def _watch_cache(
+        metrics: Metrics,
+        prefix: str,
+        description: str,
+        cache: Union[ResponseCache, MediaCache],
+    ) -> None:
+        """Export a cache's hit and miss counters."""
+        metrics.add_callback(
+            f"{prefix}_hits_total", f"Lookups of {description} served from cache.",
+            lambda: cache.hits,
+        )
+        metrics.add_callback(
+            f"{prefix}_misses_total", f"Lookups of {description} not in cache.",
+            lambda: cache.misses,
+        )
+
+    @staticmethod
+    def _watch_single_flight(metrics: Metrics, group: AsyncSingleFlight) -> None:
+        """Export how many reads a single-flight group ran and coalesced."""
+        metrics.add_callback(
+            "nlm_single_flight_calls_total",
+            "Identical concurrent nlm reads requested.",
+            lambda: group.stats()["calls"],
+        )
+        metrics.add_callback(
+            "nlm_single_flight_coalesced_total",
+            "Identical concurrent nlm reads served by a call already running.",
+            lambda: group.stats()["coalesced"],
+        )
+
+    def _build(self) -> AsyncNLMClient:
+        """Build a client and its shared resources from settings."""
+        config = self.config
+        client = AsyncNLMClient(
+            auth_token=config.nlm_auth_token,
+            cookies=config.nlm_cookies,
+            nlm_path=config.nlm_path,
+            timeout=config.nlm_timeout,
+            notebook_index_ttl=config.nlm_notebook_index_ttl,
+            timeouts=TimeoutPolicy(
+                timeouts=config.nlm_timeouts,
+                default=config.nlm_timeout,
+                adaptive=config.nlm_timeout_adaptive,
+                min_timeout=config.nlm_timeout_min,
+            ),
+            retry_policy=(
+                RetryPolicy(
+                    attempts=config.nlm_retry_attempts,
+                    base_delay=config.nlm_retry_base_delay,
+                    max_delay=config.nlm_retry_max_delay,
+                    budget_ratio=config.nlm_retry_budget,
+                )
+                if config.nlm_retry_attempts > 1
+                else None
+            ),
+            breaker=(
+                CircuitBreaker(
+                    failure_rate=config.nlm_breaker_failure_rate,
+                    min_calls=config.nlm_breaker_min_calls,
+                    reset_timeout=config.nlm_breaker_reset_timeout,
+                )
+                if config.nlm_breaker_enabled
+                else None
+            ),
+            cache=(
+                ResponseCache(
+                    max_entries=config.nlm_cache_max_entries,
+                    ttls=config.nlm_cache_ttls,
+                )
+                if config.nlm_cache_enabled
+                else None
+            ),
+            single_flight=AsyncSingleFlight(),
+            worker_pool=(
+                AsyncWorkerPool(
+                    config.nlm_path,
+                    env={
+                        "NLM_AUTH_TOKEN": config.nlm_auth_token,
+                        "NLM_COOKIES": config.nlm_cookies,
+                    },
+                    size=config.nlm_worker_pool_size,
+                    start_timeout=config.nlm_worker_start_timeout,
+                )
+                if config.nlm_worker_pool_size > 0
+                else None
+            ),
+            limiter=self.limiter,
+            shared_limiter=self.parent.limiter if self.parent is not None else None,
+            metrics=self.metrics,
+            tracer=self.tracer,
+        )
+        # Per-user caches and groups are not exported, to keep metric names unique
+        if self.metrics is not None and self.parent is None:
+            if client.cache is not None:
+                self._watch_cache(
+                    self.metrics,
+                    "nlm_response_cache",
+                    "nlm read responses",
+                    client.cache,
+                )
+            self._watch_single_flight(self.metrics, client.single_flight)
+        return client
+
+    def _tracer(self) -> Tracer:
+        """Build the tracer selected by NLM_TRACING."""
+        if self.config.nlm_tracing == "local":
+            return RecordingTracer()
+        if self.config.nlm_tracing == "otel":
+            return otel_tracer()
+        return NoopTracer()
+
+    def _demo_client(self) -> FakeNLMBackend:
+        """Build the in-memory backend served in demo mode."""
+        config = self.config
+        return FakeNLMBackend(
+            notebooks=(
+                generate_notebooks(config.nlm_demo_notebooks)
+                if config.nlm_demo_notebooks > 0
+                else DEMO_NOTEBOOKS
+            ),
+            latency=config.nlm_demo_latency,
+            error_rate=config.nlm_demo_error_rate,
+        )
@@ -0,0 +1,489 @@
+"""In-process stand-in for AsyncNLMClient.
+
+FakeNLMBackend keeps notebooks, sources, notes and audio overviews in
+memory, so creates and deletes persist for the life of the process. It
+serves demo mode when no credentials are configured, and with injected
+latency and failures and generated data sets it lets the web layers be
+load-tested without a NotebookLM account or the nlm binary.
+"""
+import asyncio
+import random
+import time
+import uuid
+import wave
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Union
+
+from nlm_web_core.bulk import SourceItem, SourceResult, add_all_async, as_items
+from nlm_web_core.nlm_client import (
+    BULK_CONCURRENCY,
+    BaseNLMClient,
+    NLMError,
+    NotebookNotFoundError,
+    SourceNotFoundError,
+)
+from nlm_web_core.notebook_index import NotebookIndex
+from nlm_web_core.records import Audio, Note, Notebook, Source
+
+# Notebooks served in demo mode unless a generated data set is requested
+DEMO_NOTEBOOKS = (
+    Notebook("demo-nb-1", "Demo Research Notebook", "📚"),
+    Notebook("demo-nb-2", "Demo Study Notes", "📖"),
+)
+
+_TOPICS = (
+    "Climate", "Quantum", "Marketing", "Roman History", "Neuroscience",
+    "Machine Learning", "Economics", "Jazz", "Biology", "Architecture",
+)
+_KINDS = ("Research", "Notes", "Reading List", "Project", "Course", "Briefing")
+_EMOJIS = ("📚", "📖", "📝", "🔬", "💡", "🎓", "🧪", "🗂️")
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Source type reported for each add_source source_type
+_SOURCE_TYPES = {
+    "url": "SOURCE_TYPE_WEB_PAGE",
+    "file": "SOURCE_TYPE_LOCAL_FILE",
+    "text": "SOURCE_TYPE_TEXT",
+}
+
+# Generated headings for each kind of content, as nlm prints them
+_GENERATED = {
+    "guide": "Study Guide",
+    "outline": "Outline",
+    "faq": "FAQ",
+    "glossary": "Glossary",
+}
+
+
+def _timestamp(moment: datetime) -> str:
+    """Format a time the way protojson does."""
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def generate_notebooks(count: int, seed: int = 0) -> list[Notebook]:
+    """
+    Build a deterministic notebook listing.
+
+    Args:
+        count: Number of notebooks
+        seed: Random seed; equal seeds give equal listings
+
+    Returns:
+        Notebooks ordered most recently modified first, like ``nlm list``
+    """
+    rng = random.Random(seed)
+    notebooks = []
+    for i in range(count):
+        created = _EPOCH + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        modified = created + timedelta(seconds=rng.randrange(30 * 24 * 3600))
+        notebooks.append(
+            Notebook(
+                project_id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                title=f"{rng.choice(_TOPICS)} {rng.choice(_KINDS)} {i + 1}",
+                emoji=rng.choice(_EMOJIS),
+                source_count=rng.randrange(8),
+                created_at=_timestamp(created),
+                modified_at=_timestamp(modified),
+            )
+        )
+    notebooks.sort(key=lambda nb: nb.modified_at or "", reverse=True)
+    return notebooks
+
+
+class FakeNLMBackend:
+    """In-memory implementation of the AsyncNLMClient interface."""
+
+    def __init__(
+        self,
+        notebooks: Iterable[Notebook] = DEMO_NOTEBOOKS,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        audio_delay: float = 0.0,
+    ):
+        """
+        Initialize fake backend.
+
+        Args:
+            notebooks: Initial notebooks, in listing order
+            latency: Seconds every call sleeps before answering
+            error_rate: Probability that a call fails with a transient
+                NLMError, as if the service answered 503
+            seed: Seed for error injection and generated sources
+            audio_delay: Seconds a new audio overview stays pending before
+                poll_audio reports it ready
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.audio_delay = audio_delay
+        self.notebook_index = NotebookIndex()
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._errors: dict[str, Exception] = {}
+        self._notebooks: dict[str, Notebook] = {nb.project_id: nb for nb in notebooks}
+        self._listing: Optional[tuple[Notebook, ...]] = None
+        self._sources: dict[str, dict[str, Source]] = {}
+        self._notes: dict[str, dict[str, Note]] = {}
+        self._audio: dict[str, Audio] = {}
+        self._audio_ready_at: dict[str, float] = {}
+        self._videos: dict[str, str] = {}
+
+    def inject_error(self, method: str, error: Optional[Exception] = None) -> None:
+        """
+        Make every call to a method fail until clear_errors() is called.
+
+        Args:
+            method: Client method name, e.g. "list_notebooks"
+            error: Exception to raise, NLMError by default
+        """
+        self._errors[method] = error or NLMError(f"Injected failure in {method}")
+
+    def clear_errors(self) -> None:
+        """Remove errors added with inject_error()."""
+        self._errors.clear()
+
+    async def _call(self, method: str) -> None:
+        """Apply injected latency and failures to one call."""
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if method in self._errors:
+            raise self._errors[method]
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise NLMError(f"Injected failure in {method}: 503 Service Unavailable")
+
+    def _notebook(self, notebook_id: str) -> Notebook:
+        """Return a notebook or raise NotebookNotFoundError."""
+        notebook = self._notebooks.get(notebook_id)
+        if notebook is None:
+            raise NotebookNotFoundError(f"Notebook {notebook_id} not found")
+        return notebook
+
+    def _changed(self, notebook: Optional[Notebook] = None) -> None:
+        """Record a mutation: bump the modified time and drop the listing."""
+        if notebook is not None:
+            self._notebooks[notebook.project_id] = replace(
+                notebook,
+                source_count=len(self._sources.get(notebook.project_id, ())),
+                modified_at=_timestamp(datetime.now(timezone.utc)),
+            )
+        self._listing = None
+
+    def _source_map(self, notebook_id: str) -> dict[str, Source]:
+        """Return a notebook's sources, generating them on first access."""
+        sources = self._sources.get(notebook_id)
+        if sources is None:
+            notebook = self._notebook(notebook_id)
+            rng = random.Random(f"{self.seed}:{notebook_id}")
+            sources = {}
+            for i in range(notebook.source_count):
+                source_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+                sources[source_id] = Source(
+                    source_id=source_id,
+                    title=f"Source {i + 1}",
+                    source_type=rng.choice(tuple(_SOURCE_TYPES.values())),
+                    added_at=notebook.created_at,
+                )
+            self._sources[notebook_id] = sources
+        return sources
+
+    # Notebook operations
+
+    async def list_notebooks(self) -> list[Notebook]:
+        """List all notebooks."""
+        await self._call("list_notebooks")
+        if self._listing is None:
+            self._listing = tuple(self._notebooks.values())
+        self.notebook_index.replace(self._listing)
+        return list(self._listing)
+
+    async def create_notebook(
+        self, title: str, emoji: Optional[str] = None
+    ) -> Optional[Notebook]:
+        """Create a new notebook at the top of the listing."""
+        await self._call("create_notebook")
+        now = _timestamp(datetime.now(timezone.utc))
+        notebook = Notebook(
+            project_id=str(uuid.uuid4()),
+            title=title,
+            emoji=emoji,
+            created_at=now,
+            modified_at=now,
+        )
+        self._notebooks = {notebook.project_id: notebook, **self._notebooks}
+        self._sources[notebook.project_id] = {}
+        self._changed()
+        return notebook
+
+    async def delete_notebook(self, notebook_id: str) -> bool:
+        """Delete a notebook and everything in it."""
+        await self._call("delete_notebook")
+        self._notebook(notebook_id)
+        del self._notebooks[notebook_id]
+        stores: tuple[dict[str, Any], ...] = (
+            self._sources, self._notes, self._audio, self._audio_ready_at, self._videos
+        )
+        for store in stores:
+            store.pop(notebook_id, None)
+        self.notebook_index.discard(notebook_id)
+        self._changed()
+        return True
+
+    async def search_notebooks(
+        self,
+        query: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[Notebook], Optional[str]]:
+        """List one page of notebooks; see AsyncNLMClient.search_notebooks."""
+        await self.list_notebooks()
+        return self.notebook_index.page(query, sort, limit, cursor)
+
+    async def get_notebook(self, notebook_id: str) -> Notebook:
+        """Get notebook details."""
+        await self._call("get_notebook")
+        return self._notebook(notebook_id)
+
+    # Source operations
+
+    async def list_sources(self, notebook_id: str) -> list[Source]:
+        """List sources in a notebook."""
+        await self._call("list_sources")
+        return list(self._source_map(notebook_id).values())
+
+    async def add_source(
+        self,
+        notebook_id: str,
+        source_input: str,
+        source_type: str = "url",
+        mime_type: Optional[str] = None,
+    ) -> Optional[Source]:
+        """Add a URL, file or text source to a notebook."""
+        await self._call("add_source")
+        sources = self._source_map(notebook_id)
+        source = Source(
+            source_id=str(uuid.uuid4()),
+            title="Pasted Text" if source_type == "text" else source_input,
+            source_type=_SOURCE_TYPES.get(source_type, "SOURCE_TYPE_UNSPECIFIED"),
+            added_at=_timestamp(datetime.now(timezone.utc)),
+        )
+        sources[source.source_id] = source
+        self._changed(self._notebook(notebook_id))
+        return source
+
+    async def add_sources_bulk(
+        self,
+        notebook_id: str,
+        items: Iterable[Union[SourceItem, str]],
+        concurrency: Optional[int] = None,
+        retries: int = 2,
+        retry_delay: float = 0.5,
+        progress: Optional[Callable[[SourceResult], None]] = None,
+    ) -> list[SourceResult]:
+        """Add many sources; see AsyncNLMClient.add_sources_bulk."""
+        return await add_all_async(
+            lambda item: self.add_source(
+                notebook_id, item.source_input, item.source_type, item.mime_type
+            ),
+            as_items(items),
+            concurrency=concurrency or BULK_CONCURRENCY,
+            retries=retries,
+            retry_delay=retry_delay,
+            transient=BaseNLMClient._transient,
+            abort_on=(NotebookNotFoundError,),
+            progress=progress,
+        )
+
+    async def delete_source(self, notebook_id: str, source_id: str) -> bool:
+        """Delete a source."""
+        await self._call("delete_source")
+        sources = self._source_map(notebook_id)
+        if sources.pop(source_id, None) is None:
+            raise SourceNotFoundError(f"Source {source_id} not found")
+        self._changed(self._notebook(notebook_id))
+        return True
+
+    async def rename_source(self, source_id: str, new_name: str) -> bool:
+        """Rename a source in whichever notebook holds it."""
+        await self._call("rename_source")
+        for sources in self._sources.values():
+            if source_id in sources:
+                sources[source_id] = replace(sources[source_id], title=new_name)
+                return True
+        raise SourceNotFoundError(f"Source {source_id} not found")
+
+    # Content generation
+
+    def _generated_lines(self, notebook_id: str, kind: str) -> list[str]:
+        """Deterministic markdown for a kind of generated content."""
+        notebook = self._notebook(notebook_id)
+        lines = [f"# {_GENERATED[kind]}: {notebook.title}\n", "\n"]
+        for source in self._source_map(notebook_id).values():
+            lines.append(f"- Key point from {source.title}\n")
+        if len(lines) == 2:
+            lines.append("- Add sources to generate richer content\n")
+        return lines
+
+    async def _generate(self, method: str, notebook_id: str, kind: str) -> str:
+        """Return generated content in one piece."""
+        await self._call(method)
+        return "".join(self._generated_lines(notebook_id, kind))
+
+    async def _stream(self, method: str, notebook_id: str, kind: str) -> AsyncIterator[str]:
+        """Yield generated content line by line."""
+        await self._call(method)
+        for line in self._generated_lines(notebook_id, kind):
+            yield line
+            await asyncio.sleep(0)
+
+    async def generate_guide(self, notebook_id: str) -> str:
+        """Generate study guide."""
+        return await self._generate("generate_guide", notebook_id, "guide")
+
+    async def generate_outline(self, notebook_id: str) -> str:
+        """Generate content outline."""
+        return await self._generate("generate_outline", notebook_id, "outline")
+
+    async def generate_faq(self, notebook_id: str) -> str:
+        """Generate FAQ."""
+        return await self._generate("generate_faq", notebook_id, "faq")
+
+    async def generate_glossary(self, notebook_id: str) -> str:
+        """Generate glossary."""
+        return await self._generate("generate_glossary", notebook_id, "glossary")
+
+    def stream_guide(self, notebook_id: str) -> AsyncIterator[str]:
+        """Generate study guide, yielding content as it is produced."""
+        return self._stream("stream_guide", notebook_id, "guide")
+
+    def stream_outline(self, notebook_id: str) -> AsyncIterator[str]:
+        """Generate content outline, yielding content as it is produced."""
+        return self._stream("stream_outline", notebook_id, "outline")
+
+    def stream_faq(self, notebook_id: str) -> AsyncIterator[str]:
+        """Generate FAQ, yielding content as it is produced."""
+        return self._stream("stream_faq", notebook_id, "faq")
+
+    def stream_glossary(self, notebook_id: str) -> AsyncIterator[str]:
+        """Generate glossary, yielding content as it is produced."""
+        return self._stream("stream_glossary", notebook_id, "glossary")
+
+    # Audio operations
+
+    async def create_audio(self, notebook_id: str, instructions: str) -> Optional[Audio]:
+        """Create an audio overview, pending for audio_delay seconds."""
+        await self._call("create_audio")
+        self._notebook(notebook_id)
+        audio = Audio(
+            audio_id=str(uuid.uuid4()),
+            status="pending" if self.audio_delay else "ready",
+            duration=300,
+            instructions=instructions,
+        )
+        self._audio[notebook_id] = audio
+        self._audio_ready_at[notebook_id] = time.monotonic() + self.audio_delay
+        return audio
+
+    async def get_audio(self, notebook_id: str) -> Optional[Audio]:
+        """Get audio overview, None if the notebook has none."""
+        await self._call("get_audio")
+        self._notebook(notebook_id)
+        return self._audio.get(notebook_id)
+
+    async def poll_audio(self, notebook_id: str) -> Optional[Audio]:
+        """Get the audio overview once audio_delay has passed, else None."""
+        await self._call("poll_audio")
+        self._notebook(notebook_id)
+        audio = self._audio.get(notebook_id)
+        if audio is None or time.monotonic() < self._audio_ready_at[notebook_id]:
+            return None
+        if audio.status == "pending":
+            audio = self._audio[notebook_id] = replace(audio, status="ready")
+        return audio
+
+    async def list_audio(self, notebook_id: str) -> list[Audio]:
+        """List audio overviews."""
+        await self._call("list_audio")
+        self._notebook(notebook_id)
+        audio = self._audio.get(notebook_id)
+        return [audio] if audio is not None else []
+
+    async def delete_audio(self, notebook_id: str) -> bool:
+        """Delete audio overview."""
+        await self._call("delete_audio")
+        self._notebook(notebook_id)
+        self._audio.pop(notebook_id, None)
+        return True
+
+    # Video operations
+
+    async def create_video(self, notebook_id: str, instructions: str) -> bool:
+        """Start generating a video overview."""
+        await self._call("create_video")
+        self._notebook(notebook_id)
+        self._videos[notebook_id] = instructions
+        return True
+
+    # Media downloads
+
+    async def download_media(self, notebook_id: str, kind: str, path: str) -> None:
+        """Write a silent WAV (audio) or placeholder bytes (video) to path."""
+        await self._call("download_media")
+        self._notebook(notebook_id)
+        overviews = self._audio.keys() if kind == "audio" else self._videos.keys()
+        if notebook_id not in overviews:
+            raise NLMError(f"No {kind} overview for notebook {notebook_id}")
+        if kind == "video":
+            with open(path, "wb") as f:
+                f.write(bytes(64 * 1024))
+            return
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(8000)
+            f.writeframes(b"\x80" * 8000 * 5)  # Five seconds of silence
+
+    # Note operations
+
+    async def list_notes(self, notebook_id: str) -> list[Note]:
+        """List notes in a notebook."""
+        await self._call("list_notes")
+        self._notebook(notebook_id)
+        return list(self._notes.get(notebook_id, {}).values())
+
+    async def create_note(self, notebook_id: str, title: str) -> Optional[Note]:
+        """Create a new, empty note."""
+        await self._call("create_note")
+        self._notebook(notebook_id)
+        now = _timestamp(datetime.now(timezone.utc))
+        note = Note(note_id=str(uuid.uuid4()), title=title, created_at=now, modified_at=now)
+        self._notes.setdefault(notebook_id, {})[note.note_id] = note
+        return note
+
+    async def update_note(
+        self, notebook_id: str, note_id: str, content: str, title: str
+    ) -> bool:
+        """Update a note."""
+        await self._call("update_note")
+        self._notebook(notebook_id)
+        notes = self._notes.get(notebook_id, {})
+        if note_id not in notes:
+            raise NLMError(f"Note {note_id} not found")
+        notes[note_id] = replace(
+            notes[note_id],
+            title=title,
+            content=content,
+            modified_at=_timestamp(datetime.now(timezone.utc)),
+        )
+        return True
+
+    async def delete_note(self, note_id: str) -> bool:
+        """Delete a note from whichever notebook holds it."""
+        await self._call("delete_note")
+        for notes in self._notes.values():
+            if notes.pop(note_id, None) is not None:
+                return True
+        raise NLMError(f"Note {note_id} not found")
@@ -0,0 +1,384 @@
+"""Background jobs for long-running generation commands.
+
+Audio and video overviews take minutes to produce, longer than a request
+should wait, so they run as jobs: submit() records a job in a SQLite store
+and returns at once, and a small pool of asyncio workers runs the command.
+Audio jobs then poll ``nlm audio-get`` with exponential backoff until the
+overview is ready. Jobs still queued or in progress when the process stops
+are picked up again by the next start(), without sending a command that may
+already have run twice: see JobQueue.start.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Callable, Optional
+
+from nlm_web_core.nlm_client import BaseNLMClient, NLMError
+
+# Client method that starts each kind of job
+JOB_KINDS = {
+    "audio": "create_audio",
+    "video": "create_video",
+    "guide": "generate_guide",
+    "outline": "generate_outline",
+    "faq": "generate_faq",
+    "glossary": "generate_glossary",
+}
+
+# Instructions for audio and video jobs submitted without any
+DEFAULT_INSTRUCTIONS = "Provide a comprehensive overview"
+
+# Statuses of jobs that have not finished, resumed by start()
+ACTIVE_STATUSES = ("queued", "running", "polling")
+
+# Kinds whose command changes nothing upstream, so it can simply run again
+REPEATABLE_KINDS = ("guide", "outline", "faq", "glossary")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    notebook_id TEXT NOT NULL,
+    instructions TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    polls INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_notebook ON jobs (notebook_id, created_at);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    """A submitted job and its progress."""
+
+    job_id: str
+    kind: str
+    notebook_id: str
+    instructions: Optional[str] = None
+    status: str = "queued"
+    result: Optional[str] = None
+    error: Optional[str] = None
+    polls: int = 0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.status not in ACTIVE_STATUSES
+
+
+_COLUMNS = tuple(f.name for f in fields(Job))
+
+
+class JobStore:
+    """Jobs persisted in a SQLite database.
+
+    Statements are single-row reads and writes on a local file, so callers
+    on the event loop run them inline; a lock serializes the connection.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Open (and create if needed) the job database.
+
+        Args:
+            path: Database file, or ":memory:" for a store that lasts as
+                long as the process
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def save(self, job: Job) -> None:
+        """Insert or update a job."""
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                tuple(asdict(job).values()),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job, None if it does not exist."""
+        rows = self._select("WHERE job_id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def list_jobs(self, notebook_id: Optional[str] = None, limit: int = 50) -> list[Job]:
+        """
+        List jobs, newest first.
+
+        Args:
+            notebook_id: Only jobs for this notebook, all if None
+            limit: Maximum number of jobs
+
+        Returns:
+            Jobs ordered by creation time, newest first
+        """
+        if notebook_id is None:
+            return self._select("ORDER BY created_at DESC LIMIT ?", (limit,))
+        return self._select(
+            "WHERE notebook_id = ? ORDER BY created_at DESC LIMIT ?", (notebook_id, limit)
+        )
+
+    def unfinished(self) -> list[Job]:
+        """Jobs that have not finished, oldest first."""
+        placeholders = ", ".join("?" * len(ACTIVE_STATUSES))
+        return self._select(
+            f"WHERE status IN ({placeholders}) ORDER BY created_at", ACTIVE_STATUSES
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def _select(self, clause: str, params: tuple[Any, ...]) -> list[Job]:
+        """Run a SELECT over all columns and decode the rows."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs {clause}", params
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+
+class JobQueue:
+    """Runs submitted jobs on a pool of asyncio workers."""
+
+    def __init__(
+        self,
+        client: Any,
+        store: JobStore,
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        poll_max_interval: float = 60.0,
+        poll_timeout: float = 1800.0,
+    ):
+        """
+        Initialize job queue; workers start with start() or the first submit.
+
+        Args:
+            client: Async nlm client (or fake backend) that runs the jobs
+            store: Where jobs are persisted
+            workers: Jobs running at once
+            poll_interval: Seconds before the first audio-get poll, doubled
+                after each one that finds the overview still pending
+            poll_max_interval: Upper bound on the interval between polls
+            poll_timeout: Seconds after which a pending audio job fails
+        """
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.poll_max_interval = poll_max_interval
+        self.poll_timeout = poll_timeout
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._tasks: list[asyncio.Task] = []
+        self._listeners: list[Callable[[Job], None]] = []
+
+    def start(self) -> None:
+        """
+        Start the workers and requeue jobs left unfinished by a previous run.
+
+        Queued and polling jobs continue where they were. A job left running
+        may already have sent its command, so it is not simply run again:
+        audio jobs go on to poll for the overview, repeatable kinds run
+        again, and video jobs fail, since a second create would start a
+        second video.
+
+        Must be called with a running event loop; later calls do nothing.
+        """
+        self._start()
+
+    def _start(self) -> asyncio.Queue[str]:
+        """Start the workers if needed and return the queue they serve."""
+        if self._queue is not None:
+            return self._queue
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        for job in self.store.unfinished():
+            if job.status == "running":
+                job = self._interrupted(job)
+            if not job.done:
+                queue.put_nowait(job.job_id)
+        self._queue = queue
+        self._tasks = [
+            asyncio.create_task(self._work(queue)) for _ in range(max(1, self.workers))
+        ]
+        return queue
+
+    async def close(self) -> None:
+        """Stop the workers; jobs in progress are resumed by the next start()."""
+        tasks, self._tasks, self._queue = self._tasks, [], None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(
+        self, kind: str, notebook_id: str, instructions: Optional[str] = None
+    ) -> Job:
+        """
+        Record a job and queue it to run.
+
+        Args:
+            kind: One of JOB_KINDS
+            notebook_id: Notebook ID
+            instructions: Generation instructions for audio and video
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If kind is unknown
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        queue = self._start()
+        now = time.time()
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            notebook_id=notebook_id,
+            instructions=instructions,
+            created_at=now,
+            updated_at=now,
+        )
+        self.store.save(job)
+        queue.put_nowait(job.job_id)
+        self._notify(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job, None if it does not exist."""
+        return self.store.get(job_id)
+
+    def list_jobs(self, notebook_id: Optional[str] = None, limit: int = 50) -> list[Job]:
+        """List jobs, newest first; see JobStore.list_jobs."""
+        return self.store.list_jobs(notebook_id, limit)
+
+    def subscribe(self, listener: Callable[[Job], None]) -> Callable[[], None]:
+        """
+        Call a listener with every job whenever it is submitted or changes.
+
+        Args:
+            listener: Called on the event loop with the updated job
+
+        Returns:
+            Function that removes the listener; later calls do nothing
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _update(self, job: Job, **changes: Any) -> Job:
+        """Persist changes to a job and notify listeners."""
+        job = replace(job, updated_at=time.time(), **changes)
+        self.store.save(job)
+        self._notify(job)
+        return job
+
+    def _notify(self, job: Job) -> None:
+        """Call every listener, keeping one failing listener from stopping the rest."""
+        for listener in list(self._listeners):
+            try:
+                listener(job)
+            except Exception:
+                pass
+
+    def _interrupted(self, job: Job) -> Job:
+        """Settle a job a previous run left running; see start()."""
+        if job.kind == "audio":
+            return self._update(job, status="polling")
+        if job.kind in REPEATABLE_KINDS:
+            return job
+        return self._update(
+            job,
+            status="failed",
+            error=(
+                "Interrupted by a restart after the command may have been sent; "
+                "check whether it completed before submitting it again"
+            ),
+        )
+
+    async def _work(self, queue: asyncio.Queue[str]) -> None:
+        """Run queued jobs until cancelled."""
+        while True:
+            job = self.store.get(await queue.get())
+            if job is not None and not job.done:
+                await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        """Run one job to completion, recording its outcome."""
+        try:
+            if job.status != "polling":
+                job = self._update(job, status="running")
+                method = getattr(self.client, JOB_KINDS[job.kind])
+                if job.kind in ("audio", "video"):
+                    result = await method(
+                        job.notebook_id, job.instructions or DEFAULT_INSTRUCTIONS
+                    )
+                else:
+                    result = await method(job.notebook_id)
+                if job.kind != "audio":
+                    self._update(job, status="succeeded", result=self._result(result))
+                    return
+                if result is not None and result.status != "pending":
+                    self._update(job, status="succeeded", result=result.audio_id)
+                    return
+                job = self._update(job, status="polling")
+            job, audio = await self._poll(job)
+            self._update(job, status="succeeded", result=audio.audio_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._update(self.store.get(job.job_id) or job, status="failed", error=str(e))
+
+    async def _poll(self, job: Job) -> tuple[Job, Any]:
+        """
+        Poll audio-get with exponential backoff until the overview is ready.
+
+        Transient failures are polled through; other errors fail the job.
+
+        Returns:
+            The job with its poll count updated, and the ready overview
+
+        Raises:
+            NLMError: If the overview is not ready within poll_timeout
+        """
+        deadline = job.created_at + self.poll_timeout
+        delay = self.poll_interval
+        while True:
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.time())))
+            try:
+                audio = await self.client.poll_audio(job.notebook_id)
+            except Exception as e:
+                if not BaseNLMClient._transient(e):
+                    raise
+                audio = None
+            job = self._update(job, polls=job.polls + 1)
+            if audio is not None:
+                return job, audio
+            if time.time() >= deadline:
+                raise NLMError(
+                    f"Audio overview not ready after {self.poll_timeout:g} seconds"
+                )
+            delay = min(delay * 2, self.poll_max_interval)
+
+    @staticmethod
+    def _result(value: Any) -> Optional[str]:
+        """Store generated text as the result; other return values are not kept."""
+        return value if isinstance(value, str) else None
@@ -0,0 +1,70 @@
+"""Extraction of the JSON payload from nlm command output.
+
+``--json`` output is usually a single JSON document, but the CLI may print
+log or progress lines before it, and documents may be pretty-printed over
+several lines. Uses orjson for decoding when it is installed.
+"""
+import json
+import re
+from types import ModuleType
+from typing import Any, Optional
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# A line whose first non-blank character may open a JSON document
+_DOCUMENT_START = re.compile(r"^[ \t]*[\[{]", re.MULTILINE)
+
+_decoder = json.JSONDecoder()
+
+
+def loads(text: str) -> Any:
+    """Decode one JSON document, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def extract_json(output: str) -> Any:
+    """
+    Return the last JSON document in command output.
+
+    Output that is entirely JSON is decoded directly. Otherwise the output is
+    scanned once from the top: each line opening with ``{`` or ``[`` is
+    decoded in place, and scanning resumes after the end of every document
+    found, so pretty-printed documents are parsed once rather than line by
+    line and then as a whole.
+
+    Args:
+        output: Command output
+
+    Returns:
+        Parsed JSON data, or the output unchanged if it contains none
+    """
+    stripped = output.strip()
+    if stripped[:1] in ("{", "["):
+        try:
+            return loads(stripped)
+        except ValueError:
+            pass
+
+    result: Any = output
+    position = 0
+    while True:
+        match = _DOCUMENT_START.search(output, position)
+        if match is None:
+            return result
+        try:
+            document, end = _decoder.raw_decode(output, match.end() - 1)
+        except ValueError:
+            position = match.end()
+            continue
+        # Only documents that end their line count, so "[1] done" is log text
+        line_end = output.find("\n", end)
+        if output[end : line_end if line_end != -1 else len(output)].strip():
+            position = match.end()
+            continue
+        result, position = document, end
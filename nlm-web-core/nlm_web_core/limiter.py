@@ -0,0 +1,220 @@
+"""Admission control for nlm commands: bounded concurrency and wait queue.
+
+Each command holds a slot while it runs. At most ``max_concurrent`` commands
+run at once, and at most ``max_per_notebook`` of them against one notebook.
+Callers that cannot start wait in a FIFO queue of at most ``max_queue``
+entries (and ``max_per_notebook`` entries per notebook); beyond that they
+are rejected immediately so load is shed instead of piling up.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when a command is rejected because the wait queue is full."""
+
+    def __init__(self, message: str, notebook_id: Optional[str] = None):
+        """
+        Args:
+            message: Error message
+            notebook_id: Notebook whose queue is full, None for the global queue
+        """
+        super().__init__(message)
+        self.notebook_id = notebook_id
+
+
+class QueueTimeoutError(Exception):
+    """Raised when a queued command did not get a slot in time."""
+
+    pass
+
+
+class AsyncConcurrencyLimiter:
+    """Admission limiter for the asyncio client; use it from one event loop."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_per_notebook: int = 2,
+        max_queue: int = 32,
+        queue_timeout: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            max_concurrent: Commands allowed to run at once
+            max_per_notebook: Commands allowed to run at once per notebook
+            max_queue: Commands allowed to wait for a slot
+            queue_timeout: Seconds a command may wait before giving up
+            clock: Monotonic time source
+        """
+        self.max_concurrent = max_concurrent
+        self.max_per_notebook = max_per_notebook
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._clock = clock
+        self._running = 0
+        self._running_by_notebook: dict[str, int] = {}
+        self._waiters: deque[tuple[Optional[str], Any]] = deque()
+        self._queued_by_notebook: dict[str, int] = {}
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _has_slot(self, notebook_id: Optional[str]) -> bool:
+        """Whether a command for notebook_id may start now."""
+        if self._running >= self.max_concurrent:
+            return False
+        return (
+            notebook_id is None
+            or self._running_by_notebook.get(notebook_id, 0) < self.max_per_notebook
+        )
+
+    def _take(self, notebook_id: Optional[str]) -> None:
+        """Occupy a slot."""
+        self._running += 1
+        self._admitted += 1
+        if notebook_id is not None:
+            self._running_by_notebook[notebook_id] = (
+                self._running_by_notebook.get(notebook_id, 0) + 1
+            )
+
+    def _enqueue(self, notebook_id: Optional[str], waiter: Any) -> None:
+        """Add a waiter to the queue, or reject it if the queue is full."""
+        if len(self._waiters) >= self.max_queue:
+            self._rejected += 1
+            raise QueueFullError("Too many queued nlm commands")
+        if notebook_id is not None:
+            queued = self._queued_by_notebook.get(notebook_id, 0)
+            if queued >= self.max_per_notebook:
+                self._rejected += 1
+                raise QueueFullError(
+                    f"Too many queued nlm commands for notebook {notebook_id}",
+                    notebook_id=notebook_id,
+                )
+            self._queued_by_notebook[notebook_id] = queued + 1
+        self._waiters.append((notebook_id, waiter))
+
+    def _dequeue(self, notebook_id: Optional[str], waiter: Any) -> None:
+        """Remove a waiter from the queue."""
+        self._waiters.remove((notebook_id, waiter))
+        self._forget_queued(notebook_id)
+
+    def _forget_queued(self, notebook_id: Optional[str]) -> None:
+        """Drop a notebook's queued count after its waiter left the queue."""
+        if notebook_id is None:
+            return
+        remaining = self._queued_by_notebook[notebook_id] - 1
+        if remaining:
+            self._queued_by_notebook[notebook_id] = remaining
+        else:
+            del self._queued_by_notebook[notebook_id]
+
+    def _release(self, notebook_id: Optional[str]) -> list[Any]:
+        """
+        Free a slot and hand freed slots to queued waiters in FIFO order.
+
+        Waiters whose notebook is still saturated are skipped so they do not
+        hold up commands for other notebooks.
+
+        Returns:
+            Waiters that were granted a slot and must be woken
+        """
+        self._running -= 1
+        if notebook_id is not None:
+            remaining = self._running_by_notebook[notebook_id] - 1
+            if remaining:
+                self._running_by_notebook[notebook_id] = remaining
+            else:
+                del self._running_by_notebook[notebook_id]
+
+        granted = []
+        for entry in list(self._waiters):
+            if self._running >= self.max_concurrent:
+                break
+            waiter_notebook, waiter = entry
+            if not self._abandoned(waiter) and self._has_slot(waiter_notebook):
+                self._waiters.remove(entry)
+                self._forget_queued(waiter_notebook)
+                self._take(waiter_notebook)
+                granted.append(waiter)
+        return granted
+
+    def _record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Account for time spent in the queue."""
+        self._waits += 1
+        self._wait_total += seconds
+        self._wait_max = max(self._wait_max, seconds)
+        if timed_out:
+            self._timed_out += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return current load and queue-time statistics."""
+        return {
+            "running": self._running,
+            "queued": len(self._waiters),
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "queue_waits": self._waits,
+            "queue_wait_seconds_total": self._wait_total,
+            "queue_wait_seconds_max": self._wait_max,
+        }
+
+    @asynccontextmanager
+    async def acquire(self, notebook_id: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block, waiting if necessary.
+
+        Args:
+            notebook_id: Notebook the command targets, None if account-wide
+
+        Raises:
+            QueueFullError: If the wait queue is full
+            QueueTimeoutError: If no slot became free within queue_timeout
+        """
+        if self._has_slot(notebook_id):
+            self._take(notebook_id)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._enqueue(notebook_id, future)
+            start = self._clock()
+            try:
+                await asyncio.wait_for(future, self.queue_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                granted = future.done() and not future.cancelled()
+                if isinstance(e, asyncio.CancelledError):
+                    if granted:
+                        # The slot arrived just before the cancellation
+                        self._wake(self._release(notebook_id))
+                    else:
+                        self._dequeue(notebook_id, future)
+                    raise
+                if not granted:
+                    self._dequeue(notebook_id, future)
+                    self._record_wait(self._clock() - start, timed_out=True)
+                    raise QueueTimeoutError("Timed out waiting for an nlm slot")
+            self._record_wait(self._clock() - start)
+
+        try:
+            yield
+        finally:
+            self._wake(self._release(notebook_id))
+
+    def _abandoned(self, waiter: asyncio.Future) -> bool:
+        """Whether a waiter was cancelled but has not yet left the queue."""
+        return waiter.done()
+
+    @staticmethod
+    def _wake(futures: list[asyncio.Future]) -> None:
+        """Resume waiters that were granted a slot."""
+        for future in futures:
+            future.set_result(None)
@@ -0,0 +1,317 @@
+"""On-disk cache and HTTP delivery of downloaded audio and video overviews.
+
+``nlm audio-download`` fetches a whole multi-megabyte file on every call,
+while a browser playing it issues many small ``Range`` requests as the user
+seeks. MediaCache keeps downloaded files in a directory bounded by total
+size, evicting the least recently used, and media_response() serves a file
+with ``Range``, ``ETag`` and ``Last-Modified`` support so seeks and repeat
+plays are answered from disk.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from nlm_web_core.singleflight import AsyncSingleFlight
+
+# Bytes read from disk per chunk of a streamed response
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass(frozen=True, slots=True)
+class MediaFile:
+    """A cached media file."""
+
+    path: Path
+    size: int
+    modified: float
+
+    @property
+    def etag(self) -> str:
+        """Strong validator derived from size and modification time."""
+        return f'"{self.size:x}-{int(self.modified * 1_000_000):x}"'
+
+    @property
+    def last_modified(self) -> str:
+        """Modification time as an HTTP date."""
+        return formatdate(self.modified, usegmt=True)
+
+    @property
+    def media_type(self) -> str:
+        """MIME type guessed from the file extension."""
+        return mimetypes.guess_type(self.path.name)[0] or "application/octet-stream"
+
+
+class MediaCache:
+    """Size-bounded LRU cache of downloaded media files in one directory.
+
+    Files are named after a hash of their key, so the cache is rebuilt from
+    the directory on startup, oldest first. Concurrent requests for a file
+    that is not cached share one download.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize media cache, adopting files already in the directory.
+
+        Args:
+            directory: Where files are kept; created if missing
+            max_bytes: Total size above which least recently used files are
+                deleted (the newest file is kept even if larger)
+            max_age: Seconds a download is served before it is fetched again,
+                in case the overview was regenerated elsewhere
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._single_flight = AsyncSingleFlight()
+        self._files: OrderedDict[str, MediaFile] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        for path in sorted(self.directory.iterdir(), key=lambda p: p.stat().st_mtime):
+            if path.suffix == ".part":
+                path.unlink(missing_ok=True)  # Interrupted download
+            elif path.is_file():
+                stat = path.stat()
+                self._files[path.stem] = MediaFile(path, stat.st_size, stat.st_mtime)
+                self.total_bytes += stat.st_size
+        self._evict()
+
+    @staticmethod
+    def _name(key: str) -> str:
+        """File name stem for a key."""
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[MediaFile]:
+        """
+        Look up a cached file and mark it recently used.
+
+        Args:
+            key: Cache key, e.g. "audio/<notebook-id>"
+
+        Returns:
+            Cached file, or None if missing or older than max_age
+        """
+        name = self._name(key)
+        with self._lock:
+            media = self._files.get(name)
+            if media is None or self._clock() - media.modified > self.max_age:
+                self.misses += 1
+                return None
+            self._files.move_to_end(name)
+            self.hits += 1
+            return media
+
+    async def fetch(
+        self, key: str, suffix: str, download: Callable[[str], Awaitable[None]]
+    ) -> MediaFile:
+        """
+        Return a cached file, downloading it first if needed.
+
+        Args:
+            key: Cache key
+            suffix: File extension, which determines the served MIME type
+            download: Writes the file to the path it is given
+
+        Returns:
+            The cached file
+        """
+        media = self.get(key)
+        if media is not None:
+            return media
+        return await self._single_flight.do(
+            key, lambda: self._download(key, suffix, download)
+        )
+
+    async def _download(
+        self, key: str, suffix: str, download: Callable[[str], Awaitable[None]]
+    ) -> MediaFile:
+        """Download into a temporary file and move it into the cache."""
+        name = self._name(key)
+        part = self.directory / f"{name}.{uuid.uuid4().hex}.part"
+        path = self.directory / f"{name}{suffix}"
+        try:
+            await download(str(part))
+            with self._lock:
+                # The replaced entry's file is path itself unless the suffix
+                # changed, and must not be unlinked once the new file is there
+                self._drop(name, keep=path)
+                os.replace(part, path)
+                stat = path.stat()
+                media = MediaFile(path, stat.st_size, stat.st_mtime)
+                self._files[name] = media
+                self.total_bytes += media.size
+                self._evict()
+        finally:
+            part.unlink(missing_ok=True)
+        return media
+
+    def discard(self, key: str) -> None:
+        """Delete a cached file, e.g. after its overview was regenerated."""
+        with self._lock:
+            self._drop(self._name(key))
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _drop(self, name: str, keep: Optional[Path] = None) -> None:
+        """Remove one entry and its file unless that is keep; the lock must be held."""
+        media = self._files.pop(name, None)
+        if media is not None:
+            self.total_bytes -= media.size
+            # Responses already streaming keep reading the unlinked file
+            if media.path != keep:
+                media.path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """Delete least recently used files over max_bytes; the lock must be held."""
+        while self.total_bytes > self.max_bytes and len(self._files) > 1:
+            self._drop(next(iter(self._files)))
+            self.evictions += 1
+
+
+def parse_range(header: str, size: int) -> tuple[int, int]:
+    """
+    Parse a single-range ``Range`` header.
+
+    Args:
+        header: Header value, e.g. "bytes=0-1023", "bytes=500-" or "bytes=-500"
+        size: File size in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions
+
+    Raises:
+        ValueError: If the header is malformed, asks for several ranges or
+            lies beyond the end of the file
+    """
+    match = _RANGE.match(header.strip())
+    if match is None:
+        raise ValueError(f"Unsupported range {header!r}")
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            raise ValueError(f"Unsatisfiable range {header!r}")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Unsatisfiable range {header!r}")
+    return start, end
+
+
+def _read(path: Path, start: int, length: int) -> Iterator[bytes]:
+    """Yield length bytes of a file from start, in chunks."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(MEDIA_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _not_modified(request: Request, media: MediaFile) -> bool:
+    """Whether the client's conditional headers match the cached file."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return media.etag in (tag.strip() for tag in if_none_match.split(",")) or (
+            if_none_match.strip() == "*"
+        )
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(media.modified) <= since
+    return False
+
+
+def media_response(
+    request: Request, media: MediaFile, filename: Optional[str] = None
+) -> Response:
+    """
+    Serve a cached file, honouring conditional and ``Range`` requests.
+
+    Args:
+        request: Incoming request
+        media: File to serve
+        filename: Offer the file as a download with this name instead of
+            playing it inline
+
+    Returns:
+        304 if the client's copy is current, 206 for a satisfiable range,
+        416 for an unsatisfiable one, else 200 with the whole file
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": media.etag,
+        "Last-Modified": media.last_modified,
+        "Cache-Control": "private, max-age=0, must-revalidate",
+    }
+    if filename is not None:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    if _not_modified(request, media):
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, media.size - 1, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if range_header and (if_range is None or if_range in (media.etag, media.last_modified)):
+        try:
+            start, end = parse_range(range_header, media.size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{media.size}"
+            return Response(status_code=416, headers=headers)
+        headers["Content-Range"] = f"bytes {start}-{end}/{media.size}"
+        status_code = 206
+
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media.media_type)
+    return StreamingResponse(
+        _read(media.path, start, length),
+        status_code=status_code,
+        headers=headers,
+        media_type=media.media_type,
+    )
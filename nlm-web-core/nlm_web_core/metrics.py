@@ -0,0 +1,310 @@
+"""Prometheus metrics for nlm commands and HTTP routes.
+
+A small, dependency-free implementation of counters, gauges and histograms
+rendered in the Prometheus text exposition format. Clients only touch
+metrics when a Metrics instance is passed to them, so a disabled setup pays
+for nothing but a ``None`` check per command.
+"""
+import math
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds in seconds, from fast cache-warm reads to
+# multi-minute generation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    """Render a label set such as {command="list",le="0.5"}."""
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Named metric family with a fixed set of label names."""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        """
+        Args:
+            name: Metric name
+            help: One-line description
+            labels: Label names, values are given positionally when recording
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterable[str]:
+        """Yield exposition lines, starting with HELP and TYPE."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Add amount to the count for a label set."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current count for a label set."""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down per label set."""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Subtract amount from the value for a label set."""
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets per label set."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: bucket counts (non-cumulative), sum
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for a label set."""
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * len(self.buckets), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        """Observations recorded for a label set."""
+        with self._lock:
+            entry = self._values.get(labels)
+            return sum(entry[0]) if entry is not None else 0
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            )
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket{_format_labels(self.labels, labels, le)} "
+                    f"{cumulative}"
+                )
+            label_text = _format_labels(self.labels, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Callback(_Metric):
+    """Metric read from a function at scrape time, e.g. a cache's own counters."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        type: str,
+        read: Callable[[], float],
+    ):
+        """
+        Args:
+            name: Metric name
+            help: One-line description
+            type: "counter" or "gauge"
+            read: Returns the current value
+        """
+        super().__init__(name, help)
+        self.type = type
+        self._read = read
+
+    def _samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_value(self._read())}"
+
+
+class Metrics:
+    """Every metric the application exports, rendered by the /metrics route."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize metrics.
+
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.command_seconds = Histogram(
+            "nlm_command_duration_seconds",
+            "Time nlm commands took, from admission to result.",
+            ("command",),
+            buckets,
+        )
+        self.spawn_seconds = Histogram(
+            "nlm_process_spawn_seconds",
+            "Time taken to start one-shot nlm processes.",
+            buckets=buckets,
+        )
+        self.parse_seconds = Histogram(
+            "nlm_json_parse_seconds",
+            "Time taken to parse and decode nlm JSON output.",
+            ("command",),
+            buckets,
+        )
+        self.exits = Counter(
+            "nlm_command_exits_total",
+            "Finished nlm commands by exit code.",
+            ("command", "code"),
+        )
+        self.timeouts = Counter(
+            "nlm_command_timeouts_total",
+            "nlm commands killed by their timeout.",
+            ("command",),
+        )
+        self.in_flight = Gauge(
+            "nlm_processes_in_flight",
+            "One-shot nlm processes currently running.",
+        )
+        self.request_seconds = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route.",
+            ("method", "route", "status"),
+            buckets,
+        )
+        self._metrics: list[_Metric] = [
+            self.command_seconds,
+            self.spawn_seconds,
+            self.parse_seconds,
+            self.exits,
+            self.timeouts,
+            self.in_flight,
+            self.request_seconds,
+        ]
+
+    def add_callback(
+        self, name: str, help: str, read: Callable[[], float], type: str = "counter"
+    ) -> None:
+        """
+        Export a value owned by another component, read on each scrape.
+
+        A callback registered again under the same name replaces the old one,
+        e.g. when a client is rebuilt.
+
+        Args:
+            name: Metric name
+            help: One-line description
+            read: Returns the current value
+            type: "counter" or "gauge"
+        """
+        self._metrics = [m for m in self._metrics if m.name != name]
+        self._metrics.append(Callback(name, help, type, read))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a metric by name."""
+        return next((m for m in self._metrics if m.name == name), None)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP request latency by route template.
+
+    Routes are labelled by their path template, e.g.
+    ``/api/notebooks/{notebook_id}``, so label cardinality stays bounded;
+    requests that matched no route are labelled "other".
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        """
+        Args:
+            app: Wrapped ASGI application
+            metrics: Metrics to record into
+        """
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", "other")
+            self.metrics.request_seconds.observe(
+                time.monotonic() - started, scope["method"], route, str(status_code)
+            )
@@ -0,0 +1,1488 @@
+"""NLM CLI wrapper client for executing nlm commands."""
+import asyncio
+import codecs
+import re
+import threading
+import time
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
+from functools import partial, wraps
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Concatenate,
+    Coroutine,
+    Iterable,
+    Optional,
+    ParamSpec,
+    TypeVar,
+    Union,
+    cast,
+)
+from pathlib import Path
+
+from nlm_web_core.breaker import CircuitBreaker, CircuitOpenError
+from nlm_web_core.bulk import SourceItem, SourceResult, add_all_async, as_items
+from nlm_web_core.cache import MISSING, ResponseCache
+from nlm_web_core.json_output import extract_json
+from nlm_web_core.limiter import AsyncConcurrencyLimiter, QueueFullError, QueueTimeoutError
+from nlm_web_core.metrics import Metrics
+from nlm_web_core.notebook_index import NotebookIndex
+from nlm_web_core.records import Audio, Note, Notebook, Source, decode_list
+from nlm_web_core.retry import RetryPolicy
+from nlm_web_core.singleflight import AsyncSingleFlight
+from nlm_web_core.timeouts import TimeoutPolicy
+from nlm_web_core.tracing import NoopTracer, Tracer, current_request_id
+from nlm_web_core.worker import (
+    AsyncWorkerPool,
+    WorkerCrashedError,
+    WorkerTimeoutError,
+    WorkerUnavailableError,
+)
+
+
+class NLMError(Exception):
+    """Base exception for NLM client errors."""
+
+    pass
+
+
+class NotebookNotFoundError(NLMError):
+    """Raised when notebook is not found."""
+
+    pass
+
+
+class SourceNotFoundError(NLMError):
+    """Raised when source is not found."""
+
+    pass
+
+
+class NLMTimeoutError(NLMError):
+    """Raised when a command does not finish within its timeout."""
+
+    pass
+
+
+class NLMOverloadedError(NLMError):
+    """Raised when a command is rejected because too many are queued."""
+
+    pass
+
+
+class NotebookBusyError(NLMOverloadedError):
+    """Raised when too many commands are queued for one notebook."""
+
+    pass
+
+
+class NLMUnavailableError(NLMOverloadedError):
+    """Raised when commands are paused because NotebookLM keeps failing."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        """
+        Args:
+            message: Error message
+            retry_after: Seconds until commands are tried again
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Bytes read from a streaming command's stdout at a time
+STREAM_CHUNK_SIZE = 4096
+
+# Substrings of CLI errors for requests the service rejected without acting
+TRANSIENT_MARKERS = (
+    "429",
+    "503",
+    "RESOURCE_EXHAUSTED",
+    "UNAVAILABLE",
+    "Too Many Requests",
+    "Service Unavailable",
+)
+
+# Sources added at once by add_sources_bulk when no limiter caps it
+BULK_CONCURRENCY = 4
+
+# File extension of each kind of media, as `nlm <kind>-download` saves it
+MEDIA_SUFFIXES = {"audio": ".wav", "video": ".mp4"}
+
+# "ID: ..." line of the overview `nlm audio-get` prints once audio is ready
+_AUDIO_ID = re.compile(r"^\s*ID:\s*(\S+)", re.MULTILINE)
+
+# Subcommands whose first argument is the notebook they operate on
+NOTEBOOK_COMMANDS = frozenset(
+    {
+        "sources", "add", "rm", "rm-source",
+        "generate-guide", "generate-outline", "faq", "glossary",
+        "audio-create", "audio-get", "audio-list", "audio-rm", "audio-download",
+        "video-create", "video-list", "video-download",
+        "notes", "new-note", "update-note",
+    }
+)
+
+
+class BaseNLMClient:
+    """Shared configuration, error mapping and output parsing for NLM clients."""
+
+    def __init__(
+        self,
+        auth_token: str,
+        cookies: str,
+        nlm_path: str = "nlm",
+        timeout: float = 60,
+        notebook_index_ttl: float = 60,
+        cache: Optional[ResponseCache] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        """
+        Initialize NLM client.
+
+        Args:
+            auth_token: NLM authentication token
+            cookies: NLM cookies
+            nlm_path: Path to nlm binary (default: "nlm" in PATH)
+            timeout: Seconds to wait for a command before giving up
+            notebook_index_ttl: Seconds a notebook listing serves lookups
+            cache: Optional response cache for read-only commands
+            timeouts: Optional per-command timeout policy, used instead of
+                timeout
+            retry_policy: Optional policy retrying read-only commands after
+                transient upstream errors
+            breaker: Optional circuit breaker rejecting commands while the
+                upstream error rate is high
+            metrics: Optional metrics to record command latency, exit codes
+                and timeouts in
+            tracer: Tracer receiving a span per command phase, e.g. an
+                OpenTelemetry tracer (default: no-op)
+
+        Raises:
+            ValueError: If auth_token or cookies are empty
+        """
+        if not auth_token or not cookies:
+            raise ValueError("auth_token and cookies are required")
+
+        self.auth_token = auth_token
+        self.cookies = cookies
+        self.nlm_path = nlm_path
+        self.timeout = timeout
+        self.notebook_index = NotebookIndex(ttl=notebook_index_ttl)
+        self.cache = cache
+        self.timeouts = timeouts
+        self.retry_policy = retry_policy
+        self.breaker = breaker
+        self.metrics = metrics
+        self.tracer = tracer if tracer is not None else NoopTracer()
+
+    def _command_env(self) -> dict[str, str]:
+        """Build the environment passed to nlm processes."""
+        return {
+            "NLM_AUTH_TOKEN": self.auth_token,
+            "NLM_COOKIES": self.cookies,
+        }
+
+    def _cached(self, key: tuple[str, ...]) -> Any:
+        """Return a cached response for key, or MISSING."""
+        if self.cache is None:
+            return MISSING
+        return self.cache.get(key)
+
+    def _generation(self, notebook_id: Optional[str]) -> Optional[tuple[int, int]]:
+        """Return the cache generation to pass to _store() for a read."""
+        if self.cache is None:
+            return None
+        return self.cache.generation(notebook_id)
+
+    def _store(
+        self,
+        key: tuple[str, ...],
+        value: Any,
+        notebook_id: Optional[str],
+        generation: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """Cache a read-only response unless a write overtook it."""
+        if self.cache is not None:
+            self.cache.set(
+                key, value, notebook_id=notebook_id, generation=generation
+            )
+
+    def _invalidate(self, notebook_id: Optional[str] = None) -> None:
+        """Drop cached responses affected by a write to notebook_id."""
+        if self.cache is not None:
+            self.cache.invalidate(notebook_id)
+
+    def _clear_cache(self) -> None:
+        """Drop every cached response after a write of unknown scope."""
+        if self.cache is not None:
+            self.cache.clear()
+
+    @staticmethod
+    def _subcommand(args: list[str]) -> list[str]:
+        """Strip global flags such as --direct-rpc from the front of args."""
+        while args and args[0].startswith("-"):
+            args = args[1:]
+        return args
+
+    @classmethod
+    def _target_notebook(cls, args: list[str]) -> Optional[str]:
+        """Return the notebook a command operates on, None if account-wide."""
+        args = cls._subcommand(args)
+        if len(args) > 1 and args[0] in NOTEBOOK_COMMANDS:
+            return args[1]
+        return None
+
+    def _timeout(self, args: list[str]) -> float:
+        """Seconds a command may run before it is killed."""
+        if self.timeouts is None:
+            return self.timeout
+        return self.timeouts.timeout(self._subcommand(args)[0])
+
+    def _observe(self, args: list[str], started: float) -> None:
+        """Record the latency of a command that completed."""
+        if self.timeouts is not None:
+            self.timeouts.observe(self._subcommand(args)[0], time.monotonic() - started)
+
+    def _timed_out(self, args: list[str], timeout: float) -> NLMTimeoutError:
+        """Build the error for a command killed after timeout seconds."""
+        command = self._subcommand(args)[0]
+        if self.metrics is not None:
+            self.metrics.timeouts.inc(command)
+        return NLMTimeoutError(f"nlm {command} timed out after {timeout:g}s")
+
+    def _span_attributes(self, args: list[str]) -> dict[str, str]:
+        """Attributes identifying a command and the request that ran it."""
+        attributes = {"nlm.command": self._subcommand(args)[0]}
+        notebook_id = self._target_notebook(args)
+        if notebook_id is not None:
+            attributes["nlm.notebook_id"] = notebook_id
+        request_id = current_request_id()
+        if request_id is not None:
+            attributes["request.id"] = request_id
+        return attributes
+
+    def _measure(self, args: list[str], started: float) -> None:
+        """Record how long a command took, whatever its outcome."""
+        if self.metrics is not None:
+            self.metrics.command_seconds.observe(
+                time.monotonic() - started, self._subcommand(args)[0]
+            )
+
+    def _exited(self, args: list[str], returncode: int) -> None:
+        """Count a finished command by its exit code."""
+        if self.metrics is not None:
+            self.metrics.exits.inc(self._subcommand(args)[0], str(returncode))
+
+    @staticmethod
+    def _overloaded(error: Exception) -> NLMOverloadedError:
+        """Map a limiter rejection to the client's error type."""
+        if isinstance(error, QueueFullError) and error.notebook_id is not None:
+            return NotebookBusyError(str(error))
+        return NLMOverloadedError(str(error))
+
+    @staticmethod
+    def _transient(error: Exception) -> bool:
+        """
+        Whether a failed command may be retried without repeating its effect.
+
+        Commands shed by admission control never ran, and the upstream
+        errors in TRANSIENT_MARKERS are rejections before anything changed.
+        Local timeouts are not transient: the command may have completed.
+        """
+        if isinstance(error, NLMOverloadedError):
+            return True
+        message = str(error)
+        return any(marker in message for marker in TRANSIENT_MARKERS)
+
+    @staticmethod
+    def _upstream_failure(error: Exception) -> bool:
+        """Whether a failed command counts against the upstream's health."""
+        if isinstance(error, NLMTimeoutError):
+            return True
+        if isinstance(error, NLMOverloadedError):
+            return False  # Shed locally, never reached the upstream
+        message = str(error)
+        return any(marker in message for marker in TRANSIENT_MARKERS)
+
+    def _retryable(self, error: Exception, attempt: int) -> bool:
+        """
+        Whether a failed read may be tried again, spending retry budget if so.
+
+        Only upstream rejections are retried: local shedding and open
+        circuits would just fail again, and a read that timed out already
+        took as long as the caller can wait.
+        """
+        return (
+            self.retry_policy is not None
+            and not isinstance(error, NLMTimeoutError)
+            and self._upstream_failure(error)
+            and self.retry_policy.allow_retry(attempt)
+        )
+
+    def _check_circuit(self) -> None:
+        """Reject a command up front while the circuit breaker is open."""
+        if self.breaker is None:
+            return
+        try:
+            self.breaker.allow()
+        except CircuitOpenError as e:
+            raise NLMUnavailableError(str(e), retry_after=e.retry_after)
+
+    def _record_outcome(self, error: Optional[Exception] = None) -> None:
+        """Tell the circuit breaker whether the upstream handled a command."""
+        if self.breaker is None:
+            return
+        if error is not None and self._upstream_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _release_circuit(self) -> None:
+        """Tell the circuit breaker a command it admitted reports no outcome."""
+        if self.breaker is not None:
+            self.breaker.release()
+
+    def _bulk_concurrency(self, concurrency: Optional[int]) -> int:
+        """Cap batch parallelism at what the limiter admits per notebook."""
+        limiter = getattr(self, "limiter", None)
+        if limiter is None:
+            return concurrency or BULK_CONCURRENCY
+        return min(concurrency or limiter.max_per_notebook, limiter.max_per_notebook)
+
+    def _check_result(
+        self, returncode: int, stdout: str, stderr: str
+    ) -> tuple[str, str]:
+        """
+        Map a finished nlm process to its output or an exception.
+
+        Args:
+            returncode: Process exit code
+            stdout: Captured stdout
+            stderr: Captured stderr
+
+        Returns:
+            Tuple of (stdout, stderr)
+
+        Raises:
+            NLMError: If command failed
+        """
+        if returncode != 0:
+            error_msg = (
+                stderr.strip() or stdout.strip() or f"nlm exited with code {returncode}"
+            )
+            if "not found" in error_msg.lower():
+                if "notebook" in error_msg.lower():
+                    raise NotebookNotFoundError(error_msg)
+                elif "source" in error_msg.lower():
+                    raise SourceNotFoundError(error_msg)
+            raise NLMError(error_msg)
+
+        return stdout, stderr
+
+    @staticmethod
+    def _record(record_type: Any, data: Any) -> Any:
+        """Decode a single JSON object into a record, None if there is none."""
+        if not isinstance(data, dict):
+            return None
+        return record_type.from_json(data)
+
+    @classmethod
+    def _audio(cls, data: Any) -> Optional[Audio]:
+        """
+        Decode ``nlm audio-get`` output into an audio overview.
+
+        The CLI prints JSON when it can, and otherwise either a "not ready
+        yet" message or an overview summary with a ``Ready: true`` line.
+
+        Args:
+            data: Parsed output, or the output text when it holds no JSON
+
+        Returns:
+            Audio overview, pending while it is still being generated, or
+            None if the CLI printed JSON other than an overview
+        """
+        if not isinstance(data, str):
+            return cls._record(Audio, data)
+        if "Ready: true" not in data:
+            return Audio(audio_id="", status="pending")
+        match = _AUDIO_ID.search(data)
+        return Audio(audio_id=match.group(1) if match else "", status="ready")
+
+    def _ready_audio(self, stdout: str) -> Optional[Audio]:
+        """
+        Decode ``nlm audio-get`` output into the overview once it is ready.
+
+        Args:
+            stdout: Command output
+
+        Returns:
+            Ready audio overview, or None while it is still being generated
+        """
+        audio = self._audio(self._parse_json_output(stdout))
+        return audio if audio is not None and audio.status != "pending" else None
+
+    def _parse_json_output(self, output: str) -> Any:
+        """
+        Parse JSON output from nlm command, skipping any log lines around it.
+
+        Args:
+            output: Command output
+
+        Returns:
+            Parsed JSON data
+        """
+        return extract_json(output)
+
+
+class AsyncNLMClient(BaseNLMClient):
+    """Asyncio client for interacting with NLM CLI without blocking the event loop."""
+
+    def __init__(
+        self,
+        *args: Any,
+        single_flight: Optional[AsyncSingleFlight] = None,
+        worker_pool: Optional[AsyncWorkerPool] = None,
+        limiter: Optional[AsyncConcurrencyLimiter] = None,
+        shared_limiter: Optional[AsyncConcurrencyLimiter] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize NLM client.
+
+        Accepts the same arguments as BaseNLMClient, plus:
+
+        Args:
+            single_flight: Group coalescing identical concurrent reads, shareable
+                between clients (default: a private group)
+            worker_pool: Persistent nlm workers to run commands on, falling back
+                to one-shot processes when unavailable (default: one-shot only)
+            limiter: Admission control bounding concurrent and queued commands,
+                shareable between clients (default: unbounded)
+            shared_limiter: Limiter a command must also get a slot from once
+                its own limiter admits it, e.g. a host-wide cap over several
+                clients' budgets (default: none)
+        """
+        super().__init__(*args, **kwargs)
+        self.single_flight = single_flight or AsyncSingleFlight()
+        self.worker_pool = worker_pool
+        self.limiter = limiter
+        self.shared_limiter = shared_limiter
+
+    @asynccontextmanager
+    async def _admission(self, args: list[str]) -> AsyncIterator[None]:
+        """
+        Hold a slot in the client's limiter and then in the shared one.
+
+        The client's own limiter is taken first, so commands its budget cannot
+        start yet wait there instead of occupying slots other clients share.
+
+        Args:
+            args: Command arguments
+
+        Raises:
+            QueueFullError: If either limiter's wait queue is full
+            QueueTimeoutError: If either limiter had no slot in time
+        """
+        notebook_id = self._target_notebook(args)
+        async with AsyncExitStack() as stack:
+            for limiter in (self.limiter, self.shared_limiter):
+                if limiter is not None:
+                    await stack.enter_async_context(limiter.acquire(notebook_id))
+            yield
+
+    async def _run_command(
+        self, args: list[str], input_data: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Run nlm command once the limiter admits it.
+
+        Args:
+            args: Command arguments
+            input_data: Optional stdin input
+
+        Returns:
+            Tuple of (stdout, stderr)
+
+        Raises:
+            NLMOverloadedError: If the command was rejected or queued too long,
+                or the circuit breaker is open
+            NLMError: If command fails
+        """
+        with self.tracer.start_as_current_span(
+            "nlm.command", attributes=self._span_attributes(args)
+        ) as span:
+            self._check_circuit()
+            queued = time.monotonic()
+            settled = False
+            try:
+                async with self._admission(args):
+                    started = time.monotonic()
+                    span.set_attribute("nlm.queue_seconds", round(started - queued, 6))
+                    try:
+                        result = await self._dispatch(args, input_data)
+                    except NLMError as e:
+                        settled = True
+                        self._record_outcome(e)
+                        raise
+                    else:
+                        settled = True
+                        self._record_outcome()
+                        self._observe(args, started)
+                        return result
+                    finally:
+                        self._measure(args, started)
+            except (QueueFullError, QueueTimeoutError) as e:
+                raise self._overloaded(e)
+            finally:
+                # Shed, cancelled or failed locally: nothing was learned
+                # about the upstream, but a half-open probe must be freed
+                if not settled:
+                    self._release_circuit()
+
+    async def _dispatch(
+        self, args: list[str], input_data: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Run nlm command on a persistent worker, or in a one-shot process.
+
+        Commands starting with global flags always run one-shot: workers
+        share one configuration for every request.
+
+        Args:
+            args: Command arguments
+            input_data: Optional stdin input
+
+        Returns:
+            Tuple of (stdout, stderr)
+
+        Raises:
+            NLMTimeoutError: If the command does not finish in time
+            NLMError: If command fails
+        """
+        if self.worker_pool is not None and not args[0].startswith("-"):
+            try:
+                with self.tracer.start_as_current_span("nlm.worker"):
+                    returncode, stdout, stderr = await self.worker_pool.run(
+                        args, input_data, self._timeout(args)
+                    )
+            except WorkerUnavailableError:
+                pass  # Request was never sent; fall back to a one-shot process
+            except WorkerTimeoutError:
+                raise self._timed_out(args, self._timeout(args))
+            except WorkerCrashedError as e:
+                raise NLMError(str(e))
+            else:
+                self._exited(args, returncode)
+                return self._check_result(returncode, stdout, stderr)
+
+        return await self._run_process(args, input_data)
+
+    async def _run_process(
+        self, args: list[str], input_data: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Run nlm command in a subprocess and return stdout, stderr.
+
+        The process is killed if the timeout expires or the awaiting task is
+        cancelled, so abandoned requests never leave orphaned nlm processes.
+
+        Args:
+            args: Command arguments
+            input_data: Optional stdin input
+
+        Returns:
+            Tuple of (stdout, stderr)
+
+        Raises:
+            NLMError: If command fails
+        """
+        process = await self._spawn(
+            args,
+            stdin=(
+                asyncio.subprocess.PIPE
+                if input_data is not None
+                else asyncio.subprocess.DEVNULL
+            ),
+        )
+
+        timeout = self._timeout(args)
+        try:
+            with self.tracer.start_as_current_span("nlm.process") as span:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(
+                        input_data.encode() if input_data is not None else None
+                    ),
+                    timeout=timeout,
+                )
+                span.set_attribute("nlm.stdout_bytes", len(stdout))
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise self._timed_out(args, timeout)
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+        finally:
+            self._reaped()
+
+        # communicate() has reaped the process, so this returns at once
+        returncode = await process.wait()
+        self._exited(args, returncode)
+        return self._check_result(
+            returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+
+    async def _spawn(self, args: list[str], stdin: int) -> asyncio.subprocess.Process:
+        """
+        Start a one-shot nlm process, counting it as in flight until _reaped().
+
+        Args:
+            args: Command arguments
+            stdin: How the process's stdin is connected
+
+        Returns:
+            The running process
+
+        Raises:
+            NLMError: If the nlm binary does not exist
+        """
+        started = time.monotonic()
+        try:
+            with self.tracer.start_as_current_span("nlm.spawn"):
+                process = await asyncio.create_subprocess_exec(
+                    self.nlm_path,
+                    *args,
+                    stdin=stdin,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=self._command_env(),
+                )
+        except FileNotFoundError:
+            raise NLMError(f"nlm binary not found at: {self.nlm_path}")
+        if self.metrics is not None:
+            self.metrics.spawn_seconds.observe(time.monotonic() - started)
+            self.metrics.in_flight.inc()
+        return process
+
+    def _reaped(self) -> None:
+        """Stop counting a one-shot process as in flight."""
+        if self.metrics is not None:
+            self.metrics.in_flight.dec()
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> int:
+        """Kill a running nlm process and reap it, returning its exit code."""
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        return await process.wait()
+
+    async def _stream_command(self, args: list[str]) -> AsyncIterator[str]:
+        """
+        Run nlm command once the limiter admits it, yielding stdout as it arrives.
+
+        Streaming always uses a one-shot process: the worker protocol returns
+        a command's output in a single response. The limiter slot is held
+        until the stream is exhausted or closed. Only the process spawn is
+        traced, since a span cannot stay current across a generator's yields.
+
+        A stream the consumer closes early still reports to the circuit
+        breaker: as a success once output arrived, otherwise by releasing its
+        admission, so an abandoned half-open probe does not hold traffic back.
+
+        Args:
+            args: Command arguments
+
+        Yields:
+            Decoded stdout chunks
+
+        Raises:
+            NLMOverloadedError: If the command was rejected or queued too long,
+                or the circuit breaker is open
+            NLMError: If command fails
+        """
+        self._check_circuit()
+        failure: Optional[NLMError] = None
+        answered = False
+        try:
+            async with self._admission(args):
+                started = time.monotonic()
+                try:
+                    async with aclosing(self._stream_process(args)) as chunks:
+                        async for chunk in chunks:
+                            answered = True
+                            yield chunk
+                except NLMError as e:
+                    failure = e
+                    raise
+                else:
+                    answered = True
+                    self._observe(args, started)
+                finally:
+                    self._measure(args, started)
+        except (QueueFullError, QueueTimeoutError) as e:
+            raise self._overloaded(e)
+        finally:
+            if failure is not None or answered:
+                self._record_outcome(failure)
+            else:
+                self._release_circuit()
+
+    async def _stream_process(self, args: list[str]) -> AsyncGenerator[str, None]:
+        """
+        Run nlm command in a subprocess and yield stdout chunks.
+
+        The process is killed if the timeout expires or the consumer stops
+        iterating early. Errors reported on exit are raised after the output
+        produced so far has been yielded.
+
+        Args:
+            args: Command arguments
+
+        Yields:
+            Decoded stdout chunks
+
+        Raises:
+            NLMError: If command fails
+        """
+        process = await self._spawn(args, stdin=asyncio.subprocess.DEVNULL)
+        # _spawn always pipes both output streams
+        stdout = cast(asyncio.StreamReader, process.stdout)
+        stderr_pipe = cast(asyncio.StreamReader, process.stderr)
+
+        loop = asyncio.get_running_loop()
+        timeout = self._timeout(args)
+        deadline = loop.time() + timeout
+        stderr_task = asyncio.ensure_future(stderr_pipe.read())
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # End of the output, reported in the error if the command fails
+        output = ""
+        try:
+            while True:
+                chunk = await asyncio.wait_for(
+                    stdout.read(STREAM_CHUNK_SIZE),
+                    timeout=max(deadline - loop.time(), 0),
+                )
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    output = (output + text)[-STREAM_CHUNK_SIZE:]
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                output = (output + tail)[-STREAM_CHUNK_SIZE:]
+                yield tail
+            stderr = await asyncio.wait_for(
+                stderr_task, timeout=max(deadline - loop.time(), 0)
+            )
+            await process.wait()
+        except asyncio.TimeoutError:
+            raise self._timed_out(args, timeout)
+        finally:
+            stderr_task.cancel()
+            # Counted even when killed early, e.g. after the consumer left
+            returncode = await self._kill(process)
+            self._reaped()
+            self._exited(args, returncode)
+
+        self._check_result(returncode, output, stderr.decode(errors="replace"))
+
+    async def _read_json(
+        self,
+        args: list[str],
+        notebook_id: Optional[str] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        Run a read-only command and parse its JSON output, using the cache.
+
+        Concurrent callers with identical arguments share one subprocess and
+        one decoded result.
+
+        Args:
+            args: Command arguments
+            notebook_id: Notebook the output belongs to, None if account-wide
+            decode: Converts parsed JSON into records before it is cached
+
+        Returns:
+            Parsed JSON data, or its decoded form
+        """
+        key = tuple(args)
+        result = self._cached(key)
+        if result is MISSING:
+            result = await self.single_flight.do(
+                key, lambda: self._fetch_json(args, notebook_id, decode)
+            )
+        return result
+
+    async def _run_read(self, args: list[str]) -> str:
+        """
+        Run a read-only command, retrying transient upstream errors.
+
+        Args:
+            args: Command arguments
+
+        Returns:
+            Command stdout
+
+        Raises:
+            NLMError: If every allowed try failed
+        """
+        policy = self.retry_policy
+        if policy is not None:
+            policy.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                stdout, _ = await self._run_command(args)
+                return stdout
+            except NLMError as e:
+                if policy is None or not self._retryable(e, attempt):
+                    raise
+            await asyncio.sleep(policy.delay(attempt))
+
+    async def _fetch_json(
+        self,
+        args: list[str],
+        notebook_id: Optional[str],
+        decode: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """Run a read-only command, parse and decode its output and cache it."""
+        # Taken first, so a write landing while the command runs is noticed
+        generation = self._generation(notebook_id)
+        stdout = await self._run_read(args)
+        started = time.monotonic()
+        with self.tracer.start_as_current_span(
+            "nlm.parse", attributes={"nlm.command": args[0]}
+        ):
+            result = self._parse_json_output(stdout)
+            if decode is not None:
+                result = decode(result)
+        if self.metrics is not None:
+            self.metrics.parse_seconds.observe(time.monotonic() - started, args[0])
+        self._store(tuple(args), result, notebook_id, generation)
+        return result
+
+    # Notebook operations
+
+    async def list_notebooks(self) -> list[Notebook]:
+        """
+        List all notebooks.
+
+        Returns:
+            List of notebooks
+        """
+        generation = self.notebook_index.generation
+        result = await self._read_json(
+            ["list", "--json"], decode=partial(decode_list, Notebook)
+        )
+        self.notebook_index.replace(result, generation)
+        return list(result)
+
+    async def create_notebook(
+        self, title: str, emoji: Optional[str] = None
+    ) -> Optional[Notebook]:
+        """
+        Create a new notebook.
+
+        Args:
+            title: Notebook title
+            emoji: Optional emoji
+
+        Returns:
+            Created notebook, or None if the CLI printed no JSON for it
+        """
+        args = ["create", title]
+        if emoji:
+            args.extend(["--emoji", emoji])
+
+        stdout, _ = await self._run_command(args)
+        self.notebook_index.invalidate()
+        self._invalidate()
+        return self._record(Notebook, self._parse_json_output(stdout))
+
+    async def delete_notebook(self, notebook_id: str) -> bool:
+        """
+        Delete a notebook.
+
+        Args:
+            notebook_id: Notebook ID to delete
+
+        Returns:
+            True if successful
+
+        Raises:
+            NotebookNotFoundError: If notebook not found
+        """
+        await self._run_command(["rm", notebook_id])
+        self.notebook_index.discard(notebook_id)
+        self._invalidate(notebook_id)
+        return True
+
+    async def search_notebooks(
+        self,
+        query: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[Notebook], Optional[str]]:
+        """
+        List one page of notebooks, optionally filtered and sorted.
+
+        Pages are served from the notebook index, which keeps each sort
+        order of the current listing, so only the listing itself is fetched.
+
+        Args:
+            query: Case-insensitive substring to match in titles
+            sort: title, created or modified, prefixed with ``-`` for
+                descending order; None keeps the CLI's order
+            limit: Maximum notebooks to return, None for all
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple of (notebooks, cursor for the next page or None)
+
+        Raises:
+            ValueError: If sort is unknown or cursor is invalid
+        """
+        await self.list_notebooks()
+        return self.notebook_index.page(query, sort, limit, cursor)
+
+    async def get_notebook(self, notebook_id: str) -> Notebook:
+        """
+        Get notebook details.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Notebook data
+        """
+        # Note: nlm CLI doesn't have a direct "get" command, so lookups are
+        # served from the notebook index and only a miss lists everything
+        notebook = self.notebook_index.get(notebook_id)
+        if notebook is None:
+            if self.cache is not None:
+                self.cache.discard(("list", "--json"))
+            notebooks = await self.list_notebooks()
+            notebook = next(
+                (nb for nb in notebooks if nb.project_id == notebook_id),
+                None,
+            )
+        if notebook is None:
+            raise NotebookNotFoundError(f"Notebook {notebook_id} not found")
+        return notebook
+
+    # Source operations
+
+    async def list_sources(self, notebook_id: str) -> list[Source]:
+        """
+        List sources in a notebook.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            List of sources
+        """
+        result = await self._read_json(
+            ["sources", notebook_id, "--json"],
+            notebook_id,
+            decode=partial(decode_list, Source),
+        )
+        return list(result)
+
+    async def add_source(
+        self,
+        notebook_id: str,
+        source_input: str,
+        source_type: str = "url",
+        mime_type: Optional[str] = None,
+    ) -> Optional[Source]:
+        """
+        Add a source to a notebook.
+
+        Args:
+            notebook_id: Notebook ID
+            source_input: URL, file path, or text content
+            source_type: Type of source ("url", "file", "text")
+            mime_type: Optional MIME type
+
+        Returns:
+            Created source, or None if the CLI printed no JSON for it
+        """
+        args = ["add", notebook_id]
+
+        if source_type == "text":
+            args.append("-")
+            stdout, _ = await self._run_command(args, input_data=source_input)
+        else:
+            args.append(source_input)
+            if mime_type:
+                args.extend(["--mime", mime_type])
+            stdout, _ = await self._run_command(args)
+
+        self._invalidate(notebook_id)
+        return self._record(Source, self._parse_json_output(stdout))
+
+    async def delete_source(self, notebook_id: str, source_id: str) -> bool:
+        """
+        Delete a source.
+
+        Args:
+            notebook_id: Notebook ID
+            source_id: Source ID
+
+        Returns:
+            True if successful
+        """
+        await self._run_command(["rm-source", notebook_id, source_id])
+        self._invalidate(notebook_id)
+        return True
+
+    async def add_sources_bulk(
+        self,
+        notebook_id: str,
+        items: Iterable[Union[SourceItem, str]],
+        concurrency: Optional[int] = None,
+        retries: int = 2,
+        retry_delay: float = 0.5,
+        progress: Optional[Callable[[SourceResult], None]] = None,
+    ) -> list[SourceResult]:
+        """
+        Add many sources to a notebook with bounded parallelism.
+
+        Each item is one ``nlm add``; failures are reported per item and
+        transient ones retried with exponential backoff.
+
+        Args:
+            notebook_id: Notebook ID
+            items: Sources to add; plain strings are URLs
+            concurrency: Items in flight at once, capped at the limiter's
+                per-notebook limit
+            retries: Extra attempts for transient failures
+            retry_delay: Seconds before the first retry, doubled after each
+            progress: Called with each item's result as it finishes
+
+        Returns:
+            One result per item, in input order
+
+        Raises:
+            NotebookNotFoundError: If the notebook does not exist
+        """
+        return await add_all_async(
+            lambda item: self.add_source(
+                notebook_id, item.source_input, item.source_type, item.mime_type
+            ),
+            as_items(items),
+            concurrency=self._bulk_concurrency(concurrency),
+            retries=retries,
+            retry_delay=retry_delay,
+            transient=self._transient,
+            abort_on=(NotebookNotFoundError,),
+            progress=progress,
+        )
+
+    async def rename_source(self, source_id: str, new_name: str) -> bool:
+        """
+        Rename a source.
+
+        Args:
+            source_id: Source ID
+            new_name: New source name
+
+        Returns:
+            True if successful
+        """
+        await self._run_command(["rename-source", source_id, new_name])
+        self._clear_cache()
+        return True
+
+    # Content generation
+
+    async def generate_guide(self, notebook_id: str) -> str:
+        """
+        Generate study guide.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Generated guide content
+        """
+        stdout, _ = await self._run_command(["generate-guide", notebook_id])
+        return stdout
+
+    async def generate_outline(self, notebook_id: str) -> str:
+        """
+        Generate content outline.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Generated outline content
+        """
+        stdout, _ = await self._run_command(["generate-outline", notebook_id])
+        return stdout
+
+    async def generate_faq(self, notebook_id: str) -> str:
+        """
+        Generate FAQ.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Generated FAQ content
+        """
+        stdout, _ = await self._run_command(["faq", notebook_id])
+        return stdout
+
+    async def generate_glossary(self, notebook_id: str) -> str:
+        """
+        Generate glossary.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Generated glossary content
+        """
+        stdout, _ = await self._run_command(["glossary", notebook_id])
+        return stdout
+
+    def stream_guide(self, notebook_id: str) -> AsyncIterator[str]:
+        """
+        Generate study guide, yielding content as it is produced.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Async iterator of guide content chunks
+        """
+        return self._stream_command(["generate-guide", notebook_id])
+
+    def stream_outline(self, notebook_id: str) -> AsyncIterator[str]:
+        """
+        Generate content outline, yielding content as it is produced.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Async iterator of outline content chunks
+        """
+        return self._stream_command(["generate-outline", notebook_id])
+
+    def stream_faq(self, notebook_id: str) -> AsyncIterator[str]:
+        """
+        Generate FAQ, yielding content as it is produced.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Async iterator of FAQ content chunks
+        """
+        return self._stream_command(["faq", notebook_id])
+
+    def stream_glossary(self, notebook_id: str) -> AsyncIterator[str]:
+        """
+        Generate glossary, yielding content as it is produced.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Async iterator of glossary content chunks
+        """
+        return self._stream_command(["glossary", notebook_id])
+
+    # Audio operations
+
+    async def create_audio(self, notebook_id: str, instructions: str) -> Optional[Audio]:
+        """
+        Create audio overview.
+
+        Args:
+            notebook_id: Notebook ID
+            instructions: Generation instructions
+
+        Returns:
+            Audio overview, or None if the CLI printed no JSON for it
+        """
+        stdout, _ = await self._run_command(["audio-create", notebook_id, instructions])
+        self._invalidate(notebook_id)
+        return self._record(Audio, self._parse_json_output(stdout))
+
+    async def get_audio(self, notebook_id: str) -> Optional[Audio]:
+        """
+        Get audio overview.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Audio overview, pending while it is still being generated, or None
+            if the CLI printed JSON other than an overview
+        """
+        return await self._read_json(
+            ["audio-get", notebook_id], notebook_id, decode=self._audio
+        )
+
+    async def poll_audio(self, notebook_id: str) -> Optional[Audio]:
+        """
+        Check whether audio generation has finished, bypassing the cache.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Ready audio overview, or None while it is still being generated
+        """
+        stdout, _ = await self._run_command(["audio-get", notebook_id])
+        audio = self._ready_audio(stdout)
+        if audio is not None:
+            self._invalidate(notebook_id)
+        return audio
+
+    async def list_audio(self, notebook_id: str) -> list[Audio]:
+        """
+        List audio overviews.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            List of audio overviews
+        """
+        result = await self._read_json(
+            ["audio-list", notebook_id, "--json"],
+            notebook_id,
+            decode=partial(decode_list, Audio),
+        )
+        return list(result)
+
+    async def delete_audio(self, notebook_id: str) -> bool:
+        """
+        Delete audio overview.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            True if successful
+        """
+        await self._run_command(["audio-rm", notebook_id])
+        self._invalidate(notebook_id)
+        return True
+
+    # Video operations
+
+    async def create_video(self, notebook_id: str, instructions: str) -> bool:
+        """
+        Start generating a video overview.
+
+        Args:
+            notebook_id: Notebook ID
+            instructions: Generation instructions
+
+        Returns:
+            True once generation has started
+        """
+        await self._run_command(["video-create", notebook_id, instructions])
+        self._invalidate(notebook_id)
+        return True
+
+    # Media downloads
+
+    async def download_media(self, notebook_id: str, kind: str, path: str) -> None:
+        """
+        Download an audio or video overview to a file.
+
+        The CLI only downloads over direct RPC, so this always runs in a
+        one-shot ``nlm --direct-rpc`` process.
+
+        Args:
+            notebook_id: Notebook ID
+            kind: "audio" or "video"
+            path: File to write
+
+        Raises:
+            ValueError: If kind is unknown
+            NLMError: If the notebook has no such overview or the download fails
+        """
+        if kind not in MEDIA_SUFFIXES:
+            raise ValueError(f"Unknown media kind {kind!r}")
+        await self._run_command(["--direct-rpc", f"{kind}-download", notebook_id, path])
+
+    # Note operations
+
+    async def list_notes(self, notebook_id: str) -> list[Note]:
+        """
+        List notes in a notebook.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            List of notes
+        """
+        result = await self._read_json(
+            ["notes", notebook_id, "--json"],
+            notebook_id,
+            decode=partial(decode_list, Note),
+        )
+        return list(result)
+
+    async def create_note(self, notebook_id: str, title: str) -> Optional[Note]:
+        """
+        Create a new note.
+
+        Args:
+            notebook_id: Notebook ID
+            title: Note title
+
+        Returns:
+            Created note, or None if the CLI printed no JSON for it
+        """
+        stdout, _ = await self._run_command(["new-note", notebook_id, title])
+        self._invalidate(notebook_id)
+        return self._record(Note, self._parse_json_output(stdout))
+
+    async def update_note(
+        self, notebook_id: str, note_id: str, content: str, title: str
+    ) -> bool:
+        """
+        Update a note.
+
+        Args:
+            notebook_id: Notebook ID
+            note_id: Note ID
+            content: Note content
+            title: Note title
+
+        Returns:
+            True if successful
+        """
+        await self._run_command(["update-note", notebook_id, note_id, content, title])
+        self._invalidate(notebook_id)
+        return True
+
+    async def delete_note(self, note_id: str) -> bool:
+        """
+        Delete a note.
+
+        Args:
+            note_id: Note ID
+
+        Returns:
+            True if successful
+        """
+        await self._run_command(["rm-note", note_id])
+        self._clear_cache()
+        return True
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def _blocking(
+    method: Callable[Concatenate[AsyncNLMClient, P], Coroutine[Any, Any, R]],
+) -> Callable[Concatenate["NLMClient", P], R]:
+    """Blocking flavour of an AsyncNLMClient method, for NLMClient."""
+
+    @wraps(method)
+    def call(self: "NLMClient", *args: P.args, **kwargs: P.kwargs) -> R:
+        return self._wait(method(self.client, *args, **kwargs))
+
+    return call
+
+
+class NLMClient:
+    """
+    Blocking client for scripts and benchmarks, running an AsyncNLMClient.
+
+    Calls run on the async client in an event loop thread of its own, so both
+    clients share one implementation, and callers in several threads share
+    its cache, single-flight group, limiter and worker pool. Streaming is
+    only available on the async client.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """
+        Initialize NLM client.
+
+        Accepts the same arguments as AsyncNLMClient.
+        """
+        self.client = AsyncNLMClient(*args, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="nlm-client", daemon=True
+        )
+        self._thread.start()
+
+    def __getattr__(self, name: str) -> Any:
+        """Read settings and state such as ``cache`` from the async client."""
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _wait(self, coroutine: Coroutine[Any, Any, R]) -> R:
+        """Run a coroutine on the client's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self) -> None:
+        """Stop the client's persistent workers and its event loop thread."""
+        if self._loop.is_closed():
+            return
+        if self.client.worker_pool is not None:
+            self._wait(self.client.worker_pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    list_notebooks = _blocking(AsyncNLMClient.list_notebooks)
+    create_notebook = _blocking(AsyncNLMClient.create_notebook)
+    delete_notebook = _blocking(AsyncNLMClient.delete_notebook)
+    search_notebooks = _blocking(AsyncNLMClient.search_notebooks)
+    get_notebook = _blocking(AsyncNLMClient.get_notebook)
+
+    list_sources = _blocking(AsyncNLMClient.list_sources)
+    add_source = _blocking(AsyncNLMClient.add_source)
+    delete_source = _blocking(AsyncNLMClient.delete_source)
+    add_sources_bulk = _blocking(AsyncNLMClient.add_sources_bulk)
+    rename_source = _blocking(AsyncNLMClient.rename_source)
+
+    generate_guide = _blocking(AsyncNLMClient.generate_guide)
+    generate_outline = _blocking(AsyncNLMClient.generate_outline)
+    generate_faq = _blocking(AsyncNLMClient.generate_faq)
+    generate_glossary = _blocking(AsyncNLMClient.generate_glossary)
+
+    create_audio = _blocking(AsyncNLMClient.create_audio)
+    get_audio = _blocking(AsyncNLMClient.get_audio)
+    poll_audio = _blocking(AsyncNLMClient.poll_audio)
+    list_audio = _blocking(AsyncNLMClient.list_audio)
+    delete_audio = _blocking(AsyncNLMClient.delete_audio)
+
+    create_video = _blocking(AsyncNLMClient.create_video)
+    download_media = _blocking(AsyncNLMClient.download_media)
+
+    list_notes = _blocking(AsyncNLMClient.list_notes)
+    create_note = _blocking(AsyncNLMClient.create_note)
+    update_note = _blocking(AsyncNLMClient.update_note)
+    delete_note = _blocking(AsyncNLMClient.delete_note)
@@ -0,0 +1,218 @@
+"""In-memory notebook index for O(1) lookups by project ID.
+
+The index also serves paginated, filtered and sorted views of the listing.
+Each sort order is built once per listing and reused by later pages, and
+pages are addressed by keyset cursors, so a page costs a binary search plus
+the items it returns rather than a sort of the whole account.
+
+An index belongs to one client, so it only saves listings for clients that
+outlive a request, such as the per-process and per-user clients built by
+ClientRegistry; a client built per request starts with an empty index.
+"""
+import base64
+import bisect
+import json
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from nlm_web_core.records import Notebook
+
+# Sort key for each sortable field; project_id breaks ties so keys are unique
+SORT_KEYS: dict[str, Callable[[Notebook], tuple]] = {
+    "title": lambda nb: (nb.title.casefold(), nb.project_id),
+    "created": lambda nb: (nb.created_at or "", nb.project_id),
+    "modified": lambda nb: (nb.modified_at or "", nb.project_id),
+}
+
+
+def _encode_cursor(sort: str, key: tuple) -> str:
+    """Encode the position after a page as an opaque cursor."""
+    raw = json.dumps([sort, list(key)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Decode a cursor produced by _encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor_sort != sort or not isinstance(key, list):
+        raise ValueError("Cursor does not match the requested sort")
+    return tuple(key)
+
+
+class NotebookIndex:
+    """Notebooks keyed by ``project_id``, populated from list results.
+
+    Entries are served only while the last full listing is younger than
+    ``ttl`` seconds; after that every lookup misses until the next refresh.
+    """
+
+    def __init__(self, ttl: float = 60, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize notebook index.
+
+        Args:
+            ttl: Seconds a listing stays valid
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._notebooks: dict[str, Notebook] = {}
+        self._listing: Any = None
+        self._loaded_at: Optional[float] = None
+        # Bumped by every invalidate() and discard(); see replace()
+        self.generation = 0
+        # Sort field ("" for listing order) -> (keys, notebooks, folded titles)
+        self._orders: dict[str, tuple[list, list[Notebook], list[str]]] = {}
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the index holds a listing younger than the TTL."""
+        return (
+            self._loaded_at is not None
+            and self._clock() - self._loaded_at < self.ttl
+        )
+
+    def replace(
+        self, notebooks: Iterable[Notebook], generation: Optional[int] = None
+    ) -> None:
+        """
+        Replace the index contents with a full notebook listing.
+
+        Replacing with the listing already indexed (the same cached tuple)
+        is a no-op, so sorted views survive repeated cache hits.
+
+        Args:
+            notebooks: Notebooks from ``nlm list --json``
+            generation: ``generation`` read before the listing was fetched;
+                if a write invalidated the index since, the listing may
+                predate it and is ignored
+        """
+        if generation is not None and generation != self.generation:
+            return
+        if notebooks is self._listing and self._loaded_at is not None:
+            return
+        self._listing = notebooks
+        self._notebooks = {nb.project_id: nb for nb in notebooks}
+        self._orders.clear()
+        self._loaded_at = self._clock()
+
+    def get(self, project_id: str) -> Optional[Notebook]:
+        """
+        Look up a notebook.
+
+        Args:
+            project_id: Notebook ID
+
+        Returns:
+            Notebook data, or None if missing or the index is stale
+        """
+        if not self.is_fresh:
+            return None
+        return self._notebooks.get(project_id)
+
+    def discard(self, project_id: str) -> None:
+        """Remove a single notebook from the index."""
+        self.generation += 1
+        if self._notebooks.pop(project_id, None) is not None:
+            self._orders.clear()
+
+    def invalidate(self) -> None:
+        """Mark the index stale so the next lookup forces a refresh."""
+        self.generation += 1
+        self._loaded_at = None
+
+    def _order(self, field: str) -> tuple[list, list[Notebook], list[str]]:
+        """Return the notebooks sorted by field, building the order once."""
+        order = self._orders.get(field)
+        if order is None:
+            if field:
+                key = SORT_KEYS[field]
+                decorated = sorted(
+                    ((key(nb), nb) for nb in self._notebooks.values()),
+                    key=lambda pair: pair[0],
+                )
+            else:
+                decorated = [
+                    ((position,), nb)
+                    for position, nb in enumerate(self._notebooks.values())
+                ]
+            order = (
+                [key for key, _ in decorated],
+                [nb for _, nb in decorated],
+                [nb.title.casefold() for _, nb in decorated],
+            )
+            self._orders[field] = order
+        return order
+
+    def page(
+        self,
+        query: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[Notebook], Optional[str]]:
+        """
+        Return one page of the indexed listing.
+
+        Serves the current contents whether or not they are fresh; callers
+        refresh the listing first.
+
+        Args:
+            query: Case-insensitive substring to match in titles
+            sort: Field from SORT_KEYS, prefixed with ``-`` for descending
+                order; None keeps the listing order
+            limit: Maximum notebooks to return, None for all
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple of (notebooks, cursor for the next page or None)
+
+        Raises:
+            ValueError: If sort is unknown or cursor is invalid
+        """
+        sort = sort or ""
+        descending = sort.startswith("-")
+        field = sort[1:] if descending else sort
+        if field and field not in SORT_KEYS:
+            raise ValueError(f"Unknown sort field: {field}")
+
+        keys, notebooks, titles = self._order(field)
+        step = -1 if descending else 1
+        if cursor:
+            after = _decode_cursor(cursor, sort)
+            try:
+                position = (
+                    bisect.bisect_left(keys, after) - 1
+                    if descending
+                    else bisect.bisect_right(keys, after)
+                )
+            except TypeError as e:
+                raise ValueError("Invalid cursor") from e
+        else:
+            position = len(keys) - 1 if descending else 0
+
+        needle = query.casefold() if query else None
+        items: list[Notebook] = []
+        last = position
+        while 0 <= position < len(keys):
+            if needle is None or needle in titles[position]:
+                if limit is not None and len(items) >= limit:
+                    # Another match exists, so there is a next page
+                    return items, _encode_cursor(sort, keys[last])
+                items.append(notebooks[position])
+                last = position
+            position += step
+        return items, None
+
+    def __len__(self) -> int:
+        """Number of indexed notebooks."""
+        return len(self._notebooks)
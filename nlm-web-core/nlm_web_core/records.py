@@ -0,0 +1,127 @@
+"""Typed records decoded from ``nlm --json`` output.
+
+Records are frozen, slotted dataclasses holding only the fields the web
+apps use, so large listings take less memory in the response cache than
+the parsed JSON they come from and can be shared safely between callers.
+"""
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+def _flatten_id(value: Any) -> str:
+    """Return an ID that protojson may wrap as ``{"source_id": "..."}``."""
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None)
+    return "" if value is None else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class Notebook:
+    """A notebook as listed by ``nlm list``."""
+
+    project_id: str
+    title: str = ""
+    emoji: Optional[str] = None
+    source_count: int = 0
+    created_at: Optional[str] = None
+    modified_at: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Notebook":
+        """Decode a notebook object."""
+        metadata = data.get("metadata") or {}
+        return cls(
+            project_id=_flatten_id(data.get("project_id")),
+            title=data.get("title") or "",
+            emoji=data.get("emoji") or None,
+            source_count=len(data.get("sources") or ()),
+            created_at=metadata.get("create_time"),
+            modified_at=metadata.get("modified_time"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Source:
+    """A source in a notebook."""
+
+    source_id: str
+    title: str = ""
+    source_type: str = "SOURCE_TYPE_UNSPECIFIED"
+    added_at: Optional[str] = None
+    status: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Source":
+        """Decode a source object."""
+        metadata = data.get("metadata") or {}
+        return cls(
+            source_id=_flatten_id(data.get("source_id")),
+            title=data.get("title") or "",
+            # protojson omits enum fields holding their default value
+            source_type=str(metadata.get("source_type") or "SOURCE_TYPE_UNSPECIFIED"),
+            added_at=metadata.get("last_modified_time"),
+            status=metadata.get("status"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Note:
+    """A note in a notebook."""
+
+    note_id: str
+    title: str = ""
+    content: Optional[str] = None
+    created_at: Optional[str] = None
+    modified_at: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Note":
+        """Decode a note object; notes may be keyed like sources."""
+        metadata = data.get("metadata") or {}
+        return cls(
+            note_id=_flatten_id(data.get("note_id") or data.get("source_id")),
+            title=data.get("title") or "",
+            content=data.get("content"),
+            created_at=data.get("created_at") or metadata.get("create_time"),
+            modified_at=data.get("modified_at") or metadata.get("last_modified_time"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Audio:
+    """An audio overview of a notebook."""
+
+    audio_id: str
+    status: str = "pending"
+    duration: Optional[int] = None
+    url: Optional[str] = None
+    size_bytes: Optional[int] = None
+    instructions: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "Audio":
+        """Decode an audio overview object."""
+        return cls(
+            audio_id=_flatten_id(data.get("audio_id")),
+            status=data.get("status") or "pending",
+            duration=data.get("duration"),
+            url=data.get("url"),
+            size_bytes=data.get("size_bytes"),
+            instructions=data.get("instructions"),
+        )
+
+
+def decode_list(record_type: Any, data: Any) -> tuple:
+    """
+    Decode a JSON array into a tuple of records, skipping non-objects.
+
+    Args:
+        record_type: Record class with a ``from_json`` constructor
+        data: Parsed JSON output
+
+    Returns:
+        Tuple of records, empty if data is not a list
+    """
+    if not isinstance(data, list):
+        return ()
+    return tuple(record_type.from_json(item) for item in data if isinstance(item, dict))
@@ -0,0 +1,95 @@
+"""Retry policy for idempotent nlm reads: jittered backoff and a retry budget.
+
+NotebookLM answers bursts of load with rate-limit and 5xx errors. Retrying
+read commands hides most of them, but clients that retry in lockstep or
+without limit turn a burst into a storm. Delays are drawn with full jitter
+from an exponentially growing range, and retries are paid for from a budget
+that only refills as new requests arrive, so retries can never exceed a
+fixed fraction of traffic.
+"""
+import random
+import threading
+from typing import Callable
+
+
+class RetryPolicy:
+    """Backoff schedule and token-bucket retry budget, shareable between clients."""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        budget_ratio: float = 0.2,
+        budget_max: float = 10.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize retry policy.
+
+        Args:
+            attempts: Total tries per command, including the first
+            base_delay: Upper bound of the first retry's delay in seconds
+            max_delay: Cap on the delay range as it doubles
+            budget_ratio: Retry tokens earned per request (0.2 allows one
+                retry per five requests once the initial budget is spent)
+            budget_max: Most retry tokens that can be saved up, which is also
+                the initial budget
+            rng: Uniform [0, 1) source (injectable for tests)
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_max = budget_max
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._tokens = budget_max
+        self.retries = 0
+        self.exhausted = 0
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before a retry, with full jitter.
+
+        Args:
+            attempt: Number of tries made so far (1 before the first retry)
+
+        Returns:
+            Random delay between 0 and base_delay * 2 ** (attempt - 1), capped
+        """
+        return self._rng() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def record_request(self) -> None:
+        """Earn budget for a new request."""
+        with self._lock:
+            self._tokens = min(self.budget_max, self._tokens + self.budget_ratio)
+
+    def allow_retry(self, attempt: int) -> bool:
+        """
+        Decide whether a failed try may be retried, spending budget if so.
+
+        Args:
+            attempt: Number of tries made so far
+
+        Returns:
+            True if another try is allowed
+        """
+        if attempt >= self.attempts:
+            return False
+        with self._lock:
+            if self._tokens < 1:
+                self.exhausted += 1
+                return False
+            self._tokens -= 1
+            self.retries += 1
+            return True
+
+    def stats(self) -> dict[str, float]:
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "budget_exhausted": self.exhausted,
+                "budget": round(self._tokens, 2),
+            }
@@ -0,0 +1,117 @@
+"""Server-side sessions holding each user's NotebookLM credentials.
+
+Credentials never leave the server: the browser only holds a random session
+id (a cookie in the FastAPI app, NiceGUI's browser id in the NiceGUI app),
+which maps to the credentials in memory until the session has been idle for
+its maximum age. Sessions do not survive a restart; users sign in again.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class Credentials:
+    """One NotebookLM account's auth token and cookies."""
+
+    auth_token: str = field(repr=False)
+    cookies: str = field(repr=False)
+
+    @property
+    def key(self) -> str:
+        """Stable hash identifying the account without revealing its secrets."""
+        digest = hashlib.sha256(f"{self.auth_token}\0{self.cookies}".encode())
+        return digest.hexdigest()
+
+
+class SessionStore:
+    """In-memory map of session ids to credentials with sliding expiry."""
+
+    def __init__(
+        self,
+        max_age: float = 3600.0,
+        max_sessions: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize session store.
+
+        Args:
+            max_age: Seconds of inactivity after which a session expires
+            max_sessions: Sessions kept; the least recently used are dropped
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_age = max_age
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[str, tuple[float, Credentials]] = OrderedDict()
+
+    def create(self, credentials: Credentials) -> str:
+        """
+        Start a session.
+
+        Args:
+            credentials: The signed-in user's credentials
+
+        Returns:
+            New unguessable session id
+        """
+        session_id = secrets.token_urlsafe(32)
+        self.set(session_id, credentials)
+        return session_id
+
+    def set(self, session_id: str, credentials: Credentials) -> None:
+        """Store credentials under an existing id, e.g. a NiceGUI browser id."""
+        with self._lock:
+            self._sessions[session_id] = (self._clock(), credentials)
+            self._sessions.move_to_end(session_id)
+            self._expire()
+
+    def get(self, session_id: Optional[str]) -> Optional[Credentials]:
+        """
+        Look up a session's credentials and extend its lifetime.
+
+        Args:
+            session_id: Session id, or None if the request has none
+
+        Returns:
+            Credentials, or None if the session is unknown or expired
+        """
+        if not session_id:
+            return None
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            now = self._clock()
+            if now - entry[0] > self.max_age:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def delete(self, session_id: Optional[str]) -> None:
+        """End a session, e.g. on logout."""
+        if not session_id:
+            return
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire(self) -> None:
+        """Drop expired and surplus sessions, oldest first; the lock must be held."""
+        now = self._clock()
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_used <= self.max_age:
+                break
+            del self._sessions[session_id]
@@ -0,0 +1,74 @@
+"""Settings shared by the web applications.
+
+Each application's ``Settings`` extends NLMSettings with its own options, so
+the nlm options are declared once and read from the same environment
+variables by every front end.
+"""
+from pydantic_settings import BaseSettings
+from typing import Literal
+
+
+class NLMSettings(BaseSettings):
+    """Settings of the nlm client, its caches, limits and background work."""
+
+    # NLM Configuration
+    nlm_auth_token: str = ""
+    nlm_cookies: str = ""
+    nlm_browser_profile: str = "Default"
+    nlm_path: str = "nlm"
+
+    # Performance Configuration
+    nlm_notebook_index_ttl: float = 60.0
+    nlm_cache_enabled: bool = True
+    nlm_cache_max_entries: int = 256
+    nlm_cache_ttls: dict[str, float] = {}
+    nlm_worker_pool_size: int = 2
+    nlm_worker_start_timeout: float = 10.0
+    nlm_max_concurrent: int = 8
+    nlm_max_per_notebook: int = 2
+    nlm_max_queue: int = 32
+    nlm_queue_timeout: float = 10.0
+    nlm_timeout: float = 60.0
+    nlm_timeouts: dict[str, float] = {}
+    nlm_timeout_adaptive: bool = False
+    nlm_timeout_min: float = 5.0
+    nlm_retry_attempts: int = 3
+    nlm_retry_base_delay: float = 0.2
+    nlm_retry_max_delay: float = 5.0
+    nlm_retry_budget: float = 0.2
+    nlm_breaker_enabled: bool = True
+    nlm_breaker_failure_rate: float = 0.5
+    nlm_breaker_min_calls: int = 10
+    nlm_breaker_reset_timeout: float = 30.0
+    nlm_metrics_enabled: bool = False
+    nlm_tracing: Literal["off", "local", "otel"] = "off"
+
+    # Per-User Session Configuration (users signing in with their own credentials)
+    nlm_require_login: bool = False
+    nlm_user_idle_timeout: float = 1800.0
+    nlm_max_users: int = 64
+    nlm_user_worker_pool_size: int = 0
+
+    # Background Job Configuration
+    nlm_job_store: str = "nlm-jobs.db"
+    nlm_job_workers: int = 2
+    nlm_job_poll_interval: float = 5.0
+    nlm_job_poll_max_interval: float = 60.0
+    nlm_job_poll_timeout: float = 1800.0
+
+    # Media Cache Configuration (downloaded audio/video overviews)
+    nlm_media_dir: str = "media-cache"
+    nlm_media_cache_mb: int = 512
+    nlm_media_max_age: float = 3600.0
+
+    # Demo Configuration (used when no credentials are set)
+    nlm_demo_notebooks: int = 0
+    nlm_demo_latency: float = 0.0
+    nlm_demo_error_rate: float = 0.0
+
+    # Session Configuration
+    session_max_age: int = 3600
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
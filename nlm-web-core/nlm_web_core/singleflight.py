@@ -0,0 +1,67 @@
+"""Single-flight deduplication of concurrent identical calls."""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent identical coroutine calls on one event loop.
+
+    The shared work runs as its own task, so one caller being cancelled does
+    not cancel the others; the task is only cancelled once every caller
+    waiting on it has gone away.
+    """
+
+    def __init__(self):
+        """Initialize single-flight group."""
+        self._inflight: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all concurrent callers sharing key.
+
+        Args:
+            key: Deduplication key
+            fn: Coroutine function producing the shared result
+
+        Returns:
+            Result of fn
+        """
+        self.calls += 1
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: "_Flight") -> None:
+        """Remove a finished call so the next caller starts fresh."""
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark exceptions as retrieved when every waiter was cancelled
+            flight.task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Return call and coalesced counters."""
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+
+class _Flight:
+    """In-flight task shared by coalesced coroutine callers."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
@@ -0,0 +1,142 @@
+"""Per-command timeouts for nlm subcommands.
+
+A single timeout either kills slow generation commands too early or leaves
+a hung ``nlm list`` blocking a request for a full minute. TimeoutPolicy
+gives each subcommand its own limit and can optionally tighten it from the
+latencies the command has actually shown, so a stuck process is given up
+on soon after it is clearly slower than usual.
+"""
+import math
+import threading
+from collections import deque
+from typing import Optional
+
+# Default seconds each subcommand may run before it is killed
+DEFAULT_TIMEOUTS: dict[str, float] = {
+    "list": 20.0,
+    "sources": 20.0,
+    "notes": 20.0,
+    "audio-list": 20.0,
+    "audio-get": 20.0,
+    "video-list": 20.0,
+    "add": 120.0,
+    "generate-guide": 300.0,
+    "generate-outline": 300.0,
+    "faq": 300.0,
+    "glossary": 300.0,
+    "audio-create": 120.0,
+    "video-create": 120.0,
+    "audio-download": 600.0,
+    "video-download": 600.0,
+}
+
+
+class TimeoutPolicy:
+    """Per-subcommand timeouts, optionally adapted to observed latency.
+
+    Configured timeouts are upper bounds. In adaptive mode, once a
+    subcommand has completed ``min_samples`` times its timeout becomes
+    ``multiplier`` times the ``percentile`` of its recent latencies, never
+    below ``min_timeout`` and never above the configured value.
+    """
+
+    def __init__(
+        self,
+        timeouts: Optional[dict[str, float]] = None,
+        default: float = 60.0,
+        adaptive: bool = False,
+        percentile: float = 0.99,
+        multiplier: float = 3.0,
+        min_timeout: float = 5.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        """
+        Initialize timeout policy.
+
+        Args:
+            timeouts: Per-subcommand timeout overrides in seconds
+            default: Timeout for subcommands without an explicit entry
+            adaptive: Tighten timeouts from observed latencies
+            percentile: Latency percentile the adaptive timeout is based on
+            multiplier: Headroom applied to that percentile
+            min_timeout: Lowest timeout adaptation may set
+            min_samples: Completed runs needed before a subcommand adapts
+            window: Most recent latencies kept per subcommand
+        """
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.default = default
+        self.adaptive = adaptive
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+
+    def configured(self, command: str) -> float:
+        """Configured upper bound for a subcommand."""
+        return self.timeouts.get(command, self.default)
+
+    def timeout(self, command: str) -> float:
+        """
+        Seconds a subcommand may run before it is killed.
+
+        Args:
+            command: nlm subcommand, e.g. "list"
+
+        Returns:
+            Timeout in seconds
+        """
+        limit = self.configured(command)
+        if not self.adaptive:
+            return limit
+        observed = self._percentile(command)
+        if observed is None:
+            return limit
+        return min(limit, max(self.min_timeout, observed * self.multiplier))
+
+    def observe(self, command: str, seconds: float) -> None:
+        """
+        Record how long a completed run of a subcommand took.
+
+        Runs that timed out should not be recorded: their real duration is
+        unknown.
+
+        Args:
+            command: nlm subcommand
+            seconds: Wall-clock duration of the run
+        """
+        if not self.adaptive:
+            return
+        with self._lock:
+            samples = self._samples.get(command)
+            if samples is None:
+                samples = self._samples[command] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Current timeout and observed latency per subcommand, for monitoring."""
+        with self._lock:
+            commands = sorted(self._samples)
+        return {
+            command: {
+                "timeout": self.timeout(command),
+                "p99": self._percentile(command, 0.99) or 0.0,
+                "samples": len(self._samples[command]),
+            }
+            for command in commands
+        }
+
+    def _percentile(
+        self, command: str, percentile: Optional[float] = None
+    ) -> Optional[float]:
+        """Nearest-rank percentile of recent latencies, None if too few."""
+        with self._lock:
+            samples = self._samples.get(command)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        rank = math.ceil((percentile or self.percentile) * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
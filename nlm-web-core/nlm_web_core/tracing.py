@@ -0,0 +1,263 @@
+"""Tracing hooks for nlm commands and request ids for HTTP requests.
+
+Clients open spans through any object with OpenTelemetry's
+``start_as_current_span(name, attributes=...)`` method, so an OpenTelemetry
+tracer can be passed in directly. The default NoopTracer does nothing, and
+RecordingTracer keeps recent spans in memory to print per-request latency
+breakdowns locally without a collector.
+
+Each HTTP request gets an id, taken from its ``X-Request-ID`` header or
+generated, which is stored in a context variable so spans opened while
+handling the request (including in tasks it starts) can be tagged with it.
+"""
+import contextvars
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Protocol
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from opentelemetry import trace as otel_trace  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+
+def current_request_id() -> Optional[str]:
+    """Id of the request being handled, None outside a request."""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag everything run inside the block with a request id.
+
+    Args:
+        request_id: Id to use (default: a new random id)
+
+    Yields:
+        The request id
+    """
+    request_id = request_id or uuid.uuid4().hex
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+class Tracer(Protocol):
+    """What clients need from a tracer; satisfied by OpenTelemetry tracers."""
+
+    def start_as_current_span(
+        self, name: str, attributes: Optional[dict[str, Any]] = None
+    ) -> Any: ...
+
+
+class _NoopSpan:
+    """Span that records nothing."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer:
+    """Default tracer: every span is the same do-nothing object."""
+
+    def start_as_current_span(
+        self, name: str, attributes: Optional[dict[str, Any]] = None
+    ) -> _NoopSpan:
+        return _NOOP_SPAN
+
+
+@dataclass
+class Span:
+    """A finished or running span kept by RecordingTracer."""
+
+    name: str
+    start: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+    parent: Optional["Span"] = None
+    request_id: Optional[str] = None
+    end: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds the span lasted, so far if still running."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def depth(self) -> int:
+        """Number of ancestors."""
+        depth, parent = 0, self.parent
+        while parent is not None:
+            depth, parent = depth + 1, parent.parent
+        return depth
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value attribute."""
+        self.attributes[key] = value
+
+
+class RecordingTracer:
+    """Keeps the most recent spans in memory for local latency breakdowns."""
+
+    def __init__(self, max_spans: int = 10_000):
+        """
+        Initialize tracer.
+
+        Args:
+            max_spans: Spans kept; the oldest are dropped first
+        """
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+            "current_span", default=None
+        )
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, attributes: Optional[dict[str, Any]] = None
+    ) -> Iterator[Span]:
+        """
+        Record a span around the block, nested under the current one.
+
+        Args:
+            name: Span name, e.g. "nlm.spawn"
+            attributes: Initial attributes
+
+        Yields:
+            The span, for adding attributes
+        """
+        span = Span(
+            name,
+            time.perf_counter(),
+            dict(attributes or {}),
+            parent=self._current.get(),
+            request_id=current_request_id(),
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._current.reset(token)
+            with self._lock:
+                self._spans.append(span)
+
+    def spans(self, request_id: Optional[str] = None) -> list[Span]:
+        """
+        Recorded spans, in start order.
+
+        Args:
+            request_id: Only spans opened while handling this request
+
+        Returns:
+            Matching finished spans
+        """
+        with self._lock:
+            spans = list(self._spans)
+        if request_id is not None:
+            spans = [span for span in spans if span.request_id == request_id]
+        return sorted(spans, key=lambda span: span.start)
+
+    def breakdown(self, request_id: Optional[str] = None) -> str:
+        """
+        Indented latency breakdown of recorded spans, one line per span.
+
+        Args:
+            request_id: Only spans opened while handling this request
+
+        Returns:
+            Text such as "nlm.command 812.4ms command=list" with children
+            indented under their parent
+        """
+        lines = []
+        for span in self.spans(request_id):
+            attributes = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+            error = f" error={span.error}" if span.error else ""
+            lines.append(
+                f"{'  ' * span.depth}{span.name} {span.duration * 1000:.1f}ms"
+                f"{' ' + attributes if attributes else ''}{error}"
+            )
+        return "\n".join(lines)
+
+
+def otel_tracer(name: str = "nlm") -> Tracer:
+    """
+    OpenTelemetry tracer for the globally configured tracer provider.
+
+    Raises:
+        ValueError: If opentelemetry-api is not installed
+    """
+    if otel_trace is None:
+        raise ValueError("NLM_TRACING=otel requires the opentelemetry-api package")
+    return otel_trace.get_tracer(name)
+
+
+class RequestIdMiddleware:
+    """ASGI middleware giving every HTTP request an id for its spans.
+
+    The id comes from the request's ``X-Request-ID`` header when present and
+    is echoed back in the response's. The whole request is traced as an
+    "http.request" span, the parent of the spans of the commands it runs.
+    """
+
+    def __init__(
+        self, app: ASGIApp, tracer: Optional[Tracer] = None
+    ):
+        """
+        Args:
+            app: Wrapped ASGI application
+            tracer: Tracer for the request span (default: no-op)
+        """
+        self.app = app
+        self.tracer = tracer if tracer is not None else NoopTracer()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = REQUEST_ID_HEADER.lower().encode()
+        incoming = dict(scope["headers"]).get(header)
+        request_id = incoming.decode("latin-1")[:128] if incoming else None
+        with request_context(request_id) as request_id:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (header, request_id.encode("latin-1")),
+                    ]
+                await send(message)
+
+            with self.tracer.start_as_current_span(
+                "http.request",
+                attributes={"http.method": scope["method"], "http.target": scope["path"]},
+            ):
+                await self.app(scope, receive, send_wrapper)
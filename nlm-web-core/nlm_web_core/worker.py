@@ -0,0 +1,322 @@
+"""Persistent ``nlm worker`` processes speaking line-delimited JSON.
+
+A worker is started once and then serves many commands over stdin/stdout,
+so process spawn, runtime startup, credential loading and TLS connection
+setup are paid once instead of per call. Protocol (one JSON object per line):
+
+    worker -> {"ready": true, "protocol": 1}             (on startup)
+    caller -> {"id": 1, "args": ["list", "--json"], "stdin": "..."}
+    worker -> {"id": 1, "exit_code": 0, "stdout": "...", "stderr": "..."}
+"""
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Optional
+
+WORKER_PROTOCOL = 1
+
+# Responses carry whole command outputs on one line
+WORKER_MAX_LINE = 64 * 1024 * 1024
+
+
+class WorkerUnavailableError(Exception):
+    """Raised when a request could not be sent; callers should fall back."""
+
+    pass
+
+
+class WorkerCrashedError(Exception):
+    """Raised when a worker died or desynchronized after a request was sent."""
+
+    pass
+
+
+class WorkerTimeoutError(Exception):
+    """Raised when a worker did not answer within the timeout."""
+
+    pass
+
+
+def _encode_request(
+    request_id: int, args: list[str], input_data: Optional[str]
+) -> bytes:
+    """Serialize one request line."""
+    payload: dict[str, Any] = {"id": request_id, "args": args}
+    if input_data is not None:
+        payload["stdin"] = input_data
+    return (json.dumps(payload) + "\n").encode()
+
+
+def _is_ready(line: bytes) -> bool:
+    """Whether a line is a compatible worker ready announcement."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return False
+    return (
+        isinstance(message, dict)
+        and message.get("ready") is True
+        and message.get("protocol") == WORKER_PROTOCOL
+    )
+
+
+def _decode_response(line: bytes, request_id: int) -> tuple[int, str, str]:
+    """Parse one response line into (exit_code, stdout, stderr)."""
+    if not line:
+        raise WorkerCrashedError("nlm worker exited unexpectedly")
+    try:
+        response = json.loads(line)
+    except ValueError:
+        raise WorkerCrashedError("nlm worker sent a malformed response")
+    if response.get("id") != request_id:
+        raise WorkerCrashedError("nlm worker response out of sequence")
+    return response["exit_code"], response["stdout"], response["stderr"]
+
+
+class AsyncNLMWorker:
+    """One long-lived ``nlm worker`` process driven by asyncio streams."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        """Wrap a started worker process; use ``AsyncNLMWorker.start``."""
+        if process.stdin is None or process.stdout is None:
+            raise ValueError("worker process needs stdin and stdout pipes")
+        self.process = process
+        self._stdin = process.stdin
+        self._stdout = process.stdout
+        self._ids = itertools.count(1)
+
+    @classmethod
+    async def start(
+        cls, nlm_path: str, env: dict[str, str], start_timeout: float = 10
+    ) -> "AsyncNLMWorker":
+        """
+        Start a worker and wait for its ready line.
+
+        Args:
+            nlm_path: Path to nlm binary
+            env: Environment for the worker process
+            start_timeout: Seconds to wait for the ready line
+
+        Returns:
+            Ready worker
+
+        Raises:
+            WorkerUnavailableError: If the binary has no worker mode
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                nlm_path,
+                "worker",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=env,
+                limit=WORKER_MAX_LINE,
+            )
+        except OSError as e:
+            raise WorkerUnavailableError(str(e))
+
+        worker = cls(process)
+        try:
+            ready = await asyncio.wait_for(worker._stdout.readline(), start_timeout)
+        except asyncio.TimeoutError:
+            ready = b""
+        if not _is_ready(ready):
+            await worker.close()
+            raise WorkerUnavailableError("nlm binary does not support worker mode")
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running."""
+        return self.process.returncode is None
+
+    async def request(
+        self, args: list[str], input_data: Optional[str], timeout: float
+    ) -> tuple[int, str, str]:
+        """
+        Run one command in the worker.
+
+        Args:
+            args: Command arguments
+            input_data: Optional stdin input
+            timeout: Seconds to wait for the response
+
+        Returns:
+            Tuple of (exit_code, stdout, stderr)
+        """
+        request_id = next(self._ids)
+        try:
+            self._stdin.write(_encode_request(request_id, args, input_data))
+            await self._stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise WorkerUnavailableError(str(e))
+
+        try:
+            line = await asyncio.wait_for(self._stdout.readline(), timeout)
+        except asyncio.TimeoutError:
+            raise WorkerTimeoutError("Command timed out")
+        return _decode_response(line, request_id)
+
+    async def close(self) -> None:
+        """Stop the worker process."""
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+        await self.process.wait()
+
+
+class AsyncWorkerPool:
+    """Bounded pool of asyncio workers sharing one nlm identity.
+
+    A pool never queues: when every worker is busy, or starting workers is
+    backing off after a failed start, ``run`` raises WorkerUnavailableError
+    and the client runs the command in a one-shot process instead. The pool
+    size therefore only bounds the number of worker processes, not the
+    number of concurrent commands.
+    """
+
+    def __init__(
+        self,
+        nlm_path: str,
+        env: dict[str, str],
+        size: int = 2,
+        start_timeout: float = 10,
+        start_backoff: float = 1,
+        max_start_backoff: float = 60,
+    ):
+        """
+        Initialize worker pool. Workers are started lazily.
+
+        Args:
+            nlm_path: Path to nlm binary
+            env: Environment for worker processes
+            size: Maximum number of workers
+            start_timeout: Seconds to wait for a worker to become ready
+            start_backoff: Seconds before retrying after a failed start,
+                doubled after each consecutive failure
+            max_start_backoff: Upper bound for the start backoff
+        """
+        self.nlm_path = nlm_path
+        self.env = env
+        self.size = size
+        self.start_timeout = start_timeout
+        self.start_backoff = start_backoff
+        self.max_start_backoff = max_start_backoff
+        self._idle: list[AsyncNLMWorker] = []
+        # Workers running a command or starting; idle ones are not counted
+        self._busy = 0
+        self._start_failures = 0
+        self._retry_start_at = 0.0
+        self._closed = False
+
+    @property
+    def available(self) -> bool:
+        """Whether new workers may be started, i.e. no start is backing off."""
+        return time.monotonic() >= self._retry_start_at
+
+    def _reserve(self) -> None:
+        """
+        Claim a slot for a new worker.
+
+        Raises:
+            WorkerUnavailableError: If the pool is closed, full or backing off
+        """
+        if self._closed:
+            raise WorkerUnavailableError("worker pool closed")
+        if self._busy >= self.size:
+            raise WorkerUnavailableError("all workers busy")
+        if not self.available:
+            raise WorkerUnavailableError("worker start backing off")
+        self._busy += 1
+
+    def _started(self, ok: bool) -> None:
+        """Record the outcome of a worker start, backing off after failures."""
+        if ok:
+            self._start_failures = 0
+            return
+        self._start_failures += 1
+        self._retry_start_at = time.monotonic() + min(
+            self.start_backoff * 2 ** (self._start_failures - 1),
+            self.max_start_backoff,
+        )
+
+    async def run(
+        self, args: list[str], input_data: Optional[str], timeout: float
+    ) -> tuple[int, str, str]:
+        """
+        Run one command on an idle or newly started worker.
+
+        Starting a worker counts against the timeout. A worker whose request
+        times out, fails or is cancelled is killed, since its position in the
+        response stream is no longer known.
+
+        Args:
+            args: Command arguments
+            input_data: Optional stdin input
+            timeout: Seconds to wait for the response
+
+        Returns:
+            Tuple of (exit_code, stdout, stderr)
+
+        Raises:
+            WorkerUnavailableError: If no worker can take the request now
+            WorkerTimeoutError: If the command did not finish in time
+        """
+        deadline = time.monotonic() + timeout
+        worker = await self._checkout(timeout)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            await self._checkin(worker)
+            raise WorkerTimeoutError("Command timed out")
+        try:
+            result = await worker.request(args, input_data, remaining)
+        except BaseException:
+            self._busy -= 1
+            await worker.close()
+            raise
+        await self._checkin(worker)
+        return result
+
+    async def _checkout(self, timeout: float) -> AsyncNLMWorker:
+        """Take a live idle worker or start a new one, reaping dead ones."""
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.alive:
+                self._busy += 1
+                return worker
+            await worker.close()
+        self._reserve()
+        try:
+            worker = await AsyncNLMWorker.start(
+                self.nlm_path, self.env, min(self.start_timeout, timeout)
+            )
+        except BaseException as e:
+            self._busy -= 1
+            if isinstance(e, WorkerUnavailableError):
+                self._started(False)
+            raise
+        self._started(True)
+        return worker
+
+    async def _checkin(self, worker: AsyncNLMWorker) -> None:
+        """Release a slot, keeping the worker for reuse unless the pool closed."""
+        self._busy -= 1
+        if self._closed:
+            await worker.close()
+        else:
+            self._idle.append(worker)
+
+    async def close(self) -> None:
+        """
+        Stop idle workers now and busy ones when their command finishes.
+
+        Commands sent after closing fall back to one-shot processes.
+        """
+        self._closed = True
+        workers, self._idle = self._idle, []
+        for worker in workers:
+            await worker.close()
@@ -0,0 +1,101 @@
+"""Test configuration and fixtures."""
+import asyncio
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+
+STUB_NLM = Path(__file__).resolve().parent / "stub_nlm.py"
+
+
+@pytest.fixture
+def stub_nlm(tmp_path):
+    """Factory returning a launcher that runs the stub nlm CLI.
+
+    Keyword sizes set payload sizes, e.g. ``items=3`` sets NLM_STUB_ITEMS.
+    """
+
+    def make(
+        delay: float = 0.0, worker: bool = True, chunk_delay: float = 0.0, **sizes: int
+    ) -> str:
+        suffix = "".join(f"-{name}{value}" for name, value in sizes.items())
+        launcher = tmp_path / f"nlm-{delay}-{worker}-{chunk_delay}{suffix}"
+        env = f"NLM_STUB_DELAY={delay} NLM_STUB_CHUNK_DELAY={chunk_delay}"
+        env += "" if worker else " NLM_STUB_NO_WORKER=1"
+        env += "".join(f" NLM_STUB_{name.upper()}={value}" for name, value in sizes.items())
+        launcher.write_text(
+            f'#!/bin/sh\n{env} exec "{sys.executable}" "{STUB_NLM}" "$@"\n'
+        )
+        launcher.chmod(0o755)
+        return str(launcher)
+
+    return make
+
+
+@pytest.fixture
+def mock_run(monkeypatch):
+    """Mock standing in for one-shot nlm processes, called like subprocess.run.
+
+    Set its ``return_value`` or ``side_effect`` to
+    ``Mock(returncode=..., stdout=..., stderr=...)``. It is called in a thread
+    with the command line, so it may block without stalling the client.
+    """
+    run = Mock()
+
+    async def spawn(program, *args, env=None, **kwargs):
+        process = Mock(returncode=None)
+
+        async def communicate(input=None):
+            result = await asyncio.to_thread(run, [program, *args], env=env, input=input)
+            process.returncode = result.returncode
+            return result.stdout.encode(), result.stderr.encode()
+
+        async def wait():
+            return process.returncode
+
+        process.communicate = communicate
+        process.wait = wait
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spawn)
+    return run
+
+
+@pytest.fixture
+def sample_notebook():
+    """Sample notebook data."""
+    return {
+        "project_id": "notebook123",
+        "title": "Test Notebook",
+        "emoji": "📚",
+        "metadata": {
+            "create_time": "2025-01-15T10:00:00Z",
+            "modified_time": "2025-01-15T10:00:00Z",
+        },
+        "sources": [],
+    }
+
+
+@pytest.fixture
+def sample_source():
+    """Sample source data."""
+    return {
+        "source_id": {"source_id": "source123"},
+        "title": "Test Source",
+        "metadata": {
+            "source_type": "SOURCE_TYPE_URL",
+            "last_modified_time": "2025-01-15T10:00:00Z",
+        },
+    }
+
+
+@pytest.fixture
+def sample_audio():
+    """Sample audio overview data."""
+    return {
+        "audio_id": "audio123",
+        "status": "ready",
+        "duration": 930,  # 15:30 in seconds
+        "url": "https://example.com/audio.mp3",
+        "size_bytes": 13107200,  # 12.5 MB
+    }
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Minimal stand-in for the nlm CLI used by tests and benchmarks.
+
+Sleeps for ``NLM_STUB_DELAY`` seconds, then prints canned output for the
+requested command: protojson-shaped JSON with ``--json``, and tables like the
+CLI's tabwriter output without it. Notebook IDs starting with ``missing``
+produce a "not found" error, mirroring how the real CLI reports unknown
+notebooks. ``audio-get`` reports the overview as still generating for
+notebook IDs starting with ``pending`` and as ready otherwise.
+
+Payload sizes are configurable: ``NLM_STUB_NOTEBOOKS`` synthetic notebooks
+for ``list`` (default: two fixed ones), ``NLM_STUB_ITEMS`` entries for
+``sources``, ``notes`` and ``audio-list`` (default 0), and ``NLM_STUB_LINES``
+lines of generated content (default 3). ``audio-download`` and
+``video-download`` write ``NLM_STUB_MEDIA_BYTES`` bytes (default 4096) to the
+given file; global flags such as ``--direct-rpc`` are ignored.
+
+Content generation commands print markdown line by line, pausing
+``NLM_STUB_CHUNK_DELAY`` seconds before each one so streaming can be observed.
+
+``nlm worker`` speaks the line-delimited JSON worker protocol, applying the
+same delay per request. Set ``NLM_STUB_NO_WORKER=1`` to emulate a binary
+without worker support.
+"""
+import functools
+import json
+import os
+import sys
+import time
+
+NOTEBOOKS = [
+    {"project_id": "nb1", "title": "Notebook 1", "emoji": "📚", "sources": []},
+    {"project_id": "nb2", "title": "Notebook 2", "emoji": "📖", "sources": []},
+]
+
+GENERATE_COMMANDS = ("generate-guide", "generate-outline", "faq", "glossary")
+
+TIMESTAMP = "2025-01-15T10:00:00Z"
+
+
+def size(name: str, default: int) -> int:
+    """Read a payload size from the environment."""
+    return int(os.environ.get(f"NLM_STUB_{name}", default))
+
+
+def source(notebook_id: str, i: int) -> dict:
+    """A protojson source object."""
+    return {
+        "source_id": {"source_id": f"{notebook_id}-src-{i}"},
+        "title": f"Source {i} of {notebook_id}",
+        "metadata": {
+            "source_type": "SOURCE_TYPE_WEB_PAGE",
+            "last_modified_time": TIMESTAMP,
+        },
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def notebooks() -> list[dict]:
+    """Notebook listing: the fixed pair, or NLM_STUB_NOTEBOOKS synthetic ones."""
+    count = size("NOTEBOOKS", 0)
+    if not count:
+        return NOTEBOOKS
+    return [
+        {
+            "project_id": f"{i:08x}-0000-4000-8000-000000000000",
+            "title": f"Research notebook {i}",
+            "emoji": "📚",
+            "sources": [source(f"nb{i}", j) for j in range(3)],
+            "metadata": {"create_time": TIMESTAMP, "modified_time": TIMESTAMP},
+        }
+        for i in range(count)
+    ]
+
+
+def items(command: str, notebook_id: str) -> list[dict]:
+    """NLM_STUB_ITEMS entries for sources, notes or audio-list."""
+    count = size("ITEMS", 0)
+    if command == "sources":
+        return [source(notebook_id, i) for i in range(count)]
+    if command == "notes":
+        return [
+            {
+                "source_id": {"source_id": f"{notebook_id}-note-{i}"},
+                "title": f"Note {i}",
+                "metadata": {"last_modified_time": TIMESTAMP},
+            }
+            for i in range(count)
+        ]
+    return [
+        {"audio_id": f"{notebook_id}-audio-{i}", "status": "ready", "duration": 300}
+        for i in range(count)
+    ]
+
+
+def table(header: list[str], rows: list[list[str]]) -> str:
+    """Render rows the way Go's tabwriter aligns them."""
+    widths = [max(len(str(c)) for c in column) for column in zip(header, *rows)]
+    return "".join(
+        " ".join(str(c).ljust(w) for c, w in zip(row, widths)).rstrip() + "\n"
+        for row in [header, *rows]
+    )
+
+
+def text_output(command: str, data: list[dict]) -> str:
+    """Human-readable output printed when --json is not given."""
+    if command == "list":
+        rows = [
+            [nb["project_id"], nb["title"], str(len(nb["sources"])), TIMESTAMP]
+            for nb in data[:10]
+        ]
+        return f"Total notebooks: {len(data)} (showing first 10)\n\n" + table(
+            ["ID", "TITLE", "SOURCES", "LAST UPDATED"], rows
+        )
+    if command == "sources":
+        rows = [
+            [s["source_id"]["source_id"], s["title"], "SOURCE_TYPE_WEB_PAGE", "enabled", TIMESTAMP]
+            for s in data
+        ]
+        return table(["ID", "TITLE", "TYPE", "STATUS", "LAST UPDATED"], rows)
+    if command == "notes":
+        rows = [[n["source_id"]["source_id"], n["title"], TIMESTAMP] for n in data]
+        return table(["ID", "TITLE", "LAST MODIFIED"], rows)
+    rows = [[a["audio_id"], a["status"]] for a in data]
+    return table(["ID", "STATUS"], rows)
+
+
+def generated_lines(command: str) -> list[str]:
+    """Canned markdown output of a content generation command."""
+    return [f"# {command}\n"] + [f"- point {i}\n" for i in range(1, size("LINES", 3) + 1)]
+
+
+def respond(argv: list[str], stdin: str = "") -> tuple[int, str, str]:
+    """Return (exit_code, stdout, stderr) for one nlm invocation."""
+    time.sleep(float(os.environ.get("NLM_STUB_DELAY", "0")))
+
+    while argv and argv[0].startswith("-"):
+        argv = argv[1:]
+    if not argv:
+        return 1, "", "Usage: nlm <command> [arguments]\n"
+
+    command, args = argv[0], argv[1:]
+    if args and args[0].startswith("missing"):
+        return 1, "", f"notebook {args[0]} not found\n"
+
+    if command in ("list", "sources", "notes", "audio-list"):
+        data = notebooks() if command == "list" else items(command, args[0])
+        if "--json" in args:
+            return 0, json.dumps(data) + "\n", ""
+        return 0, text_output(command, data), ""
+    if command == "create":
+        return 0, json.dumps({"project_id": "nb-new", "title": args[0]}) + "\n", ""
+    if command == "add" and args[1:] == ["-"]:
+        source = {"source_id": {"source_id": f"text-{len(stdin)}"}, "title": "Pasted Text"}
+        return 0, json.dumps(source) + "\n", ""
+    if command in GENERATE_COMMANDS:
+        return 0, "".join(generated_lines(command)), ""
+    if command == "audio-get":
+        if args[0].startswith("pending"):
+            return 0, "Audio overview is not ready yet. Try again in a few moments.\n", ""
+        overview = f"Audio Overview:\n  Title: Overview\n  ID: {args[0]}-audio\n  Ready: true\n"
+        return 0, overview, "Fetching audio overview...\n"
+    if command in ("audio-download", "video-download"):
+        kind = command.split("-")[0]
+        path = args[1] if len(args) > 1 else f"{kind}_overview_{args[0]}.bin"
+        with open(path, "wb") as f:
+            f.write(bytes(range(256)) * (size("MEDIA_BYTES", 4096) // 256))
+        return 0, f"✅ {kind.title()} saved to: {path}\n", ""
+    if command == "crash":
+        os._exit(3)
+    return 0, f"{command}: ok\n", ""
+
+
+def serve_worker() -> int:
+    """Serve worker protocol requests from stdin until EOF."""
+    if os.environ.get("NLM_STUB_NO_WORKER"):
+        print("Usage: nlm <command> [arguments]", file=sys.stderr)
+        return 1
+
+    print(json.dumps({"ready": True, "protocol": 1}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        code, out, err = respond(request["args"], request.get("stdin", ""))
+        response = {"id": request["id"], "exit_code": code, "stdout": out, "stderr": err}
+        print(json.dumps(response), flush=True)
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    """Emulate a single nlm invocation."""
+    if argv == ["worker"]:
+        return serve_worker()
+
+    if argv[:1] and argv[0] in GENERATE_COMMANDS and not argv[1].startswith("missing"):
+        chunk_delay = float(os.environ.get("NLM_STUB_CHUNK_DELAY", "0"))
+        for line in generated_lines(argv[0]):
+            time.sleep(chunk_delay)
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        return 0
+
+    stdin = sys.stdin.read() if argv[-1:] == ["-"] else ""
+    code, out, err = respond(argv, stdin)
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
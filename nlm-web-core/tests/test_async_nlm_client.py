@@ -0,0 +1,255 @@
+"""Tests for the asyncio NLM CLI client."""
+import asyncio
+import time
+from unittest.mock import Mock
+import pytest
+from nlm_web_core.breaker import CircuitBreaker
+from nlm_web_core.nlm_client import (
+    AsyncNLMClient,
+    NLMError,
+    NLMTimeoutError,
+    NotebookNotFoundError,
+)
+from nlm_web_core.timeouts import TimeoutPolicy
+
+
+def half_open_breaker() -> CircuitBreaker:
+    """Breaker that tripped and cooled down, waiting for a probe."""
+    clock = Mock(return_value=0.0)
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.return_value = 10.0
+    return breaker
+
+
+class TestAsyncCommands:
+    """Test running commands through a real subprocess."""
+
+    async def test_list_notebooks(self, stub_nlm):
+        """Test listing notebooks through the stub CLI."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+
+        notebooks = await client.list_notebooks()
+
+        assert [nb.project_id for nb in notebooks] == ["nb1", "nb2"]
+
+    async def test_get_notebook(self, stub_nlm):
+        """Test getting a single notebook."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+
+        notebook = await client.get_notebook("nb2")
+
+        assert notebook.title == "Notebook 2"
+
+    async def test_large_payloads(self, stub_nlm):
+        """Test sized listings decode into records."""
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(notebooks=500, items=20)
+        )
+
+        assert len(await client.list_notebooks()) == 500
+        sources = await client.list_sources("nb1")
+        assert [s.source_id for s in sources][:2] == ["nb1-src-0", "nb1-src-1"]
+        assert len(await client.list_notes("nb1")) == 20
+        assert (await client.list_audio("nb1"))[0].status == "ready"
+
+    async def test_poll_audio_bypasses_cache(self, stub_nlm):
+        """Test every poll runs audio-get instead of reusing a cached answer."""
+        from nlm_web_core.cache import ResponseCache
+
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(), cache=ResponseCache()
+        )
+
+        assert await client.poll_audio("pending-nb") is None
+        assert await client.poll_audio("pending-nb") is None
+        audio = await client.poll_audio("nb1")
+        assert (audio.audio_id, audio.status) == ("nb1-audio", "ready")
+        assert client.cache.hits == 0
+
+    async def test_get_audio_caches_text_output(self, stub_nlm):
+        """Test the overview is decoded from text output before it is cached."""
+        from nlm_web_core.cache import ResponseCache
+
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(), cache=ResponseCache()
+        )
+
+        pending = await client.get_audio("pending-nb")
+        assert await client.get_audio("pending-nb") == pending
+        assert pending.status == "pending"
+        audio = await client.get_audio("nb1")
+        assert (audio.audio_id, audio.status) == ("nb1-audio", "ready")
+        assert client.cache.hits == 1
+
+    async def test_not_found_error(self, stub_nlm):
+        """Test CLI errors are mapped to typed exceptions."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+
+        with pytest.raises(NotebookNotFoundError):
+            await client.delete_notebook("missing-nb")
+
+    async def test_binary_not_found(self, tmp_path):
+        """Test missing nlm binary."""
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=str(tmp_path / "does-not-exist")
+        )
+
+        with pytest.raises(NLMError, match="nlm binary not found"):
+            await client.list_notebooks()
+
+
+class TestAsyncTimeoutAndCancellation:
+    """Test that slow commands never outlive their caller."""
+
+    async def test_timeout(self, stub_nlm):
+        """Test a slow command raises NLMError after the timeout."""
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(delay=5), timeout=0.2
+        )
+
+        start = time.perf_counter()
+        with pytest.raises(NLMError, match="timed out"):
+            await client.list_notebooks()
+
+        assert time.perf_counter() - start < 2
+
+    async def test_per_command_timeout(self, stub_nlm):
+        """Test the timeout policy limits each subcommand separately."""
+        client = AsyncNLMClient(
+            "token",
+            "cookies",
+            nlm_path=stub_nlm(delay=0.5),
+            timeouts=TimeoutPolicy(timeouts={"list": 0.2, "sources": 5}),
+        )
+
+        with pytest.raises(NLMTimeoutError, match="nlm list timed out after 0.2s"):
+            await client.list_notebooks()
+        assert await client.list_sources("nb1") == []
+
+    async def test_cancellation(self, stub_nlm):
+        """Test cancelling the awaiting task propagates promptly."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(delay=5))
+
+        task = asyncio.create_task(client.list_notebooks())
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+        start = time.perf_counter()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert time.perf_counter() - start < 2
+
+    async def test_cancelled_probe_is_released(self, stub_nlm):
+        """Test a cancelled half-open probe lets the next command probe."""
+        breaker = half_open_breaker()
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(delay=5), breaker=breaker
+        )
+
+        task = asyncio.create_task(client._run_command(["list", "--json"]))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert breaker.state == "half_open"
+        breaker.allow()
+
+
+class TestAsyncConcurrency:
+    """Test that parallel commands overlap instead of serializing."""
+
+    async def test_parallel_requests_finish_in_max_latency(self, stub_nlm):
+        """Test N parallel calls take about one call's latency, not N."""
+        delay, n = 0.3, 8
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(delay=delay))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client.list_notebooks() for _ in range(n)))
+        elapsed = time.perf_counter() - start
+
+        assert all(len(r) == 2 for r in results)
+        assert elapsed < delay * n / 2
+
+
+class TestAsyncStreaming:
+    """Test streaming content generation output."""
+
+    async def test_first_chunk_before_completion(self, stub_nlm):
+        """Test chunks are yielded as the process writes them."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(chunk_delay=0.2))
+
+        start = time.perf_counter()
+        chunks = []
+        first_chunk_at = None
+        async for chunk in client.stream_guide("nb1"):
+            first_chunk_at = first_chunk_at or time.perf_counter() - start
+            chunks.append(chunk)
+        total = time.perf_counter() - start
+
+        assert "".join(chunks).startswith("# generate-guide\n")
+        assert "".join(chunks).endswith("- point 3\n")
+        assert first_chunk_at < total - 0.4
+
+    async def test_error_raised_from_iteration(self, stub_nlm):
+        """Test CLI errors surface from the stream."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+
+        with pytest.raises(NotebookNotFoundError):
+            async for _ in client.stream_faq("missing-nb"):
+                pass
+
+    async def test_silent_failure_reports_exit_code(self, stub_nlm):
+        """Test a stream failing without stderr still says how it failed."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+
+        with pytest.raises(NLMError, match="exited with code 3"):
+            async for _ in client._stream_command(["crash"]):
+                pass
+
+    async def test_closing_stream_kills_process(self, stub_nlm):
+        """Test abandoning a stream early stops the process promptly."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(chunk_delay=5))
+        stream = client.stream_glossary("nb1")
+
+        task = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+        start = time.perf_counter()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await stream.aclose()
+        assert time.perf_counter() - start < 2
+
+    async def test_stream_closed_before_output_releases_probe(self, stub_nlm):
+        """Test an abandoned half-open probe lets the next command probe."""
+        breaker = half_open_breaker()
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(chunk_delay=5), breaker=breaker
+        )
+        stream = client.stream_glossary("nb1")
+
+        task = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await stream.aclose()
+
+        assert breaker.state == "half_open"
+        breaker.allow()
+
+    async def test_stream_closed_after_output_is_a_success(self, stub_nlm):
+        """Test output before an early close counts as the upstream answering."""
+        breaker = half_open_breaker()
+        client = AsyncNLMClient(
+            "token", "cookies", nlm_path=stub_nlm(chunk_delay=0.1), breaker=breaker
+        )
+        stream = client.stream_guide("nb1")
+
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert breaker.state == "closed"
@@ -0,0 +1,111 @@
+"""Tests for the circuit breaker."""
+import pytest
+from nlm_web_core.breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def tripped(clock: FakeClock) -> CircuitBreaker:
+    """Breaker opened by a run of failures."""
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, reset_timeout=10, clock=clock)
+    for _ in range(4):
+        breaker.record_failure()
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Test opening, probing and closing."""
+
+    def test_opens_on_failure_rate(self):
+        """Test the circuit opens only once enough calls failed often enough."""
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, clock=FakeClock())
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "closed"  # Too few calls
+
+        breaker.record_failure()
+        assert breaker.state == "open"  # 3 of 4 failed
+
+    def test_successes_keep_it_closed(self):
+        """Test an error rate below the threshold does not open the circuit."""
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, clock=FakeClock())
+        for _ in range(10):
+            breaker.record_success()
+            breaker.record_success()
+            breaker.record_failure()
+
+        assert breaker.state == "closed"
+        breaker.allow()
+
+    def test_open_rejects_with_retry_after(self):
+        """Test commands fail fast while open."""
+        clock = FakeClock()
+        breaker = tripped(clock)
+        clock.now = 4
+
+        with pytest.raises(CircuitOpenError) as excinfo:
+            breaker.allow()
+
+        assert excinfo.value.retry_after == 6
+        assert breaker.stats()["rejected"] == 1
+
+    def test_half_open_probe(self):
+        """Test one probe is let through after the cool-down and closes the circuit."""
+        clock = FakeClock()
+        breaker = tripped(clock)
+        clock.now = 10
+
+        breaker.allow()
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()  # Probe still running
+        breaker.record_success()
+
+        assert breaker.state == "closed"
+        breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        """Test a failed probe opens the circuit for another cool-down."""
+        clock = FakeClock()
+        breaker = tripped(clock)
+        clock.now = 10
+        breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.stats()["opened"] == 2
+        clock.now = 19
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+
+    def test_lost_probe_is_replaced(self):
+        """Test a probe that never reports back does not block the circuit forever."""
+        clock = FakeClock()
+        breaker = tripped(clock)
+        clock.now = 10
+        breaker.allow()
+
+        clock.now = 20
+        breaker.allow()
+
+    def test_released_probe_is_replaced(self):
+        """Test a probe released without an outcome frees the slot at once."""
+        clock = FakeClock()
+        breaker = tripped(clock)
+        clock.now = 10
+        breaker.allow()
+
+        breaker.release()
+
+        assert breaker.state == "half_open"
+        breaker.allow()
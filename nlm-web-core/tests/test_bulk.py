@@ -0,0 +1,134 @@
+"""Tests for bounded-parallel bulk source adds."""
+import asyncio
+import time
+import pytest
+from nlm_web_core.bulk import SourceItem, SourceResult, add_all_async, as_items
+from nlm_web_core.nlm_client import (
+    AsyncNLMClient,
+    NLMClient,
+    NLMError,
+    NLMOverloadedError,
+    NotebookNotFoundError,
+)
+from nlm_web_core.limiter import AsyncConcurrencyLimiter
+from nlm_web_core.records import Source
+
+TRANSIENT = AsyncNLMClient._transient
+
+
+class Flaky:
+    """Add function failing chosen inputs a number of times."""
+
+    def __init__(self, failures: dict[str, list[Exception]], delay: float = 0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls: list[str] = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, item: SourceItem) -> Source:
+        self.calls.append(item.source_input)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        errors = self.failures.get(item.source_input)
+        if errors:
+            raise errors.pop(0)
+        return Source(f"id-{item.source_input}")
+
+
+ITEMS = as_items(f"https://example.com/{i}" for i in range(10))
+
+
+class TestAddAll:
+    """Test the asyncio runner."""
+
+    async def test_results_in_input_order_with_bounded_parallelism(self):
+        """Test every item runs once, at most `concurrency` at a time."""
+        add = Flaky({}, delay=0.02)
+        seen: list[SourceResult] = []
+
+        results = await add_all_async(add, ITEMS, 3, 0, 0, TRANSIENT, progress=seen.append)
+
+        assert [r.source.source_id for r in results] == [f"id-{i.source_input}" for i in ITEMS]
+        assert add.peak == 3
+        assert len(seen) == 10
+
+    async def test_retries_transient_failures_only(self):
+        """Test overload and 503 errors are retried; others are reported."""
+        add = Flaky(
+            {
+                ITEMS[0].source_input: [NLMOverloadedError("busy")],
+                ITEMS[1].source_input: [NLMError("rpc error: 503 Service Unavailable")] * 5,
+                ITEMS[2].source_input: [NLMError("invalid URL")],
+            }
+        )
+
+        results = await add_all_async(add, ITEMS[:3], 2, 2, 0, TRANSIENT)
+
+        assert results[0].ok and results[0].attempts == 2
+        assert not results[1].ok and results[1].attempts == 3
+        assert results[2].error == "invalid URL" and results[2].attempts == 1
+
+    async def test_bounded_parallelism_and_backoff(self):
+        """Test concurrency bound and exponential retry delay."""
+        add = Flaky({ITEMS[0].source_input: [NLMOverloadedError("busy")] * 2}, delay=0.01)
+
+        start = time.monotonic()
+        results = await add_all_async(add, ITEMS, 4, 2, 0.05, TRANSIENT)
+
+        assert all(r.ok for r in results)
+        assert results[0].attempts == 3
+        assert add.peak == 4
+        assert time.monotonic() - start >= 0.15
+
+    async def test_abort_cancels_remaining(self):
+        """Test a missing notebook stops items that have not started."""
+        add = Flaky({ITEMS[0].source_input: [NotebookNotFoundError("gone")]}, delay=0.01)
+
+        with pytest.raises(NotebookNotFoundError):
+            await add_all_async(
+                add, ITEMS, 2, 0, 0, TRANSIENT, abort_on=(NotebookNotFoundError,)
+            )
+        assert len(add.calls) < len(ITEMS)
+
+
+class TestClientBulkAdd:
+    """Test add_sources_bulk through the stub CLI."""
+
+    async def test_text_sources(self, stub_nlm):
+        """Test each item becomes one nlm add."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+        items = [SourceItem("x" * n, "text") for n in (1, 2, 3)]
+
+        results = await client.add_sources_bulk("nb1", items)
+
+        assert [r.source.source_id for r in results] == ["text-1", "text-2", "text-3"]
+
+    async def test_missing_notebook(self, stub_nlm):
+        """Test a missing notebook raises instead of failing every item."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm())
+
+        with pytest.raises(NotebookNotFoundError):
+            await client.add_sources_bulk("missing-nb", ["https://example.com"])
+
+    def test_blocking_client(self, stub_nlm):
+        """Test the blocking client runs the batch on the async one."""
+        client = NLMClient("token", "cookies", nlm_path=stub_nlm())
+        try:
+            results = client.add_sources_bulk("nb1", [SourceItem("abcd", "text")] * 3)
+        finally:
+            client.close()
+
+        assert [r.source.source_id for r in results] == ["text-4"] * 3
+
+    def test_concurrency_capped_by_limiter(self):
+        """Test batches never exceed the per-notebook admission limit."""
+        client = AsyncNLMClient(
+            "token", "cookies", limiter=AsyncConcurrencyLimiter(max_per_notebook=2)
+        )
+
+        assert client._bulk_concurrency(None) == 2
+        assert client._bulk_concurrency(8) == 2
+        assert client._bulk_concurrency(1) == 1
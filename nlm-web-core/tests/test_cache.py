@@ -0,0 +1,171 @@
+"""Tests for the read-only response cache."""
+import threading
+from unittest.mock import Mock
+from nlm_web_core.cache import MISSING, ResponseCache
+from nlm_web_core.nlm_client import NLMClient
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResponseCache:
+    """Test TTL, LRU and invalidation behaviour."""
+
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted."""
+        cache = ResponseCache()
+
+        assert cache.get(("list", "--json")) is MISSING
+        cache.set(("list", "--json"), [1])
+        assert cache.get(("list", "--json")) == [1]
+
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+    def test_per_command_ttl(self):
+        """Test each subcommand expires on its own TTL."""
+        clock = FakeClock()
+        cache = ResponseCache(ttls={"list": 10, "audio-get": 1}, clock=clock)
+        cache.set(("list", "--json"), [])
+        cache.set(("audio-get", "nb1"), {}, notebook_id="nb1")
+
+        clock.now = 5
+        assert cache.get(("audio-get", "nb1")) is MISSING
+        assert cache.get(("list", "--json")) == []
+
+    def test_zero_ttl_disables_command(self):
+        """Test a zero TTL never caches that command."""
+        cache = ResponseCache(ttls={"audio-get": 0})
+        cache.set(("audio-get", "nb1"), {})
+
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.set(("sources", "a"), 1)
+        cache.set(("sources", "b"), 2)
+        cache.get(("sources", "a"))
+        cache.set(("sources", "c"), 3)
+
+        assert cache.get(("sources", "b")) is MISSING
+        assert cache.get(("sources", "a")) == 1
+        assert cache.evictions == 1
+
+    def test_invalidate_notebook(self):
+        """Test invalidation drops the notebook and account-wide entries."""
+        cache = ResponseCache()
+        cache.set(("list", "--json"), [])
+        cache.set(("sources", "nb1", "--json"), [], notebook_id="nb1")
+        cache.set(("sources", "nb2", "--json"), [], notebook_id="nb2")
+
+        cache.invalidate("nb1")
+
+        assert cache.get(("list", "--json")) is MISSING
+        assert cache.get(("sources", "nb1", "--json")) is MISSING
+        assert cache.get(("sources", "nb2", "--json")) == []
+
+    def test_set_skips_responses_older_than_invalidation(self):
+        """Test a response read across an invalidation of its tag is dropped."""
+        cache = ResponseCache()
+        sources = cache.generation("nb1")
+        notes = cache.generation("nb2")
+        listing = cache.generation()
+
+        cache.invalidate("nb1")
+        cache.set(("sources", "nb1", "--json"), [], notebook_id="nb1", generation=sources)
+        cache.set(("notes", "nb2", "--json"), [], notebook_id="nb2", generation=notes)
+        cache.set(("list", "--json"), [], generation=listing)
+
+        assert cache.get(("sources", "nb1", "--json")) is MISSING
+        assert cache.get(("notes", "nb2", "--json")) == []
+        assert cache.get(("list", "--json")) is MISSING
+
+    def test_clear_outdates_every_generation(self):
+        """Test responses read across a clear() are dropped."""
+        cache = ResponseCache()
+        generation = cache.generation("nb1")
+
+        cache.clear()
+        cache.set(("sources", "nb1"), [], notebook_id="nb1", generation=generation)
+
+        assert len(cache) == 0
+
+
+class TestClientCaching:
+    """Test NLMClient reads go through the cache."""
+
+    def test_reads_are_cached(self, mock_run):
+        """Test repeated reads spawn one process."""
+        mock_run.return_value = Mock(returncode=0, stdout='[{"title": "S"}]', stderr="")
+        client = NLMClient("token", "cookies", cache=ResponseCache())
+
+        client.list_sources("nb1")
+        sources = client.list_sources("nb1")
+
+        assert [source.title for source in sources] == ["S"]
+        assert mock_run.call_count == 1
+
+    def test_callers_get_their_own_list(self, mock_run):
+        """Test mutating a returned list does not corrupt the cache."""
+        mock_run.return_value = Mock(returncode=0, stdout="[]", stderr="")
+        client = NLMClient("token", "cookies", cache=ResponseCache())
+
+        client.list_notebooks().append({"project_id": "local"})
+
+        assert client.list_notebooks() == []
+
+    def test_writes_invalidate_notebook(self, mock_run):
+        """Test write-through invalidation from mutating calls."""
+        mock_run.return_value = Mock(returncode=0, stdout="[]", stderr="")
+        client = NLMClient("token", "cookies", cache=ResponseCache())
+
+        client.list_sources("nb1")
+        client.list_notes("nb2")
+        client.add_source("nb1", "https://example.com")
+        client.list_sources("nb1")
+        client.list_notes("nb2")
+
+        # list_sources twice (invalidated), list_notes once, add_source once
+        assert mock_run.call_count == 4
+
+    def test_no_cache_by_default(self, mock_run):
+        """Test clients without a cache always run the command."""
+        mock_run.return_value = Mock(returncode=0, stdout="[]", stderr="")
+        client = NLMClient("token", "cookies")
+
+        client.list_notes("nb1")
+        client.list_notes("nb1")
+
+        assert mock_run.call_count == 2
+
+    def test_read_overtaken_by_write_is_not_cached(self, mock_run):
+        """Test a listing started before a delete does not refill the cache."""
+        listing_started = threading.Event()
+        release_listing = threading.Event()
+
+        def run(cmd, **kwargs):
+            if cmd[1] == "list":
+                listing_started.set()
+                release_listing.wait(5)
+                return Mock(returncode=0, stdout='[{"project_id": "nb1"}]', stderr="")
+            return Mock(returncode=0, stdout="", stderr="")
+
+        mock_run.side_effect = run
+        client = NLMClient("token", "cookies", cache=ResponseCache())
+        slow_read = threading.Thread(target=client.list_notebooks)
+        slow_read.start()
+        listing_started.wait(5)
+
+        client.delete_notebook("nb1")
+        release_listing.set()
+        slow_read.join(5)
+
+        assert client.cache.get(("list", "--json")) is MISSING
+        assert client.notebook_index.get("nb1") is None
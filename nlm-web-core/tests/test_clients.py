@@ -0,0 +1,253 @@
+"""Tests for the process-wide client registry."""
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock
+from nlm_web_core.clients import ClientRegistry
+from nlm_web_core.jobs import Job
+from nlm_web_core.nlm_client import AsyncNLMClient
+from nlm_web_core.sessions import Credentials
+from nlm_web_core.settings import NLMSettings
+from nlm_web_core.tracing import NoopTracer, RecordingTracer
+
+
+def make_settings(**overrides: Any) -> NLMSettings:
+    """Settings with credentials, overridable per test."""
+    values: dict[str, Any] = {"nlm_auth_token": "token", "nlm_cookies": "cookies", "nlm_job_store": ":memory:"}
+    values.update(overrides)
+    return NLMSettings(**values)
+
+
+class TestClientRegistry:
+    """Test ClientRegistry lifecycle."""
+
+    def test_client_is_shared(self):
+        """Test every lookup returns the same client."""
+        registry = ClientRegistry(make_settings())
+
+        client = registry.start()
+        assert isinstance(client, AsyncNLMClient)
+        assert registry.client is client
+        assert registry.start() is client
+
+    def test_resources_follow_settings(self):
+        """Test optional resources are built only when enabled."""
+        client = ClientRegistry(
+            make_settings(
+                nlm_cache_enabled=False, nlm_worker_pool_size=0, nlm_max_concurrent=0
+            )
+        ).client
+
+        assert client.cache is None
+        assert client.worker_pool is None
+        assert client.limiter is None
+        assert client.metrics is None
+
+    def test_tracer_follows_settings(self):
+        """Test the tracer named by NLM_TRACING is shared with the client."""
+        registry = ClientRegistry(make_settings(nlm_tracing="local"))
+
+        assert isinstance(registry.tracer, RecordingTracer)
+        assert registry.client.tracer is registry.tracer
+        assert isinstance(ClientRegistry(make_settings()).tracer, NoopTracer)
+
+    def test_metrics_export_cache_counters(self):
+        """Test enabled metrics are shared with the client and read cache counters."""
+        registry = ClientRegistry(make_settings(nlm_metrics_enabled=True))
+        client = registry.client
+        client.cache.get(("list", "--json"))
+
+        assert client.metrics is registry.metrics
+        assert "nlm_response_cache_misses_total 1\n" in registry.metrics.render()
+
+    async def test_metrics_export_single_flight_counters(self, stub_nlm):
+        """Test concurrent identical reads are counted as calls and coalesced."""
+        registry = ClientRegistry(
+            make_settings(nlm_metrics_enabled=True, nlm_path=stub_nlm(delay=0.1))
+        )
+
+        await asyncio.gather(*(registry.client.list_notebooks() for _ in range(3)))
+
+        text = registry.metrics.render()
+        assert "nlm_single_flight_calls_total 3\n" in text
+        assert "nlm_single_flight_coalesced_total 2\n" in text
+        await registry.close()
+
+    async def test_demo_mode_without_credentials(self):
+        """Test missing credentials select the demo client."""
+        registry = ClientRegistry(make_settings(nlm_auth_token=""))
+
+        assert registry.demo_mode is True
+        notebooks = await registry.client.list_notebooks()
+        assert notebooks[0].project_id == "demo-nb-1"
+
+    async def test_notebook_index_outlives_requests(self, stub_nlm, monkeypatch):
+        """Test a later request's lookup is served by the shared client's index."""
+        registry = ClientRegistry(
+            make_settings(nlm_path=stub_nlm(), nlm_worker_pool_size=0)
+        )
+        await registry.client.list_notebooks()
+
+        # The next request gets the same client, so no listing is needed
+        monkeypatch.setattr(
+            registry.client, "list_notebooks", AsyncMock(side_effect=AssertionError)
+        )
+        notebook = await registry.client.get_notebook("nb1")
+
+        assert notebook.title == "Notebook 1"
+        await registry.close()
+
+    async def test_close_stops_workers(self, stub_nlm):
+        """Test closing stops workers and a later lookup builds a new client."""
+        registry = ClientRegistry(make_settings(nlm_path=stub_nlm()))
+        client = registry.client
+        await client.list_notebooks()
+        assert client.worker_pool._idle
+
+        await registry.close()
+        assert not client.worker_pool._idle
+        assert registry.client is not client
+        await registry.close()
+
+    async def test_job_queue(self):
+        """Test the job queue runs on the shared client and stops on close."""
+        registry = ClientRegistry(make_settings(nlm_auth_token="", nlm_job_workers=3))
+        jobs = registry.jobs
+        assert registry.jobs is jobs
+        assert jobs.client is registry.client
+        assert jobs.store.path == ":memory:"
+
+        jobs.start()
+        tasks = list(jobs._tasks)
+        assert len(tasks) == 3
+        await registry.close()
+        assert all(task.done() for task in tasks)
+        assert registry.jobs is not jobs
+
+    async def test_new_overview_drops_cached_media(self, tmp_path):
+        """Test a finished audio job discards the previously downloaded file."""
+        registry = ClientRegistry(
+            make_settings(nlm_auth_token="", nlm_media_dir=str(tmp_path))
+        )
+        client = registry.client
+        await client.create_audio("demo-nb-1", "first")
+        await registry.media.fetch(
+            "audio/demo-nb-1",
+            ".wav",
+            lambda path: client.download_media("demo-nb-1", "audio", path),
+        )
+
+        job = registry.jobs.submit("audio", "demo-nb-1")
+        while not registry.jobs.get(job.job_id).done:
+            await asyncio.sleep(0.005)
+
+        assert registry.media.get("audio/demo-nb-1") is None
+        await registry.close()
+
+
+class TestUserRegistries:
+    """Test per-user registries for signed-in credentials."""
+
+    def test_anonymous_and_configured_account_use_root(self):
+        """Test requests without their own account are served by the root."""
+        registry = ClientRegistry(make_settings())
+
+        assert registry.for_credentials(None) is registry
+        assert registry.for_credentials(Credentials("token", "cookies")) is registry
+        assert registry.user_count == 0
+
+    def test_accounts_get_own_clients(self, tmp_path):
+        """Test each account gets its own client, cache and limiter."""
+        registry = ClientRegistry(
+            make_settings(nlm_tracing="local", nlm_media_dir=str(tmp_path))
+        )
+
+        alice = registry.for_credentials(Credentials("alice", "a-cookies"))
+        bob = registry.for_credentials(Credentials("bob", "b-cookies"))
+
+        assert registry.for_credentials(Credentials("alice", "a-cookies")) is alice
+        assert alice is not bob and registry.user_count == 2
+        assert alice.client.auth_token == "alice"
+        assert alice.client.cache is not bob.client.cache
+        assert alice.client.limiter is not bob.client.limiter
+        assert alice.client.breaker is not registry.client.breaker
+        assert alice.client.worker_pool is None
+        assert alice.tracer is registry.tracer
+        assert alice.media.directory.parent == tmp_path / "users"
+
+    async def test_idle_users_are_closed(self, tmp_path):
+        """Test idle and surplus users are evicted unless they have running jobs."""
+        registry = ClientRegistry(
+            make_settings(nlm_max_users=1, nlm_media_dir=str(tmp_path))
+        )
+        alice = registry.for_credentials(Credentials("alice", "a"))
+        media_dir = alice.media.directory
+        busy = registry.for_credentials(Credentials("busy", "b"))
+        busy.jobs.store.save(Job(job_id="job-1", kind="audio", notebook_id="nb-1"))
+
+        registry.for_credentials(Credentials("carol", "c"))
+        await asyncio.gather(*registry._closing)
+
+        assert list(registry._users.values())[0] is busy
+        assert registry.user_count == 2
+        assert not media_dir.exists()
+
+        await registry.close()
+        assert registry.user_count == 0
+
+    async def test_returning_user_keeps_new_media(self, tmp_path):
+        """Test closing an evicted registry leaves its successor's media alone."""
+        registry = ClientRegistry(
+            make_settings(nlm_user_idle_timeout=0, nlm_media_dir=str(tmp_path))
+        )
+        old = registry.for_credentials(Credentials("alice", "a"))
+        old_dir = old.media.directory
+
+        new = registry.for_credentials(Credentials("alice", "a"))
+        new_dir = new.media.directory
+        new_dir.mkdir(parents=True, exist_ok=True)
+        (new_dir / "audio.m4a").write_bytes(b"audio")
+        await asyncio.gather(*registry._closing)
+
+        assert new is not old and new_dir != old_dir
+        assert not old_dir.exists()
+        assert (new_dir / "audio.m4a").read_bytes() == b"audio"
+        await registry.close()
+
+    def test_lookups_off_the_loop_do_not_evict(self, tmp_path):
+        """Test users are kept open where their registries could not be closed."""
+        registry = ClientRegistry(
+            make_settings(nlm_user_idle_timeout=0, nlm_media_dir=str(tmp_path))
+        )
+        alice = registry.for_credentials(Credentials("alice", "a"))
+
+        registry.for_credentials(Credentials("bob", "b"))
+
+        assert registry.user_count == 2
+        assert registry.for_credentials(Credentials("alice", "a")) is alice
+
+    async def test_users_share_the_process_limit(self, stub_nlm, tmp_path):
+        """Test signed-in users together run at most NLM_MAX_CONCURRENT commands."""
+        registry = ClientRegistry(
+            make_settings(
+                nlm_max_concurrent=2,
+                nlm_path=stub_nlm(delay=0.2),
+                nlm_media_dir=str(tmp_path),
+            )
+        )
+        users = [
+            registry.for_credentials(Credentials(name, "cookies"))
+            for name in ("alice", "bob")
+        ]
+        assert all(user.client.shared_limiter is registry.limiter for user in users)
+
+        reads = asyncio.gather(
+            *(user.client.list_sources(f"nb{i}") for user in users for i in (1, 2))
+        )
+        await asyncio.sleep(0.1)
+
+        assert registry.limiter.stats()["running"] == 2
+        assert registry.limiter.stats()["queued"] == 2
+        assert all(user.limiter.stats()["running"] == 2 for user in users)
+        assert len(await reads) == 4
+        assert registry.limiter.stats()["running"] == 0
+        await registry.close()
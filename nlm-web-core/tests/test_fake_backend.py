@@ -0,0 +1,110 @@
+"""Tests for the in-memory fake nlm backend."""
+import pytest
+from nlm_web_core.fake_backend import FakeNLMBackend, generate_notebooks
+from nlm_web_core.nlm_client import NLMError, NotebookNotFoundError
+
+
+class TestGenerateNotebooks:
+    """Test deterministic data generation."""
+
+    def test_deterministic(self):
+        """Test equal seeds give equal listings and other seeds differ."""
+        assert generate_notebooks(50, seed=1) == generate_notebooks(50, seed=1)
+        assert generate_notebooks(50, seed=1) != generate_notebooks(50, seed=2)
+
+    def test_listing_shape(self):
+        """Test notebooks are unique and most recently modified first."""
+        notebooks = generate_notebooks(1000)
+
+        assert len({nb.project_id for nb in notebooks}) == 1000
+        modified = [nb.modified_at for nb in notebooks]
+        assert modified == sorted(modified, reverse=True)
+
+
+class TestFakeNLMBackend:
+    """Test FakeNLMBackend state and fault injection."""
+
+    async def test_create_and_delete_persist(self):
+        """Test mutations are visible to later calls."""
+        backend = FakeNLMBackend()
+
+        notebook = await backend.create_notebook("New", "📝")
+        listing = await backend.list_notebooks()
+        assert listing[0] == notebook
+        assert len(listing) == 3
+
+        await backend.delete_notebook("demo-nb-1")
+        assert [nb.project_id for nb in await backend.list_notebooks()] == [
+            notebook.project_id,
+            "demo-nb-2",
+        ]
+        with pytest.raises(NotebookNotFoundError):
+            await backend.get_notebook("demo-nb-1")
+
+    async def test_sources_notes_and_audio(self):
+        """Test the per-notebook stores."""
+        backend = FakeNLMBackend(generate_notebooks(3))
+        notebook_id = (await backend.list_notebooks())[0].project_id
+        generated = await backend.list_sources(notebook_id)
+        assert generated == await backend.list_sources(notebook_id)
+
+        source = await backend.add_source(notebook_id, "some text", source_type="text")
+        assert source.source_type == "SOURCE_TYPE_TEXT"
+        assert (await backend.get_notebook(notebook_id)).source_count == len(generated) + 1
+
+        note = await backend.create_note(notebook_id, "Idea")
+        await backend.update_note(notebook_id, note.note_id, "body", "Idea 2")
+        assert (await backend.list_notes(notebook_id))[0].content == "body"
+
+        assert await backend.get_audio(notebook_id) is None
+        await backend.create_audio(notebook_id, "be brief")
+        assert (await backend.list_audio(notebook_id))[0].instructions == "be brief"
+
+    async def test_stream_generation(self):
+        """Test generated content streams line by line."""
+        backend = FakeNLMBackend()
+
+        chunks = [c async for c in backend.stream_faq("demo-nb-1")]
+        assert chunks[0] == "# FAQ: Demo Research Notebook\n"
+        assert "".join(chunks) == await backend.generate_faq("demo-nb-1")
+
+    async def test_search_uses_index(self):
+        """Test pagination over a generated data set."""
+        backend = FakeNLMBackend(generate_notebooks(100))
+
+        page, cursor = await backend.search_notebooks(sort="title", limit=40)
+        rest, end = await backend.search_notebooks(sort="title", cursor=cursor)
+        assert len(page) == 40 and len(rest) == 60 and end is None
+
+    async def test_injected_error(self):
+        """Test errors can be injected per method and cleared."""
+        backend = FakeNLMBackend()
+        backend.inject_error("list_notebooks")
+
+        with pytest.raises(NLMError):
+            await backend.list_notebooks()
+        backend.clear_errors()
+        assert await backend.list_notebooks()
+
+    async def test_error_rate(self):
+        """Test random failures follow error_rate deterministically."""
+        backend = FakeNLMBackend(error_rate=0.5, seed=3)
+        outcomes = []
+        for _ in range(200):
+            try:
+                await backend.get_notebook("demo-nb-1")
+                outcomes.append(True)
+            except NLMError:
+                outcomes.append(False)
+
+        assert 60 < outcomes.count(False) < 140
+        assert backend.calls == 200
+
+    async def test_latency(self):
+        """Test every call waits for the configured latency."""
+        import time
+
+        backend = FakeNLMBackend(latency=0.05)
+        start = time.monotonic()
+        await backend.list_notebooks()
+        assert time.monotonic() - start >= 0.05
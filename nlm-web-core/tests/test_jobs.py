@@ -0,0 +1,209 @@
+"""Tests for background jobs."""
+import asyncio
+import time
+import pytest
+from nlm_web_core import jobs as jobs_module
+from nlm_web_core.fake_backend import FakeNLMBackend
+from nlm_web_core.jobs import Job, JobQueue, JobStore
+from nlm_web_core.nlm_client import NLMError
+from nlm_web_core.records import Audio
+
+
+async def wait_done(queue: JobQueue, job_id: str, timeout: float = 2.0) -> Job:
+    """Wait until a job has finished."""
+    async with asyncio.timeout(timeout):
+        while True:
+            job = queue.get(job_id)
+            assert job is not None
+            if job.done:
+                return job
+            await asyncio.sleep(0.005)
+
+
+class ScriptedAudio:
+    """Client whose poll_audio returns (or raises) scripted results."""
+
+    def __init__(self, polls: list):
+        self.polls = polls
+        self.created = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def create_audio(self, notebook_id: str, instructions: str) -> Audio:
+        await self.release.wait()
+        self.created += 1
+        return Audio("aud1", status="pending", instructions=instructions)
+
+    async def poll_audio(self, notebook_id: str):
+        result = self.polls.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class TestJobStore:
+    """Test SQLite persistence."""
+
+    def test_roundtrip_and_queries(self, tmp_path):
+        """Test saved jobs can be read back, listed and reopened."""
+        path = str(tmp_path / "jobs.db")
+        store = JobStore(path)
+        store.save(Job("a", "audio", "nb1", created_at=1.0, updated_at=1.0))
+        store.save(Job("b", "guide", "nb2", created_at=2.0, updated_at=2.0))
+        store.save(Job("c", "faq", "nb1", status="succeeded", created_at=3.0, updated_at=3.0))
+        store.close()
+
+        store = JobStore(path)
+        assert store.get("a") == Job("a", "audio", "nb1", created_at=1.0, updated_at=1.0)
+        assert store.get("missing") is None
+        assert [job.job_id for job in store.list_jobs()] == ["c", "b", "a"]
+        assert [job.job_id for job in store.list_jobs("nb1")] == ["c", "a"]
+        assert [job.job_id for job in store.unfinished()] == ["a", "b"]
+
+
+class TestJobQueue:
+    """Test running, polling and resuming jobs."""
+
+    async def test_generation_job(self):
+        """Test a generation job stores the generated content."""
+        queue = JobQueue(FakeNLMBackend(), JobStore())
+        job = queue.submit("guide", "demo-nb-1")
+        assert job.status == "queued"
+
+        job = await wait_done(queue, job.job_id)
+
+        assert job.status == "succeeded"
+        assert job.result.startswith("# Study Guide")
+        await queue.close()
+
+    async def test_audio_job_polls_until_ready(self):
+        """Test audio jobs poll the backend until the overview is ready."""
+        backend = FakeNLMBackend(audio_delay=0.05)
+        queue = JobQueue(backend, JobStore(), poll_interval=0.01)
+
+        job = await wait_done(queue, queue.submit("audio", "demo-nb-1").job_id)
+
+        assert job.status == "succeeded"
+        assert job.result == backend._audio["demo-nb-1"].audio_id
+        assert job.polls >= 1
+        await queue.close()
+
+    async def test_poll_backoff(self, monkeypatch):
+        """Test poll intervals double up to the cap and transient errors are polled through."""
+        delays = []
+        sleep = asyncio.sleep
+
+        async def record(delay):
+            if delay >= 1:  # Not wait_done's own sleeps
+                delays.append(delay)
+            await sleep(0)
+
+        monkeypatch.setattr(jobs_module.asyncio, "sleep", record)
+        client = ScriptedAudio(
+            [None, NLMError("503 Service Unavailable"), None, None, Audio("aud1", "ready")]
+        )
+        queue = JobQueue(client, JobStore(), poll_interval=1, poll_max_interval=4)
+
+        job = await wait_done(queue, queue.submit("audio", "nb1").job_id)
+
+        assert (job.status, job.result, job.polls) == ("succeeded", "aud1", 5)
+        assert delays == [1, 2, 4, 4, 4]
+        await queue.close()
+
+    async def test_poll_errors_and_timeout_fail_job(self):
+        """Test non-transient errors and the poll timeout fail the job."""
+        queue = JobQueue(ScriptedAudio([NLMError("audio deleted")]), JobStore(), poll_interval=0)
+        job = await wait_done(queue, queue.submit("audio", "nb1").job_id)
+        assert (job.status, job.error) == ("failed", "audio deleted")
+        await queue.close()
+
+        queue = JobQueue(
+            ScriptedAudio([None] * 100), JobStore(), poll_interval=0.01, poll_timeout=0.05
+        )
+        job = await wait_done(queue, queue.submit("audio", "nb1").job_id)
+        assert job.status == "failed"
+        assert "not ready" in job.error
+        await queue.close()
+
+    async def test_failed_command(self):
+        """Test a failing command is recorded on the job."""
+        backend = FakeNLMBackend()
+        queue = JobQueue(backend, JobStore())
+
+        job = await wait_done(queue, queue.submit("faq", "missing").job_id)
+
+        assert job.status == "failed"
+        assert "not found" in job.error
+        await queue.close()
+
+    async def test_resume_after_restart(self, tmp_path):
+        """Test queued and polling jobs continue after the queue restarts."""
+        path = str(tmp_path / "jobs.db")
+        client = ScriptedAudio([None] * 3 + [Audio("aud1", "ready")] * 2)
+        client.release.clear()
+        queue = JobQueue(client, JobStore(path), workers=1, poll_interval=60)
+        polling = queue.submit("audio", "nb1")
+        queued = queue.submit("audio", "nb2")
+        client.release.set()
+        async with asyncio.timeout(1):
+            while queue.get(polling.job_id).status != "polling":
+                await asyncio.sleep(0.005)
+        await queue.close()
+        queue.store.close()
+        assert client.created == 1
+
+        queue = JobQueue(client, JobStore(path), workers=1, poll_interval=0)
+        queue.start()
+
+        assert (await wait_done(queue, polling.job_id)).status == "succeeded"
+        assert (await wait_done(queue, queued.job_id)).status == "succeeded"
+        assert client.created == 2
+        await queue.close()
+
+    async def test_running_jobs_are_not_created_again(self, tmp_path):
+        """Test jobs interrupted mid-command do not send their create twice."""
+        path = str(tmp_path / "jobs.db")
+        store = JobStore(path)
+        now = time.time()
+        for job_id, kind in (("a", "audio"), ("v", "video"), ("g", "guide")):
+            store.save(
+                Job(job_id, kind, "demo-nb-1", status="running", created_at=now, updated_at=now)
+            )
+        store.close()
+        # The interrupted run's create reached the backend; another must not
+        client = FakeNLMBackend()
+        await client.create_audio("demo-nb-1", "Overview")
+        client.inject_error("create_audio")
+        client.inject_error("create_video")
+
+        queue = JobQueue(client, JobStore(path), poll_interval=0)
+        queue.start()
+
+        audio = await wait_done(queue, "a")
+        video = await wait_done(queue, "v")
+        guide = await wait_done(queue, "g")
+        assert (audio.status, audio.error) == ("succeeded", None)
+        assert audio.polls == 1
+        assert video.status == "failed"
+        assert "restart" in video.error
+        assert guide.status == "succeeded"
+        await queue.close()
+
+    async def test_subscribe(self):
+        """Test listeners see every status change until they unsubscribe."""
+        queue = JobQueue(FakeNLMBackend(), JobStore())
+        seen = []
+        unsubscribe = queue.subscribe(lambda job: seen.append(job.status))
+
+        job = await wait_done(queue, queue.submit("outline", "demo-nb-1").job_id)
+        unsubscribe()
+        queue.submit("outline", "demo-nb-1")
+
+        assert seen == ["queued", "running", "succeeded"]
+        assert job.status == "succeeded"
+        await queue.close()
+
+    def test_unknown_kind(self):
+        """Test unknown job kinds are rejected."""
+        with pytest.raises(ValueError):
+            JobQueue(FakeNLMBackend(), JobStore()).submit("podcast", "demo-nb-1")
@@ -0,0 +1,47 @@
+"""Tests for extracting JSON from nlm command output."""
+import json
+import pytest
+from nlm_web_core import json_output
+from nlm_web_core.json_output import extract_json
+
+NOTEBOOKS = [{"project_id": "nb1", "title": "Notebook 1"}]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Run each test with and without the orjson backend."""
+    if request.param == "json":
+        monkeypatch.setattr(json_output, "orjson", None)
+    return request.param
+
+
+class TestExtractJson:
+    """Test locating the JSON payload in command output."""
+
+    def test_compact(self, backend):
+        """Test output that is a single JSON line."""
+        assert extract_json(json.dumps(NOTEBOOKS) + "\n") == NOTEBOOKS
+
+    def test_pretty_printed(self, backend):
+        """Test multi-line JSON is parsed as one document."""
+        assert extract_json(json.dumps(NOTEBOOKS, indent=2)) == NOTEBOOKS
+
+    def test_log_lines_before_json(self, backend):
+        """Test progress lines before the payload are skipped."""
+        output = "Fetching notebooks...\n[INFO] 1 found\n" + json.dumps(
+            NOTEBOOKS, indent=2
+        )
+
+        assert extract_json(output) == NOTEBOOKS
+
+    def test_last_document_wins(self, backend):
+        """Test the last JSON document is returned."""
+        assert extract_json('{"stage": 1}\nlog\n{"stage": 2}\n') == {"stage": 2}
+
+    def test_trailing_text_on_line_is_not_json(self, backend):
+        """Test a bracketed prefix followed by text is treated as log output."""
+        assert extract_json('{"id": 1}\n[1] done\n') == {"id": 1}
+
+    def test_no_json_returns_output(self, backend):
+        """Test plain text output is returned unchanged."""
+        assert extract_json("Deleted notebook nb1\n") == "Deleted notebook nb1\n"
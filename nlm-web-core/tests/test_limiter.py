@@ -0,0 +1,140 @@
+"""Tests for nlm command admission control."""
+import asyncio
+import pytest
+from nlm_web_core.limiter import AsyncConcurrencyLimiter, QueueFullError, QueueTimeoutError
+from nlm_web_core.nlm_client import (
+    AsyncNLMClient,
+    NLMOverloadedError,
+    NotebookBusyError,
+)
+
+
+class TestAsyncConcurrencyLimiter:
+    """Test the asyncio limiter."""
+
+    async def test_rejects_when_queue_full(self):
+        """Test commands beyond the queue bound fail immediately."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=1, max_queue=0)
+
+        async with limiter.acquire():
+            with pytest.raises(QueueFullError) as exc_info:
+                async with limiter.acquire():
+                    pass
+
+        assert exc_info.value.notebook_id is None
+        assert limiter.stats()["rejected"] == 1
+
+    async def test_queued_command_runs_after_release(self):
+        """Test a waiting command is granted the freed slot."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=1, max_queue=1)
+        started = asyncio.Event()
+
+        async def waiter():
+            async with limiter.acquire():
+                started.set()
+
+        async with limiter.acquire():
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0.05)
+            assert not started.is_set()
+            assert limiter.stats()["queued"] == 1
+        await task
+
+        assert started.is_set()
+        stats = limiter.stats()
+        assert stats["running"] == 0
+        assert stats["queue_waits"] == 1
+        assert stats["queue_wait_seconds_max"] > 0
+
+    async def test_queue_timeout(self):
+        """Test a waiter gives up after queue_timeout."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=1, queue_timeout=0.01)
+
+        async with limiter.acquire():
+            with pytest.raises(QueueTimeoutError):
+                async with limiter.acquire():
+                    pass
+
+        assert limiter.stats()["timed_out"] == 1
+        assert limiter.stats()["queued"] == 0
+
+    async def test_client_maps_rejection(self):
+        """Test AsyncNLMClient reports a full queue as NLMOverloadedError."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=1, max_queue=0)
+        client = AsyncNLMClient("token", "cookies", limiter=limiter)
+
+        async with limiter.acquire():
+            with pytest.raises(NLMOverloadedError):
+                await client.list_notebooks()
+
+    async def test_bounds_concurrency(self):
+        """Test no more than max_concurrent commands run at once."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=2, max_queue=10)
+        running = peak = 0
+
+        async def command():
+            nonlocal running, peak
+            async with limiter.acquire():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(command() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.stats()["admitted"] == 6
+
+    async def test_per_notebook_limit(self):
+        """Test one busy notebook does not block others."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=4, max_per_notebook=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.acquire("nb1"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        async with limiter.acquire("nb2"):
+            assert limiter.stats()["running"] == 2
+            assert limiter.stats()["queued"] == 1
+
+        with pytest.raises(QueueFullError) as exc_info:
+            async with limiter.acquire("nb1"):
+                pass
+        assert exc_info.value.notebook_id == "nb1"
+
+        release.set()
+        await asyncio.gather(holder, queued)
+        assert limiter.stats()["running"] == 0
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test cancelling a queued command frees its queue entry."""
+        limiter = AsyncConcurrencyLimiter(max_concurrent=1)
+
+        async with limiter.acquire():
+            waiter = asyncio.create_task(limiter.acquire().__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        assert limiter.stats()["queued"] == 0
+        assert limiter.stats()["running"] == 0
+
+    async def test_client_maps_notebook_rejection(self):
+        """Test AsyncNLMClient reports a full notebook queue as NotebookBusyError."""
+        limiter = AsyncConcurrencyLimiter(max_per_notebook=1)
+        client = AsyncNLMClient("token", "cookies", limiter=limiter)
+
+        async with limiter.acquire("nb1"):
+            queued = asyncio.create_task(limiter.acquire("nb1").__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(NotebookBusyError):
+                await client.list_sources("nb1")
+            queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
@@ -0,0 +1,162 @@
+"""Tests for the media cache and range parsing."""
+import asyncio
+import os
+import pytest
+from nlm_web_core.media import MediaCache, parse_range
+from nlm_web_core.nlm_client import AsyncNLMClient
+
+
+def writer(data: bytes, calls: list):
+    """Download function writing fixed bytes and counting calls."""
+
+    async def download(path: str) -> None:
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    return download
+
+
+class TestParseRange:
+    """Test Range header parsing."""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=900-5000", (900, 999)),
+            ("bytes=-5000", (0, 999)),
+        ],
+    )
+    def test_satisfiable(self, header, expected):
+        """Test explicit, open-ended and suffix ranges."""
+        assert parse_range(header, 1000) == expected
+
+    @pytest.mark.parametrize(
+        "header", ["bytes=1000-", "bytes=5-1", "bytes=-0", "bytes=0-1,5-9", "items=0-1"]
+    )
+    def test_rejected(self, header):
+        """Test out-of-bounds, multi-range and malformed headers."""
+        with pytest.raises(ValueError):
+            parse_range(header, 1000)
+
+
+class TestMediaCache:
+    """Test download caching and eviction."""
+
+    async def test_concurrent_fetches_share_download(self, tmp_path):
+        """Test one download serves concurrent and later requests."""
+        cache = MediaCache(str(tmp_path))
+        calls = []
+        download = writer(b"x" * 100, calls)
+
+        files = await asyncio.gather(
+            *(cache.fetch("audio/nb1", ".wav", download) for _ in range(5))
+        )
+        again = await cache.fetch("audio/nb1", ".wav", download)
+
+        assert len(calls) == 1
+        assert {f.path for f in files} == {again.path}
+        assert again.size == 100 and again.media_type.startswith("audio/")
+        assert not list(tmp_path.glob("*.part"))
+
+    async def test_lru_eviction_by_size(self, tmp_path):
+        """Test least recently used files go once the total exceeds the bound."""
+        cache = MediaCache(str(tmp_path), max_bytes=250)
+        calls = []
+        for key in ("a", "b"):
+            await cache.fetch(key, ".wav", writer(b"x" * 100, calls))
+        assert cache.get("a") is not None  # "b" is now least recently used
+
+        await cache.fetch("c", ".wav", writer(b"x" * 100, calls))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["bytes"] == 200
+        assert len(list(tmp_path.iterdir())) == 2
+
+    async def test_max_age_and_discard(self, tmp_path):
+        """Test stale and discarded files are downloaded again."""
+        now = [1e9]
+        cache = MediaCache(str(tmp_path), max_age=60, clock=lambda: now[0])
+        calls = []
+        download = writer(b"x", calls)
+        media = await cache.fetch("a", ".wav", download)
+        now[0] = media.modified + 30
+        await cache.fetch("a", ".wav", download)
+        assert len(calls) == 1
+
+        now[0] = media.modified + 61
+        await cache.fetch("a", ".wav", download)
+        now[0] = media.modified
+        cache.discard("a")
+        await cache.fetch("a", ".wav", download)
+        assert len(calls) == 3
+
+    async def test_refetch_after_expiry_keeps_new_file(self, tmp_path):
+        """Test a stale file downloaded again is served from disk, not unlinked."""
+        now = [1e9]
+        cache = MediaCache(str(tmp_path), max_age=60, clock=lambda: now[0])
+        media = await cache.fetch("a", ".wav", writer(b"old", []))
+
+        now[0] = media.modified + 61
+        fresh = await cache.fetch("a", ".wav", writer(b"fresh!", []))
+
+        assert fresh.path == media.path
+        assert fresh.path.read_bytes() == b"fresh!"
+        assert cache.stats()["bytes"] == 6
+        assert cache.stats()["files"] == 1
+
+    async def test_refetch_with_new_suffix_removes_old_file(self, tmp_path):
+        """Test a file replaced under another extension does not linger."""
+        now = [1e9]
+        cache = MediaCache(str(tmp_path), max_age=60, clock=lambda: now[0])
+        old = await cache.fetch("a", ".wav", writer(b"old", []))
+
+        now[0] = old.modified + 61
+        fresh = await cache.fetch("a", ".mp3", writer(b"fresh", []))
+
+        assert not old.path.exists()
+        assert [path.name for path in tmp_path.iterdir()] == [fresh.path.name]
+
+    async def test_reopen_adopts_files(self, tmp_path):
+        """Test cached files survive a restart and partial downloads do not."""
+        await MediaCache(str(tmp_path)).fetch("a", ".wav", writer(b"x" * 10, []))
+        (tmp_path / "leftover.123.part").write_bytes(b"partial")
+
+        cache = MediaCache(str(tmp_path))
+
+        assert cache.get("a").size == 10
+        assert not (tmp_path / "leftover.123.part").exists()
+
+    async def test_failed_download_leaves_nothing(self, tmp_path):
+        """Test errors propagate and temporary files are removed."""
+        cache = MediaCache(str(tmp_path))
+
+        async def failing(path: str) -> None:
+            with open(path, "wb") as f:
+                f.write(b"half")
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await cache.fetch("a", ".wav", failing)
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestClientDownload:
+    """Test download_media through the stub CLI."""
+
+    async def test_downloads_to_path(self, stub_nlm, tmp_path):
+        """Test the file is written by a one-shot --direct-rpc process."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(media_bytes=1024))
+        path = tmp_path / "out.wav"
+
+        await client.download_media("nb1", "audio", str(path))
+
+        assert path.read_bytes() == bytes(range(256)) * 4
+        assert client._target_notebook(["--direct-rpc", "audio-download", "nb1"]) == "nb1"
+        with pytest.raises(ValueError):
+            await client.download_media("nb1", "podcast", os.devnull)
@@ -0,0 +1,98 @@
+"""Tests for Prometheus metrics."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from nlm_web_core.metrics import Counter, Histogram, Metrics, MetricsMiddleware
+from nlm_web_core.nlm_client import AsyncNLMClient, NLMTimeoutError
+from nlm_web_core.timeouts import TimeoutPolicy
+
+
+class TestExposition:
+    """Test the text exposition format."""
+
+    def test_counter(self):
+        """Test counters render one sample per label set."""
+        counter = Counter("exits_total", "Exits.", ("command", "code"))
+        counter.inc("list", "0")
+        counter.inc("list", "0")
+        counter.inc("sources", '1"')
+
+        assert list(counter.render()) == [
+            "# HELP exits_total Exits.",
+            "# TYPE exits_total counter",
+            'exits_total{command="list",code="0"} 2',
+            'exits_total{command="sources",code="1\\""} 1',
+        ]
+
+    def test_histogram(self):
+        """Test histogram buckets are cumulative and end with +Inf, sum and count."""
+        histogram = Histogram("latency_seconds", "Latency.", ("command",), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, "list")
+
+        assert list(histogram.render())[2:] == [
+            'latency_seconds_bucket{command="list",le="0.1"} 1',
+            'latency_seconds_bucket{command="list",le="1"} 2',
+            'latency_seconds_bucket{command="list",le="+Inf"} 3',
+            'latency_seconds_sum{command="list"} 5.55',
+            'latency_seconds_count{command="list"} 3',
+        ]
+
+    def test_callback_replaced(self):
+        """Test callbacks are read at render time and replaced by name."""
+        metrics = Metrics()
+        metrics.add_callback("cache_hits_total", "Hits.", lambda: 1)
+        metrics.add_callback("cache_hits_total", "Hits.", lambda: 7)
+
+        text = metrics.render()
+
+        assert text.count("# TYPE cache_hits_total counter") == 1
+        assert "cache_hits_total 7\n" in text
+
+
+class TestMiddleware:
+    """Test HTTP request latency by route."""
+
+    def test_labels_by_route_template(self):
+        """Test requests are labelled with the route's path template and status."""
+        metrics = Metrics()
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: str):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/nowhere")
+
+        assert metrics.request_seconds.count("GET", "/items/{item_id}", "200") == 2
+        assert metrics.request_seconds.count("GET", "other", "404") == 1
+
+
+class TestClientMetrics:
+    """Test nlm commands are instrumented."""
+
+    async def test_commands_recorded(self, stub_nlm):
+        """Test latency, exit codes, parse time, spawn time and timeouts are recorded."""
+        metrics = Metrics()
+        client = AsyncNLMClient(
+            "token",
+            "cookies",
+            nlm_path=stub_nlm(),
+            metrics=metrics,
+            timeouts=TimeoutPolicy(timeouts={"sources": 0}),
+        )
+
+        await client.list_notebooks()
+        with pytest.raises(NLMTimeoutError):
+            await client.list_sources("nb1")
+
+        assert metrics.command_seconds.count("list") == 1
+        assert metrics.exits.value("list", "0") == 1
+        assert metrics.parse_seconds.count("list") == 1
+        assert metrics.spawn_seconds.count() == 2
+        assert metrics.timeouts.value("sources") == 1
+        assert metrics.in_flight.value() == 0
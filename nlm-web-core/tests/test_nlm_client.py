@@ -1,7 +1,14 @@
 """Tests for NLM CLI wrapper client."""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from app.nlm_client import NLMClient, NLMError, NotebookNotFoundError
+from unittest.mock import AsyncMock, Mock, patch
+from nlm_web_core.breaker import CircuitBreaker
+from nlm_web_core.nlm_client import (
+    NLMClient,
+    NLMError,
+    NLMUnavailableError,
+    NotebookNotFoundError,
+)
+from nlm_web_core.retry import RetryPolicy
 
 
 class TestNLMClientInit:
@@ -22,7 +29,6 @@ class TestNLMClientInit:
 class TestListNotebooks:
     """Test listing notebooks."""
 
-    @patch("subprocess.run")
     def test_list_notebooks_success(self, mock_run):
         """Test successful notebook listing."""
         # Arrange
@@ -38,11 +44,10 @@ class TestListNotebooks:
 
         # Assert
         assert len(notebooks) == 1
-        assert notebooks[0]["project_id"] == "nb1"
-        assert notebooks[0]["title"] == "Notebook 1"
+        assert notebooks[0].project_id == "nb1"
+        assert notebooks[0].title == "Notebook 1"
         mock_run.assert_called_once()
 
-    @patch("subprocess.run")
     def test_list_notebooks_empty(self, mock_run):
         """Test listing notebooks when none exist."""
         # Arrange
@@ -55,7 +60,6 @@ class TestListNotebooks:
         # Assert
         assert notebooks == []
 
-    @patch("subprocess.run")
     def test_list_notebooks_cli_error(self, mock_run):
         """Test handling CLI errors."""
         # Arrange
@@ -72,7 +76,6 @@ class TestListNotebooks:
 class TestCreateNotebook:
     """Test creating notebooks."""
 
-    @patch("subprocess.run")
     def test_create_notebook_success(self, mock_run):
         """Test successful notebook creation."""
         # Arrange
@@ -87,10 +90,9 @@ class TestCreateNotebook:
         notebook = client.create_notebook(title="New Notebook", emoji="📚")
 
         # Assert
-        assert notebook["project_id"] == "nb123"
-        assert notebook["title"] == "New Notebook"
+        assert notebook.project_id == "nb123"
+        assert notebook.title == "New Notebook"
 
-    @patch("subprocess.run")
     def test_create_notebook_without_emoji(self, mock_run):
         """Test creating notebook without emoji."""
         # Arrange
@@ -105,13 +107,12 @@ class TestCreateNotebook:
         notebook = client.create_notebook(title="New Notebook")
 
         # Assert
-        assert notebook["project_id"] == "nb123"
+        assert notebook.project_id == "nb123"
 
 
 class TestDeleteNotebook:
     """Test deleting notebooks."""
 
-    @patch("subprocess.run")
     def test_delete_notebook_success(self, mock_run):
         """Test successful notebook deletion."""
         # Arrange
@@ -124,7 +125,6 @@ class TestDeleteNotebook:
         # Assert
         assert result is True
 
-    @patch("subprocess.run")
     def test_delete_notebook_not_found(self, mock_run):
         """Test deleting non-existent notebook."""
         # Arrange
@@ -141,7 +141,6 @@ class TestDeleteNotebook:
 class TestListSources:
     """Test listing sources."""
 
-    @patch("subprocess.run")
     def test_list_sources_success(self, mock_run):
         """Test successful source listing."""
         # Arrange
@@ -157,13 +156,12 @@ class TestListSources:
 
         # Assert
         assert len(sources) == 1
-        assert sources[0]["source_id"]["source_id"] == "src1"
+        assert sources[0].source_id == "src1"
 
 
 class TestAddSource:
     """Test adding sources."""
 
-    @patch("subprocess.run")
     def test_add_source_from_url(self, mock_run):
         """Test adding source from URL."""
         # Arrange
@@ -180,9 +178,8 @@ class TestAddSource:
         )
 
         # Assert
-        assert source["source_id"]["source_id"] == "src123"
+        assert source.source_id == "src123"
 
-    @patch("subprocess.run")
     def test_add_source_from_text(self, mock_run):
         """Test adding source from text."""
         # Arrange
@@ -199,13 +196,12 @@ class TestAddSource:
         )
 
         # Assert
-        assert source["source_id"]["source_id"] == "src123"
+        assert source.source_id == "src123"
 
 
 class TestGenerateContent:
     """Test content generation."""
 
-    @patch("subprocess.run")
     def test_generate_guide(self, mock_run):
         """Test generating study guide."""
         # Arrange
@@ -221,7 +217,6 @@ class TestGenerateContent:
         assert "# Study Guide" in guide
         assert "Content here" in guide
 
-    @patch("subprocess.run")
     def test_generate_outline(self, mock_run):
         """Test generating outline."""
         # Arrange
@@ -240,7 +235,6 @@ class TestGenerateContent:
 class TestAudioOperations:
     """Test audio overview operations."""
 
-    @patch("subprocess.run")
     def test_create_audio(self, mock_run):
         """Test creating audio overview."""
         # Arrange
@@ -257,10 +251,9 @@ class TestAudioOperations:
         )
 
         # Assert
-        assert audio["audio_id"] == "aud123"
-        assert audio["status"] == "processing"
+        assert audio.audio_id == "aud123"
+        assert audio.status == "processing"
 
-    @patch("subprocess.run")
     def test_get_audio(self, mock_run):
         """Test getting audio overview."""
         # Arrange
@@ -275,5 +268,97 @@ class TestAudioOperations:
         audio = client.get_audio(notebook_id="nb123")
 
         # Assert
-        assert audio["status"] == "ready"
-        assert "url" in audio
+        assert audio.status == "ready"
+        assert audio.url == "https://example.com/audio.mp3"
+
+    def test_poll_audio_reads_text_output(self, mock_run):
+        """Test readiness is detected from the CLI's human-readable output."""
+        # Arrange
+        mock_run.side_effect = [
+            Mock(returncode=0, stdout="Audio overview is not ready yet.\n", stderr=""),
+            Mock(
+                returncode=0,
+                stdout="Audio Overview:\n  Title: T\n  ID: aud9\n  Ready: true\n",
+                stderr="",
+            ),
+        ]
+        client = NLMClient(auth_token="token", cookies="cookies")
+
+        # Act / Assert
+        assert client.poll_audio("nb123") is None
+        audio = client.poll_audio("nb123")
+        assert (audio.audio_id, audio.status) == ("aud9", "ready")
+
+
+class TestResilience:
+    """Test retries of reads and the circuit breaker."""
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    def test_read_retried_after_transient_error(self, mock_sleep, mock_run):
+        """Test a read rejected by the upstream is retried after a backoff."""
+        # Arrange
+        mock_run.side_effect = [
+            Mock(returncode=1, stdout="", stderr="429 Too Many Requests"),
+            Mock(returncode=0, stdout="[]", stderr=""),
+        ]
+        client = NLMClient("token", "cookies", retry_policy=RetryPolicy(rng=lambda: 1.0))
+
+        # Act
+        notebooks = client.list_notebooks()
+
+        # Assert
+        assert notebooks == []
+        assert mock_run.call_count == 2
+        mock_sleep.assert_called_once_with(0.2)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    def test_writes_and_permanent_errors_not_retried(self, mock_sleep, mock_run):
+        """Test only transient errors on read-only commands are retried."""
+        # Arrange
+        mock_run.return_value = Mock(returncode=1, stdout="", stderr="503 Service Unavailable")
+        client = NLMClient("token", "cookies", retry_policy=RetryPolicy())
+
+        # Act / Assert
+        with pytest.raises(NLMError):
+            client.create_notebook("Title")
+        assert mock_run.call_count == 1
+
+        mock_run.reset_mock()
+        mock_run.return_value = Mock(returncode=1, stdout="", stderr="permission denied")
+        with pytest.raises(NLMError):
+            client.list_notebooks()
+        assert mock_run.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_breaker_fails_fast(self, mock_run):
+        """Test upstream failures open the circuit and later commands are not run."""
+        # Arrange
+        mock_run.return_value = Mock(returncode=1, stdout="", stderr="503 Service Unavailable")
+        client = NLMClient(
+            "token", "cookies", breaker=CircuitBreaker(min_calls=2, reset_timeout=30)
+        )
+        for _ in range(2):
+            with pytest.raises(NLMError):
+                client.list_notebooks()
+
+        # Act
+        with pytest.raises(NLMUnavailableError) as excinfo:
+            client.list_notebooks()
+
+        # Assert
+        assert mock_run.call_count == 2
+        assert excinfo.value.retry_after == pytest.approx(30, abs=1)
+
+    def test_breaker_ignores_command_errors(self, mock_run):
+        """Test errors the upstream answered deliberately keep the circuit closed."""
+        # Arrange
+        mock_run.return_value = Mock(returncode=1, stdout="", stderr="notebook not found")
+        client = NLMClient("token", "cookies", breaker=CircuitBreaker(min_calls=2))
+
+        # Act
+        for _ in range(3):
+            with pytest.raises(NotebookNotFoundError):
+                client.list_sources("missing")
+
+        # Assert
+        assert client.breaker.state == "closed"
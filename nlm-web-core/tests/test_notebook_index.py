@@ -0,0 +1,224 @@
+"""Tests for the notebook index."""
+from unittest.mock import Mock
+import pytest
+from nlm_web_core.notebook_index import NotebookIndex
+from nlm_web_core.nlm_client import NLMClient, NotebookNotFoundError
+from nlm_web_core.cache import ResponseCache
+from nlm_web_core.records import Notebook
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestNotebookIndex:
+    """Test NotebookIndex lookups and expiry."""
+
+    def test_lookup_after_replace(self):
+        """Test notebooks are found by project_id."""
+        index = NotebookIndex()
+        index.replace([Notebook("nb1", "One")])
+
+        assert index.get("nb1").title == "One"
+        assert index.get("nb2") is None
+
+    def test_empty_index_misses(self):
+        """Test lookups miss before the first listing."""
+        assert NotebookIndex().get("nb1") is None
+
+    def test_expires_after_ttl(self):
+        """Test entries stop being served once the listing is stale."""
+        clock = FakeClock()
+        index = NotebookIndex(ttl=10, clock=clock)
+        index.replace([Notebook("nb1")])
+
+        clock.now = 9.9
+        assert index.get("nb1") is not None
+        clock.now = 10.0
+        assert index.get("nb1") is None
+
+    def test_discard_and_invalidate(self):
+        """Test targeted removal and full invalidation."""
+        index = NotebookIndex()
+        index.replace([Notebook("nb1"), Notebook("nb2")])
+
+        index.discard("nb1")
+        assert index.get("nb1") is None
+        assert index.get("nb2") is not None
+
+        index.invalidate()
+        assert index.get("nb2") is None
+
+
+class TestNotebookIndexPages:
+    """Test paginated, filtered and sorted views."""
+
+    @pytest.fixture
+    def index(self):
+        index = NotebookIndex()
+        index.replace(
+            [
+                Notebook("nb1", "Banana", created_at="2024-01-02T00:00:00Z"),
+                Notebook("nb2", "apple pie", created_at="2024-01-03T00:00:00Z"),
+                Notebook("nb3", "Cherry", created_at="2024-01-01T00:00:00Z"),
+                Notebook("nb4", "Apple", created_at=None),
+            ]
+        )
+        return index
+
+    @staticmethod
+    def ids(notebooks):
+        return [nb.project_id for nb in notebooks]
+
+    def test_default_keeps_listing_order(self, index):
+        """Test an unsorted page preserves the CLI's order."""
+        notebooks, cursor = index.page()
+
+        assert self.ids(notebooks) == ["nb1", "nb2", "nb3", "nb4"]
+        assert cursor is None
+
+    @pytest.mark.parametrize(
+        "sort,expected",
+        [
+            ("title", ["nb4", "nb2", "nb1", "nb3"]),
+            ("-title", ["nb3", "nb1", "nb2", "nb4"]),
+            ("created", ["nb4", "nb3", "nb1", "nb2"]),
+            ("-created", ["nb2", "nb1", "nb3", "nb4"]),
+        ],
+    )
+    def test_sort(self, index, sort, expected):
+        """Test ascending and descending sorts."""
+        assert self.ids(index.page(sort=sort)[0]) == expected
+
+    @pytest.mark.parametrize("sort", [None, "title", "-title", "created", "-modified"])
+    def test_cursor_walks_every_notebook_once(self, index, sort):
+        """Test following cursors yields the full ordering in pages."""
+        pages = []
+        cursor = None
+        while True:
+            notebooks, cursor = index.page(sort=sort, limit=3 if pages else 1, cursor=cursor)
+            pages.append(self.ids(notebooks))
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [1, 3]
+        assert sum(pages, []) == self.ids(index.page(sort=sort)[0])
+
+    def test_exact_final_page_has_no_cursor(self, index):
+        """Test no cursor is returned when nothing follows the page."""
+        assert index.page(limit=4)[1] is None
+
+    def test_query_filters_titles(self, index):
+        """Test title search is a case-insensitive substring match."""
+        notebooks, cursor = index.page(query="APPLE", sort="title", limit=1)
+        assert self.ids(notebooks) == ["nb4"]
+
+        notebooks, cursor = index.page(query="APPLE", sort="title", limit=1, cursor=cursor)
+        assert self.ids(notebooks) == ["nb2"]
+        assert cursor is None
+
+    def test_sorted_order_is_reused(self, index):
+        """Test each order is built once per listing."""
+        index.page(sort="title")
+        order = index._orders["title"]
+        index.page(sort="-title", limit=1)
+
+        assert index._orders["title"] is order
+
+    def test_same_listing_keeps_orders(self):
+        """Test replacing with the already indexed listing is a no-op."""
+        listing = (Notebook("nb1", "One"),)
+        index = NotebookIndex()
+        index.replace(listing)
+        index.page(sort="title")
+
+        index.replace(listing)
+        assert "title" in index._orders
+
+        index.replace((Notebook("nb1", "One"),))
+        assert not index._orders
+
+    def test_discard_drops_from_pages(self, index):
+        """Test discarded notebooks leave sorted views."""
+        index.page(sort="title")
+        index.discard("nb4")
+
+        assert "nb4" not in self.ids(index.page(sort="title")[0])
+
+    @pytest.mark.parametrize("kwargs", [{"sort": "size"}, {"cursor": "not-a-cursor"}])
+    def test_invalid_arguments(self, index, kwargs):
+        """Test unknown sorts and malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            index.page(**kwargs)
+
+    def test_cursor_bound_to_sort(self, index):
+        """Test a cursor cannot be reused with another sort."""
+        cursor = index.page(sort="title", limit=1)[1]
+
+        with pytest.raises(ValueError):
+            index.page(sort="-title", cursor=cursor)
+
+
+class TestClientNotebookLookup:
+    """Test NLMClient.get_notebook uses the index."""
+
+    def test_get_notebook_hits_index(self, mock_run):
+        """Test repeated lookups list notebooks only once."""
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout='[{"project_id": "nb1", "title": "One"}, {"project_id": "nb2"}]',
+            stderr="",
+        )
+        client = NLMClient(auth_token="token", cookies="cookies")
+
+        assert client.get_notebook("nb1").title == "One"
+        assert client.get_notebook("nb2").project_id == "nb2"
+        assert mock_run.call_count == 1
+
+    def test_get_notebook_miss_refreshes(self, mock_run):
+        """Test a miss falls back to a fresh listing."""
+        mock_run.return_value = Mock(returncode=0, stdout="[]", stderr="")
+        client = NLMClient(auth_token="token", cookies="cookies")
+        client.list_notebooks()
+
+        with pytest.raises(NotebookNotFoundError):
+            client.get_notebook("nb1")
+        assert mock_run.call_count == 2
+
+    def test_create_and_delete_invalidate(self, mock_run):
+        """Test mutations keep the index consistent."""
+        mock_run.return_value = Mock(
+            returncode=0, stdout='[{"project_id": "nb1"}]', stderr=""
+        )
+        client = NLMClient(auth_token="token", cookies="cookies")
+        client.list_notebooks()
+
+        client.delete_notebook("nb1")
+        assert client.notebook_index.get("nb1") is None
+
+        client.list_notebooks()
+        client.create_notebook("New")
+        assert not client.notebook_index.is_fresh
+
+    def test_search_notebooks_pages_cached_listing(self, mock_run):
+        """Test pages are served from one listing."""
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout='[{"project_id": "nb1", "title": "B"}, {"project_id": "nb2", "title": "A"}]',
+            stderr="",
+        )
+        client = NLMClient(auth_token="token", cookies="cookies", cache=ResponseCache())
+
+        notebooks, cursor = client.search_notebooks(sort="title", limit=1)
+        assert [nb.project_id for nb in notebooks] == ["nb2"]
+
+        notebooks, cursor = client.search_notebooks(sort="title", limit=1, cursor=cursor)
+        assert [nb.project_id for nb in notebooks] == ["nb1"]
+        assert cursor is None
+        assert mock_run.call_count == 1
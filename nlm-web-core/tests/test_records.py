@@ -0,0 +1,58 @@
+"""Tests for typed records decoded from nlm JSON output."""
+import pytest
+from nlm_web_core.records import Audio, Note, Notebook, Source, decode_list
+
+
+class TestRecords:
+    """Test decoding protojson-shaped objects."""
+
+    def test_notebook(self, sample_notebook):
+        """Test a notebook keeps its metadata and counts its sources."""
+        notebook = Notebook.from_json(
+            {**sample_notebook, "sources": [{"title": "a"}, {"title": "b"}]}
+        )
+
+        assert notebook == Notebook(
+            project_id="notebook123",
+            title="Test Notebook",
+            emoji="📚",
+            source_count=2,
+            created_at="2025-01-15T10:00:00Z",
+            modified_at="2025-01-15T10:00:00Z",
+        )
+
+    def test_source_flattens_id(self, sample_source):
+        """Test nested source IDs and metadata are flattened."""
+        source = Source.from_json(sample_source)
+
+        assert source.source_id == "source123"
+        assert source.source_type == "SOURCE_TYPE_URL"
+        assert source.added_at == "2025-01-15T10:00:00Z"
+
+    def test_source_default_type(self):
+        """Test an omitted enum decodes to its default."""
+        assert Source.from_json({"title": "x"}).source_type == "SOURCE_TYPE_UNSPECIFIED"
+
+    def test_audio(self, sample_audio):
+        """Test audio overview fields."""
+        audio = Audio.from_json(sample_audio)
+
+        assert (audio.audio_id, audio.status, audio.duration) == ("audio123", "ready", 930)
+
+    def test_note_keyed_like_source(self):
+        """Test notes listed with source-style IDs."""
+        note = Note.from_json({"source_id": {"source_id": "n1"}, "title": "Idea"})
+
+        assert (note.note_id, note.title) == ("n1", "Idea")
+
+    def test_records_are_immutable(self):
+        """Test records can be shared from the cache safely."""
+        with pytest.raises(AttributeError):
+            Notebook("nb1").title = "changed"
+
+    def test_decode_list_skips_non_objects(self):
+        """Test decode_list tolerates unexpected output."""
+        assert decode_list(Notebook, "not json") == ()
+        assert decode_list(Notebook, [{"project_id": "nb1"}, "log"]) == (
+            Notebook("nb1"),
+        )
@@ -0,0 +1,38 @@
+"""Tests for the retry policy."""
+from nlm_web_core.retry import RetryPolicy
+
+
+class TestRetryPolicy:
+    """Test backoff delays and the retry budget."""
+
+    def test_delay_doubles_up_to_cap(self):
+        """Test the jitter range doubles per attempt and is capped."""
+        policy = RetryPolicy(base_delay=0.5, max_delay=3, rng=lambda: 1.0)
+
+        assert [policy.delay(n) for n in range(1, 5)] == [0.5, 1.0, 2.0, 3]
+
+    def test_full_jitter(self):
+        """Test delays are drawn from zero up to the range."""
+        policy = RetryPolicy(base_delay=1, rng=lambda: 0.25)
+
+        assert policy.delay(3) == 1.0
+
+    def test_attempt_limit(self):
+        """Test retries stop once every attempt has been made."""
+        policy = RetryPolicy(attempts=3)
+
+        assert policy.allow_retry(1) and policy.allow_retry(2)
+        assert not policy.allow_retry(3)
+
+    def test_budget(self):
+        """Test retries are refused once the budget is spent, until requests refill it."""
+        policy = RetryPolicy(attempts=10, budget_ratio=0.5, budget_max=2)
+
+        assert policy.allow_retry(1) and policy.allow_retry(1)
+        assert not policy.allow_retry(1)
+        policy.record_request()
+        assert not policy.allow_retry(1)
+        policy.record_request()
+        assert policy.allow_retry(1)
+
+        assert policy.stats() == {"retries": 3, "budget_exhausted": 2, "budget": 0.0}
@@ -0,0 +1,78 @@
+"""Tests for server-side credential sessions."""
+from nlm_web_core.sessions import Credentials, SessionStore
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCredentials:
+    """Test credential hashing."""
+
+    def test_key_identifies_account(self):
+        """Test equal credentials share a key and secrets stay out of repr."""
+        credentials = Credentials("token", "cookies")
+
+        assert credentials.key == Credentials("token", "cookies").key
+        assert credentials.key != Credentials("token", "other").key
+        assert credentials.key != Credentials("tokenc", "ookies").key
+        assert "token" not in repr(credentials)
+
+
+class TestSessionStore:
+    """Test session lookup and expiry."""
+
+    def test_create_and_get(self):
+        """Test a new session maps its id to the credentials."""
+        store = SessionStore()
+        credentials = Credentials("token", "cookies")
+
+        session_id = store.create(credentials)
+
+        assert len(session_id) >= 32
+        assert store.get(session_id) is credentials
+        assert store.get("unknown") is None
+        assert store.get(None) is None
+
+    def test_sliding_expiry(self):
+        """Test a session expires only after max_age without lookups."""
+        clock = FakeClock()
+        store = SessionStore(max_age=10, clock=clock)
+        session_id = store.create(Credentials("token", "cookies"))
+
+        clock.now = 8
+        assert store.get(session_id) is not None
+        clock.now = 16
+        assert store.get(session_id) is not None  # Extended by the last lookup
+        clock.now = 27
+        assert store.get(session_id) is None
+        assert len(store) == 0
+
+    def test_oldest_dropped_when_full(self):
+        """Test the least recently used session is dropped beyond max_sessions."""
+        store = SessionStore(max_sessions=2)
+        first = store.create(Credentials("a", "a"))
+        second = store.create(Credentials("b", "b"))
+        store.get(first)
+
+        store.create(Credentials("c", "c"))
+
+        assert store.get(first) is not None
+        assert store.get(second) is None
+        assert len(store) == 2
+
+    def test_delete(self):
+        """Test a deleted session is gone and deleting twice is harmless."""
+        store = SessionStore()
+        session_id = store.create(Credentials("token", "cookies"))
+
+        store.delete(session_id)
+        store.delete(session_id)
+
+        assert store.get(session_id) is None
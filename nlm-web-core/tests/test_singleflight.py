@@ -0,0 +1,108 @@
+"""Tests for single-flight request coalescing."""
+import asyncio
+from nlm_web_core.singleflight import AsyncSingleFlight
+from nlm_web_core.nlm_client import AsyncNLMClient
+
+
+class TestAsyncSingleFlight:
+    """Test coroutine coalescing."""
+
+    async def test_concurrent_callers_share_result(self):
+        """Test concurrent awaits with the same key run once."""
+        group = AsyncSingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*(group.do("k", work) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert len(runs) == 1
+        assert group.stats() == {"calls": 5, "coalesced": 4}
+
+    async def test_sequential_calls_not_coalesced(self):
+        """Test a finished call does not serve later callers."""
+        group = AsyncSingleFlight()
+
+        async def value(result):
+            return result
+
+        assert await group.do("k", lambda: value(1)) == 1
+        assert await group.do("k", lambda: value(2)) == 2
+        assert group.coalesced == 0
+
+    async def test_error_shared(self):
+        """Test every waiter sees the same exception."""
+        group = AsyncSingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            group.do("k", work), group.do("k", work), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_cancelling_one_waiter_keeps_others(self):
+        """Test one cancelled caller does not cancel the shared work."""
+        group = AsyncSingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.1)
+            return "result"
+
+        first = asyncio.create_task(group.do("k", work))
+        second = asyncio.create_task(group.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "result"
+
+    async def test_cancelling_all_waiters_cancels_work(self):
+        """Test the shared task is cancelled once nobody is waiting."""
+        group = AsyncSingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        task = asyncio.create_task(group.do("k", work))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+class TestClientCoalescing:
+    """Test AsyncNLMClient coalesces identical reads."""
+
+    async def test_parallel_list_shares_subprocess(self, stub_nlm):
+        """Test N parallel list calls spawn one nlm process."""
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(delay=0.2))
+
+        results = await asyncio.gather(*(client.list_notebooks() for _ in range(6)))
+
+        assert all(len(r) == 2 for r in results)
+        assert client.single_flight.stats() == {"calls": 6, "coalesced": 5}
+
+    async def test_shared_group_across_clients(self, stub_nlm):
+        """Test clients sharing a group coalesce with each other."""
+        group = AsyncSingleFlight()
+        nlm_path = stub_nlm(delay=0.2)
+        clients = [
+            AsyncNLMClient("token", "cookies", nlm_path=nlm_path, single_flight=group)
+            for _ in range(3)
+        ]
+
+        await asyncio.gather(*(c.list_sources("nb1") for c in clients))
+
+        assert group.coalesced == 2
@@ -0,0 +1,49 @@
+"""Tests for per-command timeouts."""
+from nlm_web_core.timeouts import DEFAULT_TIMEOUTS, TimeoutPolicy
+
+
+class TestTimeoutPolicy:
+    """Test configured and adaptive timeouts."""
+
+    def test_configured(self):
+        """Test overrides, defaults and the fallback for unknown commands."""
+        policy = TimeoutPolicy(timeouts={"list": 5}, default=42)
+
+        assert policy.timeout("list") == 5
+        assert policy.timeout("faq") == DEFAULT_TIMEOUTS["faq"]
+        assert policy.timeout("mystery") == 42
+
+    def test_not_adaptive_ignores_latency(self):
+        """Test observations do not change timeouts unless adaptive."""
+        policy = TimeoutPolicy(min_samples=1)
+        policy.observe("list", 0.1)
+
+        assert policy.timeout("list") == DEFAULT_TIMEOUTS["list"]
+        assert policy.stats() == {}
+
+    def test_adaptive(self):
+        """Test timeouts follow the observed percentile within their bounds."""
+        policy = TimeoutPolicy(
+            adaptive=True, min_timeout=1, min_samples=10, multiplier=3
+        )
+        for _ in range(9):
+            policy.observe("list", 2.0)
+        assert policy.timeout("list") == DEFAULT_TIMEOUTS["list"]  # Too few samples
+
+        policy.observe("list", 4.0)
+        assert policy.timeout("list") == 12.0  # 3 x p99
+
+        for _ in range(10):
+            policy.observe("sources", 0.01)
+            policy.observe("faq", 200.0)
+        assert policy.timeout("sources") == 1  # Floor
+        assert policy.timeout("faq") == DEFAULT_TIMEOUTS["faq"]  # Ceiling
+        assert policy.stats()["list"] == {"timeout": 12.0, "p99": 4.0, "samples": 10}
+
+    def test_window(self):
+        """Test only recent latencies count."""
+        policy = TimeoutPolicy(adaptive=True, min_timeout=0, min_samples=2, window=2)
+        for seconds in (5.0, 1.0, 1.0):
+            policy.observe("list", seconds)
+
+        assert policy.timeout("list") == 3.0
@@ -0,0 +1,106 @@
+"""Tests for tracing hooks and request ids."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from nlm_web_core.nlm_client import AsyncNLMClient, NLMError
+from nlm_web_core.tracing import (
+    RecordingTracer,
+    RequestIdMiddleware,
+    current_request_id,
+    request_context,
+)
+
+
+class TestRecordingTracer:
+    """Test span nesting and breakdowns."""
+
+    def test_nesting_and_breakdown(self):
+        """Test spans nest under the current span and print indented."""
+        tracer = RecordingTracer()
+        with request_context("req1"):
+            with tracer.start_as_current_span("outer", attributes={"a": 1}):
+                with tracer.start_as_current_span("inner") as span:
+                    span.set_attribute("b", 2)
+        with tracer.start_as_current_span("elsewhere"):
+            pass
+
+        spans = tracer.spans("req1")
+        assert [(s.name, s.depth) for s in spans] == [("outer", 0), ("inner", 1)]
+        lines = tracer.breakdown("req1").splitlines()
+        assert lines[0].startswith("outer ") and lines[0].endswith("ms a=1")
+        assert lines[1].startswith("  inner ") and lines[1].endswith("ms b=2")
+
+    def test_errors_recorded(self):
+        """Test a span records the exception that ended it."""
+        tracer = RecordingTracer()
+
+        with pytest.raises(ValueError):
+            with tracer.start_as_current_span("failing"):
+                raise ValueError("boom")
+
+        assert tracer.spans()[0].error == "ValueError"
+
+
+class TestRequestIdMiddleware:
+    """Test request ids are bound and echoed."""
+
+    def make_app(self, tracer: RecordingTracer) -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(RequestIdMiddleware, tracer=tracer)
+
+        @app.get("/")
+        async def index():
+            return {"request_id": current_request_id()}
+
+        return app
+
+    def test_incoming_id_used(self):
+        """Test an incoming X-Request-ID is used for the request and its spans."""
+        tracer = RecordingTracer()
+        client = TestClient(self.make_app(tracer))
+
+        response = client.get("/", headers={"X-Request-ID": "abc"})
+
+        assert response.json() == {"request_id": "abc"}
+        assert response.headers["X-Request-ID"] == "abc"
+        assert [s.name for s in tracer.spans("abc")] == ["http.request"]
+
+    def test_id_generated(self):
+        """Test requests without an id get a fresh one each."""
+        client = TestClient(self.make_app(RecordingTracer()))
+
+        first = client.get("/").headers["X-Request-ID"]
+        second = client.get("/").headers["X-Request-ID"]
+
+        assert first and second and first != second
+
+
+class TestClientSpans:
+    """Test nlm commands emit a span per phase."""
+
+    async def test_read_phases(self, stub_nlm):
+        """Test a read is broken down into command, spawn, process and parse."""
+        tracer = RecordingTracer()
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(), tracer=tracer)
+
+        with request_context("req1"):
+            await client.list_sources("nb1")
+
+        spans = {span.name: span for span in tracer.spans("req1")}
+        assert set(spans) == {"nlm.command", "nlm.spawn", "nlm.process", "nlm.parse"}
+        assert spans["nlm.spawn"].parent is spans["nlm.command"]
+        assert spans["nlm.process"].parent is spans["nlm.command"]
+        assert spans["nlm.command"].attributes["nlm.notebook_id"] == "nb1"
+        assert spans["nlm.command"].attributes["request.id"] == "req1"
+        assert spans["nlm.process"].attributes["nlm.stdout_bytes"] > 0
+
+    async def test_failed_command_span(self, stub_nlm):
+        """Test a failing command's span records the error."""
+        tracer = RecordingTracer()
+        client = AsyncNLMClient("token", "cookies", nlm_path=stub_nlm(), tracer=tracer)
+
+        with pytest.raises(NLMError):
+            await client.list_sources("missing")
+
+        command = next(s for s in tracer.spans() if s.name == "nlm.command")
+        assert command.error == "NotebookNotFoundError"
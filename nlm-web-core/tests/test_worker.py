@@ -0,0 +1,197 @@
+"""Tests for the persistent nlm worker transport."""
+import asyncio
+import time
+import pytest
+from nlm_web_core.nlm_client import AsyncNLMClient, NLMClient, NLMError, NotebookNotFoundError
+from nlm_web_core.worker import AsyncNLMWorker, AsyncWorkerPool, WorkerUnavailableError
+
+ENV = {"NLM_AUTH_TOKEN": "token", "NLM_COOKIES": "cookies"}
+
+
+@pytest.fixture
+def closed_workers(monkeypatch):
+    """Workers stopped during the test, in order."""
+    closed: list[AsyncNLMWorker] = []
+    close = AsyncNLMWorker.close
+
+    async def record(worker: AsyncNLMWorker) -> None:
+        closed.append(worker)
+        await close(worker)
+
+    monkeypatch.setattr(AsyncNLMWorker, "close", record)
+    return closed
+
+
+class TestAsyncWorkerPool:
+    """Test the asyncio worker pool."""
+
+    async def test_reuses_worker(self, stub_nlm):
+        """Test consecutive commands run on the same process."""
+        pool = AsyncWorkerPool(stub_nlm(), ENV, size=1)
+        try:
+            assert (await pool.run(["list", "--json"], None, 5))[0] == 0
+            pid = pool._idle[0].process.pid
+            assert await pool.run(["notes", "nb1", "--json"], None, 5) == (0, "[]\n", "")
+            assert pool._idle[0].process.pid == pid
+        finally:
+            await pool.close()
+
+    async def test_unsupported_binary(self, stub_nlm):
+        """Test a binary without worker mode makes the pool back off."""
+        pool = AsyncWorkerPool(stub_nlm(worker=False), ENV)
+
+        with pytest.raises(WorkerUnavailableError):
+            await pool.run(["list"], None, 5)
+        assert pool.available is False
+
+    async def test_failed_start_is_retried_after_backoff(self, stub_nlm):
+        """Test workers are started again once the backoff has passed."""
+        pool = AsyncWorkerPool(stub_nlm(worker=False), ENV, start_backoff=60)
+        with pytest.raises(WorkerUnavailableError):
+            await pool.run(["list"], None, 5)
+        with pytest.raises(WorkerUnavailableError, match="backing off"):
+            await pool.run(["list"], None, 5)
+        assert pool._start_failures == 1
+
+        pool.nlm_path = stub_nlm()
+        pool._retry_start_at = 0.0
+        try:
+            assert await pool.run(["notes", "nb1", "--json"], None, 5) == (0, "[]\n", "")
+            assert pool.available is True
+            assert pool._start_failures == 0
+        finally:
+            await pool.close()
+
+    async def test_start_counts_against_timeout(self, tmp_path):
+        """Test a slow worker start gives up within the command timeout."""
+        slow = tmp_path / "slow-nlm"
+        # exec, so killing the worker closes its pipes instead of leaving them to sleep
+        slow.write_text("#!/bin/sh\nexec sleep 5\n")
+        slow.chmod(0o755)
+        pool = AsyncWorkerPool(str(slow), ENV, start_timeout=10)
+
+        started = time.monotonic()
+        with pytest.raises(WorkerUnavailableError):
+            await pool.run(["list"], None, 0.3)
+
+        assert time.monotonic() - started < 3
+        assert pool._busy == 0
+
+    async def test_stdin_and_reuse(self, stub_nlm):
+        """Test stdin is forwarded and the worker is kept alive."""
+        pool = AsyncWorkerPool(stub_nlm(), ENV, size=1)
+        client = AsyncNLMClient("token", "cookies", worker_pool=pool)
+        try:
+            source = await client.add_source("nb1", "hello", source_type="text")
+            pid = pool._idle[0].process.pid
+            await client.list_notebooks()
+
+            assert source.source_id == "text-5"
+            assert pool._idle[0].process.pid == pid
+        finally:
+            await pool.close()
+
+    async def test_busy_pool_runs_one_shot(self, stub_nlm):
+        """Test commands beyond `size` busy workers run one-shot, not queued."""
+        nlm_path = stub_nlm(delay=0.5)
+        pool = AsyncWorkerPool(nlm_path, ENV, size=2)
+        client = AsyncNLMClient("token", "cookies", nlm_path=nlm_path, worker_pool=pool)
+        try:
+            started = time.monotonic()
+            await asyncio.gather(*(client.list_sources(f"nb{i}") for i in range(4)))
+
+            # Queued behind two workers, four commands would take two delays
+            assert time.monotonic() - started < 0.9
+            assert len(pool._idle) == 2
+            assert pool._busy == 0
+        finally:
+            await pool.close()
+
+    async def test_timeout_kills_worker(self, stub_nlm):
+        """Test a timed out worker is discarded."""
+        pool = AsyncWorkerPool(stub_nlm(delay=5), ENV, size=1, start_timeout=5)
+        client = AsyncNLMClient("token", "cookies", worker_pool=pool, timeout=0.3)
+
+        with pytest.raises(NLMError, match="timed out"):
+            await client.list_notebooks()
+        assert pool._idle == []
+
+    async def test_crash_is_an_error(self, stub_nlm):
+        """Test a worker dying mid-request surfaces as NLMError."""
+        pool = AsyncWorkerPool(stub_nlm(), ENV, size=1)
+        client = AsyncNLMClient("token", "cookies", worker_pool=pool)
+
+        with pytest.raises(NLMError, match="exited unexpectedly"):
+            await client._run_command(["crash"])
+        assert pool.available is True
+
+    async def test_client_falls_back(self, stub_nlm):
+        """Test AsyncNLMClient falls back to one-shot processes."""
+        nlm_path = stub_nlm(worker=False)
+        pool = AsyncWorkerPool(nlm_path, ENV)
+        client = AsyncNLMClient("token", "cookies", nlm_path=nlm_path, worker_pool=pool)
+
+        assert len(await client.list_notebooks()) == 2
+        assert pool.available is False
+
+
+    async def test_dead_idle_worker_is_reaped(self, stub_nlm, closed_workers):
+        """Test a worker that died while idle is closed and replaced."""
+        pool = AsyncWorkerPool(stub_nlm(), ENV, size=1)
+        try:
+            await pool.run(["list", "--json"], None, 5)
+            dead = pool._idle[0]
+            dead.process.kill()
+            while dead.alive:
+                await asyncio.sleep(0.01)
+
+            assert (await pool.run(["list", "--json"], None, 5))[0] == 0
+            assert closed_workers == [dead]
+            assert pool._idle[0] is not dead
+        finally:
+            await pool.close()
+
+    async def test_close_stops_busy_workers_when_returned(self, stub_nlm, closed_workers):
+        """Test a worker running a command during close is stopped afterwards."""
+        pool = AsyncWorkerPool(stub_nlm(delay=0.3), ENV, size=1)
+        command = asyncio.create_task(pool.run(["list", "--json"], None, 5))
+        while pool._busy == 0 or command.done():
+            await asyncio.sleep(0.01)
+
+        await pool.close()
+        assert (await command)[0] == 0
+
+        assert len(closed_workers) == 1
+        assert not closed_workers[0].alive
+        assert pool._idle == []
+        with pytest.raises(WorkerUnavailableError, match="closed"):
+            await pool.run(["list", "--json"], None, 5)
+
+
+class TestBlockingClient:
+    """Test NLMClient shares the async client's worker pool."""
+
+    def test_client_uses_worker(self, stub_nlm):
+        """Test NLMClient runs commands through the pool."""
+        pool = AsyncWorkerPool(stub_nlm(), ENV)
+        client = NLMClient("token", "cookies", nlm_path="unused", worker_pool=pool)
+        try:
+            assert len(client.list_notebooks()) == 2
+            with pytest.raises(NotebookNotFoundError):
+                client.delete_notebook("missing-nb")
+        finally:
+            client.close()
+        assert pool._idle == []
+
+    def test_client_falls_back(self, stub_nlm):
+        """Test NLMClient falls back to one-shot processes."""
+        nlm_path = stub_nlm(worker=False)
+        client = NLMClient(
+            "token", "cookies", nlm_path=nlm_path, worker_pool=AsyncWorkerPool(nlm_path, ENV)
+        )
+        try:
+            assert len(client.list_notebooks()) == 2
+            assert len(client.list_notebooks()) == 2
+            assert client.worker_pool.available is False
+        finally:
+            client.close()
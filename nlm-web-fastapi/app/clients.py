@@ -0,0 +1,6 @@
+"""The application's nlm client registry; see nlm_web_core.clients."""
+from app.config import settings
+from nlm_web_core.clients import ClientRegistry
+
+# Shared by the whole process; started and closed by the app's lifecycle hooks
+registry = ClientRegistry(settings)
@@ -1,16 +1,12 @@
 """Application configuration."""
-from pydantic_settings import BaseSettings
-from typing import Optional
+from nlm_web_core.settings import NLMSettings
 
 
-class Settings(BaseSettings):
-    """Application settings."""
+class Settings(NLMSettings):
+    """Application settings; the nlm options are inherited from NLMSettings."""
 
-    # NLM Configuration
-    nlm_auth_token: str = ""
-    nlm_cookies: str = ""
-    nlm_browser_profile: str = "Default"
-    nlm_path: str = "nlm"
+    # HTMX Fragment Configuration
+    fragment_poll_interval: int = 30
 
     # Application Configuration
     secret_key: str = "change-this-in-production"
@@ -18,12 +14,5 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
-    # Session Configuration
-    session_max_age: int = 3600
-
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-
 
 settings = Settings()
@@ -0,0 +1,151 @@
+"""Server-rendered HTML fragments for HTMX, with ETag validation.
+
+Fragments are rendered from Jinja2 templates compiled once at startup. Each
+fragment's ETag is derived from the data it shows rather than from the
+rendered bytes, so a request whose ``If-None-Match`` (or ``since`` polling
+parameter) still matches is answered without rendering at all, and recently
+rendered fragments are served from a small LRU cache of their bytes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+from fastapi import Request, Response
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+# Templates compiled up front; others are compiled on first use
+FRAGMENT_TEMPLATES = ("partials/notebook_grid.html", "partials/notebook_card.html")
+
+# Cache-Control for fragments: browsers keep them but revalidate every use
+CACHE_CONTROL = "private, no-cache"
+
+
+class FragmentRenderer:
+    """Renders template fragments, caching output by ETag."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_entries: int = 256,
+        auto_reload: bool = False,
+    ):
+        """
+        Initialize renderer and compile the fragment templates.
+
+        Args:
+            directory: Template directory
+            max_entries: Rendered fragments kept (LRU)
+            auto_reload: Recompile templates whose files changed, for
+                development; ETags then also change with the template source
+        """
+        self.loader = FileSystemLoader(str(directory))
+        self.environment = Environment(
+            loader=self.loader,
+            autoescape=select_autoescape(["html"]),
+            auto_reload=auto_reload,
+        )
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._rendered: OrderedDict[str, bytes] = OrderedDict()
+        # Compiled templates with a hash of their source, part of every ETag
+        self._templates: dict[str, tuple[Template, str]] = {}
+        for name in FRAGMENT_TEMPLATES:
+            self._load(name)
+        self.hits = 0
+        self.misses = 0
+
+    def template(self, name: str) -> Template:
+        """A compiled template, recompiled first if auto_reload found it changed."""
+        return self._load(name)[0]
+
+    def _load(self, name: str) -> tuple[Template, str]:
+        """Compile a template unless already compiled and up to date."""
+        entry = self._templates.get(name)
+        if entry is None or (
+            self.environment.auto_reload and not entry[0].is_up_to_date
+        ):
+            source, _, _ = self.loader.get_source(self.environment, name)
+            entry = self._templates[name] = (
+                self.environment.get_template(name),
+                hashlib.sha256(source.encode()).hexdigest(),
+            )
+        return entry
+
+    def etag(self, name: str, key: Hashable) -> str:
+        """
+        Strong ETag for a template rendered from data identified by key.
+
+        Args:
+            name: Template name
+            key: Everything the output depends on, e.g. records and query
+                parameters; its repr must be deterministic
+
+        Returns:
+            Quoted ETag
+        """
+        version = self._load(name)[1]
+        source = f"{name}\0{version}\0{key!r}"
+        return f'"{hashlib.sha256(source.encode()).hexdigest()[:32]}"'
+
+    def render(self, name: str, etag: str, **context: Any) -> bytes:
+        """
+        Render a template, or return its cached output for this ETag.
+
+        Args:
+            name: Template name
+            etag: ETag computed by etag() for the same data, also passed to
+                the template as ``etag``
+            **context: Template variables
+
+        Returns:
+            Rendered HTML
+        """
+        with self._lock:
+            body = self._rendered.get(etag)
+            if body is not None:
+                self._rendered.move_to_end(etag)
+                self.hits += 1
+                return body
+            self.misses += 1
+        body = self.template(name).render(etag=etag, **context).encode()
+        with self._lock:
+            self._rendered[etag] = body
+            while len(self._rendered) > self.max_entries:
+                self._rendered.popitem(last=False)
+        return body
+
+    def response(
+        self,
+        request: Request,
+        name: str,
+        key: Hashable,
+        since: Optional[str] = None,
+        **context: Any,
+    ) -> Response:
+        """
+        Serve a fragment, skipping the body when the client's copy is current.
+
+        Args:
+            request: Incoming request, for ``If-None-Match``
+            name: Template name
+            key: Everything the output depends on, see etag()
+            since: ETag of the copy an HTMX poller already shows
+            **context: Template variables
+
+        Returns:
+            204 if since matches (HTMX then leaves the page alone), 304 if
+            If-None-Match matches, else 200 with the rendered HTML
+        """
+        etag = self.etag(name, key)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if since is not None and since == etag:
+            return Response(status_code=204, headers=headers)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag in (
+            tag.strip() for tag in if_none_match.split(",")
+        ):
+            return Response(status_code=304, headers=headers)
+        body = self.render(name, etag, **context)
+        return Response(body, media_type="text/html", headers=headers)
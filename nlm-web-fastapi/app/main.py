@@ -1,12 +1,31 @@
 """Main FastAPI application."""
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from pathlib import Path
+from typing import Optional
 
-from app.routes import notebooks
+from app.routes import auth, fragments, jobs, notebooks
+from app.clients import registry
 from app.config import settings
+from nlm_web_core.breaker import CircuitBreaker
+from nlm_web_core.limiter import AsyncConcurrencyLimiter
+from nlm_web_core.metrics import CONTENT_TYPE, MetricsMiddleware
+from nlm_web_core.retry import RetryPolicy
+from nlm_web_core.timeouts import TimeoutPolicy
+from nlm_web_core.tracing import RecordingTracer, RequestIdMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared nlm client and job queue at startup, close them on shutdown."""
+    registry.start()
+    registry.jobs.start()
+    yield
+    await registry.close()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -14,6 +33,7 @@ app = FastAPI(
     description="Web interface for NotebookLM CLI",
     version="1.0.0",
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
 # Setup templates and static files
@@ -24,7 +44,17 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 
 # Include routers
+app.include_router(auth.router)
 app.include_router(notebooks.router)
+app.include_router(jobs.router)
+app.include_router(fragments.router)
+
+# Time every request by route, only when metrics are enabled
+if registry.metrics is not None:
+    app.add_middleware(MetricsMiddleware, metrics=registry.metrics)
+
+# Tag each request's spans with its X-Request-ID
+app.add_middleware(RequestIdMiddleware, tracer=registry.tracer)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -36,7 +66,39 @@ async def index(request: Request):
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "version": "1.0.0"}
+    health = {"status": "healthy", "version": "1.0.0"}
+    limiter = getattr(registry.client, "limiter", None)
+    if isinstance(limiter, AsyncConcurrencyLimiter):
+        health["limiter"] = limiter.stats()
+    breaker = getattr(registry.client, "breaker", None)
+    if isinstance(breaker, CircuitBreaker):
+        health["breaker"] = breaker.stats()
+        if health["breaker"]["state"] != "closed":
+            health["status"] = "degraded"
+    retry_policy = getattr(registry.client, "retry_policy", None)
+    if isinstance(retry_policy, RetryPolicy):
+        health["retries"] = retry_policy.stats()
+    timeouts = getattr(registry.client, "timeouts", None)
+    if isinstance(timeouts, TimeoutPolicy) and timeouts.adaptive:
+        health["timeouts"] = timeouts.stats()
+    health["users"] = {"sessions": len(registry.sessions), "clients": registry.user_count}
+    return health
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, when enabled with NLM_METRICS_ENABLED."""
+    if registry.metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(registry.metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/traces", include_in_schema=False)
+async def traces(request_id: Optional[str] = Query(None)):
+    """Latency breakdown of recent requests, when NLM_TRACING=local."""
+    if not isinstance(registry.tracer, RecordingTracer):
+        raise HTTPException(status_code=404, detail="Local tracing is disabled")
+    return PlainTextResponse(registry.tracer.breakdown(request_id))
 
 
 if __name__ == "__main__":
@@ -1,9 +1,23 @@
 """Pydantic models for request/response validation."""
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import datetime
 
 
+class LoginRequest(BaseModel):
+    """Request model for signing in with NotebookLM credentials."""
+
+    auth_token: str = Field(..., min_length=1, repr=False)
+    cookies: str = Field(..., min_length=1, repr=False)
+
+
+class AuthStatus(BaseModel):
+    """Response model for the current request's authentication."""
+
+    authenticated: bool
+    mode: Literal["session", "shared", "demo"]
+
+
 class NotebookCreate(BaseModel):
     """Request model for creating a notebook."""
 
@@ -40,6 +54,31 @@ class SourceResponse(BaseModel):
     status: Optional[str] = None
 
 
+class SourceBatch(BaseModel):
+    """Request model for adding many sources at once."""
+
+    items: List[SourceAdd] = Field(..., min_length=1, max_length=500)
+    concurrency: Optional[int] = Field(None, ge=1, le=16)
+
+
+class SourceBatchResult(BaseModel):
+    """Outcome of one item of a source batch."""
+
+    index: int
+    source_input: str
+    source: Optional[SourceResponse] = None
+    error: Optional[str] = None
+    attempts: int = 1
+
+
+class SourceBatchResponse(BaseModel):
+    """Response model for a source batch."""
+
+    results: List[SourceBatchResult]
+    succeeded: int
+    failed: int
+
+
 class AudioCreate(BaseModel):
     """Request model for creating audio overview."""
 
@@ -59,6 +98,28 @@ class AudioResponse(BaseModel):
     size_bytes: Optional[int] = None
 
 
+class JobCreate(BaseModel):
+    """Request model for submitting a background job."""
+
+    kind: Literal["audio", "video", "guide", "outline", "faq", "glossary"]
+    notebook_id: str = Field(..., min_length=1)
+    instructions: Optional[str] = Field(None, max_length=500)
+
+
+class JobResponse(BaseModel):
+    """Response model for a background job."""
+
+    job_id: str
+    kind: str
+    notebook_id: str
+    status: Literal["queued", "running", "polling", "succeeded", "failed"]
+    result: Optional[str] = None
+    error: Optional[str] = None
+    polls: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+
 class NoteCreate(BaseModel):
     """Request model for creating a note."""
 
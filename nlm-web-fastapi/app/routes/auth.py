@@ -0,0 +1,87 @@
+"""Authentication routes: per-user NotebookLM credentials kept in a session."""
+from fastapi import APIRouter, Cookie, HTTPException, Request, Response, status
+from typing import Optional
+from app.clients import registry
+from nlm_web_core.clients import ClientRegistry
+from app.models import AuthStatus, LoginRequest
+from nlm_web_core.sessions import Credentials
+
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+
+SESSION_COOKIE = "nlm_session"
+
+
+async def get_registry(
+    nlm_session: Optional[str] = Cookie(None),
+) -> ClientRegistry:
+    """
+    Get the registry serving this request: the signed-in user's own, or the
+    process-wide one.
+
+    Async so it runs on the event loop, where idle users' registries can be
+    closed, rather than in the threadpool.
+
+    Raises:
+        HTTPException: 401 if sign-in is required and the session is missing
+            or expired
+    """
+    credentials = registry.sessions.get(nlm_session)
+    if credentials is None and registry.config.nlm_require_login:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Sign in with your NotebookLM credentials",
+        )
+    return registry.for_credentials(credentials)
+
+
+@router.post("/login", response_model=AuthStatus)
+async def login(credentials: LoginRequest, request: Request, response: Response):
+    """
+    Sign in with NotebookLM credentials.
+
+    The credentials are kept in server memory; the response sets an
+    HttpOnly session cookie identifying them.
+
+    Args:
+        credentials: Auth token and cookies, as for the nlm CLI
+
+    Returns:
+        Authentication status
+    """
+    session_id = registry.sessions.create(
+        Credentials(credentials.auth_token, credentials.cookies)
+    )
+    response.set_cookie(
+        SESSION_COOKIE,
+        session_id,
+        max_age=registry.config.session_max_age,
+        httponly=True,
+        samesite="lax",
+        secure=request.url.scheme == "https",
+    )
+    return AuthStatus(authenticated=True, mode="session")
+
+
+@router.get("/status", response_model=AuthStatus)
+async def auth_status(nlm_session: Optional[str] = Cookie(None)):
+    """
+    Report whether the request is signed in.
+
+    Returns:
+        ``session`` when signed in, otherwise ``shared`` if requests use the
+        configured account or ``demo`` if they use the demo backend
+    """
+    if registry.sessions.get(nlm_session) is not None:
+        return AuthStatus(authenticated=True, mode="session")
+    return AuthStatus(
+        authenticated=False, mode="demo" if registry.demo_mode else "shared"
+    )
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(nlm_session: Optional[str] = Cookie(None)):
+    """Sign out, forgetting the session's credentials."""
+    registry.sessions.delete(nlm_session)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    response.delete_cookie(SESSION_COOKIE)
+    return response
@@ -0,0 +1,221 @@
+"""HTML fragment routes for the HTMX front end."""
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response, status
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+from app.config import settings
+from app.fragments import FragmentRenderer
+from nlm_web_core.clients import NLMBackend
+from nlm_web_core.nlm_client import (
+    NotebookNotFoundError,
+    NLMError,
+    NLMOverloadedError,
+    NLMTimeoutError,
+)
+from app.routes.notebooks import (
+    MAX_PAGE_SIZE,
+    SortField,
+    get_nlm_client,
+    overloaded,
+    timed_out,
+)
+
+router = APIRouter(prefix="/fragments", tags=["fragments"])
+
+GRID = "partials/notebook_grid.html"
+CARD = "partials/notebook_card.html"
+
+# Cards per page of the grid, as the index page requests them
+PAGE_SIZE = 60
+
+renderer = FragmentRenderer(
+    Path(__file__).resolve().parent.parent / "templates",
+    auto_reload=settings.debug,
+)
+
+
+@router.get("/notebooks")
+async def notebook_grid(
+    request: Request,
+    q: Optional[str] = Query(None, description="Case-insensitive title search"),
+    sort: Optional[SortField] = Query(
+        None, description="Sort field, prefixed with - for descending order"
+    ),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor of the previous page"),
+    page: int = Query(
+        1,
+        ge=1,
+        description="Number of the page; without a cursor, pages 1 to this one",
+    ),
+    since: Optional[str] = Query(None, description="ETag of the grid already shown"),
+    client: NLMBackend = Depends(get_nlm_client),
+):
+    """
+    Render one page of notebook cards.
+
+    The page ends with a "Load more" button fetching the next page. The grid
+    also carries a poller that re-requests every page loaded so far, with
+    ``since`` set to their ETag: while the notebooks are unchanged the poll
+    gets 204 No Content, which HTMX ignores, and nothing is rendered. Each
+    later page replaces the poller so that it also covers that page.
+
+    Returns:
+        HTML fragment, or 204/304 when the client's copy is current
+    """
+    try:
+        notebooks, next_cursor = await client.search_notebooks(
+            query=q,
+            sort=sort,
+            # A request without a cursor is a poll covering several pages
+            limit=limit if cursor is not None else limit * page,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+    params = {
+        name: value
+        for name, value in (("q", q), ("sort", sort), ("limit", limit))
+        if value is not None
+    }
+    next_url = (
+        f"{request.url.path}?"
+        f"{urlencode({**params, 'cursor': next_cursor, 'page': page + 1})}"
+        if next_cursor is not None
+        else None
+    )
+    poll_url = (
+        f"{request.url.path}?{urlencode({**params, 'page': page})}"
+        if settings.fragment_poll_interval > 0
+        else None
+    )
+    return renderer.response(
+        request,
+        GRID,
+        (tuple(notebooks), cursor, next_url, poll_url, settings.fragment_poll_interval),
+        since=since,
+        notebooks=notebooks,
+        cursor=cursor,
+        next_url=next_url,
+        poll_url=poll_url,
+        poll_interval=settings.fragment_poll_interval,
+    )
+
+
+@router.get("/notebooks/{notebook_id}")
+async def notebook_card(
+    notebook_id: str,
+    request: Request,
+    since: Optional[str] = Query(None, description="ETag of the card already shown"),
+    client: NLMBackend = Depends(get_nlm_client),
+):
+    """
+    Render one notebook's card.
+
+    Args:
+        notebook_id: Notebook ID
+
+    Returns:
+        HTML fragment, or 204/304 when the client's copy is current
+    """
+    try:
+        notebook = await client.get_notebook(notebook_id)
+    except NotebookNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {notebook_id} not found",
+        )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+    return renderer.response(request, CARD, notebook, since=since, notebook=notebook)
+
+
+@router.post("/notebooks", status_code=status.HTTP_201_CREATED)
+async def create_notebook(
+    title: str = Form(..., min_length=1, max_length=200),
+    emoji: Optional[str] = Form(None, max_length=10),
+    client: NLMBackend = Depends(get_nlm_client),
+):
+    """
+    Create a notebook from the index page's form.
+
+    Args:
+        title: Notebook title
+        emoji: Optional emoji
+
+    Returns:
+        The new notebook's card; if the CLI did not report the notebook, an
+        empty body with an ``HX-Trigger`` that makes the grid reload
+    """
+    try:
+        notebook = await client.create_notebook(title=title, emoji=emoji or None)
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+    if notebook is None:
+        return Response(
+            status_code=status.HTTP_201_CREATED,
+            headers={"HX-Trigger": "notebooks-changed"},
+        )
+    etag = renderer.etag(CARD, notebook)
+    return Response(
+        renderer.render(CARD, etag, notebook=notebook),
+        status_code=status.HTTP_201_CREATED,
+        media_type="text/html",
+    )
+
+
+@router.delete("/notebooks/{notebook_id}")
+async def delete_notebook(
+    notebook_id: str,
+    client: NLMBackend = Depends(get_nlm_client),
+):
+    """
+    Delete a notebook.
+
+    Answers 200 with an empty body rather than 204, which HTMX would not
+    swap, so the card the request came from is removed.
+
+    Args:
+        notebook_id: Notebook ID to delete
+    """
+    try:
+        await client.delete_notebook(notebook_id=notebook_id)
+    except NotebookNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {notebook_id} not found",
+        )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+    return Response(media_type="text/html")
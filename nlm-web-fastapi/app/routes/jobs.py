@@ -0,0 +1,100 @@
+"""Background job routes."""
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
+from typing import List, Optional
+from nlm_web_core.clients import ClientRegistry, NLMBackend
+from nlm_web_core.jobs import JobQueue
+from app.models import JobCreate, JobResponse
+from nlm_web_core.nlm_client import (
+    NotebookNotFoundError,
+    NLMError,
+    NLMOverloadedError,
+    NLMTimeoutError,
+)
+from app.routes.auth import get_registry
+from app.routes.notebooks import get_nlm_client, overloaded, timed_out
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def get_job_queue(registry: ClientRegistry = Depends(get_registry)) -> JobQueue:
+    """Get the background job queue for the request's user."""
+    return registry.jobs
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    job: JobCreate,
+    response: Response,
+    client: NLMBackend = Depends(get_nlm_client),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """
+    Queue an audio, video or content generation job.
+
+    The job runs in the background; poll the URL in the ``Location`` header
+    for its status.
+
+    Args:
+        job: Job kind, notebook and instructions
+
+    Returns:
+        The queued job
+    """
+    try:
+        await client.get_notebook(job.notebook_id)
+    except NotebookNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {job.notebook_id} not found",
+        )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+    queued = jobs.submit(job.kind, job.notebook_id, job.instructions)
+    response.headers["Location"] = f"{router.prefix}/{queued.job_id}"
+    return queued
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    notebook_id: Optional[str] = Query(None, description="Only jobs for this notebook"),
+    limit: int = Query(50, ge=1, le=500),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """
+    List background jobs, newest first.
+
+    Returns:
+        List of jobs
+    """
+    return jobs.list_jobs(notebook_id, limit)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """
+    Get a background job's status and result.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Job data
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found",
+        )
+    return job
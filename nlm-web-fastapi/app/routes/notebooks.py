@@ -1,66 +1,118 @@
 """Notebook routes."""
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from app.models import NotebookCreate, NotebookResponse, ErrorResponse
-from app.nlm_client import NLMClient, NotebookNotFoundError, NLMError
-from app.config import settings
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import math
+from functools import partial
+from typing import AsyncIterator, List, Literal, Optional
+from nlm_web_core.bulk import SourceItem, SourceResult
+from nlm_web_core.media import MediaCache, media_response
+from app.models import (
+    NotebookCreate,
+    NotebookResponse,
+    ErrorResponse,
+    SourceBatch,
+    SourceBatchResponse,
+    SourceBatchResult,
+    SourceResponse,
+)
+from nlm_web_core.nlm_client import (
+    MEDIA_SUFFIXES,
+    NotebookBusyError,
+    NotebookNotFoundError,
+    NLMError,
+    NLMOverloadedError,
+    NLMTimeoutError,
+)
+from nlm_web_core.clients import ClientRegistry, NLMBackend
+from app.routes.auth import get_registry
 
 router = APIRouter(prefix="/api/notebooks", tags=["notebooks"])
 
 
-def get_nlm_client() -> NLMClient:
-    """Get NLM client instance."""
-    # Demo mode: return mock data if no credentials
-    if not settings.nlm_auth_token or not settings.nlm_cookies:
-        # Return a mock client for demo purposes
-        from unittest.mock import Mock
-        mock_client = Mock(spec=NLMClient)
-        mock_client.list_notebooks.return_value = [
-            {
-                "project_id": "demo-nb-1",
-                "title": "Demo Research Notebook",
-                "emoji": "📚",
-                "sources": [],
-            },
-            {
-                "project_id": "demo-nb-2",
-                "title": "Demo Study Notes",
-                "emoji": "📖",
-                "sources": [],
-            },
-        ]
-        mock_client.create_notebook.return_value = {
-            "project_id": "demo-nb-new",
-            "title": "New Demo Notebook",
-            "emoji": "📝",
-        }
-        mock_client.delete_notebook.return_value = True
-        mock_client.get_notebook.return_value = {
-            "project_id": "demo-nb-1",
-            "title": "Demo Research Notebook",
-            "emoji": "📚",
-            "sources": [],
-        }
-        return mock_client
-    
-    return NLMClient(
-        auth_token=settings.nlm_auth_token,
-        cookies=settings.nlm_cookies,
-        nlm_path=settings.nlm_path,
+# Client streaming method for each kind of generated content
+GENERATORS = {
+    "guide": "stream_guide",
+    "outline": "stream_outline",
+    "faq": "stream_faq",
+    "glossary": "stream_glossary",
+}
+
+
+def get_nlm_client(registry: ClientRegistry = Depends(get_registry)) -> NLMBackend:
+    """Get the NLM client for the request's user, or the process-wide one."""
+    return registry.client
+
+
+def get_media_cache(registry: ClientRegistry = Depends(get_registry)) -> MediaCache:
+    """Get the cache of downloaded media for the request's user."""
+    return registry.media
+
+
+def overloaded(error: NLMOverloadedError) -> HTTPException:
+    """Build the response for a command shed by admission control or the breaker."""
+    return HTTPException(
+        status_code=(
+            status.HTTP_429_TOO_MANY_REQUESTS
+            if isinstance(error, NotebookBusyError)
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(getattr(error, "retry_after", 1)))},
+    )
+
+
+def timed_out(error: NLMTimeoutError) -> HTTPException:
+    """Build the response for a command killed by its timeout."""
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=str(error),
     )
 
 
-@router.get("", response_model=List[dict])
-async def list_notebooks(client: NLMClient = Depends(get_nlm_client)):
+# Largest page a client may request with ``limit``
+MAX_PAGE_SIZE = 500
+
+SortField = Literal["title", "-title", "created", "-created", "modified", "-modified"]
+
+
+@router.get("", response_model=List[NotebookResponse])
+async def list_notebooks(
+    response: Response,
+    q: Optional[str] = Query(None, description="Case-insensitive title search"),
+    sort: Optional[SortField] = Query(
+        None, description="Sort field, prefixed with - for descending order"
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    client: NLMBackend = Depends(get_nlm_client),
+):
     """
-    List all notebooks.
+    List notebooks, optionally one page at a time.
+
+    Without query parameters all notebooks are returned in the CLI's order.
+    When more results follow a page, the cursor for the next one is sent in
+    the ``X-Next-Cursor`` header.
 
     Returns:
         List of notebooks
     """
     try:
-        notebooks = client.list_notebooks()
+        if q is None and sort is None and limit is None and cursor is None:
+            return await client.list_notebooks()
+        notebooks, next_cursor = await client.search_notebooks(
+            query=q, sort=sort, limit=limit, cursor=cursor
+        )
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor
         return notebooks
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
     except NLMError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -73,10 +125,14 @@ async def list_notebooks(client: NLMClient = Depends(get_nlm_client)):
         )
 
 
-@router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=Optional[NotebookResponse],
+    status_code=status.HTTP_201_CREATED,
+)
 async def create_notebook(
     notebook: NotebookCreate,
-    client: NLMClient = Depends(get_nlm_client),
+    client: NLMBackend = Depends(get_nlm_client),
 ):
     """
     Create a new notebook.
@@ -85,14 +141,18 @@ async def create_notebook(
         notebook: Notebook creation data
 
     Returns:
-        Created notebook data
+        Created notebook, or null if the CLI did not report it
     """
     try:
-        result = client.create_notebook(
+        result = await client.create_notebook(
             title=notebook.title,
             emoji=notebook.emoji,
         )
         return result
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
     except NLMError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -100,10 +160,10 @@ async def create_notebook(
         )
 
 
-@router.get("/{notebook_id}", response_model=dict)
+@router.get("/{notebook_id}", response_model=NotebookResponse)
 async def get_notebook(
     notebook_id: str,
-    client: NLMClient = Depends(get_nlm_client),
+    client: NLMBackend = Depends(get_nlm_client),
 ):
     """
     Get notebook details.
@@ -115,13 +175,17 @@ async def get_notebook(
         Notebook data
     """
     try:
-        notebook = client.get_notebook(notebook_id)
+        notebook = await client.get_notebook(notebook_id)
         return notebook
     except NotebookNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Notebook {notebook_id} not found",
         )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
     except NLMError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -132,7 +196,7 @@ async def get_notebook(
 @router.delete("/{notebook_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_notebook(
     notebook_id: str,
-    client: NLMClient = Depends(get_nlm_client),
+    client: NLMBackend = Depends(get_nlm_client),
 ):
     """
     Delete a notebook.
@@ -141,14 +205,267 @@ async def delete_notebook(
         notebook_id: Notebook ID to delete
     """
     try:
-        client.delete_notebook(notebook_id)
+        await client.delete_notebook(notebook_id=notebook_id)
     except NotebookNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"error": f"Notebook {notebook_id} not found"},
         )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
     except NLMError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
         )
+
+
+def _batch_result(result: SourceResult) -> SourceBatchResult:
+    """Convert one bulk-add result to its response model."""
+    return SourceBatchResult(
+        index=result.index,
+        source_input=result.item.source_input,
+        source=(
+            SourceResponse.model_validate(result.source, from_attributes=True)
+            if result.source is not None
+            else None
+        ),
+        error=result.error,
+        attempts=result.attempts,
+    )
+
+
+def _batch_response(results: List[SourceResult]) -> SourceBatchResponse:
+    """Summarize a finished batch."""
+    succeeded = sum(result.ok for result in results)
+    return SourceBatchResponse(
+        results=[_batch_result(result) for result in results],
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
+@router.post("/{notebook_id}/sources:batch", response_model=SourceBatchResponse)
+async def add_sources_batch(
+    notebook_id: str,
+    batch: SourceBatch,
+    request: Request,
+    client: NLMBackend = Depends(get_nlm_client),
+):
+    """
+    Add many sources to a notebook with bounded parallelism.
+
+    Each item succeeds or fails on its own; transient failures are retried.
+    Clients sending ``Accept: text/event-stream`` get a ``progress`` event
+    per finished item and a final ``done`` event with the summary.
+
+    Args:
+        notebook_id: Notebook ID
+        batch: Sources to add and optional concurrency
+
+    Returns:
+        Per-item results in input order with success and failure counts
+    """
+    try:
+        await client.get_notebook(notebook_id)
+    except NotebookNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {notebook_id} not found",
+        )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+    items = [
+        SourceItem(item.source_input, item.source_type, item.mime_type)
+        for item in batch.items
+    ]
+
+    if "text/event-stream" in request.headers.get("accept", ""):
+        # Results as items finish, then None once the batch is over
+        finished: asyncio.Queue[Optional[SourceResult]] = asyncio.Queue()
+
+        async def events() -> AsyncIterator[str]:
+            task = asyncio.ensure_future(
+                client.add_sources_bulk(
+                    notebook_id,
+                    items,
+                    concurrency=batch.concurrency,
+                    progress=finished.put_nowait,
+                )
+            )
+            task.add_done_callback(lambda _: finished.put_nowait(None))
+            try:
+                completed = 0
+                while (result := await finished.get()) is not None:
+                    completed += 1
+                    progress = {
+                        "completed": completed,
+                        "total": len(items),
+                        "result": _batch_result(result).model_dump(mode="json"),
+                    }
+                    yield _sse_event(json.dumps(progress), event="progress")
+                summary = _batch_response(await task)
+                yield _sse_event(summary.model_dump_json(), event="done")
+            except NLMError as e:
+                yield _sse_event(str(e), event="error")
+            finally:
+                task.cancel()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    try:
+        results = await client.add_sources_bulk(
+            notebook_id, items, concurrency=batch.concurrency
+        )
+    except NotebookNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {notebook_id} not found",
+        )
+    return _batch_response(results)
+
+
+def _sse_event(data: str, event: str = "message") -> str:
+    """Format one Server-Sent Event; newlines in data become data lines."""
+    lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+    return f"event: {event}\n{lines}\n"
+
+
+def _generation_failed(notebook_id: str, error: NLMError) -> HTTPException:
+    """Build the response for a content generation that failed."""
+    if isinstance(error, NotebookNotFoundError):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {notebook_id} not found",
+        )
+    if isinstance(error, NLMOverloadedError):
+        return overloaded(error)
+    if isinstance(error, NLMTimeoutError):
+        return timed_out(error)
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=str(error),
+    )
+
+
+@router.get("/{notebook_id}/generate/{kind}")
+@router.post("/{notebook_id}/generate/{kind}")
+async def generate_content(
+    notebook_id: str,
+    kind: Literal["guide", "outline", "faq", "glossary"],
+    request: Request,
+    client: NLMBackend = Depends(get_nlm_client),
+):
+    """
+    Generate content, streaming it to clients that accept Server-Sent Events.
+
+    With ``Accept: text/event-stream`` chunks are sent as the nlm CLI
+    produces them. The first chunk is awaited before responding so that
+    failures to start still map to an error status; later failures end the
+    stream with an ``error`` event. Other clients get the whole markdown
+    once generation finished, so a failure at any point maps to an error
+    status rather than a truncated 200.
+
+    Args:
+        notebook_id: Notebook ID
+        kind: Content to generate: guide, outline, faq or glossary
+
+    Returns:
+        Server-Sent Events, or the generated markdown
+    """
+    stream = getattr(client, GENERATORS[kind])(notebook_id)
+
+    if "text/event-stream" not in request.headers.get("accept", ""):
+        try:
+            content = "".join([chunk async for chunk in stream])
+        except NLMError as e:
+            raise _generation_failed(notebook_id, e)
+        return Response(content, media_type="text/markdown; charset=utf-8")
+
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = ""
+    except NLMError as e:
+        raise _generation_failed(notebook_id, e)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            if first:
+                yield _sse_event(first)
+            async for chunk in stream:
+                yield _sse_event(chunk)
+            yield _sse_event("", event="done")
+        except NLMError as e:
+            yield _sse_event(str(e), event="error")
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.api_route("/{notebook_id}/media/{kind}", methods=["GET", "HEAD"])
+async def get_media(
+    notebook_id: str,
+    kind: Literal["audio", "video"],
+    request: Request,
+    download: bool = Query(False, description="Send as an attachment"),
+    client: NLMBackend = Depends(get_nlm_client),
+    media: MediaCache = Depends(get_media_cache),
+):
+    """
+    Serve a notebook's audio or video overview for playback or download.
+
+    The file is downloaded through the CLI once and then served from the
+    media cache, with ``Range`` requests for seeking and ``ETag`` /
+    ``Last-Modified`` validation for repeat plays.
+
+    Args:
+        notebook_id: Notebook ID
+        kind: audio or video
+
+    Returns:
+        The media file, or the requested byte range of it
+    """
+    suffix = MEDIA_SUFFIXES[kind]
+    try:
+        file = await media.fetch(
+            f"{kind}/{notebook_id}",
+            suffix,
+            partial(client.download_media, notebook_id, kind),
+        )
+    except NotebookNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notebook {notebook_id} not found",
+        )
+    except NLMOverloadedError as e:
+        raise overloaded(e)
+    except NLMTimeoutError as e:
+        raise timed_out(e)
+    except NLMError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+    filename = f"{kind}_overview_{notebook_id}{suffix}" if download else None
+    return media_response(request, file, filename)
@@ -0,0 +1,91 @@
+"""Throughput benchmark: notebook routes over the in-memory fake backend.
+
+Serves GET /api/notebooks from a FakeNLMBackend holding a generated account,
+so the numbers measure the web layer (routing, validation, serialization)
+without the nlm binary or a NotebookLM account. Requests are issued
+concurrently through httpx's in-process ASGI transport.
+
+Usage:
+    python -m benchmarks.bench_routes --notebooks 100 10000 --requests 200
+    python -m benchmarks.bench_routes --latency 0.05 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+from nlm_web_core.fake_backend import FakeNLMBackend, generate_notebooks
+from app.main import app
+from app.routes.notebooks import get_nlm_client
+
+QUERIES = {
+    "full": "/api/notebooks",
+    "page": "/api/notebooks?limit=50&sort=-modified",
+    "search": "/api/notebooks?limit=50&q=jazz&sort=title",
+}
+
+
+async def measure(
+    http: httpx.AsyncClient, url: str, requests: int, concurrency: int
+) -> tuple[list[float], int]:
+    """Return per-request latencies and the response size for one URL."""
+    latencies: list[float] = []
+    size = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        nonlocal size
+        async with semaphore:
+            start = time.perf_counter()
+            response = await http.get(url)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            size = len(response.content)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, size
+
+
+async def run(counts: list[int], requests: int, concurrency: int, latency: float) -> None:
+    """Benchmark each query against each account size."""
+    print(
+        f"{'notebooks':>9} {'query':>7} {'p50':>10} {'p95':>10} {'req/s':>9} {'bytes':>10}"
+    )
+    # httpx wants dict scopes; Starlette's mapping-typed app speaks the same protocol
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    for count in counts:
+        backend = FakeNLMBackend(generate_notebooks(count), latency=latency)
+        app.dependency_overrides[get_nlm_client] = lambda: backend
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for name, url in QUERIES.items():
+                await http.get(url)  # build sorted views outside the timing
+                start = time.perf_counter()
+                latencies, size = await measure(http, url, requests, concurrency)
+                elapsed = time.perf_counter() - start
+                ordered = sorted(latencies)
+                p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                print(
+                    f"{count:>9} {name:>7} {statistics.median(ordered) * 1000:8.2f}ms"
+                    f" {p95 * 1000:8.2f}ms {requests / elapsed:9.1f} {size:>10}"
+                )
+    app.dependency_overrides.clear()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notebooks", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per fake nlm call"
+    )
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.notebooks, args.requests, args.concurrency, args.latency))
+
+
+if __name__ == "__main__":
+    main()
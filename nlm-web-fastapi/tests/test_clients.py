@@ -0,0 +1,28 @@
+"""Tests for the application's client registry."""
+from fastapi.testclient import TestClient
+from app.config import Settings
+from nlm_web_core.clients import ClientRegistry
+
+
+class TestLifespan:
+    """Test the FastAPI app shares one client across requests."""
+
+    def test_requests_share_client(self, monkeypatch):
+        """Test the dependency returns the registry's client."""
+        from app import clients
+        from app.main import app
+        from app.routes.notebooks import get_nlm_client
+
+        registry = ClientRegistry(
+            Settings(nlm_auth_token="token", nlm_cookies="cookies", nlm_worker_pool_size=0)
+        )
+        monkeypatch.setattr(clients, "registry", registry)
+        monkeypatch.setattr("app.routes.auth.registry", registry)
+        monkeypatch.setattr("app.main.registry", registry)
+
+        with TestClient(app):
+            client = registry._client
+            assert client is not None
+            assert get_nlm_client(registry) is client
+            assert get_nlm_client(registry) is client
+        assert registry._client is None
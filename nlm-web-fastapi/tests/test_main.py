@@ -0,0 +1,150 @@
+"""Tests for the diagnostics endpoints next to the API routes."""
+from typing import Any
+import pytest
+from fastapi.testclient import TestClient
+from starlette.middleware import Middleware
+from nlm_web_core.clients import ClientRegistry
+from nlm_web_core.metrics import CONTENT_TYPE, MetricsMiddleware
+from nlm_web_core.tracing import RequestIdMiddleware
+from app.config import Settings
+
+
+@pytest.fixture
+def serve(monkeypatch, tmp_path):
+    """Factory serving the app from a registry built with the given settings.
+
+    The app installs its middlewares from the process-wide registry when it is
+    imported, so they are installed again here around the test's registry.
+    Commands run a stand-in nlm binary that prints an empty listing.
+    """
+    from app.main import app
+
+    nlm = tmp_path / "nlm"
+    nlm.write_text("#!/bin/sh\necho '[]'\n")
+    nlm.chmod(0o755)
+
+    def make(**overrides: Any) -> tuple[ClientRegistry, TestClient]:
+        values: dict[str, Any] = {
+            "nlm_auth_token": "token",
+            "nlm_cookies": "cookies",
+            "nlm_path": str(nlm),
+            "nlm_job_store": ":memory:",
+            "nlm_media_dir": str(tmp_path),
+            "nlm_worker_pool_size": 0,
+        }
+        values.update(overrides)
+        registry = ClientRegistry(Settings(**values))
+        monkeypatch.setattr("app.main.registry", registry)
+        monkeypatch.setattr("app.routes.auth.registry", registry)
+        middleware = [Middleware(RequestIdMiddleware, tracer=registry.tracer)]
+        if registry.metrics is not None:
+            middleware.insert(0, Middleware(MetricsMiddleware, metrics=registry.metrics))
+        monkeypatch.setattr(app, "user_middleware", middleware)
+        monkeypatch.setattr(app, "middleware_stack", None)
+        return registry, TestClient(app)
+
+    return make
+
+
+class TestMetrics:
+    """Test the Prometheus endpoint."""
+
+    def test_disabled(self, serve):
+        """Test metrics answer 404 unless NLM_METRICS_ENABLED is set."""
+        _, client = serve()
+
+        assert client.get("/metrics").status_code == 404
+
+    def test_requests_labelled_by_route(self, serve):
+        """Test request latency is exported under each route's path template."""
+        _, client = serve(nlm_metrics_enabled=True)
+
+        client.get("/api/notebooks/nb1")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert any(
+            line.startswith("http_request_duration_seconds_count{")
+            and 'route="/api/notebooks/{notebook_id}"' in line
+            for line in response.text.splitlines()
+        )
+
+
+class TestHealth:
+    """Test the health check."""
+
+    def test_healthy(self, serve):
+        """Test a closed breaker reports healthy, with limiter and breaker stats."""
+        _, client = serve()
+
+        health = client.get("/health").json()
+
+        assert health["status"] == "healthy"
+        assert health["breaker"]["state"] == "closed"
+        assert health["limiter"]["running"] == 0
+        assert health["users"] == {"sessions": 0, "clients": 0}
+
+    def test_open_breaker_is_degraded(self, serve):
+        """Test an open breaker marks the service degraded."""
+        registry, client = serve(nlm_breaker_min_calls=1)
+        registry.client.breaker.record_failure()
+
+        health = client.get("/health").json()
+
+        assert health["status"] == "degraded"
+        assert health["breaker"]["state"] == "open"
+
+    def test_policies_reported_when_configured(self, serve):
+        """Test retry and adaptive timeout stats appear only when enabled."""
+        _, client = serve(nlm_retry_attempts=1)
+        health = client.get("/health").json()
+        assert "retries" not in health and "timeouts" not in health
+
+        _, client = serve(nlm_retry_attempts=3, nlm_timeout_adaptive=True)
+        health = client.get("/health").json()
+        assert health["retries"]["retries"] == 0
+        assert "timeouts" in health
+
+    def test_demo_mode(self, serve):
+        """Test the demo backend reports no resilience policies."""
+        _, client = serve(nlm_auth_token="")
+
+        health = client.get("/health").json()
+
+        assert health["status"] == "healthy"
+        assert not {"limiter", "breaker", "retries", "timeouts"} & health.keys()
+
+
+class TestTraces:
+    """Test request ids and the local latency breakdown."""
+
+    def test_disabled(self, serve):
+        """Test traces answer 404 unless NLM_TRACING=local."""
+        _, client = serve()
+
+        assert client.get("/traces").status_code == 404
+
+    def test_request_id_echoed(self, serve):
+        """Test a request's X-Request-ID is sent back, and one is made up otherwise."""
+        _, client = serve()
+
+        assert client.get("/health", headers={"X-Request-ID": "abc"}).headers[
+            "X-Request-ID"
+        ] == "abc"
+        assert client.get("/health").headers["X-Request-ID"]
+
+    def test_breakdown_by_request(self, serve):
+        """Test a request's span is listed with its nlm command spans nested under it."""
+        _, client = serve(nlm_tracing="local")
+
+        client.get("/api/notebooks", headers={"X-Request-ID": "abc"})
+        client.get("/health", headers={"X-Request-ID": "other"})
+        response = client.get("/traces", params={"request_id": "abc"})
+
+        lines = response.text.splitlines()
+        assert lines[0].startswith("http.request ")
+        assert "http.target=/api/notebooks" in lines[0]
+        assert any(line.startswith("  nlm.command ") for line in lines)
+        assert any(line.startswith("    nlm.process ") for line in lines)
+        assert "/health" not in response.text
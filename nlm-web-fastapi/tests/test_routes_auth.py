@@ -0,0 +1,108 @@
+"""Tests for sign-in routes and per-user request routing."""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from nlm_web_core.clients import ClientRegistry
+from app.config import Settings
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """Root registry in demo mode, serving the auth routes."""
+    registry = ClientRegistry(
+        Settings(
+            nlm_auth_token="",
+            nlm_job_store=":memory:",
+            nlm_media_dir=str(tmp_path),
+            nlm_worker_pool_size=0,
+        )
+    )
+    monkeypatch.setattr("app.routes.auth.registry", registry)
+    return registry
+
+
+@pytest.fixture
+def client(registry):
+    """Test client without the app lifespan, which uses the global registry."""
+    from app.main import app
+
+    return TestClient(app)
+
+
+LOGIN = {"auth_token": "user-token", "cookies": "user-cookies"}
+
+
+class TestAuth:
+    """Test /api/auth endpoints."""
+
+    def test_status_without_session(self, client):
+        """Test anonymous requests are reported as using the demo backend."""
+        response = client.get("/api/auth/status")
+
+        assert response.json() == {"authenticated": False, "mode": "demo"}
+
+    def test_login_sets_session_cookie(self, registry, client):
+        """Test signing in stores the credentials server-side behind a cookie."""
+        response = client.post("/api/auth/login", json=LOGIN)
+
+        assert response.status_code == 200
+        cookie = response.headers["set-cookie"]
+        assert cookie.startswith("nlm_session=")
+        assert "HttpOnly" in cookie and "samesite=lax" in cookie.lower()
+        assert "user-token" not in cookie
+        assert client.get("/api/auth/status").json()["authenticated"] is True
+        assert len(registry.sessions) == 1
+
+    def test_login_requires_credentials(self, client):
+        """Test empty credentials are rejected."""
+        response = client.post("/api/auth/login", json={"auth_token": "", "cookies": "c"})
+
+        assert response.status_code == 422
+
+    def test_logout_forgets_session(self, registry, client):
+        """Test signing out ends the session."""
+        client.post("/api/auth/login", json=LOGIN)
+
+        response = client.post("/api/auth/logout")
+
+        assert response.status_code == 204
+        assert len(registry.sessions) == 0
+        assert client.get("/api/auth/status").json()["authenticated"] is False
+
+    async def test_requests_use_users_registry(self, registry, client):
+        """Test a signed-in user's requests are served by their own registry."""
+        from app.routes.auth import get_registry
+
+        client.post("/api/auth/login", json=LOGIN)
+        session_id = client.cookies["nlm_session"]
+
+        user = await get_registry(session_id)
+        assert user is not registry
+        assert user.client.auth_token == "user-token"
+        assert await get_registry(session_id) is user
+        assert await get_registry(None) is registry
+
+    async def test_idle_users_are_closed(self, registry, client):
+        """Test a lookup closes idle users' registries on the event loop."""
+        from app.routes.auth import get_registry
+
+        registry.config.nlm_user_idle_timeout = 0
+        client.post("/api/auth/login", json=LOGIN)
+        user = await get_registry(client.cookies["nlm_session"])
+        user.jobs.start()
+        client.post("/api/auth/login", json={**LOGIN, "auth_token": "other-token"})
+
+        await get_registry(client.cookies["nlm_session"])
+        await asyncio.gather(*registry._closing)
+
+        assert user._jobs is None and user._client is None
+        assert registry.user_count == 1
+        await registry.close()
+
+    def test_login_required(self, registry, client):
+        """Test API requests without a session get 401 when sign-in is required."""
+        registry.config.nlm_require_login = True
+
+        assert client.get("/api/notebooks").status_code == 401
+        client.post("/api/auth/login", json=LOGIN)
+        assert client.get("/api/auth/status").json()["mode"] == "session"
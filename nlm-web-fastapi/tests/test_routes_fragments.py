@@ -0,0 +1,276 @@
+"""Tests for HTML fragment routes."""
+import os
+import pytest
+from urllib.parse import quote
+from fastapi.testclient import TestClient
+from nlm_web_core.fake_backend import FakeNLMBackend
+from app.fragments import FragmentRenderer
+from nlm_web_core.records import Notebook
+
+
+@pytest.fixture
+def backend():
+    """Serve fragment routes from an in-memory backend."""
+    from app.main import app
+    from app.routes.notebooks import get_nlm_client
+
+    backend = FakeNLMBackend()
+    app.dependency_overrides[get_nlm_client] = lambda: backend
+    yield backend
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(backend):
+    """Test client for the app."""
+    from app.main import app
+
+    return TestClient(app)
+
+
+class TestNotebookGrid:
+    """Test GET /fragments/notebooks."""
+
+    def test_renders_cards(self, client):
+        """Test the grid is HTML with a card per notebook and a poller."""
+        # Act
+        response = client.get("/fragments/notebooks")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert "Demo Research Notebook" in response.text
+        assert 'id="notebook-demo-nb-2"' in response.text
+        assert 'hx-trigger="every 30s"' in response.text
+
+    def test_escapes_titles(self, backend, client):
+        """Test notebook titles cannot inject markup."""
+        # Arrange
+        backend._notebooks["demo-nb-1"] = Notebook(
+            "demo-nb-1", "<script>alert(1)</script>", "📚"
+        )
+
+        # Act
+        response = client.get("/fragments/notebooks")
+
+        # Assert
+        assert "<script>" not in response.text
+        assert "&lt;script&gt;alert(1)&lt;/script&gt;" in response.text
+
+    def test_if_none_match_gets_304(self, client):
+        """Test an unchanged grid is not sent again."""
+        # Arrange
+        etag = client.get("/fragments/notebooks").headers["etag"]
+
+        # Act
+        response = client.get("/fragments/notebooks", headers={"If-None-Match": etag})
+
+        # Assert
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_poll_since_unchanged_gets_204(self, client):
+        """Test a poll carrying the current ETag gets No Content."""
+        # Arrange
+        etag = client.get("/fragments/notebooks").headers["etag"]
+
+        # Act
+        response = client.get("/fragments/notebooks", params={"since": etag})
+
+        # Assert
+        assert response.status_code == 204
+
+    def test_poll_after_change_gets_new_grid(self, client):
+        """Test a poll after a notebook was created gets the new grid."""
+        # Arrange
+        etag = client.get("/fragments/notebooks").headers["etag"]
+        client.post("/fragments/notebooks", data={"title": "Fresh Notebook"})
+
+        # Act
+        response = client.get("/fragments/notebooks", params={"since": etag})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert "Fresh Notebook" in response.text
+
+    def test_pages_link_to_next_page(self, client):
+        """Test a page ends with a button loading the next one."""
+        # Act
+        first = client.get("/fragments/notebooks", params={"sort": "title", "limit": 1})
+
+        # Assert
+        assert "Demo Research Notebook" in first.text
+        assert "Demo Study Notes" not in first.text
+        next_url = first.text.split('hx-get="')[1].split('"')[0].replace("&amp;", "&")
+        assert "cursor=" in next_url
+        assert "page=2" in next_url
+        second = client.get(next_url)
+        assert "Demo Study Notes" in second.text
+        assert "Load more" not in second.text
+
+    def test_poll_covers_loaded_pages(self, client):
+        """Test after "Load more" the poller refreshes both pages, not just the first."""
+        # Arrange
+        first = client.get("/fragments/notebooks", params={"sort": "title", "limit": 1})
+        next_url = first.text.split('hx-get="')[1].split('"')[0].replace("&amp;", "&")
+        second = client.get(next_url)
+
+        # Act
+        poller = second.text.split('id="notebooks-poller"')[1]
+        assert 'hx-swap-oob="true"' in poller
+        poll_url = poller.split('hx-get="')[1].split('"')[0].replace("&amp;", "&")
+        response = client.get(poll_url)
+
+        # Assert
+        assert "since=" not in poll_url
+        assert "Demo Research Notebook" in response.text
+        assert "Demo Study Notes" in response.text
+        assert "Load more" not in response.text
+        assert 'hx-swap-oob' not in response.text
+        etag = response.headers["etag"]
+        assert f"since={quote(etag)}" in response.text
+        assert client.get(poll_url, params={"since": etag}).status_code == 204
+
+    def test_empty_state(self, client):
+        """Test a search matching nothing shows the empty state."""
+        # Act
+        response = client.get("/fragments/notebooks", params={"q": "nothing like this"})
+
+        # Assert
+        assert "No notebooks" in response.text
+
+    def test_invalid_cursor(self, client):
+        """Test a malformed cursor is a bad request."""
+        # Act
+        response = client.get("/fragments/notebooks", params={"cursor": "bogus"})
+
+        # Assert
+        assert response.status_code == 400
+
+
+class TestNotebookCardFragments:
+    """Test per-notebook fragment endpoints."""
+
+    def test_card(self, client):
+        """Test a single card is rendered with an ETag."""
+        # Act
+        response = client.get("/fragments/notebooks/demo-nb-1")
+
+        # Assert
+        assert response.status_code == 200
+        assert "Demo Research Notebook" in response.text
+        assert 'hx-delete="/fragments/notebooks/demo-nb-1"' in response.text
+        assert client.get(
+            "/fragments/notebooks/demo-nb-1",
+            headers={"If-None-Match": response.headers["etag"]},
+        ).status_code == 304
+
+    def test_card_not_found(self, client):
+        """Test an unknown notebook is a 404."""
+        # Act
+        response = client.get("/fragments/notebooks/missing")
+
+        # Assert
+        assert response.status_code == 404
+
+    def test_create_returns_card(self, client):
+        """Test the create form gets the new notebook's card."""
+        # Act
+        response = client.post(
+            "/fragments/notebooks", data={"title": "Form Notebook", "emoji": "🧪"}
+        )
+
+        # Assert
+        assert response.status_code == 201
+        assert response.headers["content-type"].startswith("text/html")
+        assert "🧪 Form Notebook" in response.text
+
+    def test_create_requires_title(self, client):
+        """Test an empty title is rejected."""
+        # Act
+        response = client.post("/fragments/notebooks", data={"title": ""})
+
+        # Assert
+        assert response.status_code == 422
+
+    def test_delete_swaps_card_out(self, backend, client):
+        """Test delete answers an empty 200, so HTMX removes the card."""
+        # Act
+        response = client.delete("/fragments/notebooks/demo-nb-1")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.content == b""
+        assert "demo-nb-1" not in backend._notebooks
+
+    def test_delete_not_found(self, client):
+        """Test deleting an unknown notebook is a 404."""
+        # Act
+        response = client.delete("/fragments/notebooks/missing")
+
+        # Assert
+        assert response.status_code == 404
+
+
+class TestFragmentRenderer:
+    """Test FragmentRenderer caching."""
+
+    @pytest.fixture
+    def renderer(self, tmp_path):
+        """Renderer over a directory with the fragment templates."""
+        partials = tmp_path / "partials"
+        partials.mkdir()
+        (partials / "notebook_grid.html").write_text("{{ notebooks | length }}")
+        (partials / "notebook_card.html").write_text("<b>{{ notebook.title }}</b>")
+        return FragmentRenderer(tmp_path, max_entries=2)
+
+    def test_etag_depends_on_data(self, renderer):
+        """Test equal data gives equal ETags and different data different ones."""
+        # Arrange
+        notebook = Notebook("nb-1", "One")
+
+        # Act
+        etag = renderer.etag("partials/notebook_card.html", notebook)
+
+        # Assert
+        assert etag == renderer.etag("partials/notebook_card.html", Notebook("nb-1", "One"))
+        assert etag != renderer.etag("partials/notebook_card.html", Notebook("nb-1", "Two"))
+        assert etag != renderer.etag("partials/notebook_grid.html", notebook)
+        assert etag.startswith('"') and etag.endswith('"')
+
+    def test_render_is_cached_by_etag(self, renderer):
+        """Test a fragment is rendered once per ETag, evicting the oldest."""
+        # Arrange
+        name = "partials/notebook_card.html"
+        notebooks = [Notebook(f"nb-{i}", f"<{i}>") for i in range(3)]
+        etags = [renderer.etag(name, notebook) for notebook in notebooks]
+
+        # Act
+        first = renderer.render(name, etags[0], notebook=notebooks[0])
+        again = renderer.render(name, etags[0], notebook=notebooks[0])
+        renderer.render(name, etags[1], notebook=notebooks[1])
+        renderer.render(name, etags[2], notebook=notebooks[2])
+        renderer.render(name, etags[0], notebook=notebooks[0])
+
+        # Assert
+        assert first == again == b"<b>&lt;0&gt;</b>"
+        assert (renderer.hits, renderer.misses) == (1, 4)
+
+    def test_template_change_changes_etag(self, tmp_path, renderer):
+        """Test reloaded templates do not serve ETags of their old output."""
+        # Arrange
+        renderer.environment.auto_reload = True
+        notebook = Notebook("nb-1", "One")
+        etag = renderer.etag("partials/notebook_card.html", notebook)
+
+        # Act
+        path = tmp_path / "partials" / "notebook_card.html"
+        path.write_text("<i>{{ notebook.title }}</i>")
+        mtime = path.stat().st_mtime + 10
+        os.utime(path, (mtime, mtime))
+
+        # Assert
+        assert renderer.etag("partials/notebook_card.html", notebook) != etag
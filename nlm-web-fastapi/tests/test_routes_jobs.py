@@ -0,0 +1,90 @@
+"""Tests for background job routes."""
+import time
+import pytest
+from fastapi.testclient import TestClient
+from nlm_web_core.fake_backend import FakeNLMBackend
+from nlm_web_core.jobs import JobQueue, JobStore
+
+
+@pytest.fixture
+def backend():
+    """Serve job routes from an in-memory backend and job queue."""
+    from app.main import app
+    from app.routes.jobs import get_job_queue
+    from app.routes.notebooks import get_nlm_client
+
+    backend = FakeNLMBackend(audio_delay=0.05)
+    queue = JobQueue(backend, JobStore(), poll_interval=0.01)
+    app.dependency_overrides[get_nlm_client] = lambda: backend
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    yield backend
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(backend):
+    """Test client whose event loop outlives single requests, so jobs can run."""
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def wait_done(client: TestClient, url: str, timeout: float = 2.0) -> dict:
+    """Poll a job URL until the job has finished."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(url).json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+class TestJobs:
+    """Test /api/jobs endpoints."""
+
+    def test_submit_and_poll(self, backend, client):
+        """Test a job is accepted at once and its URL reports completion."""
+        # Act
+        response = client.post(
+            "/api/jobs",
+            json={"kind": "audio", "notebook_id": "demo-nb-1", "instructions": "Be brief"},
+        )
+
+        # Assert
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        job = wait_done(client, response.headers["Location"])
+        assert job["status"] == "succeeded"
+        assert job["result"] == backend._audio["demo-nb-1"].audio_id
+        assert backend._audio["demo-nb-1"].instructions == "Be brief"
+
+    def test_list_by_notebook(self, client):
+        """Test jobs can be listed per notebook, newest first."""
+        first = client.post("/api/jobs", json={"kind": "faq", "notebook_id": "demo-nb-1"})
+        client.post("/api/jobs", json={"kind": "faq", "notebook_id": "demo-nb-2"})
+        second = client.post("/api/jobs", json={"kind": "guide", "notebook_id": "demo-nb-1"})
+
+        response = client.get("/api/jobs", params={"notebook_id": "demo-nb-1"})
+
+        assert [job["job_id"] for job in response.json()] == [
+            second.json()["job_id"],
+            first.json()["job_id"],
+        ]
+
+    def test_missing_notebook(self, client):
+        """Test jobs for unknown notebooks are rejected before queueing."""
+        response = client.post("/api/jobs", json={"kind": "audio", "notebook_id": "missing"})
+
+        assert response.status_code == 404
+        assert client.get("/api/jobs").json() == []
+
+    def test_unknown_job(self, client):
+        """Test unknown job IDs are 404."""
+        assert client.get("/api/jobs/nope").status_code == 404
+
+    def test_invalid_kind(self, client):
+        """Test only known job kinds are accepted."""
+        response = client.post("/api/jobs", json={"kind": "podcast", "notebook_id": "demo-nb-1"})
+
+        assert response.status_code == 422
@@ -1,7 +1,7 @@
 """Tests for notebook routes."""
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock
 
 
 @pytest.fixture
@@ -12,19 +12,28 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def mock_nlm():
+    """Override the NLM client dependency with an async mock."""
+    from app.main import app
+    from app.routes.notebooks import get_nlm_client
+
+    mock = AsyncMock()
+    app.dependency_overrides[get_nlm_client] = lambda: mock
+    yield mock
+    app.dependency_overrides.clear()
+
+
 class TestListNotebooks:
     """Test GET /api/notebooks endpoint."""
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_list_notebooks_success(self, mock_get_client, client):
+    def test_list_notebooks_success(self, mock_nlm, client):
         """Test successful notebook listing."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.list_notebooks.return_value = [
             {"project_id": "nb1", "title": "Notebook 1", "emoji": "📚"},
             {"project_id": "nb2", "title": "Notebook 2", "emoji": "📖"},
         ]
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.get("/api/notebooks")
@@ -36,13 +45,34 @@ class TestListNotebooks:
         assert data[0]["project_id"] == "nb1"
         assert data[1]["project_id"] == "nb2"
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_list_notebooks_empty(self, mock_get_client, client):
+    def test_list_notebooks_typed_response(self, mock_nlm, client):
+        """Test records are serialized through NotebookResponse."""
+        # Arrange
+        from nlm_web_core.records import Notebook
+
+        mock_nlm.list_notebooks.return_value = [
+            Notebook("nb1", "Notebook 1", "📚", source_count=3)
+        ]
+
+        # Act
+        response = client.get("/api/notebooks")
+
+        # Assert
+        assert response.json() == [
+            {
+                "project_id": "nb1",
+                "title": "Notebook 1",
+                "emoji": "📚",
+                "created_at": None,
+                "modified_at": None,
+                "source_count": 3,
+            }
+        ]
+
+    def test_list_notebooks_empty(self, mock_nlm, client):
         """Test listing when no notebooks exist."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.list_notebooks.return_value = []
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.get("/api/notebooks")
@@ -51,36 +81,94 @@ class TestListNotebooks:
         assert response.status_code == 200
         assert response.json() == []
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_list_notebooks_error(self, mock_get_client, client):
+    def test_list_notebooks_error(self, mock_nlm, client):
         """Test error handling."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.list_notebooks.side_effect = Exception("API Error")
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.get("/api/notebooks")
 
         # Assert
         assert response.status_code == 500
-        assert "error" in response.json()
+        assert "error" in response.json()["detail"]
+
+    def test_list_notebooks_overloaded(self, mock_nlm, client):
+        """Test a full command queue is reported as 503."""
+        # Arrange
+        from nlm_web_core.nlm_client import NLMOverloadedError
+
+        mock_nlm.list_notebooks.side_effect = NLMOverloadedError("Queue full")
+
+        # Act
+        response = client.get("/api/notebooks")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+
+    def test_list_notebooks_page(self, mock_nlm, client):
+        """Test query parameters select a page and expose the next cursor."""
+        # Arrange
+        from nlm_web_core.records import Notebook
+
+        mock_nlm.search_notebooks.return_value = ([Notebook("nb2", "Apple")], "abc")
+
+        # Act
+        response = client.get("/api/notebooks?q=app&sort=-title&limit=1")
+
+        # Assert
+        assert response.status_code == 200
+        assert [nb["project_id"] for nb in response.json()] == ["nb2"]
+        assert response.headers["X-Next-Cursor"] == "abc"
+        mock_nlm.search_notebooks.assert_awaited_once_with(
+            query="app", sort="-title", limit=1, cursor=None
+        )
+        mock_nlm.list_notebooks.assert_not_called()
+
+    def test_list_notebooks_last_page(self, mock_nlm, client):
+        """Test the last page carries no cursor header."""
+        # Arrange
+        mock_nlm.search_notebooks.return_value = ([], None)
+
+        # Act
+        response = client.get("/api/notebooks?limit=10&cursor=abc")
+
+        # Assert
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_list_notebooks_invalid_cursor(self, mock_nlm, client):
+        """Test a rejected cursor is reported as 400."""
+        # Arrange
+        mock_nlm.search_notebooks.side_effect = ValueError("Invalid cursor")
+
+        # Act
+        response = client.get("/api/notebooks?cursor=bogus")
+
+        # Assert
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("query", ["sort=size", "limit=0", "limit=100000"])
+    def test_list_notebooks_invalid_params(self, client, query):
+        """Test unknown sorts and out-of-range limits are rejected."""
+        response = client.get(f"/api/notebooks?{query}")
+
+        assert response.status_code == 422
 
 
 class TestCreateNotebook:
     """Test POST /api/notebooks endpoint."""
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_create_notebook_success(self, mock_get_client, client):
+    def test_create_notebook_success(self, mock_nlm, client):
         """Test successful notebook creation."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.create_notebook.return_value = {
             "project_id": "nb123",
             "title": "New Notebook",
             "emoji": "📚",
         }
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.post(
@@ -96,16 +184,13 @@ class TestCreateNotebook:
             title="New Notebook", emoji="📚"
         )
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_create_notebook_without_emoji(self, mock_get_client, client):
+    def test_create_notebook_without_emoji(self, mock_nlm, client):
         """Test creating notebook without emoji."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.create_notebook.return_value = {
             "project_id": "nb123",
             "title": "New Notebook",
         }
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.post("/api/notebooks", json={"title": "New Notebook"})
@@ -126,13 +211,10 @@ class TestCreateNotebook:
 class TestDeleteNotebook:
     """Test DELETE /api/notebooks/{id} endpoint."""
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_delete_notebook_success(self, mock_get_client, client):
+    def test_delete_notebook_success(self, mock_nlm, client):
         """Test successful notebook deletion."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.delete_notebook.return_value = True
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.delete("/api/notebooks/nb123")
@@ -141,38 +223,32 @@ class TestDeleteNotebook:
         assert response.status_code == 204
         mock_nlm.delete_notebook.assert_called_once_with(notebook_id="nb123")
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_delete_notebook_not_found(self, mock_get_client, client):
+    def test_delete_notebook_not_found(self, mock_nlm, client):
         """Test deleting non-existent notebook."""
         # Arrange
-        from app.nlm_client import NotebookNotFoundError
+        from nlm_web_core.nlm_client import NotebookNotFoundError
 
-        mock_nlm = Mock()
         mock_nlm.delete_notebook.side_effect = NotebookNotFoundError("Not found")
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.delete("/api/notebooks/invalid")
 
         # Assert
         assert response.status_code == 404
-        assert "error" in response.json()
+        assert "error" in response.json()["detail"]
 
 
 class TestGetNotebook:
     """Test GET /api/notebooks/{id} endpoint."""
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_get_notebook_success(self, mock_get_client, client):
+    def test_get_notebook_success(self, mock_nlm, client):
         """Test successful notebook retrieval."""
         # Arrange
-        mock_nlm = Mock()
         mock_nlm.get_notebook.return_value = {
             "project_id": "nb123",
             "title": "Test Notebook",
             "emoji": "📚",
         }
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.get("/api/notebooks/nb123")
@@ -183,18 +259,334 @@ class TestGetNotebook:
         assert data["project_id"] == "nb123"
         assert data["title"] == "Test Notebook"
 
-    @patch("app.routes.notebooks.get_nlm_client")
-    def test_get_notebook_not_found(self, mock_get_client, client):
+    def test_get_notebook_not_found(self, mock_nlm, client):
         """Test getting non-existent notebook."""
         # Arrange
-        from app.nlm_client import NotebookNotFoundError
+        from nlm_web_core.nlm_client import NotebookNotFoundError
 
-        mock_nlm = Mock()
         mock_nlm.get_notebook.side_effect = NotebookNotFoundError("Not found")
-        mock_get_client.return_value = mock_nlm
 
         # Act
         response = client.get("/api/notebooks/invalid")
 
         # Assert
         assert response.status_code == 404
+
+    def test_get_notebook_busy(self, mock_nlm, client):
+        """Test a full per-notebook queue is reported as 429."""
+        # Arrange
+        from nlm_web_core.nlm_client import NotebookBusyError
+
+        mock_nlm.get_notebook.side_effect = NotebookBusyError("Notebook busy")
+
+        # Act
+        response = client.get("/api/notebooks/nb123")
+
+        # Assert
+        assert response.status_code == 429
+        assert response.json()["detail"] == "Notebook busy"
+
+    def test_get_notebook_circuit_open(self, mock_nlm, client):
+        """Test commands paused by the circuit breaker are 503 with its Retry-After."""
+        # Arrange
+        from nlm_web_core.nlm_client import NLMUnavailableError
+
+        mock_nlm.get_notebook.side_effect = NLMUnavailableError("paused", retry_after=12.3)
+
+        # Act
+        response = client.get("/api/notebooks/nb123")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "13"
+
+    def test_get_notebook_timeout(self, mock_nlm, client):
+        """Test a command killed by its timeout is reported as 504."""
+        # Arrange
+        from nlm_web_core.nlm_client import NLMTimeoutError
+
+        mock_nlm.get_notebook.side_effect = NLMTimeoutError(
+            "nlm list timed out after 20s"
+        )
+
+        # Act
+        response = client.get("/api/notebooks/nb123")
+
+        # Assert
+        assert response.status_code == 504
+        assert "timed out" in response.json()["detail"]
+
+
+async def fake_stream(*chunks, error=None):
+    """Async generator yielding chunks, then optionally raising error."""
+    for chunk in chunks:
+        yield chunk
+    if error is not None:
+        raise error
+
+
+class TestGenerateContent:
+    """Test /api/notebooks/{id}/generate/{kind} streaming endpoint."""
+
+    def test_markdown(self, mock_nlm, client):
+        """Test chunks are joined into plain markdown by default."""
+        # Arrange
+        mock_nlm.stream_guide = Mock(return_value=fake_stream("# Guide\n", "- a\n"))
+
+        # Act
+        response = client.post("/api/notebooks/nb1/generate/guide")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert response.text == "# Guide\n- a\n"
+        mock_nlm.stream_guide.assert_called_once_with("nb1")
+
+    def test_server_sent_events(self, mock_nlm, client):
+        """Test SSE framing when the client accepts text/event-stream."""
+        # Arrange
+        mock_nlm.stream_faq = Mock(return_value=fake_stream("Q1\nA1", "\n"))
+
+        # Act
+        response = client.get(
+            "/api/notebooks/nb1/generate/faq",
+            headers={"Accept": "text/event-stream"},
+        )
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            "event: message\ndata: Q1\ndata: A1\n\n"
+            "event: message\ndata: \ndata: \n\n"
+            "event: done\ndata: \n\n"
+        )
+
+    def test_error_mid_stream_sends_error_event(self, mock_nlm, client):
+        """Test a failure after the first chunk is reported as an SSE event."""
+        # Arrange
+        from nlm_web_core.nlm_client import NLMError
+
+        mock_nlm.stream_outline = Mock(
+            return_value=fake_stream("# Outline\n", error=NLMError("boom"))
+        )
+
+        # Act
+        response = client.get(
+            "/api/notebooks/nb1/generate/outline",
+            headers={"Accept": "text/event-stream"},
+        )
+
+        # Assert
+        assert response.text.endswith("event: error\ndata: boom\n\n")
+
+    def test_error_mid_generation_maps_to_status(self, mock_nlm, client):
+        """Test a failure after some output is an error status, not a truncated 200."""
+        # Arrange
+        from nlm_web_core.nlm_client import NLMTimeoutError
+
+        mock_nlm.stream_outline = Mock(
+            return_value=fake_stream("# Outline\n", error=NLMTimeoutError("too slow"))
+        )
+
+        # Act
+        response = client.post("/api/notebooks/nb1/generate/outline")
+
+        # Assert
+        assert response.status_code == 504
+        assert "# Outline" not in response.text
+
+    def test_not_found_before_first_chunk(self, mock_nlm, client):
+        """Test errors before any output map to a status code."""
+        # Arrange
+        from nlm_web_core.nlm_client import NotebookNotFoundError
+
+        mock_nlm.stream_glossary = Mock(
+            return_value=fake_stream(error=NotebookNotFoundError("Not found"))
+        )
+
+        # Act
+        response = client.post("/api/notebooks/missing/generate/glossary")
+
+        # Assert
+        assert response.status_code == 404
+
+    def test_unknown_kind(self, client):
+        """Test unsupported content kinds are rejected."""
+        response = client.post("/api/notebooks/nb1/generate/timeline")
+
+        assert response.status_code == 422
+
+
+class TestAddSourcesBatch:
+    """Test POST /api/notebooks/{id}/sources:batch endpoint."""
+
+    @pytest.fixture
+    def fake_backend(self):
+        """Serve routes from an in-memory backend."""
+        from nlm_web_core.fake_backend import FakeNLMBackend
+        from app.main import app
+        from app.routes.notebooks import get_nlm_client
+
+        backend = FakeNLMBackend()
+        app.dependency_overrides[get_nlm_client] = lambda: backend
+        yield backend
+        app.dependency_overrides.clear()
+
+    def test_per_item_results(self, mock_nlm, client):
+        """Test successes and failures are reported per item."""
+        # Arrange
+        from nlm_web_core.bulk import SourceItem, SourceResult
+        from nlm_web_core.records import Source
+
+        mock_nlm.add_sources_bulk.return_value = [
+            SourceResult(0, SourceItem("https://a"), source=Source("s1", "A")),
+            SourceResult(1, SourceItem("https://b"), error="invalid URL", attempts=1),
+        ]
+
+        # Act
+        response = client.post(
+            "/api/notebooks/nb1/sources:batch",
+            json={
+                "items": [{"source_input": "https://a"}, {"source_input": "https://b"}],
+                "concurrency": 2,
+            },
+        )
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["succeeded"], data["failed"]) == (1, 1)
+        assert data["results"][0]["source"]["source_id"] == "s1"
+        assert data["results"][1]["error"] == "invalid URL"
+        args = mock_nlm.add_sources_bulk.await_args
+        assert args.kwargs["concurrency"] == 2
+        assert [item.source_input for item in args.args[1]] == ["https://a", "https://b"]
+
+    def test_adds_to_backend(self, fake_backend, client):
+        """Test sources are added end to end."""
+        # Act
+        response = client.post(
+            "/api/notebooks/demo-nb-1/sources:batch",
+            json={"items": [{"source_input": f"https://e.com/{i}"} for i in range(5)]},
+        )
+
+        # Assert
+        assert response.json()["succeeded"] == 5
+        assert len(fake_backend._sources["demo-nb-1"]) == 5
+
+    def test_progress_events(self, fake_backend, client):
+        """Test SSE clients get one progress event per item, then a summary."""
+        import json
+
+        # Act
+        response = client.post(
+            "/api/notebooks/demo-nb-1/sources:batch",
+            json={"items": [{"source_input": "t", "source_type": "text"}] * 3},
+            headers={"Accept": "text/event-stream"},
+        )
+
+        # Assert
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("data: ", 1)[1]))
+            for block in response.text.strip().split("\n\n")
+        ]
+        assert [name for name, _ in events] == ["progress"] * 3 + ["done"]
+        assert [data["completed"] for _, data in events[:3]] == [1, 2, 3]
+        assert events[-1][1]["succeeded"] == 3
+
+    def test_missing_notebook(self, fake_backend, client):
+        """Test an unknown notebook is 404 before anything is added."""
+        response = client.post(
+            "/api/notebooks/missing/sources:batch",
+            json={"items": [{"source_input": "https://a"}]},
+        )
+
+        assert response.status_code == 404
+
+    def test_empty_batch(self, client):
+        """Test a batch needs at least one item."""
+        response = client.post("/api/notebooks/nb1/sources:batch", json={"items": []})
+
+        assert response.status_code == 422
+
+
+class TestMedia:
+    """Test GET /api/notebooks/{id}/media/{kind} endpoint."""
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        """Serve media from an in-memory backend with an audio overview."""
+        import asyncio
+        from nlm_web_core.fake_backend import FakeNLMBackend
+        from app.main import app
+        from nlm_web_core.media import MediaCache
+        from app.routes.notebooks import get_media_cache, get_nlm_client
+
+        backend = FakeNLMBackend()
+        asyncio.run(backend.create_audio("demo-nb-1", "Be brief"))
+        app.dependency_overrides[get_nlm_client] = lambda: backend
+        app.dependency_overrides[get_media_cache] = lambda: MediaCache(str(tmp_path))
+        yield backend
+        app.dependency_overrides.clear()
+
+    URL = "/api/notebooks/demo-nb-1/media/audio"
+
+    def test_full_file_then_cached(self, backend, client):
+        """Test the whole file is served and later requests skip the CLI."""
+        # Act
+        first = client.get(self.URL)
+        second = client.get(self.URL)
+
+        # Assert
+        assert first.status_code == 200
+        assert first.headers["content-type"].startswith("audio/")
+        assert first.headers["accept-ranges"] == "bytes"
+        assert first.content[:4] == b"RIFF"
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert backend.calls == 2  # create_audio, then one download
+
+    def test_range_requests(self, backend, client):
+        """Test seeking gets partial content and bad ranges get 416."""
+        size = len(client.get(self.URL).content)
+
+        partial = client.get(self.URL, headers={"Range": "bytes=4-7"})
+        tail = client.get(self.URL, headers={"Range": "bytes=-10"})
+        beyond = client.get(self.URL, headers={"Range": f"bytes={size}-"})
+
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == f"bytes 4-7/{size}"
+        assert len(partial.content) == 4
+        assert tail.headers["content-range"] == f"bytes {size - 10}-{size - 1}/{size}"
+        assert beyond.status_code == 416
+        assert beyond.headers["content-range"] == f"bytes */{size}"
+
+    def test_conditional_requests(self, backend, client):
+        """Test validators give 304 and a stale If-Range gives the whole file."""
+        first = client.get(self.URL)
+        etag, modified = first.headers["etag"], first.headers["last-modified"]
+
+        assert client.get(self.URL, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(self.URL, headers={"If-Modified-Since": modified}).status_code == 304
+        stale = client.get(self.URL, headers={"Range": "bytes=0-1", "If-Range": '"old"'})
+        assert stale.status_code == 200
+        fresh = client.get(self.URL, headers={"Range": "bytes=0-1", "If-Range": etag})
+        assert fresh.status_code == 206
+
+    def test_head_and_download(self, backend, client):
+        """Test HEAD sends only headers and ?download=true an attachment."""
+        head = client.head(self.URL)
+        download = client.get(self.URL, params={"download": "true"})
+
+        assert head.status_code == 200 and head.content == b""
+        assert int(head.headers["content-length"]) == len(download.content)
+        assert download.headers["content-disposition"] == (
+            'attachment; filename="audio_overview_demo-nb-1.wav"'
+        )
+
+    def test_missing_media(self, backend, client):
+        """Test unknown notebooks are 404 and missing overviews fail."""
+        assert client.get("/api/notebooks/missing/media/audio").status_code == 404
+        assert client.get("/api/notebooks/demo-nb-2/media/video").status_code == 500
+        assert client.get("/api/notebooks/demo-nb-1/media/podcast").status_code == 422
@@ -1,13 +1,15 @@
 """Notebook card component."""
 from nicegui import ui
-from typing import Dict, Any, Callable
+from typing import Callable
+from nlm_web_core.records import Notebook
 
 
 def notebook_card(
-    notebook: Dict[str, Any],
+    notebook: Notebook,
     on_view: Callable[[str], None],
     on_delete: Callable[[str], None],
-) -> None:
+    pending: bool = False,
+) -> ui.card:
     """
     Render a notebook card.
 
@@ -15,30 +17,47 @@ def notebook_card(
         notebook: Notebook data
         on_view: Callback when view is clicked
         on_delete: Callback when delete is clicked
+        pending: Whether the notebook is still being created, which dims the
+            card and disables its buttons
+
+    Returns:
+        The card element
     """
-    with ui.card().classes("w-full hover:shadow-lg transition-shadow"):
+    with ui.card().classes("w-full hover:shadow-lg transition-shadow") as card:
+        if pending:
+            card.classes("opacity-50")
+
         # Header
         with ui.row().classes("w-full items-center justify-between"):
-            ui.label(f"{notebook.get('emoji', '📚')} {notebook['title']}").classes(
+            ui.label(f"{notebook.emoji or '📚'} {notebook.title}").classes(
                 "text-lg font-semibold"
             )
 
         # Metadata
-        ui.label(f"ID: {notebook['project_id']}").classes("text-sm text-gray-500")
+        ui.label(
+            "Creating…" if pending else f"ID: {notebook.project_id}"
+        ).classes("text-sm text-gray-500")
 
         # Stats
-        source_count = len(notebook.get("sources", []))
         with ui.row().classes("gap-4 mt-2"):
-            ui.label(f"📄 {source_count} sources").classes("text-sm text-gray-600")
+            ui.label(f"📄 {notebook.source_count} sources").classes(
+                "text-sm text-gray-600"
+            )
 
         # Actions
         with ui.row().classes("gap-2 mt-4"):
-            ui.button(
+            view_button = ui.button(
                 "View",
-                on_click=lambda: on_view(notebook["project_id"]),
+                on_click=lambda: on_view(notebook.project_id),
             ).props("flat color=primary")
 
-            ui.button(
+            delete_button = ui.button(
                 "Delete",
-                on_click=lambda: on_delete(notebook["project_id"]),
+                on_click=lambda: on_delete(notebook.project_id),
             ).props("flat color=negative")
+
+        if pending:
+            for button in (view_button, delete_button):
+                button.disable()
+
+    return card
@@ -0,0 +1,137 @@
+"""Notebook grid component that re-renders only the cards that changed."""
+from nicegui import ui
+from typing import Callable, Collection, Optional
+from app.components.notebook_card import notebook_card
+from nlm_web_core.records import Notebook
+
+# Cards rendered at first, and added each time the end of the grid scrolls
+# into view; accounts with hundreds of notebooks are rendered a page at a time
+PAGE_SIZE = 60
+
+
+class NotebookGrid:
+    """Grid of notebook cards keyed by project ID.
+
+    update() compares a new listing with the cards on screen: cards of
+    removed notebooks are deleted, new and changed notebooks get a new card,
+    and unchanged cards are kept, moved if the order changed. A refresh
+    therefore sends only the changed cards over the websocket rather than
+    the whole grid.
+
+    Only the first ``limit`` notebooks get a card. A sentinel below the grid
+    raises the limit by a page when it scrolls into view (or is clicked), so
+    large accounts are rendered incrementally as the user scrolls.
+    """
+
+    def __init__(
+        self,
+        on_view: Callable[[str], None],
+        on_delete: Callable[[str], None],
+        columns: int = 3,
+        page_size: int = PAGE_SIZE,
+    ):
+        """
+        Create an empty grid in the current container.
+
+        Args:
+            on_view: Callback when a card's view button is clicked
+            on_delete: Callback when a card's delete button is clicked
+            columns: Grid columns
+            page_size: Cards rendered at first and per page after that
+        """
+        self.on_view = on_view
+        self.on_delete = on_delete
+        self.columns = columns
+        self.page_size = page_size
+        self.limit = page_size
+        self.notebooks: list[Notebook] = []
+        self.pending: frozenset[str] = frozenset()
+        # Rendered cards by project ID, with the record and pending flag each
+        # was rendered from
+        self._cards: dict[str, tuple[Notebook, bool, ui.card]] = {}
+        self._empty: Optional[ui.column] = None
+
+        self.grid = ui.grid(columns=columns).classes("w-full gap-4")
+        # Quasar's q-intersection reports when it enters the viewport
+        self._more = ui.element("q-intersection").classes("w-full").style(
+            "min-height: 48px"
+        )
+        self._more.on("visibility", lambda e: self.show_more() if e.args else None)
+        with self._more:
+            self._more_button = ui.button(on_click=self.show_more).props(
+                "flat color=primary"
+            ).classes("w-full")
+        self._more.visible = False
+
+    def __len__(self) -> int:
+        """Number of cards currently rendered."""
+        return len(self._cards)
+
+    def update(
+        self, notebooks: list[Notebook], pending: Collection[str] = ()
+    ) -> None:
+        """
+        Show a new listing, re-rendering only what changed.
+
+        Args:
+            notebooks: Notebooks in display order
+            pending: IDs of notebooks still being created
+        """
+        self.notebooks = list(notebooks)
+        self.pending = frozenset(pending)
+        visible = self.notebooks[: self.limit]
+        keep = {notebook.project_id for notebook in visible}
+
+        for project_id in [pid for pid in self._cards if pid not in keep]:
+            self.grid.remove(self._cards.pop(project_id)[2])
+
+        order: list[ui.element] = []
+        for notebook in visible:
+            is_pending = notebook.project_id in self.pending
+            entry = self._cards.get(notebook.project_id)
+            if entry is not None and entry[:2] != (notebook, is_pending):
+                self.grid.remove(entry[2])
+                entry = None
+            if entry is None:
+                with self.grid:
+                    card = notebook_card(
+                        notebook=notebook,
+                        on_view=self.on_view,
+                        on_delete=self.on_delete,
+                        pending=is_pending,
+                    )
+                entry = self._cards[notebook.project_id] = (notebook, is_pending, card)
+            order.append(entry[2])
+
+        if self._empty is not None and self.notebooks:
+            self.grid.remove(self._empty)
+            self._empty = None
+        elif not self.notebooks:
+            if self._empty is None:
+                with self.grid:
+                    self._empty = self._empty_state()
+            order.append(self._empty)
+
+        # New cards were appended; restore display order in one update
+        children = self.grid.default_slot.children
+        if children != order:
+            children[:] = order
+            self.grid.update()
+
+        remaining = len(self.notebooks) - len(visible)
+        self._more.visible = remaining > 0
+        self._more_button.text = f"Show more ({remaining} remaining)"
+
+    def show_more(self) -> None:
+        """Render the next page of notebooks."""
+        if len(self.notebooks) > self.limit:
+            self.limit += self.page_size
+            self.update(self.notebooks, self.pending)
+
+    def _empty_state(self) -> ui.column:
+        """Placeholder shown when there are no notebooks."""
+        with ui.column().classes(f"col-span-{self.columns} text-center py-12") as empty:
+            ui.icon("description", size="xl").classes("text-gray-400")
+            ui.label("No notebooks").classes("text-lg font-medium mt-2")
+            ui.label("Get started by creating a new notebook").classes("text-gray-500")
+        return empty
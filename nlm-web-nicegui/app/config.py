@@ -1,16 +1,9 @@
 """Application configuration."""
-from pydantic_settings import BaseSettings
-from typing import Optional
+from nlm_web_core.settings import NLMSettings
 
 
-class Settings(BaseSettings):
-    """Application settings."""
-
-    # NLM Configuration
-    nlm_auth_token: str = ""
-    nlm_cookies: str = ""
-    nlm_browser_profile: str = "Default"
-    nlm_path: str = "nlm"
+class Settings(NLMSettings):
+    """Application settings; the nlm options are inherited from NLMSettings."""
 
     # Application Configuration
     title: str = "NLM Web Interface"
@@ -18,10 +11,10 @@ class Settings(BaseSettings):
     port: int = 8080
     reload: bool = True
     dark_mode: bool = True
+    optimistic_updates: bool = True
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    # Session Configuration
+    storage_secret: str = "change-this-in-production"
 
 
 settings = Settings()
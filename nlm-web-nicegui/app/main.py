@@ -1,17 +1,148 @@
 """Main NiceGUI application."""
-from nicegui import ui, app
+import time
+from functools import partial
+from typing import Optional
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
+from nicegui import context, ui, app
+from app.clients import registry
 from app.config import settings
-from app.state import app_state
-from app.components.notebook_card import notebook_card
+from nlm_web_core.jobs import DEFAULT_INSTRUCTIONS
+from nlm_web_core.media import media_response
+from nlm_web_core.metrics import CONTENT_TYPE, MetricsMiddleware
+from nlm_web_core.nlm_client import (
+    MEDIA_SUFFIXES,
+    NLMError,
+    NLMTimeoutError,
+    NotebookNotFoundError,
+)
+from nlm_web_core.sessions import Credentials
+from app.state import AppState, browser_id, user_registry
+from nlm_web_core.tracing import RecordingTracer, RequestIdMiddleware
+from app.components.notebook_grid import NotebookGrid
+
+# Minimum seconds between re-renders of streamed markdown; every update
+# resends the whole document over the websocket
+MARKDOWN_REFRESH_INTERVAL = 0.1
+
+# Label and badge color of audio/video jobs shown on the Audio tab
+JOB_LABELS = {"audio": "Audio overview", "video": "Video overview"}
+JOB_COLORS = {
+    "queued": "grey",
+    "running": "primary",
+    "polling": "primary",
+    "succeeded": "positive",
+    "failed": "negative",
+}
 
 
 # Configure dark mode
 ui.dark_mode().enable() if settings.dark_mode else ui.dark_mode().disable()
 
+# Build the shared nlm client and job queue at startup, close them on shutdown
+app.on_startup(registry.start)
+app.on_startup(lambda: registry.jobs.start())
+app.on_shutdown(registry.close)
+
+# Time every request by route, only when metrics are enabled
+if registry.metrics is not None:
+    app.add_middleware(MetricsMiddleware, metrics=registry.metrics)
+
+# Tag the spans of each page load and media request with its X-Request-ID
+app.add_middleware(RequestIdMiddleware, tracer=registry.tracer)
+
+
+@app.get("/media/{notebook_id}/{kind}")
+async def media(notebook_id: str, kind: str, request: Request, download: bool = False):
+    """Serve an audio or video overview from the media cache, with Range support."""
+    if kind not in MEDIA_SUFFIXES:
+        raise HTTPException(status_code=404, detail=f"Unknown media kind {kind}")
+    user = user_registry(browser_id())
+    try:
+        file = await user.media.fetch(
+            f"{kind}/{notebook_id}",
+            MEDIA_SUFFIXES[kind],
+            partial(user.client.download_media, notebook_id, kind),
+        )
+    except NotebookNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Notebook {notebook_id} not found")
+    except NLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except NLMError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    filename = f"{kind}_overview_{notebook_id}{MEDIA_SUFFIXES[kind]}" if download else None
+    return media_response(request, file, filename)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, when enabled with NLM_METRICS_ENABLED."""
+    if registry.metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(registry.metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/traces", include_in_schema=False)
+async def traces(request_id: Optional[str] = None):
+    """Latency breakdown of recent requests, when NLM_TRACING=local."""
+    if not isinstance(registry.tracer, RecordingTracer):
+        raise HTTPException(status_code=404, detail="Local tracing is disabled")
+    return PlainTextResponse(registry.tracer.breakdown(request_id))
+
+
+def auth_status():
+    """Show who the browser is signed in as, with sign-in and sign-out buttons."""
+    signed_in = registry.sessions.get(browser_id()) is not None
+
+    def sign_in_dialog():
+        """Ask for NotebookLM credentials and keep them in this browser's session."""
+        with ui.dialog() as dialog, ui.card().classes("w-96"):
+            ui.label("Sign in to NotebookLM").classes("text-lg font-semibold")
+            token_input = ui.input("Auth token", password=True).classes("w-full").props(
+                "outlined"
+            )
+            cookies_input = ui.input("Cookies", password=True).classes("w-full").props(
+                "outlined"
+            )
+
+            def sign_in():
+                if not token_input.value or not cookies_input.value:
+                    ui.notify("Auth token and cookies are required", type="warning")
+                    return
+                if browser_id() is None:
+                    ui.notify("Sign-in needs STORAGE_SECRET to be set", type="negative")
+                    return
+                registry.sessions.set(
+                    browser_id(), Credentials(token_input.value, cookies_input.value)
+                )
+                ui.navigate.reload()
+
+            with ui.row().classes("gap-2 mt-4 justify-end"):
+                ui.button("Cancel", on_click=dialog.close).props("flat")
+                ui.button("Sign in", on_click=sign_in).props("color=primary")
+
+        dialog.open()
+
+    def sign_out():
+        registry.sessions.delete(browser_id())
+        ui.navigate.reload()
+
+    with ui.row().classes("items-center gap-2"):
+        if signed_in:
+            ui.icon("circle", size="xs").classes("text-green-500")
+            ui.label("Signed in").classes("text-sm")
+            ui.button("Sign out", on_click=sign_out).props("flat dense color=white")
+        else:
+            mode = "Demo mode" if registry.demo_mode else "Shared account"
+            ui.icon("circle", size="xs").classes("text-grey-5")
+            ui.label(mode).classes("text-sm")
+            ui.button("Sign in", on_click=sign_in_dialog).props("flat dense color=white")
+
 
 @ui.page("/")
 async def index():
     """Home page - Notebooks list."""
+    state = AppState()
 
     # Header
     with ui.header().classes("items-center justify-between"):
@@ -23,10 +154,8 @@ async def index():
             # Dark mode toggle
             ui.switch("Dark Mode", value=settings.dark_mode, on_change=lambda e: ui.dark_mode().toggle())
 
-            # Connection status
-            with ui.row().classes("items-center gap-2"):
-                ui.icon("circle", size="xs").classes("text-green-500")
-                ui.label("Connected").classes("text-sm")
+            # Authentication status
+            auth_status()
 
     # Main content
     with ui.column().classes("w-full max-w-7xl mx-auto p-6 gap-6"):
@@ -50,41 +179,30 @@ async def index():
         spinner = ui.spinner(size="lg")
         spinner.visible = False
 
-        # Notebooks grid
-        notebooks_container = ui.grid(columns=3).classes("w-full gap-4")
+        # Notebooks grid, updated card by card
+        notebooks_grid = NotebookGrid(
+            on_view=lambda nb_id: view_notebook(nb_id),
+            on_delete=lambda nb_id: delete_notebook_confirm(nb_id),
+        )
 
         async def load_notebooks():
-            """Load and display notebooks."""
+            """Load notebooks and update the cards that changed."""
             spinner.visible = True
             error_label.visible = False
-            notebooks_container.clear()
 
-            success = await app_state.load_notebooks()
+            success = await state.load_notebooks()
 
             spinner.visible = False
 
             if not success:
-                error_label.text = app_state.error or "Failed to load notebooks"
+                error_label.text = state.error or "Failed to load notebooks"
                 error_label.visible = True
                 return
 
-            if not app_state.notebooks:
-                with notebooks_container:
-                    with ui.column().classes("col-span-3 text-center py-12"):
-                        ui.icon("description", size="xl").classes("text-gray-400")
-                        ui.label("No notebooks").classes("text-lg font-medium mt-2")
-                        ui.label("Get started by creating a new notebook").classes(
-                            "text-gray-500"
-                        )
-                return
+            notebooks_grid.update(state.notebooks, state.pending)
 
-            with notebooks_container:
-                for notebook in app_state.notebooks:
-                    notebook_card(
-                        notebook=notebook,
-                        on_view=lambda nb_id: view_notebook(nb_id),
-                        on_delete=lambda nb_id: delete_notebook_confirm(nb_id),
-                    )
+        # Optimistic changes and their reconciliation update the grid directly
+        state.on_change = lambda: notebooks_grid.update(state.notebooks, state.pending)
 
         async def view_notebook(notebook_id: str):
             """Navigate to notebook detail page."""
@@ -108,9 +226,17 @@ async def index():
         async def delete_notebook(notebook_id: str, dialog):
             """Delete notebook."""
             dialog.close()
+            if settings.optimistic_updates:
+                # The card disappears at once and comes back if deletion fails
+                if not await state.delete_notebook_optimistic(notebook_id):
+                    ui.notify(
+                        state.error or "Failed to delete notebook", type="negative"
+                    )
+                return
+
             spinner.visible = True
 
-            success = await app_state.delete_notebook(notebook_id)
+            success = await state.delete_notebook(notebook_id)
 
             spinner.visible = False
 
@@ -119,7 +245,7 @@ async def index():
                 await load_notebooks()
             else:
                 ui.notify(
-                    app_state.error or "Failed to delete notebook", type="negative"
+                    state.error or "Failed to delete notebook", type="negative"
                 )
 
         def create_notebook_dialog():
@@ -153,9 +279,19 @@ async def index():
                 return
 
             dialog.close()
+            if settings.optimistic_updates:
+                # A placeholder card is shown until the notebook exists
+                if not await state.create_notebook_optimistic(
+                    title=title, emoji=emoji if emoji else None
+                ):
+                    ui.notify(
+                        state.error or "Failed to create notebook", type="negative"
+                    )
+                return
+
             spinner.visible = True
 
-            success = await app_state.create_notebook(
+            success = await state.create_notebook(
                 title=title, emoji=emoji if emoji else None
             )
 
@@ -166,7 +302,7 @@ async def index():
                 await load_notebooks()
             else:
                 ui.notify(
-                    app_state.error or "Failed to create notebook", type="negative"
+                    state.error or "Failed to create notebook", type="negative"
                 )
 
         # Initial load
@@ -176,6 +312,7 @@ async def index():
 @ui.page("/notebooks/{notebook_id}")
 async def notebook_detail(notebook_id: str):
     """Notebook detail page."""
+    state = AppState()
 
     # Header
     with ui.header().classes("items-center justify-between"):
@@ -219,27 +356,27 @@ async def notebook_detail(notebook_id: str):
                         """Load sources for this notebook."""
                         sources_container.clear()
 
-                        success = await app_state.load_sources(notebook_id)
+                        success = await state.load_sources(notebook_id)
 
                         if not success:
                             with sources_container:
                                 ui.label(
-                                    app_state.error or "Failed to load sources"
+                                    state.error or "Failed to load sources"
                                 ).classes("text-red-500")
                             return
 
-                        if not app_state.sources:
+                        if not state.sources:
                             with sources_container:
                                 ui.label("No sources yet").classes("text-gray-500")
                             return
 
                         with sources_container:
-                            for source in app_state.sources:
+                            for source in state.sources:
                                 with ui.card().classes("w-full"):
-                                    ui.label(source["title"]).classes("font-semibold")
-                                    ui.label(
-                                        f"Type: {source['metadata'].get('source_type', 'Unknown')}"
-                                    ).classes("text-sm text-gray-500")
+                                    ui.label(source.title).classes("font-semibold")
+                                    ui.label(f"Type: {source.source_type}").classes(
+                                        "text-sm text-gray-500"
+                                    )
 
                     await load_sources()
 
@@ -250,13 +387,144 @@ async def notebook_detail(notebook_id: str):
 
             # Audio panel
             with ui.tab_panel(audio_tab):
-                ui.label("Audio Overviews").classes("text-2xl font-semibold")
-                ui.label("Audio management coming soon...").classes("text-gray-500")
+                with ui.column().classes("w-full gap-4"):
+                    ui.label("Audio Overviews").classes("text-2xl font-semibold")
+
+                    instructions_input = ui.input(
+                        "Instructions", placeholder=DEFAULT_INSTRUCTIONS
+                    ).classes("w-full").props("outlined")
+
+                    with ui.row().classes("gap-2"):
+                        ui.button(
+                            "Create Audio Overview",
+                            icon="graphic_eq",
+                            on_click=lambda: submit_job("audio"),
+                        ).props("color=primary")
+                        ui.button(
+                            "Create Video Overview",
+                            icon="movie",
+                            on_click=lambda: submit_job("video"),
+                        ).props("color=primary")
+
+                    jobs_container = ui.column().classes("w-full gap-2")
+
+                    def render_jobs():
+                        """Show this notebook's audio and video jobs."""
+                        jobs_container.clear()
+                        jobs = [
+                            job
+                            for job in state.list_jobs(notebook_id)
+                            if job.kind in JOB_LABELS
+                        ]
+
+                        with jobs_container:
+                            if not jobs:
+                                ui.label("No audio or video overviews yet").classes(
+                                    "text-gray-500"
+                                )
+                                return
+
+                            playing = set()
+                            for job in jobs:
+                                with ui.card().classes("w-full"):
+                                    with ui.row().classes(
+                                        "w-full items-center justify-between"
+                                    ):
+                                        ui.label(JOB_LABELS[job.kind]).classes(
+                                            "font-semibold"
+                                        )
+                                        ui.badge(job.status, color=JOB_COLORS[job.status])
+                                    if job.error:
+                                        ui.label(job.error).classes("text-sm text-red-500")
+                                    elif job.status == "polling":
+                                        ui.label(
+                                            f"Generating… checked {job.polls} times"
+                                        ).classes("text-sm text-gray-500")
+                                    elif job.result:
+                                        ui.label(f"ID: {job.result}").classes(
+                                            "text-sm text-gray-500"
+                                        )
+                                    # Player for the newest overview of each kind
+                                    if job.status == "succeeded" and job.kind not in playing:
+                                        playing.add(job.kind)
+                                        url = f"/media/{notebook_id}/{job.kind}"
+                                        player = ui.audio if job.kind == "audio" else ui.video
+                                        player(url).classes("w-full")
+                                        ui.link(
+                                            "Download", f"{url}?download=true"
+                                        ).classes("text-sm")
+
+                    def submit_job(kind: str):
+                        """Queue an audio or video overview job."""
+                        job = state.submit_job(
+                            kind, notebook_id, instructions_input.value or None
+                        )
+                        if job is None:
+                            ui.notify(state.error, type="negative")
+                        else:
+                            ui.notify(f"{JOB_LABELS[kind]} started", type="positive")
+
+                    render_jobs()
+                    # Job updates arrive from background workers; re-render
+                    # and push them to this page until it disconnects
+                    stop_watching = state.watch_jobs(
+                        notebook_id, lambda job: render_jobs()
+                    )
+                    context.get_client().on_disconnect(stop_watching)
 
             # Generation panel
             with ui.tab_panel(generation_tab):
-                ui.label("Content Generation").classes("text-2xl font-semibold")
-                ui.label("Content generation coming soon...").classes("text-gray-500")
+                with ui.column().classes("w-full gap-4"):
+                    ui.label("Content Generation").classes("text-2xl font-semibold")
+
+                    generation_buttons = []
+                    with ui.row().classes("items-center gap-2"):
+                        for kind, label, icon in (
+                            ("guide", "Study Guide", "school"),
+                            ("outline", "Outline", "list"),
+                            ("faq", "FAQ", "quiz"),
+                            ("glossary", "Glossary", "menu_book"),
+                        ):
+                            generation_buttons.append(
+                                ui.button(
+                                    label,
+                                    icon=icon,
+                                    on_click=lambda kind=kind: generate(kind),
+                                ).props("color=primary")
+                            )
+                        generation_spinner = ui.spinner(size="md")
+                        generation_spinner.visible = False
+
+                    generation_error = ui.label().classes("text-red-500")
+                    generation_error.visible = False
+
+                    generated = ui.markdown().classes("w-full")
+
+                    async def generate(kind: str):
+                        """Stream generated content into the markdown view."""
+                        for button in generation_buttons:
+                            button.disable()
+                        generation_spinner.visible = True
+                        generation_error.visible = False
+                        generated.set_content("")
+
+                        content = ""
+                        rendered_at = 0.0
+                        async for chunk in state.stream_content(notebook_id, kind):
+                            content += chunk
+                            now = time.monotonic()
+                            if now - rendered_at >= MARKDOWN_REFRESH_INTERVAL:
+                                generated.set_content(content)
+                                rendered_at = now
+                        generated.set_content(content)
+
+                        generation_spinner.visible = False
+                        for button in generation_buttons:
+                            button.enable()
+
+                        if state.error:
+                            generation_error.text = state.error
+                            generation_error.visible = True
 
 
 def main():
@@ -267,6 +535,7 @@ def main():
         port=settings.port,
         reload=False,  # Disable reload for production
         show=False,  # Don't auto-open browser
+        storage_secret=settings.storage_secret,  # Identifies browsers for sign-in
     )
 
 
@@ -1,62 +1,100 @@
-"""Application state management."""
-from typing import Optional, List, Dict, Any
-from app.nlm_client import NLMClient
-from app.config import settings
+"""Per-connection application state.
+
+Every page a browser opens gets its own AppState, so tabs never overwrite
+each other's notebook lists or selection. The data itself is not fetched
+per tab: reads go through the client of the browser's account, whose
+response cache and single-flight group are shared by every connection, so
+N tabs showing the same notebook cost one nlm call.
+"""
+import asyncio
+import uuid
+from typing import Callable, Optional, List, AsyncIterator
+from nicegui import app
+from app.clients import registry
+from nlm_web_core.clients import ClientRegistry, NLMBackend
+from nlm_web_core.jobs import Job
+from nlm_web_core.records import Notebook, Source
+
+# Client streaming method for each kind of generated content
+GENERATORS = {
+    "guide": "stream_guide",
+    "outline": "stream_outline",
+    "faq": "stream_faq",
+    "glossary": "stream_glossary",
+}
+
+# Seconds after the last optimistic create or delete before the notebook
+# list is re-read from the server, so a burst of changes costs one refresh
+RECONCILE_DELAY = 1.0
+
+
+def browser_id() -> Optional[str]:
+    """NiceGUI's id for the browser being served, None outside a request."""
+    try:
+        return app.storage.browser.get("id")
+    except (AssertionError, RuntimeError):
+        # Outside a page or request, or storage is not enabled in ui.run()
+        return None
+
+
+def user_registry(browser: Optional[str]) -> ClientRegistry:
+    """
+    Registry serving a browser: its signed-in user's, or the shared one.
+
+    Args:
+        browser: Browser id, see browser_id()
+    """
+    return registry.for_credentials(registry.sessions.get(browser))
 
 
 class AppState:
-    """Global application state."""
+    """State of one page connection."""
+
+    def __init__(self, browser: Optional[str] = None):
+        """
+        Initialize state for the page being built.
 
-    def __init__(self):
-        """Initialize application state."""
-        self.client: Optional[NLMClient] = None
-        self.notebooks: List[Dict[str, Any]] = []
+        Args:
+            browser: Browser the page belongs to (default: the one being served)
+        """
+        self.browser = browser if browser is not None else browser_id()
+        self._client: Optional[NLMBackend] = None
+        self.notebooks: List[Notebook] = []
         self.current_notebook_id: Optional[str] = None
-        self.sources: List[Dict[str, Any]] = []
+        self.sources: List[Source] = []
         self.loading: bool = False
         self.error: Optional[str] = None
+        # IDs of placeholder notebooks shown while their creation is running
+        self.pending: set[str] = set()
+        # Called when an optimistic change or reconciliation alters notebooks
+        self.on_change: Optional[Callable[[], None]] = None
+        self._mutations = 0
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> NLMBackend:
+        """The attached client, else the client of the page's browser.
+
+        Looked up on each use rather than kept, so signing in or out and idle
+        per-user clients being closed take effect on open pages too.
+        """
+        if self._client is not None:
+            return self._client
+        return user_registry(self.browser).client
+
+    @client.setter
+    def client(self, client: Optional[NLMBackend]) -> None:
+        self._client = client
 
     def initialize_client(self) -> bool:
         """
-        Initialize NLM client with credentials.
+        Build the NLM client of the page's browser if it does not exist yet.
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            if not settings.nlm_auth_token or not settings.nlm_cookies:
-                # Demo mode: use mock client
-                from unittest.mock import Mock
-                self.client = Mock(spec=NLMClient)
-                self.client.list_notebooks.return_value = [
-                    {
-                        "project_id": "demo-nb-1",
-                        "title": "Demo Research Notebook",
-                        "emoji": "📚",
-                        "sources": [],
-                    },
-                    {
-                        "project_id": "demo-nb-2",
-                        "title": "Demo Study Notes",
-                        "emoji": "📖",
-                        "sources": [],
-                    },
-                ]
-                self.client.create_notebook.return_value = {
-                    "project_id": "demo-nb-new",
-                    "title": "New Demo Notebook",
-                    "emoji": "📝",
-                }
-                self.client.delete_notebook.return_value = True
-                self.client.list_sources.return_value = []
-                return True
-
-            self.client = NLMClient(
-                auth_token=settings.nlm_auth_token,
-                cookies=settings.nlm_cookies,
-                nlm_path=settings.nlm_path,
-            )
-            return True
+            return self.client is not None
         except Exception as e:
             self.error = f"Failed to initialize client: {str(e)}"
             return False
@@ -75,7 +113,7 @@ class AppState:
         try:
             self.loading = True
             self.error = None
-            self.notebooks = self.client.list_notebooks()
+            self.notebooks = await self.client.list_notebooks()
             return True
         except Exception as e:
             self.error = f"Failed to load notebooks: {str(e)}"
@@ -101,8 +139,9 @@ class AppState:
         try:
             self.loading = True
             self.error = None
-            notebook = self.client.create_notebook(title=title, emoji=emoji)
-            self.notebooks.insert(0, notebook)
+            notebook = await self.client.create_notebook(title=title, emoji=emoji)
+            if notebook is not None:
+                self.notebooks.insert(0, notebook)
             return True
         except Exception as e:
             self.error = f"Failed to create notebook: {str(e)}"
@@ -126,8 +165,8 @@ class AppState:
         try:
             self.loading = True
             self.error = None
-            self.client.delete_notebook(notebook_id)
-            self.notebooks = [nb for nb in self.notebooks if nb["project_id"] != notebook_id]
+            await self.client.delete_notebook(notebook_id)
+            self.notebooks = [nb for nb in self.notebooks if nb.project_id != notebook_id]
             return True
         except Exception as e:
             self.error = f"Failed to delete notebook: {str(e)}"
@@ -135,6 +174,123 @@ class AppState:
         finally:
             self.loading = False
 
+    async def create_notebook_optimistic(
+        self, title: str, emoji: Optional[str] = None
+    ) -> bool:
+        """
+        Create a notebook, showing it before the server has answered.
+
+        A placeholder is inserted at once and replaced by the created notebook,
+        or removed again if creation fails. The list is then reconciled with
+        the server in the background; see schedule_reconcile().
+
+        Args:
+            title: Notebook title
+            emoji: Optional emoji
+
+        Returns:
+            True if successful, False otherwise
+        """
+        placeholder = Notebook(f"pending-{uuid.uuid4().hex}", title, emoji)
+        self.pending.add(placeholder.project_id)
+        self.notebooks.insert(0, placeholder)
+        self._changed()
+
+        self._mutations += 1
+        try:
+            self.error = None
+            notebook = await self.client.create_notebook(title=title, emoji=emoji)
+        except Exception as e:
+            self.error = f"Failed to create notebook: {str(e)}"
+            notebook = None
+        finally:
+            self._mutations -= 1
+            self.pending.discard(placeholder.project_id)
+        # The placeholder is gone if a reconciliation replaced the list meanwhile
+        index = next(
+            (i for i, nb in enumerate(self.notebooks) if nb is placeholder), 0
+        )
+        self.notebooks = [nb for nb in self.notebooks if nb is not placeholder]
+        if notebook is not None and all(
+            nb.project_id != notebook.project_id for nb in self.notebooks
+        ):
+            self.notebooks.insert(index, notebook)
+        self._changed()
+        if self.error:
+            return False
+        self.schedule_reconcile()
+        return True
+
+    async def delete_notebook_optimistic(self, notebook_id: str) -> bool:
+        """
+        Delete a notebook, hiding it before the server has answered.
+
+        The notebook is put back where it was if deletion fails. The list is
+        then reconciled with the server in the background.
+
+        Args:
+            notebook_id: Notebook ID to delete
+
+        Returns:
+            True if successful, False otherwise
+        """
+        index = next(
+            (i for i, nb in enumerate(self.notebooks) if nb.project_id == notebook_id),
+            None,
+        )
+        removed = self.notebooks.pop(index) if index is not None else None
+        self._changed()
+
+        self._mutations += 1
+        try:
+            self.error = None
+            await self.client.delete_notebook(notebook_id)
+        except Exception as e:
+            self.error = f"Failed to delete notebook: {str(e)}"
+            if index is not None and removed is not None:
+                self.notebooks.insert(min(index, len(self.notebooks)), removed)
+                self._changed()
+            return False
+        finally:
+            self._mutations -= 1
+        self.schedule_reconcile()
+        return True
+
+    def schedule_reconcile(self, delay: Optional[float] = None) -> None:
+        """
+        Re-read the notebook list once optimistic changes have settled.
+
+        Each call restarts the delay, so a burst of changes is followed by a
+        single refresh. Must be called with a running event loop.
+
+        Args:
+            delay: Seconds to wait after the last change (default:
+                RECONCILE_DELAY)
+        """
+        if delay is None:
+            delay = RECONCILE_DELAY
+        if self._reconcile_task is not None and not self._reconcile_task.done():
+            self._reconcile_task.cancel()
+        self._reconcile_task = asyncio.create_task(self._reconcile(delay))
+
+    async def _reconcile(self, delay: float) -> None:
+        """Replace optimistic changes with the server's notebook list."""
+        await asyncio.sleep(delay)
+        # A change still running will schedule its own reconciliation
+        if self._mutations:
+            return
+        error = self.error
+        if await self.load_notebooks():
+            self._changed()
+        else:
+            # Keep showing the optimistic list; the next load will catch up
+            self.error = error
+
+    def _changed(self) -> None:
+        """Tell the page that notebooks changed."""
+        if self.on_change is not None:
+            self.on_change()
+
     async def load_sources(self, notebook_id: str) -> bool:
         """
         Load sources for a notebook.
@@ -152,7 +308,7 @@ class AppState:
             self.loading = True
             self.error = None
             self.current_notebook_id = notebook_id
-            self.sources = self.client.list_sources(notebook_id)
+            self.sources = await self.client.list_sources(notebook_id)
             return True
         except Exception as e:
             self.error = f"Failed to load sources: {str(e)}"
@@ -160,6 +316,80 @@ class AppState:
         finally:
             self.loading = False
 
+    async def stream_content(self, notebook_id: str, kind: str) -> AsyncIterator[str]:
+        """
+        Generate content for a notebook, yielding markdown as it is produced.
+
+        Stops early and sets ``error`` if generation fails.
+
+        Args:
+            notebook_id: Notebook ID
+            kind: Content to generate: guide, outline, faq or glossary
+
+        Yields:
+            Generated markdown chunks
+        """
+        if not self.client:
+            if not self.initialize_client():
+                return
+
+        self.error = None
+        stream = getattr(self.client, GENERATORS[kind])(notebook_id)
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception as e:
+            self.error = f"Failed to generate {kind}: {str(e)}"
+        finally:
+            await stream.aclose()
+
+    def submit_job(
+        self, kind: str, notebook_id: str, instructions: Optional[str] = None
+    ) -> Optional[Job]:
+        """
+        Queue a background audio, video or generation job.
+
+        Args:
+            kind: Job kind, e.g. "audio" or "video"
+            notebook_id: Notebook ID
+            instructions: Optional generation instructions
+
+        Returns:
+            The queued job, or None if it could not be queued
+        """
+        try:
+            self.error = None
+            return user_registry(self.browser).jobs.submit(kind, notebook_id, instructions)
+        except Exception as e:
+            self.error = f"Failed to start {kind} job: {str(e)}"
+            return None
+
+    def list_jobs(self, notebook_id: str) -> List[Job]:
+        """
+        List a notebook's background jobs, newest first.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            List of jobs
+        """
+        return user_registry(self.browser).jobs.list_jobs(notebook_id)
+
+    def watch_jobs(
+        self, notebook_id: str, callback: Callable[[Job], None]
+    ) -> Callable[[], None]:
+        """
+        Call back whenever one of a notebook's jobs is submitted or changes.
+
+        Args:
+            notebook_id: Notebook ID
+            callback: Called with the updated job
+
+        Returns:
+            Function that stops watching
+        """
+        return user_registry(self.browser).jobs.subscribe(
+            lambda job: callback(job) if job.notebook_id == notebook_id else None
+        )
 
-# Global state instance
-app_state = AppState()
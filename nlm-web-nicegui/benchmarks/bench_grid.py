@@ -0,0 +1,103 @@
+"""Render-cost benchmark: rebuilding the notebook grid vs keyed updates.
+
+Builds the home page's notebook grid in a server-less NiceGUI client and
+refreshes it the way the page does: on first load, with an unchanged
+listing, after a notebook is created and after one is deleted. For each
+refresh it reports how many elements were sent to the browser, the size of
+the websocket ``update`` message that carries them, and the time taken.
+
+"rebuild" clears the grid and renders one card per notebook, as the page did
+before NotebookGrid; "keyed" is NotebookGrid with its default page size.
+
+Usage:
+    python -m benchmarks.bench_grid --notebooks 100 1000
+"""
+import argparse
+import json
+import time
+from typing import Callable, Optional
+
+from nicegui import Client, ui
+from nicegui.page import page
+
+from app.components.notebook_card import notebook_card
+from app.components.notebook_grid import NotebookGrid
+from nlm_web_core.fake_backend import generate_notebooks
+from nlm_web_core.records import Notebook
+
+
+def noop(project_id: str) -> None:
+    """Card button callback."""
+
+
+def rebuild_strategy() -> Callable[[list[Notebook]], None]:
+    """Refresh by clearing the grid and rendering every card again."""
+    grid = ui.grid(columns=3)
+
+    def refresh(notebooks: list[Notebook]) -> None:
+        grid.clear()
+        with grid:
+            for notebook in notebooks:
+                notebook_card(notebook=notebook, on_view=noop, on_delete=noop)
+
+    return refresh
+
+
+def keyed_strategy() -> Callable[[list[Notebook]], None]:
+    """Refresh through NotebookGrid."""
+    return NotebookGrid(on_view=noop, on_delete=noop).update
+
+
+def measure(client: Client, refresh: Callable[[], None]) -> tuple[int, int, float]:
+    """Return elements sent, websocket bytes and seconds for one refresh."""
+    client.outbox.updates.clear()
+    start = time.perf_counter()
+    refresh()
+    # What the outbox loop would emit as one "update" message
+    message = {
+        element_id: None if element is None else element._to_dict()
+        for element_id, element in client.outbox.updates.items()
+    }
+    elapsed = time.perf_counter() - start
+    sent = sum(1 for element in message.values() if element is not None)
+    return sent, len(json.dumps(message, default=str)), elapsed
+
+
+def run(counts: list[int]) -> None:
+    """Benchmark both strategies against each account size."""
+    print(
+        f"{'notebooks':>9} {'strategy':>8} {'refresh':>9} "
+        f"{'elements':>9} {'bytes':>11} {'time':>10}"
+    )
+    for count in counts:
+        notebooks = generate_notebooks(count)
+        created = [Notebook("bench-new", "Created notebook"), *notebooks]
+        scenarios = [
+            ("initial", notebooks),
+            ("same", notebooks),
+            ("create", created),
+            ("delete", created[:1] + created[2:]),
+        ]
+        for name, strategy in (("rebuild", rebuild_strategy), ("keyed", keyed_strategy)):
+            client = Client(page("/"), shared=True)
+            with client:
+                refresh = strategy()
+                for scenario, listing in scenarios:
+                    sent, size, elapsed = measure(client, lambda: refresh(listing))
+                    print(
+                        f"{count:>9} {name:>8} {scenario:>9} {sent:>9} {size:>11}"
+                        f" {elapsed * 1000:8.2f}ms"
+                    )
+            client.remove_all_elements()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notebooks", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args(argv)
+    run(args.notebooks)
+
+
+if __name__ == "__main__":
+    main()
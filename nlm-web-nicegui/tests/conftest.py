@@ -1,6 +1,7 @@
 """Test configuration and fixtures."""
 import pytest
 from unittest.mock import Mock
+from nlm_web_core.records import Notebook, Source
 
 
 @pytest.fixture
@@ -14,18 +15,8 @@ def mock_nlm_client():
 def sample_notebooks():
     """Sample notebook data."""
     return [
-        {
-            "project_id": "nb1",
-            "title": "Research Notebook",
-            "emoji": "📚",
-            "sources": [],
-        },
-        {
-            "project_id": "nb2",
-            "title": "Study Notes",
-            "emoji": "📖",
-            "sources": [],
-        },
+        Notebook("nb1", "Research Notebook", "📚"),
+        Notebook("nb2", "Study Notes", "📖"),
     ]
 
 
@@ -33,14 +24,6 @@ def sample_notebooks():
 def sample_sources():
     """Sample source data."""
     return [
-        {
-            "source_id": {"source_id": "src1"},
-            "title": "Article 1",
-            "metadata": {"source_type": "SOURCE_TYPE_URL"},
-        },
-        {
-            "source_id": {"source_id": "src2"},
-            "title": "Document.pdf",
-            "metadata": {"source_type": "SOURCE_TYPE_LOCAL_FILE"},
-        },
+        Source("src1", "Article 1", "SOURCE_TYPE_URL"),
+        Source("src2", "Document.pdf", "SOURCE_TYPE_LOCAL_FILE"),
     ]
@@ -0,0 +1,319 @@
+"""Tests for the NiceGUI pages and HTTP endpoints."""
+import asyncio
+import pytest
+from fastapi import HTTPException, Request
+from nicegui import Client, background_tasks, core, ui
+from nicegui.page import page
+from app import main
+from app import state as state_module
+from app.config import Settings
+from nlm_web_core.clients import ClientRegistry
+from nlm_web_core.jobs import Job
+from nlm_web_core.sessions import Credentials
+
+
+@pytest.fixture
+async def registry(monkeypatch, tmp_path):
+    """Demo-mode registry serving the pages instead of the process-wide one."""
+    registry = ClientRegistry(
+        Settings(
+            nlm_auth_token="",
+            nlm_cookies="",
+            nlm_job_store=":memory:",
+            nlm_media_dir=str(tmp_path),
+        )
+    )
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(state_module, "registry", registry)
+    monkeypatch.setattr(state_module, "RECONCILE_DELAY", 0.01)
+    yield registry
+    await registry.close()
+
+
+@pytest.fixture
+async def client(monkeypatch, registry):
+    """NiceGUI client to build pages in, running event handlers on this loop."""
+    monkeypatch.setattr(core, "loop", asyncio.get_running_loop())
+    client = Client(page("/"), shared=True)
+    yield client
+    await settle()
+    client.remove_all_elements()
+
+
+async def render(client: Client, build, *args) -> None:
+    """Build a page, or part of one, in the client."""
+    with client:
+        result = build(*args)
+        if asyncio.iscoroutine(result):
+            await result
+
+
+async def settle() -> None:
+    """Wait for the event handlers started so far, and those they start."""
+    while background_tasks.running_tasks:
+        await asyncio.gather(*background_tasks.running_tasks)
+
+
+def find(client: Client, kind: type, text: str) -> list:
+    """Elements of a kind whose text is ``text``, in creation order."""
+    return [
+        element
+        for element in client.elements.values()
+        if isinstance(element, kind)
+        and not element.is_deleted
+        and (getattr(element, "text", None) == text or element._props.get("label") == text)
+    ]
+
+
+def texts(client: Client) -> list[str]:
+    """Text of every label on the page."""
+    return [
+        element.text
+        for element in client.elements.values()
+        if isinstance(element, ui.label) and not element.is_deleted
+    ]
+
+
+async def click(button: ui.button) -> None:
+    """Click a button and wait for its handlers."""
+    for listener_id in list(button._event_listeners):
+        button._handle_event({"listener_id": listener_id, "args": {}})
+    await settle()
+
+
+async def create(client: Client, title: str) -> None:
+    """Fill in and submit the new notebook dialog."""
+    await click(find(client, ui.button, "New Notebook")[0])
+    find(client, ui.input, "Title")[-1].value = title
+    await click(find(client, ui.button, "Create")[-1])
+
+
+def descendants(element: ui.element) -> list:
+    """Elements nested in an element, depth first."""
+    return [
+        nested
+        for slot in element.slots.values()
+        for child in slot.children
+        for nested in (child, *descendants(child))
+    ]
+
+
+async def delete(client: Client, title: str) -> None:
+    """Delete the card of a notebook, confirming the dialog."""
+    card = find(client, ui.label, title)[0].parent_slot.parent.parent_slot.parent
+    button = next(
+        element
+        for element in descendants(card)
+        if isinstance(element, ui.button) and element.text == "Delete"
+    )
+    await click(button)
+    await click(find(client, ui.button, "Delete")[-1])
+
+
+class TestIndex:
+    """Test the notebooks page."""
+
+    async def test_lists_notebooks(self, client):
+        """Test the page shows a card per notebook and the sign-in state."""
+        await render(client, main.index)
+
+        assert "📚 Demo Research Notebook" in texts(client)
+        assert "📖 Demo Study Notes" in texts(client)
+        assert "Demo mode" in texts(client)
+
+    async def test_load_error(self, registry, client):
+        """Test a failed listing is shown instead of the cards."""
+        registry.client.inject_error("list_notebooks")
+
+        await render(client, main.index)
+
+        error = next(t for t in texts(client) if t.startswith("Failed to load notebooks"))
+        assert find(client, ui.label, error)[0].visible
+
+    @pytest.mark.parametrize("optimistic", [True, False])
+    async def test_create_and_delete(self, monkeypatch, registry, client, optimistic):
+        """Test notebooks created and deleted from the page reach the backend."""
+        monkeypatch.setattr(main.settings, "optimistic_updates", optimistic)
+        await render(client, main.index)
+
+        await create(client, "Fresh Notebook")
+        assert "📚 Fresh Notebook" in texts(client)
+        created = [nb for nb in await registry.client.list_notebooks()
+                   if nb.title == "Fresh Notebook"]
+        assert len(created) == 1
+
+        await delete(client, "📚 Fresh Notebook")
+        await asyncio.sleep(0.05)
+        await settle()
+        assert "📚 Fresh Notebook" not in texts(client)
+        assert all(nb.title != "Fresh Notebook"
+                   for nb in await registry.client.list_notebooks())
+
+    @pytest.mark.parametrize("optimistic", [True, False])
+    async def test_failures_are_notified(self, monkeypatch, registry, client, optimistic):
+        """Test failed creates and deletes leave the notebooks as they were."""
+        monkeypatch.setattr(main.settings, "optimistic_updates", optimistic)
+        await render(client, main.index)
+        registry.client.inject_error("create_notebook")
+        registry.client.inject_error("delete_notebook")
+        notify = []
+        monkeypatch.setattr(ui, "notify", lambda message, **kwargs: notify.append(message))
+
+        await create(client, "Doomed")
+        await delete(client, "📚 Demo Research Notebook")
+
+        assert "📚 Doomed" not in texts(client)
+        assert "📚 Demo Research Notebook" in texts(client)
+        assert [message.split(":")[0] for message in notify] == [
+            "Failed to create notebook",
+            "Failed to delete notebook",
+        ]
+
+    async def test_create_requires_title(self, monkeypatch, registry, client):
+        """Test the dialog does not submit without a title."""
+        await render(client, main.index)
+        notify = []
+        monkeypatch.setattr(ui, "notify", lambda message, **kwargs: notify.append(message))
+
+        await create(client, "")
+
+        assert notify == ["Title is required"]
+        assert len(await registry.client.list_notebooks()) == 2
+
+
+class TestAuthStatus:
+    """Test signing in and out from the header."""
+
+    async def test_sign_in_and_out(self, monkeypatch, registry, client):
+        """Test the dialog keeps credentials in the browser's session."""
+        monkeypatch.setattr(main, "browser_id", lambda: "browser-1")
+        await render(client, main.auth_status)
+
+        await click(find(client, ui.button, "Sign in")[0])
+        find(client, ui.input, "Auth token")[-1].value = "token"
+        find(client, ui.input, "Cookies")[-1].value = "cookies"
+        await click(find(client, ui.button, "Sign in")[-1])
+
+        assert registry.sessions.get("browser-1") == Credentials("token", "cookies")
+        await render(client, main.auth_status)
+        assert "Signed in" in texts(client)
+        await click(find(client, ui.button, "Sign out")[-1])
+        assert registry.sessions.get("browser-1") is None
+
+    async def test_sign_in_needs_credentials_and_storage(self, monkeypatch, registry, client):
+        """Test incomplete credentials and browsers without an id are refused."""
+        notify = []
+        monkeypatch.setattr(ui, "notify", lambda message, **kwargs: notify.append(message))
+        await render(client, main.auth_status)
+        await click(find(client, ui.button, "Sign in")[0])
+
+        await click(find(client, ui.button, "Sign in")[-1])
+        find(client, ui.input, "Auth token")[-1].value = "token"
+        find(client, ui.input, "Cookies")[-1].value = "cookies"
+        await click(find(client, ui.button, "Sign in")[-1])
+
+        assert notify == [
+            "Auth token and cookies are required",
+            "Sign-in needs STORAGE_SECRET to be set",
+        ]
+        assert len(registry.sessions) == 0
+
+
+class TestNotebookDetail:
+    """Test the notebook page."""
+
+    async def test_sources(self, registry, client):
+        """Test the notebook's sources are listed."""
+        await registry.client.add_source("demo-nb-1", "https://example.com/article")
+        sources = await registry.client.list_sources("demo-nb-1")
+
+        await render(client, main.notebook_detail, "demo-nb-1")
+
+        assert sources and all(source.title in texts(client) for source in sources)
+
+    async def test_no_sources(self, client):
+        """Test a notebook without sources says so."""
+        await render(client, main.notebook_detail, "demo-nb-2")
+
+        assert "No sources yet" in texts(client)
+
+    async def test_sources_error(self, registry, client):
+        """Test a failed source listing is shown in place of the list."""
+        registry.client.inject_error("list_sources")
+
+        await render(client, main.notebook_detail, "demo-nb-1")
+
+        assert any(t.startswith("Failed to load sources") for t in texts(client))
+
+    async def test_jobs(self, registry, client):
+        """Test jobs are listed and a finished overview gets a player."""
+        registry.jobs.store.save(
+            Job(job_id="job-1", kind="audio", notebook_id="demo-nb-1",
+                status="succeeded", result="audio-1")
+        )
+
+        await render(client, main.notebook_detail, "demo-nb-1")
+        await click(find(client, ui.button, "Create Video Overview")[0])
+
+        assert "ID: audio-1" in texts(client)
+        players = [e for e in client.elements.values() if isinstance(e, ui.audio)]
+        assert players[-1]._props["src"] == "/media/demo-nb-1/audio"
+        assert [job.kind for job in registry.jobs.list_jobs("demo-nb-1")] == [
+            "video", "audio"
+        ]
+        assert "Video overview" in texts(client)
+
+    async def test_generate(self, registry, client):
+        """Test generated content is streamed into the page."""
+        await render(client, main.notebook_detail, "demo-nb-1")
+
+        await click(find(client, ui.button, "Study Guide")[0])
+
+        markdown = [e for e in client.elements.values() if isinstance(e, ui.markdown)]
+        assert markdown[-1].content
+        assert all(b.enabled for b in find(client, ui.button, "Study Guide"))
+
+    async def test_generate_error(self, registry, client):
+        """Test a failed generation is shown under the buttons."""
+        registry.client.inject_error("stream_faq")
+        await render(client, main.notebook_detail, "demo-nb-1")
+
+        await click(find(client, ui.button, "FAQ")[0])
+
+        assert any(t.startswith("Failed to generate faq") for t in texts(client))
+
+
+class TestEndpoints:
+    """Test the HTTP endpoints next to the pages."""
+
+    @staticmethod
+    def request() -> Request:
+        """A bare GET request, as the media endpoint receives it."""
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+    async def test_media(self, registry):
+        """Test an overview is downloaded into the cache and served."""
+        await registry.client.create_audio("demo-nb-1", "")
+
+        response = await main.media("demo-nb-1", "audio", self.request(), download=True)
+
+        assert response.status_code == 200
+        assert "audio_overview_demo-nb-1" in response.headers["content-disposition"]
+
+    @pytest.mark.parametrize(
+        "notebook_id, kind, status",
+        [("demo-nb-1", "podcast", 404), ("missing", "audio", 404), ("demo-nb-1", "video", 500)],
+    )
+    async def test_media_errors(self, registry, notebook_id, kind, status):
+        """Test unknown kinds and notebooks, and missing overviews, are errors."""
+        with pytest.raises(HTTPException) as error:
+            await main.media(notebook_id, kind, self.request())
+
+        assert error.value.status_code == status
+
+    async def test_metrics_and_traces_disabled(self, registry):
+        """Test diagnostics answer 404 unless enabled."""
+        for endpoint in (main.metrics, main.traces):
+            with pytest.raises(HTTPException) as error:
+                await endpoint()
+            assert error.value.status_code == 404
@@ -0,0 +1,116 @@
+"""Tests for the keyed, incrementally rendered notebook grid."""
+import pytest
+from dataclasses import replace
+from nicegui import Client, ui
+from nicegui.page import page
+from app.components.notebook_grid import NotebookGrid
+from nlm_web_core.records import Notebook
+
+
+@pytest.fixture
+def client():
+    """NiceGUI client to build elements in, without a server."""
+    client = Client(page("/"), shared=True)
+    with client:
+        yield client
+    client.remove_all_elements()
+
+
+def make_notebooks(count: int) -> list[Notebook]:
+    """Notebooks nb0, nb1, ... in listing order."""
+    return [Notebook(f"nb{i}", f"Notebook {i}", source_count=i) for i in range(count)]
+
+
+def cards(grid: NotebookGrid) -> list:
+    """Elements in the grid, in display order."""
+    return list(grid.grid.default_slot.children)
+
+
+class TestNotebookGrid:
+    """Test NotebookGrid renders only what changed."""
+
+    def test_unchanged_refresh_sends_nothing(self, client):
+        """Test refreshing with the same listing touches no element."""
+        grid = NotebookGrid(on_view=print, on_delete=print)
+        notebooks = make_notebooks(5)
+        grid.update(notebooks)
+        assert len(grid) == 5
+        client.outbox.updates.clear()
+
+        grid.update(list(notebooks))
+
+        assert client.outbox.updates == {}
+
+    def test_add_and_remove_keep_other_cards(self, client):
+        """Test only added, removed and changed notebooks get new cards."""
+        grid = NotebookGrid(on_view=print, on_delete=print)
+        notebooks = make_notebooks(4)
+        grid.update(notebooks)
+        before = dict(zip((nb.project_id for nb in notebooks), cards(grid)))
+
+        new = Notebook("new", "Fresh")
+        renamed = replace(notebooks[2], title="Renamed")
+        grid.update([new, notebooks[0], renamed, notebooks[3]])
+
+        after = cards(grid)
+        assert len(after) == 4
+        assert after[1] is before["nb0"] and after[3] is before["nb3"]
+        assert after[2] is not before["nb2"]
+        assert before["nb1"].is_deleted and before["nb2"].is_deleted
+        assert after[0] not in before.values()
+
+    def test_unchanged_cards_are_not_rebuilt(self, client):
+        """Test a fresh listing of equal records, reordered, keeps every card."""
+        grid = NotebookGrid(on_view=print, on_delete=print)
+        grid.update(make_notebooks(4))
+        before = dict(zip((f"nb{i}" for i in range(4)), cards(grid)))
+        elements = len(client.elements)
+        client.outbox.updates.clear()
+
+        # A new load returns new, equal records
+        grid.update(list(reversed(make_notebooks(4))))
+
+        assert cards(grid) == [before[f"nb{i}"] for i in (3, 2, 1, 0)]
+        assert not any(card.is_deleted for card in before.values())
+        assert len(client.elements) == elements
+        assert list(client.outbox.updates) == [grid.grid.id]
+
+    def test_pending_cards(self, client):
+        """Test a notebook being created gets a disabled card until it exists."""
+        grid = NotebookGrid(on_view=print, on_delete=print)
+        placeholder = Notebook("pending-1", "New")
+        grid.update([placeholder], pending={"pending-1"})
+        card = cards(grid)[0]
+        buttons = [e for e in card._collect_descendants() if isinstance(e, ui.button)]
+        assert buttons and all(not button.enabled for button in buttons)
+
+        grid.update([Notebook("nb9", "New")])
+
+        assert card.is_deleted and len(grid) == 1
+
+    def test_empty_state(self, client):
+        """Test the placeholder is shown only while there are no notebooks."""
+        grid = NotebookGrid(on_view=print, on_delete=print)
+        grid.update([])
+        assert len(cards(grid)) == 1 and len(grid) == 0
+
+        grid.update(make_notebooks(1))
+        assert len(cards(grid)) == 1 and len(grid) == 1
+
+    def test_renders_a_page_at_a_time(self, client):
+        """Test large listings are rendered incrementally."""
+        grid = NotebookGrid(on_view=print, on_delete=print, page_size=60)
+        grid.update(make_notebooks(150))
+        assert len(grid) == 60
+        assert grid._more.visible
+        first = cards(grid)
+
+        grid.show_more()
+        assert len(grid) == 120
+        assert cards(grid)[:60] == first
+        assert grid._more_button.text == "Show more (30 remaining)"
+
+        grid.show_more()
+        grid.show_more()
+        assert len(grid) == 150
+        assert not grid._more.visible
@@ -0,0 +1,416 @@
+"""Tests for application state management."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from nlm_web_core.fake_backend import FakeNLMBackend
+from nlm_web_core.records import Notebook
+from app.state import AppState
+
+
+@pytest.fixture(autouse=True)
+def fast_reconcile(monkeypatch):
+    """Reconcile optimistic changes without the production delay."""
+    monkeypatch.setattr("app.state.RECONCILE_DELAY", 0.01)
+
+
+class TestAppState:
+    """Test AppState awaiting the async client."""
+
+    async def test_load_notebooks(self, mock_nlm_client, sample_notebooks):
+        """Test loading notebooks awaits the client."""
+        state = AppState()
+        state.client = mock_nlm_client
+        mock_nlm_client.list_notebooks = AsyncMock(return_value=sample_notebooks)
+
+        assert await state.load_notebooks() is True
+        assert state.notebooks == sample_notebooks
+
+    async def test_load_notebooks_error(self, mock_nlm_client):
+        """Test client errors are surfaced via state.error."""
+        state = AppState()
+        state.client = mock_nlm_client
+        mock_nlm_client.list_notebooks = AsyncMock(side_effect=Exception("boom"))
+
+        assert await state.load_notebooks() is False
+        assert "boom" in state.error
+
+    async def test_delete_notebook(self, mock_nlm_client, sample_notebooks):
+        """Test deleting removes the notebook locally."""
+        state = AppState()
+        state.client = mock_nlm_client
+        state.notebooks = list(sample_notebooks)
+        mock_nlm_client.delete_notebook = AsyncMock(return_value=True)
+
+        assert await state.delete_notebook("nb1") is True
+        assert [nb.project_id for nb in state.notebooks] == ["nb2"]
+
+    async def test_load_sources(self, mock_nlm_client, sample_sources):
+        """Test loading sources for a notebook."""
+        state = AppState()
+        state.client = mock_nlm_client
+        mock_nlm_client.list_sources = AsyncMock(return_value=sample_sources)
+
+        assert await state.load_sources("nb1") is True
+        assert state.current_notebook_id == "nb1"
+        assert state.sources == sample_sources
+
+    async def test_stream_content(self, mock_nlm_client):
+        """Test generated content is yielded chunk by chunk."""
+
+        async def chunks(notebook_id):
+            yield "# Guide\n"
+            yield "- point\n"
+
+        state = AppState()
+        state.client = mock_nlm_client
+        mock_nlm_client.stream_guide = chunks
+
+        assert [c async for c in state.stream_content("nb1", "guide")] == [
+            "# Guide\n",
+            "- point\n",
+        ]
+        assert state.error is None
+
+    async def test_stream_content_error(self, mock_nlm_client):
+        """Test a failing stream stops and sets state.error."""
+
+        async def failing(notebook_id):
+            yield "# FAQ\n"
+            raise Exception("boom")
+
+        state = AppState()
+        state.client = mock_nlm_client
+        mock_nlm_client.stream_faq = failing
+
+        assert [c async for c in state.stream_content("nb1", "faq")] == ["# FAQ\n"]
+        assert "boom" in state.error
+
+    async def test_optimistic_create(self, mock_nlm_client, sample_notebooks):
+        """Test a placeholder is shown at once and replaced by the real notebook."""
+        state = AppState()
+        state.client = mock_nlm_client
+        state.notebooks = list(sample_notebooks)
+        created = Notebook("nb3", "New")
+        seen = []
+        state.on_change = lambda: seen.append(
+            ([nb.title for nb in state.notebooks], set(state.pending))
+        )
+        mock_nlm_client.create_notebook = AsyncMock(return_value=created)
+        mock_nlm_client.list_notebooks = AsyncMock(
+            return_value=[created, *sample_notebooks]
+        )
+
+        assert await state.create_notebook_optimistic("New") is True
+
+        titles, pending = seen[0]
+        assert titles[0] == "New" and len(pending) == 1
+        assert state.notebooks[0] is created and not state.pending
+        mock_nlm_client.list_notebooks.assert_not_awaited()  # Deferred
+        await state._reconcile_task
+        mock_nlm_client.list_notebooks.assert_awaited_once()
+
+    async def test_optimistic_create_rolls_back(self, mock_nlm_client, sample_notebooks):
+        """Test a failed create removes its placeholder and skips reconciling."""
+        state = AppState()
+        state.client = mock_nlm_client
+        state.notebooks = list(sample_notebooks)
+        mock_nlm_client.create_notebook = AsyncMock(side_effect=Exception("boom"))
+
+        assert await state.create_notebook_optimistic("New") is False
+
+        assert state.notebooks == sample_notebooks
+        assert not state.pending
+        assert "boom" in state.error
+        assert state._reconcile_task is None
+
+    async def test_optimistic_delete_rolls_back(self, mock_nlm_client, sample_notebooks):
+        """Test a failed delete puts the notebook back where it was."""
+        state = AppState()
+        state.client = mock_nlm_client
+        state.notebooks = list(sample_notebooks)
+        shown = []
+        state.on_change = lambda: shown.append([nb.project_id for nb in state.notebooks])
+        mock_nlm_client.delete_notebook = AsyncMock(side_effect=Exception("boom"))
+
+        assert await state.delete_notebook_optimistic("nb1") is False
+
+        assert shown == [["nb2"], ["nb1", "nb2"]]
+        assert state.notebooks == sample_notebooks
+
+    async def test_burst_reconciles_once(self, mock_nlm_client, sample_notebooks):
+        """Test several optimistic deletes are followed by one list refresh."""
+        state = AppState()
+        state.client = mock_nlm_client
+        state.notebooks = list(sample_notebooks)
+        mock_nlm_client.delete_notebook = AsyncMock(return_value=True)
+        mock_nlm_client.list_notebooks = AsyncMock(return_value=[])
+
+        assert await state.delete_notebook_optimistic("nb1")
+        first = state._reconcile_task
+        assert await state.delete_notebook_optimistic("nb2")
+        await asyncio.sleep(0)
+
+        assert first.cancelled()
+        await state._reconcile_task
+        mock_nlm_client.list_notebooks.assert_awaited_once()
+
+    def test_states_share_registry_client(self, monkeypatch):
+        """Test every AppState attaches the process-wide client."""
+        from app import state as state_module
+        from nlm_web_core.clients import ClientRegistry
+        from app.config import Settings
+
+        registry = ClientRegistry(Settings(nlm_auth_token="", nlm_cookies=""))
+        monkeypatch.setattr(state_module, "registry", registry)
+        first, second = AppState(), AppState()
+
+        assert first.initialize_client() and second.initialize_client()
+        assert first.client is second.client is registry.client
+
+    def test_signed_in_browser_gets_own_client(self, monkeypatch):
+        """Test a browser signed in with its own credentials uses its own client."""
+        from app import state as state_module
+        from nlm_web_core.clients import ClientRegistry
+        from app.config import Settings
+        from nlm_web_core.sessions import Credentials
+
+        registry = ClientRegistry(Settings(nlm_auth_token="", nlm_cookies=""))
+        monkeypatch.setattr(state_module, "registry", registry)
+        state = AppState("browser-1")
+        shared = state.client
+
+        registry.sessions.set("browser-1", Credentials("token", "cookies"))
+
+        assert state.client is not shared
+        assert state.client.auth_token == "token"
+        assert state.client is state_module.user_registry("browser-1").client
+        assert AppState("browser-2").client is shared
+
+    async def test_connections_share_reads(self, monkeypatch, sample_notebooks):
+        """Test each page has its own state but concurrent loads run one command."""
+        from app import state as state_module
+        from nlm_web_core.clients import ClientRegistry
+        from app.config import Settings
+
+        registry = ClientRegistry(Settings(nlm_auth_token="t", nlm_cookies="c"))
+        monkeypatch.setattr(state_module, "registry", registry)
+        client = registry.client
+        calls = []
+
+        async def run_command(args, input_data=None):
+            calls.append(args)
+            await asyncio.sleep(0.01)
+            return '[{"project_id": "nb1", "title": "Research Notebook"}]', ""
+
+        monkeypatch.setattr(client, "_run_command", run_command)
+        states = [AppState(f"browser-{i}") for i in range(5)]
+
+        assert all(await asyncio.gather(*(s.load_notebooks() for s in states)))
+        states[0].current_notebook_id = "nb1"
+        assert await states[1].load_notebooks()
+
+        assert calls == [["list", "--json"]]
+        assert states[0].notebooks == states[1].notebooks
+        assert states[0].notebooks is not states[1].notebooks
+        assert states[1].current_notebook_id is None
+
+    async def test_jobs_for_notebook(self, monkeypatch):
+        """Test job submission and updates are scoped to one notebook."""
+        from app import state as state_module
+        from nlm_web_core.clients import ClientRegistry
+        from app.config import Settings
+
+        registry = ClientRegistry(Settings(nlm_auth_token="", nlm_cookies=""))
+        monkeypatch.setattr(state_module, "registry", registry)
+        state = AppState()
+        seen = []
+        stop = state.watch_jobs("demo-nb-1", lambda job: seen.append(job.notebook_id))
+
+        job = state.submit_job("audio", "demo-nb-1")
+        state.submit_job("audio", "demo-nb-2")
+        stop()
+
+        assert [j.job_id for j in state.list_jobs("demo-nb-1")] == [job.job_id]
+        assert seen == ["demo-nb-1"]
+        assert state.submit_job("podcast", "demo-nb-1") is None
+        assert "podcast" in state.error
+        await registry.close()
+
+
+class TestOptimisticUpdates:
+    """Test optimistic creates and deletes against the in-memory backend."""
+
+    @pytest.fixture
+    async def state(self):
+        """State of a page showing the demo notebooks."""
+        state = AppState()
+        state.client = FakeNLMBackend()
+        assert await state.load_notebooks()
+        yield state
+        if state._reconcile_task is not None:
+            state._reconcile_task.cancel()
+
+    async def test_placeholder_is_replaced(self, state):
+        """Test the placeholder shown during a create becomes the real notebook."""
+        state.client.latency = 0.02
+        task = asyncio.create_task(state.create_notebook_optimistic("New", "🧪"))
+        await asyncio.sleep(0.005)
+
+        placeholder = state.notebooks[0]
+        assert placeholder.title == "New" and placeholder.project_id in state.pending
+
+        assert await task
+        created = state.notebooks[0]
+        assert created.title == "New" and created.project_id != placeholder.project_id
+        assert not state.pending
+        assert all(nb.project_id != placeholder.project_id for nb in state.notebooks)
+        await state._reconcile_task
+        assert state.notebooks == await state.client.list_notebooks()
+
+    async def test_failures_roll_back(self, state):
+        """Test failed creates and deletes leave the list as the server has it."""
+        before = list(state.notebooks)
+        shown = []
+        state.on_change = lambda: shown.append([nb.title for nb in state.notebooks])
+        state.client.inject_error("create_notebook")
+        state.client.inject_error("delete_notebook")
+
+        assert await state.create_notebook_optimistic("Doomed") is False
+        assert await state.delete_notebook_optimistic(before[1].project_id) is False
+
+        assert state.notebooks == before == await state.client.list_notebooks()
+        assert not state.pending and state._reconcile_task is None
+        assert shown == [
+            ["Doomed", before[0].title, before[1].title],
+            [before[0].title, before[1].title],
+            [before[0].title],
+            [before[0].title, before[1].title],
+        ]
+        assert "Injected failure in delete_notebook" in state.error
+
+    async def test_reconcile_during_create(self, state):
+        """Test list refreshes landing while a create is running do not lose it."""
+        backend = state.client
+        release = asyncio.Event()
+        create = backend.create_notebook
+
+        async def answer_late(**kwargs):
+            # The notebook exists on the server before the create returns
+            notebook = await create(**kwargs)
+            await release.wait()
+            return notebook
+
+        backend.create_notebook = answer_late
+        task = asyncio.create_task(state.create_notebook_optimistic("Late"))
+        await asyncio.sleep(0)
+
+        # A reconciliation is skipped while the create runs...
+        calls = backend.calls
+        await state._reconcile(0)
+        assert backend.calls == calls
+        assert state.notebooks[0].project_id in state.pending
+
+        # ...but a reload can still replace the list, placeholder included
+        assert await state.load_notebooks()
+        release.set()
+        assert await task
+
+        assert [nb.title for nb in state.notebooks].count("Late") == 1
+        assert not state.pending
+        assert state.notebooks == await backend.list_notebooks()
+
+    async def test_reconcile_is_debounced(self, state):
+        """Test a burst of changes is followed by one list read after the last."""
+        backend = state.client
+        changes = []
+        state.on_change = lambda: changes.append(len(state.notebooks))
+        calls = backend.calls
+
+        state.schedule_reconcile(0.02)
+        await asyncio.sleep(0.01)
+        # Created elsewhere, e.g. in another tab
+        await backend.create_notebook("From Elsewhere")
+        state.schedule_reconcile(0.02)
+        await asyncio.sleep(0.01)
+        state.schedule_reconcile(0.02)
+        await state._reconcile_task
+
+        assert backend.calls == calls + 2  # The create and one list
+        assert state.notebooks[0].title == "From Elsewhere"
+        assert changes == [3]
+
+
+class TestConnections:
+    """Test each page connection keeps its own state and looks up its client."""
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        """Demo-mode registry serving the states instead of the process-wide one."""
+        from app import state as state_module
+        from nlm_web_core.clients import ClientRegistry
+        from app.config import Settings
+
+        registry = ClientRegistry(
+            Settings(nlm_auth_token="", nlm_cookies="", nlm_job_store=":memory:")
+        )
+        monkeypatch.setattr(state_module, "registry", registry)
+        return registry
+
+    async def test_tabs_of_one_browser_are_isolated(self, registry):
+        """Test optimistic changes and selection stay in the tab that made them."""
+        first, second = AppState("browser-1"), AppState("browser-1")
+        changes = []
+        first.on_change = lambda: changes.append("first")
+        second.on_change = lambda: changes.append("second")
+        assert await first.load_notebooks() and await second.load_notebooks()
+
+        first.current_notebook_id = "demo-nb-1"
+        assert await first.create_notebook_optimistic("Only Here")
+        first._reconcile_task.cancel()
+
+        assert first.notebooks[0].title == "Only Here"
+        assert all(nb.title != "Only Here" for nb in second.notebooks)
+        assert second.current_notebook_id is None and not second.pending
+        assert set(changes) == {"first"}
+        assert first.client is second.client
+
+    def test_attached_client_wins(self, registry, mock_nlm_client):
+        """Test a client set on the state is used instead of the registry's."""
+        state = AppState("browser-1")
+
+        state.client = mock_nlm_client
+        assert state.client is mock_nlm_client
+        state.client = None
+        assert state.client is registry.client
+
+    def test_signing_out_returns_to_shared_client(self, registry):
+        """Test open pages follow their browser's session on every lookup."""
+        from nlm_web_core.sessions import Credentials
+
+        state = AppState("browser-1")
+        registry.sessions.set("browser-1", Credentials("token", "cookies"))
+        own = state.client
+
+        registry.sessions.delete("browser-1")
+
+        assert own is not registry.client
+        assert state.client is registry.client
+
+    async def test_lookup_failure_is_reported(self, monkeypatch, registry):
+        """Test a client that cannot be built fails loads with state.error."""
+
+        def broken(credentials):
+            raise RuntimeError("no client")
+
+        monkeypatch.setattr(registry, "for_credentials", broken)
+        state = AppState("browser-1")
+
+        assert state.initialize_client() is False
+        assert state.error == "Failed to initialize client: no client"
+
+    def test_browser_id_outside_request(self):
+        """Test states built outside a page have no browser."""
+        from app.state import browser_id
+
+        assert browser_id() is None
+        assert AppState().browser is None